@@ -0,0 +1,59 @@
+"""
+8-bit ALU golden model and verification support
+
+    from alu import ALU8Bit
+    result, flags = ALU8Bit().execute('00000', 42, 23)
+
+Modules:
+    opcodes        opcode metadata from spec/opcode/opcode_table.csv, NZCV flag packing
+    model          ALU(width) and ALU8Bit (scalar and batch), TableALU8Bit (precomputed lookups)
+    vector_format  compact binary test-vector format and mmap reader
+    result_cache   content-hash cache of verification results
+    service        asyncio socket server and client for the model (alu_cli.py --serve)
+    fpga_link      batched serial transport to the FPGA board, pty loopback emulator
+    rtl            behavioural model of the FPGA RTL (sim/FPGA/src/ALU.sv) for co-simulation
+    circ           indexed, cached reader for Logisim .circ files
+    kicad          streaming, indexed, cached reader for KiCad schematics and boards
+    netlist        gate-level simulator of the Logisim circuit (sim/top/alu_top.circ)
+    timing         event-driven timing simulation of the netlist with per-element delays
+    power          switching activity and dynamic power estimation on the netlist
+    trace          instruction traces with registers and flags, replay (alu_cli.py --trace)
+"""
+
+from .model import ALU, ALU8Bit, TableALU8Bit
+from .opcodes import (
+    DISPLAY_NAMES,
+    FLAG_C,
+    FLAG_N,
+    FLAG_V,
+    FLAG_Z,
+    OPCODE_INDEX,
+    OPCODE_INFO,
+    OPCODE_NAMES,
+    OPCODES,
+    OpcodeInfo,
+    lookup_opcode,
+    opcode_number,
+    pack_flags,
+    unpack_flags,
+)
+
+__all__ = [
+    'ALU',
+    'ALU8Bit',
+    'TableALU8Bit',
+    'DISPLAY_NAMES',
+    'FLAG_C',
+    'FLAG_N',
+    'FLAG_V',
+    'FLAG_Z',
+    'OPCODE_INDEX',
+    'OPCODE_INFO',
+    'OPCODE_NAMES',
+    'OPCODES',
+    'OpcodeInfo',
+    'lookup_opcode',
+    'opcode_number',
+    'pack_flags',
+    'unpack_flags',
+]
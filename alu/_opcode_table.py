@@ -0,0 +1,25 @@
+"""Generated from spec/opcode/opcode_table.csv by tools/compile_opcode_table.py; do not edit"""
+
+SOURCE = 'OPCODE Decimal,OPCODE Binary,FUNC[3:0],Operation,Description,Implementation,Circuit Progress\n0,00000,0000,ADD,A + B,Arithmetic: A + B,TRUE\n1,00001,0001,SUB,A - B,Arithmetic: A - B (uses M=1),TRUE\n2,00010,0010,INC A,A + 1,Arithmetic: A + 1,TRUE\n3,00011,0011,DEC A,A - 1,Arithmetic: A - 1 (uses M=1),TRUE\n4,00100,0100,LSL / SLL,Shift left logical,Arithmetic: Shift A left by 1 bit,TRUE\n5,00101,0101,LSR / SRL,Shift right logical,Arithmetic: Shift A right by 1 bit,TRUE\n6,00110,0110,ASR,Arithmetic shift right,Arithmetic: Shift A right with sign extension,TRUE\n7,00111,0111,REV A,Reverse A bits,Arithmetic: Reverse bit order of A,TRUE\n8,01000,1000,NAND,A NAND B,Logic: Base NAND operation (INV_OUT=0),TRUE\n9,01001,1001,NOR,A NOR B,Logic: Base NOR operation (INV_OUT=0),TRUE\n10,01010,1010,XOR,A XOR B,Logic: Base XOR operation (INV_OUT=0),TRUE\n11,01011,1011,PASS A,Pass A through,Logic: Pass A to output unchanged,TRUE\n12,01100,1100,PASS B,Pass B through,Logic: Pass B to output unchanged,TRUE\n13,01101,1101,AND,A AND B,Logic: Implemented as NAND + invert (INV_OUT=1),TRUE\n14,01110,1110,OR,A OR B,Logic: Implemented as NOR + invert (INV_OUT=1),TRUE\n15,01111,1111,XNOR,A XNOR B,Logic: Implemented as XOR + invert (INV_OUT=1),TRUE\n16,10000,0000,CMP,Compare (A - B flags only),Arithmetic: A - B for flags, no output,TRUE\n17,10001,0001,NOT A,Invert A,Logic: Implemented as PASS A + invert (INV_OUT=1),TRUE\n18,10010,0010,NOT B,Invert B,Logic: Implemented as PASS B + invert (INV_OUT=1),TRUE\n'
+
+ROWS = (
+    (0, '00000', '0000', 'ADD', ('ADD',), 'A + B', 'Arithmetic: A + B', 'Arithmetic', True),
+    (1, '00001', '0001', 'SUB', ('SUB',), 'A - B', 'Arithmetic: A - B (uses M=1)', 'Arithmetic', True),
+    (2, '00010', '0010', 'INC A', ('INC A',), 'A + 1', 'Arithmetic: A + 1', 'Arithmetic', True),
+    (3, '00011', '0011', 'DEC A', ('DEC A',), 'A - 1', 'Arithmetic: A - 1 (uses M=1)', 'Arithmetic', True),
+    (4, '00100', '0100', 'LSL', ('LSL', 'SLL'), 'Shift left logical', 'Arithmetic: Shift A left by 1 bit', 'Arithmetic', True),
+    (5, '00101', '0101', 'LSR', ('LSR', 'SRL'), 'Shift right logical', 'Arithmetic: Shift A right by 1 bit', 'Arithmetic', True),
+    (6, '00110', '0110', 'ASR', ('ASR',), 'Arithmetic shift right', 'Arithmetic: Shift A right with sign extension', 'Arithmetic', True),
+    (7, '00111', '0111', 'REV A', ('REV A',), 'Reverse A bits', 'Arithmetic: Reverse bit order of A', 'Arithmetic', True),
+    (8, '01000', '1000', 'NAND', ('NAND',), 'A NAND B', 'Logic: Base NAND operation (INV_OUT=0)', 'Logic', True),
+    (9, '01001', '1001', 'NOR', ('NOR',), 'A NOR B', 'Logic: Base NOR operation (INV_OUT=0)', 'Logic', True),
+    (10, '01010', '1010', 'XOR', ('XOR',), 'A XOR B', 'Logic: Base XOR operation (INV_OUT=0)', 'Logic', True),
+    (11, '01011', '1011', 'PASS A', ('PASS A',), 'Pass A through', 'Logic: Pass A to output unchanged', 'Logic', True),
+    (12, '01100', '1100', 'PASS B', ('PASS B',), 'Pass B through', 'Logic: Pass B to output unchanged', 'Logic', True),
+    (13, '01101', '1101', 'AND', ('AND',), 'A AND B', 'Logic: Implemented as NAND + invert (INV_OUT=1)', 'Logic', True),
+    (14, '01110', '1110', 'OR', ('OR',), 'A OR B', 'Logic: Implemented as NOR + invert (INV_OUT=1)', 'Logic', True),
+    (15, '01111', '1111', 'XNOR', ('XNOR',), 'A XNOR B', 'Logic: Implemented as XOR + invert (INV_OUT=1)', 'Logic', True),
+    (16, '10000', '0000', 'CMP', ('CMP',), 'Compare (A - B flags only)', 'Arithmetic: A - B for flags, no output', 'Arithmetic', True),
+    (17, '10001', '0001', 'NOT A', ('NOT A',), 'Invert A', 'Logic: Implemented as PASS A + invert (INV_OUT=1)', 'Logic', True),
+    (18, '10010', '0010', 'NOT B', ('NOT B',), 'Invert B', 'Logic: Implemented as PASS B + invert (INV_OUT=1)', 'Logic', True),
+)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Indexed, cached reader for Logisim-evolution .circ files
+
+parse_file() reads every circuit of a project in one pass: each component's
+attributes become a dict, and wire endpoints and tunnels (joined by label)
+are resolved into nets. CircuitIndex then finds components by library,
+name, location or tunnel label, and the net of any point, without rescanning
+the circuit.
+
+    from alu.circ import CircuitIndex, load_circuit
+    index = CircuitIndex(load_circuit('sim/top/alu_top.circ'))
+    index.by_name['Multiplexer']
+    index.net((1230, 1100))
+
+load_file() keeps the parsed model in a JSON cache (results/circuit_cache.json)
+keyed on the file's size and mtime, falling back to its SHA-256 when those
+change, so repeated analyses and simulations of alu_top.circ skip the XML
+parse. CACHE_VERSION must be bumped when the parsed model changes.
+"""
+
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .result_cache import FileCache
+
+DEFAULT_CACHE_FILE = Path(__file__).resolve().parent.parent / 'results' / 'circuit_cache.json'
+CACHE_VERSION = 1
+
+Point = Tuple[int, int]
+
+
+class CircuitError(ValueError):
+    """The file is not a readable Logisim circuit"""
+
+
+class Component(NamedTuple):
+    name: str
+    loc: Point
+    attrs: Dict[str, str]
+    lib: Optional[str] = None     # Library id, e.g. '1' (see CircuitFile.libraries)
+
+    def attr(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.attrs.get(name, default)
+
+    def width(self, name: str = 'width', default: int = 1) -> int:
+        return int(self.attrs.get(name, default))
+
+    def describe(self) -> str:
+        label = self.attrs.get('label')
+        return f"{self.name} at {self.loc}" + (f" ({label})" if label else "")
+
+
+class Circuit(NamedTuple):
+    """Components and wire segments of one circuit, with the project options"""
+    components: List[Component]
+    wires: List[Tuple[Point, Point]]
+    options: Dict[str, str]
+    nets: Optional[Dict[Point, Point]] = None   # Point -> net representative (resolve_nets)
+
+
+class CircuitFile(NamedTuple):
+    """Every circuit of a .circ project"""
+    circuits: Dict[str, Circuit]
+    libraries: Dict[str, str]     # Library id -> descriptor, e.g. '1' -> '#Gates'
+    options: Dict[str, str]
+
+
+class _UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        if parent != item:
+            root = item
+            while self.parent[root] != root:
+                root = self.parent[root]
+            while self.parent[item] != root:
+                self.parent[item], item = root, self.parent[item]
+            return root
+        return item
+
+    def union(self, a, b) -> None:
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[b] = a
+
+
+def resolve_nets(components: List[Component], wires: List[Tuple[Point, Point]]) -> Dict[Point, Point]:
+    """Map every wire endpoint and tunnel to its net's representative (smallest) point.
+
+    Points joined by wires, and tunnels with the same label, form a net.
+    Points that are in no wire or tunnel are their own net.
+    """
+    points = _UnionFind()
+    for start, end in wires:
+        points.union(start, end)
+    tunnels = {}
+    for comp in components:
+        if comp.name == 'Tunnel':
+            points.union(tunnels.setdefault(comp.attr('label', ''), comp.loc), comp.loc)
+
+    members = defaultdict(list)
+    for point in points.parent:
+        members[points.find(point)].append(point)
+    nets = {}
+    for group in members.values():
+        representative = min(group)
+        for point in group:
+            nets[point] = representative
+    return nets
+
+
+class CircuitIndex:
+    """Lookup tables over one circuit, built once"""
+
+    def __init__(self, circuit: Circuit):
+        self.circuit = circuit
+        self.by_name: Dict[str, List[Component]] = defaultdict(list)
+        self.by_lib: Dict[Optional[str], List[Component]] = defaultdict(list)
+        self.at: Dict[Point, List[Component]] = defaultdict(list)
+        self.tunnels: Dict[str, List[Component]] = defaultdict(list)
+        for comp in circuit.components:
+            self.by_name[comp.name].append(comp)
+            self.by_lib[comp.lib].append(comp)
+            self.at[comp.loc].append(comp)
+            if comp.name == 'Tunnel':
+                self.tunnels[comp.attr('label', '')].append(comp)
+        self.nets = circuit.nets if circuit.nets is not None else resolve_nets(circuit.components, circuit.wires)
+
+    def net(self, point: Point) -> Point:
+        """Representative point of the net at point"""
+        return self.nets.get(point, point)
+
+
+def _point(text: str) -> Point:
+    x, y = text.strip('()').split(',')
+    return int(x), int(y)
+
+
+def parse_file(path) -> CircuitFile:
+    """Read every circuit of a .circ file (no cache)"""
+    try:
+        root = ET.parse(path).getroot()
+    except ET.ParseError as exc:
+        raise CircuitError(f"{path}: {exc}") from None
+    libraries = {lib.get('name'): lib.get('desc') for lib in root.iterfind('lib')}
+    options = {a.get('name'): a.get('val') for a in root.iterfind('options/a')}
+    circuits = {}
+    for element in root.iter('circuit'):
+        components = [
+            Component(comp.get('name'), _point(comp.get('loc')),
+                      {a.get('name'): a.get('val') for a in comp.iterfind('a')}, comp.get('lib'))
+            for comp in element.iterfind('comp')
+        ]
+        wires = [(_point(wire.get('from')), _point(wire.get('to'))) for wire in element.iterfind('wire')]
+        circuits[element.get('name')] = Circuit(components, wires, options, resolve_nets(components, wires))
+    return CircuitFile(circuits, libraries, options)
+
+
+def _circuit_file_to_json(parsed: CircuitFile) -> dict:
+    return {
+        'libraries': parsed.libraries,
+        'options': parsed.options,
+        'circuits': {
+            name: {
+                'components': [[comp.lib, comp.name, list(comp.loc), comp.attrs] for comp in circuit.components],
+                'wires': [[*start, *end] for start, end in circuit.wires],
+                'nets': [[*point, *net] for point, net in circuit.nets.items()],
+            }
+            for name, circuit in parsed.circuits.items()
+        },
+    }
+
+
+def _circuit_file_from_json(data: dict) -> CircuitFile:
+    options = data['options']
+    circuits = {}
+    for name, circuit in data['circuits'].items():
+        circuits[name] = Circuit(
+            [Component(comp_name, tuple(loc), attrs, lib) for lib, comp_name, loc, attrs in circuit['components']],
+            [((x1, y1), (x2, y2)) for x1, y1, x2, y2 in circuit['wires']],
+            options,
+            {(x, y): (nx, ny) for x, y, nx, ny in circuit['nets']},
+        )
+    return CircuitFile(circuits, data['libraries'], options)
+
+
+class CircuitCache(FileCache):
+    """JSON-backed store of parsed .circ files"""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_FILE):
+        super().__init__(path, CACHE_VERSION, _circuit_file_to_json, _circuit_file_from_json)
+
+
+def load_file(path, cache_file: Optional[Path] = DEFAULT_CACHE_FILE) -> CircuitFile:
+    """Parsed .circ file, from the cache when it is unchanged (cache_file=None disables the cache)"""
+    if cache_file is None:
+        return parse_file(path)
+    cache = CircuitCache(cache_file)
+    parsed = cache.load(path)
+    if parsed is None:
+        parsed = parse_file(path)
+        cache.store(path, parsed)
+    cache.save()
+    return parsed
+
+
+def load_circuit(path, circuit: str = 'main', cache_file: Optional[Path] = DEFAULT_CACHE_FILE) -> Circuit:
+    """One circuit of a .circ file, through the cache"""
+    circuits = load_file(path, cache_file).circuits
+    if circuit not in circuits:
+        raise CircuitError(f"No circuit named '{circuit}' in {path}")
+    return circuits[circuit]
+
+
+def parse_circuit(path, circuit: str = 'main') -> Circuit:
+    """Read one circuit of a .circ file, bypassing the cache"""
+    return load_circuit(path, circuit, cache_file=None)
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Serial link to the ALU on an FPGA board, and a pty loopback emulator
+
+The host sends batches of operations in frames and the board answers each
+frame with one frame of results, so a serial round trip is paid per batch
+rather than per operation. Frames are sequence-numbered and up to
+`window` of them are kept in flight, so the board can work on one frame
+while the next is still on the wire.
+
+Frame layout (little-endian):
+
+    sync    u8   REQUEST_SYNC (host -> board) or RESPONSE_SYNC (board -> host)
+    kind    u8   KIND_EXECUTE / KIND_RESULT, or KIND_ERROR
+    seq     u8   sequence number, echoed in the response
+    count   u16  records (execute/result) or message bytes (error)
+    payload      KIND_EXECUTE: count x (opcode u8, A u8, B u8)
+                 KIND_RESULT:  count x (result u8, NZCV u8)
+                 KIND_ERROR:   UTF-8 message
+    crc     u16  CRC-16/CCITT (binascii.crc_hqx) of kind..payload
+
+A receiver that sees a byte other than the sync byte discards input until
+the next sync byte, so a corrupted frame costs that frame only.
+
+Serial ports are opened with pyserial when it is installed. Without it,
+POSIX character devices (including the emulator's pty) are opened directly
+in raw mode. get_transport() keeps one open transport per port so
+repeated CLI calls reuse it.
+
+LoopbackEmulator plays the board on a pseudo-terminal using the golden
+model, optionally throttled to a baud rate, so the whole path can be
+tested and benchmarked without hardware.
+"""
+
+import atexit
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from array import array
+from binascii import crc_hqx
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+from .model import TableALU8Bit
+
+REQUEST_SYNC = 0xA5
+RESPONSE_SYNC = 0x5A
+
+KIND_EXECUTE = 0x01
+KIND_RESULT = 0x81
+KIND_ERROR = 0xFF
+
+HEADER = struct.Struct('<BBBH')
+CRC = struct.Struct('<H')
+OP_RECORD_SIZE = 3
+RESULT_RECORD_SIZE = 2
+
+DEFAULT_BAUDRATE = 115200
+
+# Records per frame; sized for the board's receive buffer
+FRAME_RECORDS = 256
+
+# Frames sent ahead of the oldest unanswered one
+DEFAULT_WINDOW = 4
+
+# Seconds to wait for a response frame
+DEFAULT_TIMEOUT = 2.0
+
+# Seconds of silence after which the emulator drops a partial frame
+RESYNC_IDLE = 0.2
+
+
+def _crc(data) -> int:
+    return crc_hqx(data, 0xFFFF)
+
+
+def encode_frame(sync: int, kind: int, seq: int, count: int, payload: bytes) -> bytes:
+    """Header, payload and CRC for one frame"""
+    body = HEADER.pack(sync, kind, seq & 0xFF, count)[1:] + payload
+    return bytes([sync]) + body + CRC.pack(_crc(body))
+
+
+def _payload_size(kind: int, count: int) -> int:
+    if kind == KIND_EXECUTE:
+        return count * OP_RECORD_SIZE
+    if kind == KIND_RESULT:
+        return count * RESULT_RECORD_SIZE
+    return count
+
+
+def next_frame(buffer: bytearray, sync: int, offset: int = 0):
+    """
+    Decode the first complete frame at or after offset.
+    Returns ((kind, seq, count, payload), end) where end is the offset just
+    past the frame, or (None, resume) if no complete frame is buffered yet,
+    where bytes before resume can be discarded. Bytes before a sync byte are
+    skipped; a frame with a bad CRC is returned as
+    (KIND_ERROR, seq, 0, b'CRC mismatch') and skipped.
+    """
+    marker = bytes([sync])
+    while True:
+        start = buffer.find(marker, offset)
+        if start < 0:
+            return None, len(buffer)
+        if len(buffer) - start < HEADER.size:
+            return None, start
+        _, kind, seq, count = HEADER.unpack_from(buffer, start)
+        if kind not in (KIND_EXECUTE, KIND_RESULT, KIND_ERROR):
+            offset = start + 1  # Not a frame; resynchronise on the next sync byte
+            continue
+        end = start + HEADER.size + _payload_size(kind, count)
+        if len(buffer) < end + CRC.size:
+            return None, start
+        if CRC.unpack_from(buffer, end)[0] != _crc(buffer[start + 1:end]):
+            return (KIND_ERROR, seq, 0, b'CRC mismatch'), start + 1
+        return (kind, seq, count, bytes(buffer[start + HEADER.size:end])), end + CRC.size
+
+
+def decode_frames(buffer: bytearray, sync: int) -> Tuple[List[Tuple[int, int, int, bytes]], int]:
+    """Decode every complete frame in buffer; returns (frames, bytes consumed)"""
+    frames = []
+    offset = 0
+    while True:
+        frame, offset = next_frame(buffer, sync, offset)
+        if frame is None:
+            return frames, offset
+        frames.append(frame)
+
+
+class _FdPort:
+    """Raw POSIX character device, used when pyserial is not installed"""
+
+    def __init__(self, path: str, timeout: float):
+        import termios
+        import tty
+
+        self.fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+        try:
+            tty.setraw(self.fd, termios.TCSANOW)
+        except termios.error:
+            pass  # Not a terminal (e.g. a FIFO); nothing to configure
+        self.timeout = timeout
+
+    def write(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.fd, view):]
+
+    def read(self, size: int) -> bytes:
+        ready, _, _ = select.select([self.fd], [], [], self.timeout)
+        return os.read(self.fd, size) if ready else b''
+
+    def reset_input_buffer(self) -> None:
+        while select.select([self.fd], [], [], 0)[0]:
+            if not os.read(self.fd, 65536):
+                break
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def open_port(path: str, baudrate: int = DEFAULT_BAUDRATE, timeout: float = DEFAULT_TIMEOUT):
+    """Open a serial port with pyserial if installed, else as a raw POSIX device"""
+    try:
+        import serial
+    except ImportError:
+        if os.name != 'posix':
+            raise RuntimeError("pyserial is required for FPGA mode on this platform "
+                               "(pip install pyserial)")
+        return _FdPort(path, timeout)
+    return serial.Serial(path, baudrate=baudrate, timeout=timeout)
+
+
+class SerialTransport:
+    """
+    Batched, pipelined request/response transport over one open port.
+    execute_batch() splits the records into frames of frame_records and
+    keeps up to window frames outstanding. Responses must come back in
+    order; a missing, corrupted or out-of-order response raises OSError
+    (TimeoutError if nothing arrives in time) and stale input is
+    discarded before the next call; responses to frames abandoned by a
+    failed call (older sequence numbers) are skipped when they turn up.
+    """
+
+    def __init__(self, port, frame_records: int = FRAME_RECORDS, window: int = DEFAULT_WINDOW):
+        if not 1 <= frame_records <= 0xFFFF:
+            raise ValueError(f"frame_records must be 1-65535, got {frame_records}")
+        self.port = port
+        self.frame_records = frame_records
+        self.window = max(1, window)
+        self._seq = 0
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.operations = 0
+
+    def close(self) -> None:
+        self.port.close()
+
+    def execute_batch(self, records: Sequence[Tuple[int, int, int]]) -> List[int]:
+        """Execute (opcode, A, B) records; returns result | (NZCV << 8) per record"""
+        with self._lock:
+            try:
+                return self._execute_batch(records)
+            except OSError:
+                self._buffer.clear()
+                self.port.reset_input_buffer()
+                raise
+
+    def execute_packed(self, opcode: int, a: int, b: int) -> int:
+        return self.execute_batch([(opcode, a, b)])[0]
+
+    def _execute_batch(self, records: Sequence[Tuple[int, int, int]]) -> List[int]:
+        size = self.frame_records
+        chunks = [records[start:start + size] for start in range(0, len(records), size)]
+        outstanding: Deque[Tuple[int, int]] = deque()
+        results: List[int] = []
+        for chunk in chunks:
+            if len(outstanding) >= self.window:
+                results += self._receive(*outstanding.popleft())
+            payload = bytes(value & 0xFF for record in chunk for value in record)
+            seq = self._seq
+            self._seq = (seq + 1) & 0xFF
+            self.port.write(encode_frame(REQUEST_SYNC, KIND_EXECUTE, seq, len(chunk), payload))
+            outstanding.append((seq, len(chunk)))
+        while outstanding:
+            results += self._receive(*outstanding.popleft())
+        self.frames += len(chunks)
+        self.operations += len(records)
+        return results
+
+    def _receive(self, seq: int, count: int) -> List[int]:
+        """Read the response frame for seq"""
+        while True:
+            kind, frame_seq, frame_count, payload = self._read_frame(seq, count)
+            # Responses to frames still in flight when an earlier batch failed arrive late; skip them
+            if not 0 < (seq - frame_seq) & 0xFF < 0x80:
+                break
+        if kind == KIND_ERROR:
+            raise OSError(f"FPGA error on frame {frame_seq}: {payload.decode('utf-8', 'replace')}")
+        if frame_seq != seq or frame_count != count:
+            raise OSError(f"Expected response {seq} ({count} records), "
+                          f"got {frame_seq} ({frame_count} records)")
+        packed = array('H', payload)
+        if sys.byteorder != 'little':
+            packed.byteswap()
+        return packed.tolist()
+
+    def _read_frame(self, seq: int, count: int) -> Tuple[int, int, int, bytes]:
+        """Next intact response frame, whatever its seq"""
+        while True:
+            frame, end = next_frame(self._buffer, RESPONSE_SYNC)
+            del self._buffer[:end]
+            if frame is not None:
+                break
+            data = self.port.read(max(4096, count * RESULT_RECORD_SIZE))
+            if data:
+                self._buffer += data
+            elif self._buffer:
+                # Input went idle inside a frame, so its header was noise
+                del self._buffer[:1]
+            else:
+                raise TimeoutError(f"No response from FPGA for frame {seq}")
+        return frame
+
+
+# Open transports by (port, baudrate), shared by every caller in the process
+_TRANSPORTS: Dict[Tuple[str, int], SerialTransport] = {}
+_pool_lock = threading.Lock()
+
+
+def get_transport(port: str, baudrate: int = DEFAULT_BAUDRATE,
+                  timeout: float = DEFAULT_TIMEOUT) -> SerialTransport:
+    """Pooled transport for port, opened on first use and closed at exit"""
+    key = (port, baudrate)
+    with _pool_lock:
+        transport = _TRANSPORTS.get(key)
+        if transport is None:
+            if not _TRANSPORTS:
+                atexit.register(close_transports)
+            transport = _TRANSPORTS[key] = SerialTransport(open_port(port, baudrate, timeout))
+        return transport
+
+
+def close_transports() -> None:
+    """Close every pooled transport"""
+    with _pool_lock:
+        for transport in _TRANSPORTS.values():
+            try:
+                transport.close()
+            except OSError:
+                pass
+        _TRANSPORTS.clear()
+
+
+class LoopbackEmulator:
+    """
+    Plays the FPGA board on a pseudo-terminal.
+    Open .port like a serial device; request frames written to it are
+    answered by the golden model from a background thread. baudrate, if
+    given, throttles responses to the time the frames would take on a
+    UART (10 bits per byte in each direction), and turnaround adds a fixed
+    per-frame processing delay, so batching and pipelining gains can be
+    measured as they would appear on hardware.
+    """
+
+    def __init__(self, alu=None, baudrate: Optional[int] = None, turnaround: float = 0.0):
+        import pty
+        import tty
+
+        self.alu = alu if alu is not None else TableALU8Bit()
+        self.baudrate = baudrate
+        self.turnaround = turnaround
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._stop_read, self._stop_write = os.pipe()
+        self._thread: Optional[threading.Thread] = None
+        self.frames = 0
+        self.operations = 0
+        self.errors = 0
+
+    def start(self) -> 'LoopbackEmulator':
+        self._thread = threading.Thread(target=self._run, name='alu-fpga-emulator', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            os.write(self._stop_write, b'x')
+            self._thread.join()
+            self._thread = None
+        for fd in (self._master, self._slave, self._stop_read, self._stop_write):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self) -> 'LoopbackEmulator':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        buffer = bytearray()
+        byte_time = 10 / self.baudrate if self.baudrate else 0.0
+        rx_done = tx_done = 0.0
+        while True:
+            ready, _, _ = select.select([self._master, self._stop_read], [], [],
+                                        RESYNC_IDLE if buffer else None)
+            if self._stop_read in ready:
+                return
+            if ready:
+                try:
+                    data = os.read(self._master, 65536)
+                except OSError:
+                    return
+                buffer += data
+            else:
+                # Input went idle inside a frame, so its header was noise
+                del buffer[:1]
+            frames, consumed = decode_frames(buffer, REQUEST_SYNC)
+            del buffer[:consumed]
+            if not frames:
+                continue
+
+            # The UART is full duplex: frame k is received after the frames
+            # before it, answered turnaround later, and its response queues
+            # behind earlier responses on the transmit line
+            out = bytearray()
+            rx_done = max(rx_done, time.perf_counter())
+            for frame in frames:
+                response = self._respond(*frame)
+                rx_done += (HEADER.size + len(frame[3]) + CRC.size) * byte_time
+                tx_done = max(tx_done, rx_done + self.turnaround) + len(response) * byte_time
+                out += response
+            remaining = tx_done - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+            os.write(self._master, out)
+
+    def _respond(self, kind: int, seq: int, count: int, payload: bytes) -> bytes:
+        """Response frame for one request frame"""
+        if kind != KIND_EXECUTE:
+            self.errors += 1
+            message = payload if kind == KIND_ERROR else b'unexpected frame'
+            return encode_frame(RESPONSE_SYNC, KIND_ERROR, seq, len(message), message)
+        try:
+            results = array('H', map(self.alu.execute_packed,
+                                     payload[0::3], payload[1::3], payload[2::3]))
+        except ValueError as e:
+            self.errors += 1
+            message = str(e).encode('utf-8')
+            return encode_frame(RESPONSE_SYNC, KIND_ERROR, seq, len(message), message)
+        if sys.byteorder != 'little':
+            results.byteswap()
+        self.frames += 1
+        self.operations += count
+        return encode_frame(RESPONSE_SYNC, KIND_RESULT, seq, count, results.tobytes())
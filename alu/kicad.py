@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Streaming, indexed, cached reader for KiCad schematics and boards
+
+.kicad_sch and .kicad_pcb files are S-expressions. They are tokenized in
+chunks, and only the top-level items an analysis needs are built as lists:
+the placed symbols, sheets and labels of a schematic, and the footprints
+(with the net of every pad) and nets of a board. Symbol libraries, graphics,
+tracks and zones are skipped without building them.
+
+KicadIndex answers lookups by reference, value and net without rescanning:
+
+    from alu.kicad import KicadIndex, load_file
+    index = KicadIndex(load_file('schematics/kicad/boards/main_logic/main_logic.kicad_pcb'))
+    index.nets_of('U1')
+    index.count('NMOS', 'PMOS')
+
+load_file() keeps the extracted model in a JSON cache (results/kicad_cache.json)
+keyed on the file's size and mtime, falling back to its SHA-256 when those
+change, like alu/circ.py. CACHE_VERSION must be bumped when the model changes.
+Nets are only known for boards; a schematic's connectivity is not resolved,
+but its label names are listed.
+"""
+
+import re
+from collections import defaultdict
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+from .result_cache import FileCache
+
+DEFAULT_CACHE_FILE = Path(__file__).resolve().parent.parent / 'results' / 'kicad_cache.json'
+CACHE_VERSION = 1
+
+_TOKEN = re.compile(r'\(|\)|"(?:[^"\\]|\\.)*"|[^\s()"]+')
+_CHUNK_SIZE = 1 << 20
+
+SExpr = Union[str, List['SExpr']]
+
+# Top-level items built per file type -> the children kept of each (None: all)
+_SCHEMATIC_ITEMS = {
+    'symbol': {'lib_id', 'property', 'unit', 'in_bom'},
+    'sheet': {'property'},
+    'label': set(),
+    'global_label': set(),
+    'hierarchical_label': set(),
+}
+_BOARD_ITEMS = {
+    'net': None,
+    'footprint': {'property', 'fp_text', 'pad'},
+    'module': {'fp_text', 'pad'},      # Footprints before KiCad 6
+}
+
+
+class KicadError(ValueError):
+    """The file is not a readable KiCad S-expression"""
+
+
+class Symbol(NamedTuple):
+    """One placed symbol (one unit of a multi-unit part)"""
+    lib_id: str               # e.g. 'Simulation_SPICE:NMOS'
+    reference: str            # e.g. 'Q1'
+    value: str
+    unit: int
+    in_bom: bool
+
+
+class Footprint(NamedTuple):
+    """One footprint on a board"""
+    lib_id: str               # e.g. 'Package_TO_SOT_SMD:TSOT-23'
+    reference: str
+    value: str
+    pads: Dict[str, str]      # Pad number -> net name ('' if unconnected)
+
+
+class Sheet(NamedTuple):
+    """A hierarchical sheet and the schematic file it instantiates"""
+    name: str
+    file: str                 # As written in the schematic, relative to it
+
+
+class Schematic(NamedTuple):
+    symbols: List[Symbol]
+    sheets: List[Sheet]
+
+
+class KicadFile(NamedTuple):
+    """What the analyses use of one schematic or board"""
+    kind: str                 # 'kicad_sch' or 'kicad_pcb'
+    symbols: List[Symbol]
+    footprints: List[Footprint]
+    sheets: List[Sheet]
+    nets: List[str]           # Board nets, or schematic label names
+
+
+def _unquote(token: str) -> str:
+    if token[0] == '"':
+        return token[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    return token
+
+
+def tokenize(chunks: Iterable[str]) -> Iterator[str]:
+    """S-expression tokens of text read in chunks (quoted strings keep their quotes)
+
+    Each chunk is scanned up to its last newline, so no token is split:
+    KiCad never writes a newline inside an atom or string.
+    """
+    rest = ''
+    for chunk in chunks:
+        text = rest + chunk
+        cut = text.rfind('\n') + 1
+        if cut:
+            yield from _TOKEN.findall(text, 0, cut)
+            rest = text[cut:]
+        else:
+            rest = text
+    yield from _TOKEN.findall(rest)
+
+
+def parse_sexpr(text: str) -> SExpr:
+    """Nested lists of atoms; quoted strings are unquoted"""
+    stack = [[]]
+    for token in _TOKEN.findall(text):
+        if token == '(':
+            stack.append([])
+        elif token == ')':
+            if len(stack) == 1:
+                raise KicadError("Unbalanced ')'")
+            done = stack.pop()
+            stack[-1].append(done)
+        else:
+            stack[-1].append(_unquote(token))
+    if len(stack) != 1 or len(stack[0]) != 1:
+        raise KicadError("Unbalanced S-expression")
+    return stack[0][0]
+
+
+def read_items(tokens: Iterable[str], wanted: Dict[str, Optional[Set[str]]]) -> Tuple[str, List[list]]:
+    """The root's head and those of its items whose head is in wanted
+
+    Only the children named in wanted[head] of each item are kept (all of
+    them for None); everything else is skipped by counting parentheses.
+    """
+    tokens = iter(tokens)
+    if next(tokens, None) != '(':
+        raise KicadError("Not an S-expression")
+    kind = next(tokens, ')')
+    if kind in '()':
+        raise KicadError("Missing root element")
+
+    items = []
+    stack = []          # Lists being built, outermost first
+    keep = None         # Children kept of the item being built
+    depth = 1
+    skip = 0            # While skipping: the depth of the skipped list
+    opened = False      # '(' seen, head not yet
+    for token in tokens:
+        if token == '(':
+            depth += 1
+            opened = not skip
+        elif token == ')':
+            depth -= 1
+            if skip:
+                if depth < skip:
+                    skip = 0
+            elif stack:
+                done = stack.pop()
+                (stack[-1] if stack else items).append(done)
+            elif depth == 0:
+                return kind, items
+        elif skip:
+            continue
+        elif opened:
+            opened = False
+            if not stack:
+                if token in wanted:
+                    keep = wanted[token]
+                    stack.append([token])
+                else:
+                    skip = depth
+            elif len(stack) == 1 and keep is not None and token not in keep:
+                skip = depth
+            else:
+                stack.append([token])
+        elif stack:
+            stack[-1].append(_unquote(token))
+    raise KicadError("Unbalanced S-expression")
+
+
+def _chunks(handle, size: int = _CHUNK_SIZE) -> Iterator[str]:
+    while True:
+        chunk = handle.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _child(node: list, key: str) -> Optional[list]:
+    return next((item for item in node if isinstance(item, list) and item and item[0] == key), None)
+
+
+def _properties(node: list) -> dict:
+    return {item[1]: item[2] for item in node
+            if isinstance(item, list) and len(item) > 2 and item[0] == 'property'}
+
+
+def _footprint(node: list) -> Footprint:
+    properties = _properties(node)
+    for item in node:
+        # KiCad 5 and 6 write the reference and value as fp_text
+        if isinstance(item, list) and len(item) > 2 and item[0] == 'fp_text' and item[1] in ('reference', 'value'):
+            properties.setdefault(item[1].capitalize(), item[2])
+    pads = {}
+    for pad in node:
+        if isinstance(pad, list) and len(pad) > 1 and pad[0] == 'pad':
+            net = _child(pad, 'net')
+            # (net 48 "name") before KiCad 10, (net "name") after
+            pads.setdefault(pad[1], net[-1] if net and len(net) > 1 else '')
+    return Footprint(node[1] if len(node) > 1 and isinstance(node[1], str) else '',
+                     properties.get('Reference', ''), properties.get('Value', ''), pads)
+
+
+def parse_file(path) -> KicadFile:
+    """Read the symbols, sheets, footprints and nets of a .kicad_sch or .kicad_pcb file (no cache)"""
+    with open(path, 'r', encoding='utf-8') as handle:
+        try:
+            head = handle.read(64).lstrip()
+            wanted = _BOARD_ITEMS if head.startswith('(kicad_pcb') else _SCHEMATIC_ITEMS
+            handle.seek(0)
+            kind, items = read_items(tokenize(_chunks(handle)), wanted)
+        except KicadError as exc:
+            raise KicadError(f"{path}: {exc}") from None
+    if kind not in ('kicad_sch', 'kicad_pcb'):
+        raise KicadError(f"{path}: not a KiCad schematic or board")
+
+    symbols, footprints, sheets, nets = [], [], [], []
+    for node in items:
+        if node[0] == 'symbol':
+            lib_id = _child(node, 'lib_id')
+            if lib_id is None:
+                continue
+            properties = _properties(node)
+            unit = _child(node, 'unit')
+            in_bom = _child(node, 'in_bom')
+            symbols.append(Symbol(lib_id[1], properties.get('Reference', ''), properties.get('Value', ''),
+                                  int(unit[1]) if unit else 1, in_bom is None or in_bom[1] == 'yes'))
+        elif node[0] == 'sheet':
+            properties = _properties(node)
+            sheets.append(Sheet(properties.get('Sheetname', properties.get('Sheet name', '')),
+                                properties.get('Sheetfile', properties.get('Sheet file', ''))))
+        elif node[0] in ('footprint', 'module'):
+            footprints.append(_footprint(node))
+        elif node[0] == 'net':
+            if len(node) > 2 and node[2]:
+                nets.append(node[2])
+        elif len(node) > 1 and node[1] not in nets:      # Labels
+            nets.append(node[1])
+    return KicadFile(kind, symbols, footprints, sheets, nets)
+
+
+def read_schematic(path) -> Schematic:
+    """Placed symbols and hierarchical sheets of a .kicad_sch file"""
+    parsed = parse_file(path)
+    if parsed.kind != 'kicad_sch':
+        raise KicadError(f"{path}: not a KiCad schematic")
+    return Schematic(parsed.symbols, parsed.sheets)
+
+
+class KicadIndex:
+    """Lookup tables over one schematic or board, built once"""
+
+    def __init__(self, parsed: KicadFile):
+        self.file = parsed
+        self.by_reference: Dict[str, List[Union[Symbol, Footprint]]] = defaultdict(list)
+        self.by_value: Dict[str, List[Union[Symbol, Footprint]]] = defaultdict(list)
+        self.pads_on: Dict[str, List[Tuple[str, str]]] = defaultdict(list)     # Net -> (reference, pad)
+        for part in [*parsed.symbols, *parsed.footprints]:
+            self.by_reference[part.reference].append(part)
+            self.by_value[part.value].append(part)
+        for footprint in parsed.footprints:
+            for pad, net in footprint.pads.items():
+                if net:
+                    self.pads_on[net].append((footprint.reference, pad))
+
+    def nets_of(self, reference: str) -> List[str]:
+        """Nets connected to the pads of a footprint (boards only)"""
+        return sorted({net for part in self.by_reference.get(reference, ()) if isinstance(part, Footprint)
+                       for net in part.pads.values() if net})
+
+    def count(self, *patterns: str) -> int:
+        """Parts whose value or library id matches any glob pattern
+
+        Units of a multi-unit part count once; unannotated ('Q?') symbols
+        and power symbols count each.
+        """
+        counted = set()
+        total = 0
+        for part in [*self.file.symbols, *self.file.footprints]:
+            if part.reference.startswith('#') or not any(
+                    fnmatchcase(part.value, pattern) or fnmatchcase(part.lib_id, pattern) for pattern in patterns):
+                continue
+            if part.reference.endswith('?'):
+                total += 1
+            elif part.reference not in counted:
+                counted.add(part.reference)
+                total += 1
+        return total
+
+
+def _kicad_file_to_json(parsed: KicadFile) -> dict:
+    return {
+        'kind': parsed.kind,
+        'symbols': [list(symbol) for symbol in parsed.symbols],
+        'footprints': [list(footprint) for footprint in parsed.footprints],
+        'sheets': [list(sheet) for sheet in parsed.sheets],
+        'nets': parsed.nets,
+    }
+
+
+def _kicad_file_from_json(data: dict) -> KicadFile:
+    return KicadFile(
+        data['kind'],
+        [Symbol(*symbol) for symbol in data['symbols']],
+        [Footprint(*footprint) for footprint in data['footprints']],
+        [Sheet(*sheet) for sheet in data['sheets']],
+        data['nets'],
+    )
+
+
+class KicadCache(FileCache):
+    """JSON-backed store of extracted KiCad files"""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_FILE):
+        super().__init__(path, CACHE_VERSION, _kicad_file_to_json, _kicad_file_from_json)
+
+
+def load_files(paths: Iterable, cache_file: Optional[Path] = DEFAULT_CACHE_FILE) -> Dict[str, KicadFile]:
+    """Extracted KiCad files by path, each from the cache when it is unchanged
+
+    The cache is read and written once for all paths (cache_file=None
+    disables it).
+    """
+    cache = KicadCache(cache_file) if cache_file is not None else None
+    loaded = {}
+    for path in paths:
+        parsed = cache.load(path) if cache is not None else None
+        if parsed is None:
+            parsed = parse_file(path)
+            if cache is not None:
+                cache.store(path, parsed)
+        loaded[str(path)] = parsed
+    if cache is not None:
+        cache.save()
+    return loaded
+
+
+def load_file(path, cache_file: Optional[Path] = DEFAULT_CACHE_FILE) -> KicadFile:
+    """Extracted .kicad_sch or .kicad_pcb file, from the cache when it is unchanged"""
+    return load_files([path], cache_file)[str(path)]
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Golden model of the 8-bit ALU
+
+ALU8Bit evaluates one operation at a time and is the reference every
+runner, generator and the CLI check against. TableALU8Bit precomputes the
+whole input space for constant-time lookups, and ALU8Bit.execute_batch
+evaluates many operations at once (vectorized with NumPy when installed).
+
+ALU(width) is the same datapath at any width, for modelling widened
+variants (16/32/64-bit) of the design; ALU8Bit is ALU(8).
+"""
+
+from array import array
+from typing import Dict, Tuple
+
+from .opcodes import FLAG_C, FLAG_N, FLAG_V, FLAG_Z, OPCODE_INDEX, OPCODES, pack_flags, unpack_flags
+
+# NumPy is optional - execute_batch falls back to a pure-Python loop without
+# it. It is imported on the first batch call rather than with the model, since
+# it would otherwise dominate the start-up time of the CLI and runners.
+np = None
+_numpy_checked = False
+
+
+def _numpy():
+    """The numpy module, or None if it is not installed (imported once)"""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        np = numpy
+    return np
+
+
+# Bit-reversal table for one byte; wider REV A reverses every byte through it
+# and then reverses the byte order, so no width needs a per-bit loop
+REV_TABLE = bytes(int(f'{value:08b}'[::-1], 2) for value in range(256))
+
+# Opcode groups for the vectorized batch path (INC/DEC add/subtract a fixed 1)
+ADD_OPCODES = frozenset([0, 2])
+SUB_OPCODES = frozenset([1, 3, 16])
+UNIT_B_OPCODES = frozenset([2, 3])
+
+# Widths the vectorized batch path handles (NumPy word sizes)
+MAX_BATCH_WIDTH = 64
+
+# array module typecodes for batch results, by storage bytes
+_ARRAY_TYPECODES = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+# struct formats memoryview.tolist() decodes straight to ints
+_INT_FORMATS = frozenset('BbHhIiLlQq')
+
+
+def _storage_bytes(width: int) -> int:
+    """Smallest power-of-two number of bytes holding width bits"""
+    size = 1
+    while size * 8 < width:
+        size *= 2
+    return size
+
+
+def _as_ints(values) -> list:
+    """Coerce a buffer-protocol object or int sequence into a list of ints"""
+    try:
+        view = memoryview(values)
+    except TypeError:
+        return list(values)
+    if view.ndim == 1 and view.format in _INT_FORMATS:
+        return view.tolist()
+    return [int(value) for value in values]
+
+
+def _as_word_array(values, dtype):
+    """Coerce a NumPy array, buffer or int sequence into an ndarray of dtype"""
+    if isinstance(values, np.ndarray):
+        return values.astype(dtype, copy=False)
+    try:
+        return np.asarray(memoryview(values)).astype(dtype, copy=False)
+    except TypeError:
+        return np.asarray(values, dtype=dtype)
+
+
+# REV_TABLE as a NumPy array, created with the first vectorized REV A
+_REV_ARRAY = None
+
+
+class ALU:
+    """Software simulation of the ALU datapath at any width
+    
+    Every width-dependent constant (mask, sign bit, INC/DEC overflow
+    operands, REV byte count) is computed once in __init__, so the
+    per-operation methods are the same for 8, 16, 32 or 64 bits.
+    """
+    
+    def __init__(self, width: int = 8):
+        if width < 2:
+            raise ValueError(f"Invalid width: {width}")
+        self.width = width
+        self.mask = (1 << width) - 1
+        self.sign = 1 << (width - 1)
+        self.max_signed = self.sign - 1
+        self._rev_bytes = (width + 7) // 8
+        self._rev_shift = 8 * self._rev_bytes - width
+        self.operations = {
+            '00000': self.add,
+            '00001': self.sub,
+            '00010': self.inc_a,
+            '00011': self.dec_a,
+            '00100': self.lsl,
+            '00101': self.lsr,
+            '00110': self.asr,
+            '00111': self.rev_a,
+            '01000': self.nand,
+            '01001': self.nor,
+            '01010': self.xor,
+            '01011': self.pass_a,
+            '01100': self.pass_b,
+            '01101': self.and_op,
+            '01110': self.or_op,
+            '01111': self.xnor,
+            '10000': self.cmp,
+            '10001': self.not_a,
+            '10010': self.not_b,
+        }
+        
+    def execute(self, opcode: str, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """Execute ALU operation and return result with flags"""
+        a = a & self.mask
+        b = b & self.mask
+        
+        if opcode not in self.operations:
+            raise ValueError(f"Unknown opcode: {opcode}")
+            
+        return self.operations[opcode](a, b)
+    
+    def execute_packed(self, opcode: int, a: int, b: int) -> int:
+        """Execute by numeric opcode and return result | (NZCV << width)"""
+        if not 0 <= opcode < len(OPCODES):
+            raise ValueError(f"Unknown opcode: {opcode}")
+        result, flags = self.operations[OPCODES[opcode]](a & self.mask, b & self.mask)
+        return result | (pack_flags(flags) << self.width)
+    
+    def execute_batch(self, opcodes, a, b):
+        """Execute many operations at once
+        
+        opcodes, a and b are NumPy arrays, buffer-protocol objects (bytes,
+        array('B'), memoryview) or sequences of ints; opcodes may also be a
+        single numeric opcode applied to every pair. Returns (results, nzcv):
+        results use the smallest unsigned type holding the width (uint8 for
+        8 bits) and nzcv is uint8. These are NumPy arrays when NumPy is
+        installed and the width is at most 64 bits, array objects otherwise.
+        """
+        if self.width <= MAX_BATCH_WIDTH and _numpy() is not None:
+            return self._execute_batch_numpy(opcodes, a, b)
+        return self._execute_batch_python(opcodes, a, b)
+    
+    def _execute_batch_python(self, opcodes, a, b):
+        """Fallback batch path: one execute_packed call per element"""
+        a = _as_ints(a)
+        b = _as_ints(b)
+        if isinstance(opcodes, int):
+            opcodes = [opcodes] * len(a)
+        else:
+            opcodes = _as_ints(opcodes)
+        if not len(opcodes) == len(a) == len(b):
+            raise ValueError("opcodes, a and b must have the same length")
+        
+        packed = self.execute_packed
+        entries = [packed(op, x, y) for op, x, y in zip(opcodes, a, b)]
+        typecode = _ARRAY_TYPECODES.get(_storage_bytes(self.width))
+        mask = self.mask
+        shift = self.width
+        results = [entry & mask for entry in entries]
+        results = array(typecode, results) if typecode else results
+        nzcv = array('B', [entry >> shift for entry in entries])
+        return results, nzcv
+    
+    def _execute_batch_numpy(self, opcodes, a, b):
+        """Vectorized batch path, evaluated per opcode group in uint64"""
+        word = np.dtype(f'uint{8 * _storage_bytes(self.width)}')
+        a = _as_word_array(a, word)
+        b = _as_word_array(b, word)
+        if a.shape != b.shape:
+            raise ValueError("a and b must have the same length")
+        if isinstance(opcodes, int):
+            opcodes = np.full(a.shape, opcodes, dtype=np.int64)
+        else:
+            # Range-checked as int64: narrowing first would wrap 256 to ADD
+            try:
+                opcodes = _as_word_array(opcodes, np.int64)
+            except OverflowError:
+                raise ValueError("Unknown opcode in batch") from None
+            if opcodes.shape != a.shape:
+                raise ValueError("opcodes, a and b must have the same length")
+        if opcodes.size and (int(opcodes.min()) < 0 or int(opcodes.max()) >= len(OPCODES)):
+            raise ValueError("Unknown opcode in batch")
+        
+        # All arithmetic is modulo 2**64 with explicit masking; constants are
+        # uint64 scalars so mixed-type promotion never goes through float
+        mask = np.uint64(self.mask)
+        sign = np.uint64(self.sign)
+        one = np.uint64(1)
+        zero = np.uint64(0)
+        
+        results = np.zeros(a.shape, dtype=word)
+        nzcv = np.zeros(a.shape, dtype=np.uint8)
+        wide_a = a.astype(np.uint64) & mask
+        wide_b = b.astype(np.uint64) & mask
+        
+        for opcode in np.unique(opcodes).tolist():
+            sel = opcodes == opcode
+            x = wide_a[sel]
+            y = wide_b[sel]
+            carry = None
+            overflow = None
+            
+            if opcode in ADD_OPCODES or opcode in SUB_OPCODES:
+                if opcode in UNIT_B_OPCODES:
+                    y = np.ones_like(x)
+                if opcode in ADD_OPCODES:
+                    # Modular sum; it wrapped iff it came out below an operand
+                    res = (x + y) & mask
+                    carry = res < x
+                    overflow = ((x ^ res) & (y ^ res) & sign) != zero
+                else:
+                    # Carry is "no borrow"
+                    res = (x - y) & mask
+                    carry = x >= y
+                    overflow = ((x ^ y) & (x ^ res) & sign) != zero
+            elif opcode == 4:   # LSL
+                res = (x << one) & mask
+                carry = (x & sign) != zero
+            elif opcode == 5:   # LSR
+                res = x >> one
+                carry = (x & one) != zero
+            elif opcode == 6:   # ASR
+                res = (x >> one) | (x & sign)
+                carry = (x & one) != zero
+            elif opcode == 7:   # REV A
+                res = self._rev_numpy(x)
+            elif opcode == 8:   # NAND
+                res = ~(x & y) & mask
+            elif opcode == 9:   # NOR
+                res = ~(x | y) & mask
+            elif opcode == 10:  # XOR
+                res = x ^ y
+            elif opcode == 11:  # PASS A
+                res = x
+            elif opcode == 12:  # PASS B
+                res = y
+            elif opcode == 13:  # AND
+                res = x & y
+            elif opcode == 14:  # OR
+                res = x | y
+            elif opcode == 15:  # XNOR
+                res = ~(x ^ y) & mask
+            elif opcode == 17:  # NOT A
+                res = ~x & mask
+            else:               # NOT B
+                res = ~y & mask
+            
+            flags = np.where(res == zero, FLAG_Z, 0) | np.where((res & sign) != zero, FLAG_N, 0)
+            if carry is not None:
+                flags |= np.where(carry, FLAG_C, 0)
+            if overflow is not None:
+                flags |= np.where(overflow, FLAG_V, 0)
+            
+            # CMP only drives the flags; its output is always 0
+            results[sel] = 0 if opcode == 16 else res
+            nzcv[sel] = flags
+        
+        return results, nzcv
+    
+    def _rev_numpy(self, x):
+        """Vectorized REV A: reverse bits within each byte, then the byte order
+        
+        Little-endian bytes with each byte bit-reversed, read back as a
+        big-endian word, are the 64-bit reversal; shifting drops the padding.
+        """
+        global _REV_ARRAY
+        if _REV_ARRAY is None:
+            _REV_ARRAY = np.frombuffer(REV_TABLE, dtype=np.uint8)
+        rev = _REV_ARRAY[x.astype('<u8').view(np.uint8)]
+        return rev.view('>u8').astype(np.uint64) >> np.uint64(64 - self.width)
+    
+    def _flags(self, result: int, carry: bool = False, overflow: bool = False) -> Dict[str, bool]:
+        """Calculate standard flags"""
+        result_masked = result & self.mask
+        return {
+            'carry': carry,
+            'zero': result_masked == 0,
+            'overflow': overflow,
+            'negative': bool(result_masked & self.sign)
+        }
+    
+    def add(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """ADD: A + B"""
+        result = a + b
+        carry = result > self.mask
+        overflow = ((a & self.sign) == (b & self.sign)) and ((a & self.sign) != (result & self.sign))
+        return result & self.mask, self._flags(result, carry, overflow)
+    
+    def sub(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """SUB: A - B"""
+        result = a - b
+        carry = result >= 0
+        overflow = ((a & self.sign) != (b & self.sign)) and ((a & self.sign) != (result & self.sign))
+        return result & self.mask, self._flags(result, carry, overflow)
+    
+    def inc_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """INC A: A + 1"""
+        result = a + 1
+        carry = result > self.mask
+        overflow = (a == self.max_signed)
+        return result & self.mask, self._flags(result, carry, overflow)
+    
+    def dec_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """DEC A: A - 1"""
+        result = a - 1
+        carry = result >= 0
+        overflow = (a == self.sign)
+        return result & self.mask, self._flags(result, carry, overflow)
+    
+    def lsl(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """LSL: Logical shift left"""
+        carry = bool(a & self.sign)
+        result = (a << 1) & self.mask
+        return result, self._flags(result, carry, False)
+    
+    def lsr(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """LSR: Logical shift right"""
+        carry = bool(a & 0x01)
+        result = (a >> 1) & self.mask
+        return result, self._flags(result, carry, False)
+    
+    def asr(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """ASR: Arithmetic shift right"""
+        carry = bool(a & 0x01)
+        sign_bit = a & self.sign
+        result = ((a >> 1) | sign_bit) & self.mask
+        return result, self._flags(result, carry, False)
+    
+    def rev_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """REV A: Reverse bits (per-byte table, then byte order)"""
+        reversed_bytes = a.to_bytes(self._rev_bytes, 'little').translate(REV_TABLE)
+        result = int.from_bytes(reversed_bytes, 'big') >> self._rev_shift
+        return result, self._flags(result, False, False)
+    
+    def nand(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """NAND"""
+        result = (~(a & b)) & self.mask
+        return result, self._flags(result, False, False)
+    
+    def nor(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """NOR"""
+        result = (~(a | b)) & self.mask
+        return result, self._flags(result, False, False)
+    
+    def xor(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """XOR"""
+        result = (a ^ b) & self.mask
+        return result, self._flags(result, False, False)
+    
+    def pass_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """PASS A"""
+        return a, self._flags(a, False, False)
+    
+    def pass_b(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """PASS B"""
+        return b, self._flags(b, False, False)
+    
+    def and_op(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """AND"""
+        result = (a & b) & self.mask
+        return result, self._flags(result, False, False)
+    
+    def or_op(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """OR"""
+        result = (a | b) & self.mask
+        return result, self._flags(result, False, False)
+    
+    def xnor(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """XNOR"""
+        result = (~(a ^ b)) & self.mask
+        return result, self._flags(result, False, False)
+    
+    def cmp(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """CMP: Compare (flags only)"""
+        result = a - b
+        carry = result >= 0
+        overflow = ((a & self.sign) != (b & self.sign)) and ((a & self.sign) != (result & self.sign))
+        return 0, self._flags(result, carry, overflow)
+    
+    def not_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """NOT A"""
+        result = (~a) & self.mask
+        return result, self._flags(result, False, False)
+    
+    def not_b(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """NOT B"""
+        result = (~b) & self.mask
+        return result, self._flags(result, False, False)
+
+
+class ALU8Bit(ALU):
+    """Software simulation of 8-bit ALU (the width of the discrete hardware)"""
+    
+    def __init__(self):
+        super().__init__(8)
+
+
+# Operations whose result and flags depend only on A (or only on B); their
+# table rows are computed once and replicated instead of evaluated 65,536 times
+A_ONLY_OPCODES = frozenset(['00010', '00011', '00100', '00101', '00110', '00111',
+                            '01011', '10001'])
+B_ONLY_OPCODES = frozenset(['01100', '10010'])
+
+
+class TableALU8Bit(ALU8Bit):
+    """Table-driven 8-bit ALU
+    
+    Every (opcode, A, B) combination is precomputed from the ALU8Bit golden
+    model into a single array of 19 x 256 x 256 uint16 entries, each holding
+    result | (NZCV << 8). The table is built once per process and shared by
+    all instances, so execute() and execute_packed() are a single lookup.
+    
+    Flag dicts returned by execute() are shared between calls and must not
+    be mutated.
+    """
+    
+    _table = None
+    _flag_dicts = tuple(unpack_flags(nzcv) for nzcv in range(16))
+    
+    def __init__(self):
+        super().__init__()
+        if TableALU8Bit._table is None:
+            TableALU8Bit._table = self._build_table()
+        self.table = TableALU8Bit._table
+    
+    def _build_table(self) -> array:
+        """Evaluate the golden model over the full input space"""
+        table = array('H')
+        for opcode in OPCODES:
+            op_func = self.operations[opcode]
+            if opcode in B_ONLY_OPCODES:
+                row = array('H', [self._packed(op_func, 0, b) for b in range(256)])
+                table.extend(row * 256)
+                continue
+            for a in range(256):
+                if opcode in A_ONLY_OPCODES:
+                    table.extend(array('H', [self._packed(op_func, a, 0)]) * 256)
+                else:
+                    table.extend([self._packed(op_func, a, b) for b in range(256)])
+        return table
+    
+    @staticmethod
+    def _packed(op_func, a: int, b: int) -> int:
+        result, flags = op_func(a, b)
+        return result | (pack_flags(flags) << 8)
+    
+    def execute(self, opcode: str, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """Execute ALU operation via table lookup"""
+        index = OPCODE_INDEX.get(opcode)
+        if index is None:
+            raise ValueError(f"Unknown opcode: {opcode}")
+        entry = self.table[(index << 16) | ((a & 0xFF) << 8) | (b & 0xFF)]
+        return entry & 0xFF, self._flag_dicts[entry >> 8]
+    
+    def execute_packed(self, opcode: int, a: int, b: int) -> int:
+        """Execute by numeric opcode and return result | (NZCV << 8)"""
+        if not 0 <= opcode < len(OPCODES):
+            raise ValueError(f"Unknown opcode: {opcode}")
+        return self.table[(opcode << 16) | ((a & 0xFF) << 8) | (b & 0xFF)]
+
+
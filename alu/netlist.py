@@ -0,0 +1,691 @@
+#!/usr/bin/env python3
+"""
+Gate-level simulation of the Logisim-evolution ALU (sim/top/alu_top.circ)
+
+load_netlist() reads a circuit, joins wires, tunnels and splitters into
+single-bit signals, and levelizes the components into an evaluation
+schedule: every cell comes after the cells driving its inputs, so one pass
+in schedule order settles the circuit for an input vector.
+
+    from alu.netlist import load_netlist
+    netlist = load_netlist()
+    netlist.evaluate({'A_IN': 42, 'B_IN': 23, 'CTRL': 0})['OVERALL']
+
+Supported components are the gates (AND/OR/NAND/NOR/XOR/XNOR with any
+inputs and width, NOT), Multiplexer, Adder, Splitter, Tunnel, Pin, Constant
+and Bit Extender. The Adder is expanded into ripple-carry full adders.
+Clock, Counter, LED and Text are not simulated; a net with no driver but a
+tunnel label (CTRL, driven by the Counter that steps through the opcodes in
+Logisim) becomes an input of that name.
+
+The schedule is compiled into straight-line Python that evaluates bitsliced
+words: every signal is an int whose bit k is its value in vector k, so each
+cell is one bitwise operation over a whole batch. evaluate() is the same
+code with one-bit words.
+
+NetlistALU8Bit runs the netlist with the ALU8Bit calling conventions.
+"""
+
+import itertools
+from array import array
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from . import model
+from .circ import (Circuit, CircuitError, CircuitIndex, Component, _UnionFind,  # noqa: F401
+                   load_circuit, parse_circuit)
+from .model import _ARRAY_TYPECODES, _as_ints, _as_word_array, _storage_bytes
+from .opcodes import FLAG_C, FLAG_N, FLAG_Z, unpack_flags
+
+DEFAULT_CIRCUIT = Path(__file__).resolve().parent.parent / 'sim' / 'top' / 'alu_top.circ'
+
+# Components that take no part in the combinational datapath
+IGNORED_COMPONENTS = frozenset(['Clock', 'Counter', 'LED', 'Text', 'Probe'])
+
+# Gate name -> (cell kind, extra input-axis length). XOR shapes are 10 wider,
+# and negated outputs add a 10-unit bubble.
+GATES = {
+    'AND Gate': ('AND', 0),
+    'OR Gate': ('OR', 0),
+    'XOR Gate': ('XOR', 10),
+    'NAND Gate': ('NAND', 10),
+    'NOR Gate': ('NOR', 10),
+    'XNOR Gate': ('XNOR', 20),
+}
+
+GATE_SIZES = {'narrow': 30, 'medium': 50, 'wide': 70}
+
+
+class NetlistError(CircuitError):
+    """The circuit cannot be turned into a combinational netlist"""
+
+
+class Port(NamedTuple):
+    role: str                 # Component-specific port name ('in0', 'out', 'sel', ...)
+    loc: Tuple[int, int]
+    width: int
+
+
+class Cell(NamedTuple):
+    """One single-bit operation of the schedule"""
+    kind: str                 # AND, OR, XOR, NAND, NOR, XNOR, NOT, MUX
+    output: int
+    inputs: Tuple[int, ...]   # For MUX, the data inputs
+    select: Tuple[int, ...]   # For MUX, the select bits (LSB first)
+    level: int
+    source: str
+
+
+def _offset(comp: Component, dx: int, dy: int) -> Tuple[int, int]:
+    return comp.loc[0] + dx, comp.loc[1] + dy
+
+
+def _gate_input_offsets(inputs: int, size: int) -> List[int]:
+    """Offsets of gate inputs across the input axis, as Logisim lays them out"""
+    if inputs <= 3:
+        if size < 40:
+            start, step, lower = -5, 10, 10
+        elif size < 60 or inputs <= 2:
+            start, step, lower = -10, 20, 20
+        else:
+            start, step, lower = -15, 30, 30
+    elif inputs == 4 and size >= 60:
+        start, step, lower = -5, 20, 0
+    else:
+        start, step, lower = -5, 10, 10
+    if inputs & 1:
+        return [start * (inputs - 1) + step * index for index in range(inputs)]
+    return [start * inputs + step * index + (lower if index >= inputs // 2 else 0)
+            for index in range(inputs)]
+
+
+def _along(facing: str, axis: int, across: int) -> Tuple[int, int]:
+    """Offset of an input `axis` units behind the output, `across` to the side"""
+    if facing == 'north':
+        return across, axis
+    if facing == 'south':
+        return across, -axis
+    if facing == 'west':
+        return axis, across
+    return -axis, across
+
+
+def component_ports(comp: Component) -> List[Port]:
+    """Connection points of a component, in circuit coordinates"""
+    name = comp.name
+    facing = comp.attr('facing', 'east')
+    width = comp.width()
+
+    if name in GATES:
+        for key in comp.attrs:
+            if key.startswith('negate') and comp.attrs[key] == 'true':
+                raise NetlistError(f"Negated gate inputs are not supported: {comp.describe()}")
+        inputs = comp.width('inputs', 2)
+        size = GATE_SIZES.get(comp.attr('size', 'medium'), 50)
+        axis = size + GATES[name][1]
+        ports = [Port(f'in{index}', _offset(comp, *_along(facing, axis, across)), width)
+                 for index, across in enumerate(_gate_input_offsets(inputs, size))]
+        return ports + [Port('out', comp.loc, width)]
+
+    if name == 'NOT Gate':
+        axis = 20 if comp.attr('size') == 'narrow' else 30
+        return [Port('in0', _offset(comp, *_along(facing, axis, 0)), width), Port('out', comp.loc, width)]
+
+    if name == 'Multiplexer':
+        select = comp.width('select', 1)
+        inputs = 1 << select
+        if inputs == 2:
+            axis, side = 30, 20
+            across = [-10, 10]
+        else:
+            axis, side = 40, inputs * 5
+            across = [10 * index - inputs * 5 for index in range(inputs)]
+        # The select input sits on the bottom (east/west) or left (north/south) edge
+        select_offset = {
+            'east': (-20, side), 'west': (20, side), 'north': (-side, 20), 'south': (-side, -20),
+        }[facing]
+        ports = [Port(f'in{index}', _offset(comp, *_along(facing, axis, offset)), width)
+                 for index, offset in enumerate(across)]
+        ports.append(Port('sel', _offset(comp, *select_offset), select))
+        if comp.attr('enable') == 'true':
+            raise NetlistError(f"Multiplexer enable inputs are not supported: {comp.describe()}")
+        return ports + [Port('out', comp.loc, width)]
+
+    if name == 'Adder':
+        width = comp.width('width', 8)
+        return [
+            Port('a', _offset(comp, -40, -10), width),
+            Port('b', _offset(comp, -40, 10), width),
+            Port('carry_in', _offset(comp, -20, -20), 1),
+            Port('carry_out', _offset(comp, -20, 20), 1),
+            Port('out', comp.loc, width),
+        ]
+
+    if name == 'Splitter':
+        if comp.attr('appear', 'left') not in ('left', 'legacy') or comp.attr('spacing', '1') != '1':
+            raise NetlistError(f"Only left-justified splitters are supported: {comp.describe()}")
+        fanout = comp.width('fanout', 2)
+        ends = {
+            'north': lambda end: (-10 * (end + 1), -20),
+            'south': lambda end: (10 * (fanout - end), 20),
+            'east': lambda end: (20, 10 * (end - fanout)),
+            'west': lambda end: (-20, 10 * (end + 1)),
+        }[facing]
+        widths = [0] * fanout
+        for end in _splitter_ends(comp):
+            if end is not None:
+                widths[end] += 1
+        ports = [Port('combined', comp.loc, comp.width('incoming', 2))]
+        return ports + [Port(f'end{end}', _offset(comp, *ends(end)), widths[end]) for end in range(fanout)]
+
+    if name == 'Bit Extender':
+        ports = [Port('in', _offset(comp, -40, 0), comp.width('in_width', 8)),
+                 Port('out', comp.loc, comp.width('out_width', 16))]
+        if comp.attr('type', 'sign') == 'input':
+            ports.append(Port('extend', _offset(comp, -20, 20), 1))
+        return ports
+
+    if name in ('Pin', 'Tunnel', 'Constant'):
+        return [Port('net', comp.loc, width)]
+
+    if name in IGNORED_COMPONENTS:
+        return []
+    raise NetlistError(f"Unsupported component: {comp.describe()}")
+
+
+def _splitter_ends(comp: Component) -> List[Optional[int]]:
+    """End index for every bit of a splitter's combined side (None if unconnected)"""
+    bits = comp.width('incoming', 2)
+    fanout = comp.width('fanout', 2)
+    # Default distribution: bits in ascending order, the first ends taking any extra
+    per_end, extra = divmod(bits, fanout)
+    default = []
+    for end in range(fanout):
+        default += [end] * (per_end + (1 if end < extra else 0))
+    ends = []
+    for bit in range(bits):
+        value = comp.attr(f'bit{bit}')
+        if value is None:
+            ends.append(default[bit])
+        else:
+            ends.append(None if value == 'none' else int(value))
+    return ends
+
+
+class Netlist:
+    """A levelized single-bit netlist with named input and output buses"""
+
+    def __init__(self, signal_count: int, cells: List[Cell], inputs: Dict[str, List[int]],
+                 outputs: Dict[str, List[int]], constants: Dict[int, int], names: Dict[int, str],
+                 floating: List[str]):
+        self.signal_count = signal_count
+        self.cells = cells
+        self.inputs = inputs
+        self.outputs = outputs
+        self.constants = constants
+        self.names = names
+        self.floating = floating
+        self._kernel = None
+        self._signal_kernel = None
+
+    @property
+    def depth(self) -> int:
+        """Number of levels in the schedule (longest path in cells)"""
+        return max((cell.level for cell in self.cells), default=0)
+
+    def summary(self) -> Dict[str, int]:
+        counts = defaultdict(int)
+        for cell in self.cells:
+            counts[cell.kind] += 1
+        return {'signals': self.signal_count, 'cells': len(self.cells), 'depth': self.depth, **counts}
+
+    def evaluate(self, values: Dict[str, int]) -> Dict[str, int]:
+        """Settle the circuit for one input vector; unspecified inputs are 0"""
+        words = {name: [(value >> bit) & 1 for bit in range(len(self._input_bits(name)))]
+                 for name, value in values.items()}
+        return {name: sum(word << bit for bit, word in enumerate(bus))
+                for name, bus in self.evaluate_words(words, 1).items()}
+
+    def evaluate_words(self, words: Dict[str, List[int]], count: int) -> Dict[str, List[int]]:
+        """Settle the circuit for `count` vectors at once, bitsliced.
+
+        Every input bit is a word (an int) whose bit k is that input bit in
+        vector k; outputs come back in the same form. Each cell is then a
+        single bitwise operation over all the vectors.
+        """
+        for name in words:
+            self._input_bits(name)
+        if self._kernel is None:
+            self._kernel = _compile_kernel(self)
+        return self._kernel(words, (1 << count) - 1)
+
+    def evaluate_signals(self, words: Dict[str, List[int]], count: int) -> List[int]:
+        """Like evaluate_words, but returns the word of every signal, indexed by signal"""
+        for name in words:
+            self._input_bits(name)
+        if self._signal_kernel is None:
+            self._signal_kernel = _compile_kernel(self, signals=True)
+        return self._signal_kernel(words, (1 << count) - 1)
+
+    def evaluate_batch(self, values: Dict[str, object], count: Optional[int] = None) -> Dict[str, object]:
+        """Settle the circuit for many vectors given as sequences of bus values.
+
+        A plain int applies to every vector. Outputs are arrays of bus values
+        (NumPy arrays when NumPy is installed).
+        """
+        if count is None:
+            count = batch_size(values)
+        words = self.input_words(values, count)
+        return {name: from_words(bus, count) for name, bus in self.evaluate_words(words, count).items()}
+
+    def input_words(self, values: Dict[str, object], count: int) -> Dict[str, List[int]]:
+        """Bitsliced words of input buses given as sequences of values (or an int for every vector)"""
+        words = {}
+        for name, value in values.items():
+            width = len(self._input_bits(name))
+            if isinstance(value, int):
+                mask = (1 << count) - 1
+                words[name] = [mask if (value >> bit) & 1 else 0 for bit in range(width)]
+            else:
+                if len(value) != count:
+                    raise ValueError("All inputs must have the same length")
+                words[name] = to_words(value, width)
+        return words
+
+    def _input_bits(self, name: str) -> List[int]:
+        bits = self.inputs.get(name)
+        if bits is None:
+            raise KeyError(f"Unknown input: {name}")
+        return bits
+
+
+def batch_size(values: Dict[str, object]) -> int:
+    """Vectors in a batch of input values: the length of the first sequence, else 1"""
+    return next((len(v) for v in values.values() if not isinstance(v, int)), 1)
+
+
+def _compile_kernel(netlist: Netlist, signals: bool = False):
+    """Straight-line Python for the schedule: one local per signal, one statement per cell.
+
+    The kernel returns the output buses, or with signals the word of every
+    signal as a list (0 for signals nothing drives).
+    """
+    lines = ['def kernel(words, mask):']
+    for signal, value in sorted(netlist.constants.items()):
+        lines.append(f'    s{signal} = {"mask" if value else "0"}')
+    for name, bits in netlist.inputs.items():
+        lines.append(f'    bus = words.get({name!r}, ())')
+        for bit, signal in enumerate(bits):
+            lines.append(f'    s{signal} = bus[{bit}] if len(bus) > {bit} else 0')
+
+    decoded = {}
+    for cell in netlist.cells:
+        terms = None
+        if cell.kind == 'MUX':
+            # One-hot select terms, shared by every bit of the multiplexer
+            terms = decoded.get(cell.select)
+            if terms is None:
+                terms = decoded[cell.select] = []
+                for index, term in enumerate(select_terms(cell.select, 's{}')):
+                    lines.append(f'    d{len(decoded)}_{index} = {term}')
+                    terms.append(f'd{len(decoded)}_{index}')
+        lines.append(f'    s{cell.output} = {cell_expression(cell, "s{}", terms)}')
+
+    if signals:
+        defined = set(netlist.constants).union(*netlist.inputs.values(), (cell.output for cell in netlist.cells))
+        values = ', '.join(f's{signal}' if signal in defined else '0' for signal in range(netlist.signal_count))
+        lines.append(f'    return [{values}]')
+    else:
+        outputs = ', '.join(f'{name!r}: [{", ".join(f"s{signal}" for signal in bits)}]'
+                            for name, bits in netlist.outputs.items())
+        lines.append(f'    return {{{outputs}}}')
+    namespace = {}
+    exec(compile('\n'.join(lines), '<netlist kernel>', 'exec'), namespace)
+    return namespace['kernel']
+
+
+def select_terms(select: Sequence[int], operand: str) -> List[str]:
+    """One-hot decode of multiplexer select bits, as expressions over `operand`.format(signal)"""
+    terms = []
+    for index in range(1 << len(select)):
+        factors = [operand.format(signal) if (index >> bit) & 1 else f'({operand.format(signal)} ^ mask)'
+                   for bit, signal in enumerate(select)]
+        terms.append(' & '.join(factors))
+    return terms
+
+
+def cell_expression(cell: Cell, operand: str, terms: Optional[List[str]] = None) -> str:
+    """Bitsliced Python expression for a cell; `mask` is the all-vectors word"""
+    operands = [operand.format(signal) for signal in cell.inputs]
+    if cell.kind == 'MUX':
+        if terms is None:
+            terms = [f'({term})' for term in select_terms(cell.select, operand)]
+        return ' | '.join(f'({term} & {data})' for term, data in zip(terms, operands))
+    if not operands:
+        return '0'            # Every input floating and ignored
+    if cell.kind == 'NOT':
+        return f'{operands[0]} ^ mask'
+    operator, inverted = _OPERATORS[cell.kind]
+    expression = operator.join(operands)
+    return f'({expression}) ^ mask' if inverted else expression
+
+
+# Cell kind -> (operator joining the inputs, output inverted)
+_OPERATORS = {
+    'AND': (' & ', False),
+    'OR': (' | ', False),
+    'XOR': (' ^ ', False),
+    'NAND': (' & ', True),
+    'NOR': (' | ', True),
+    'XNOR': (' ^ ', True),
+}
+
+
+def _checked_opcodes(opcodes):
+    """Batch opcodes range-checked to CTRL's 5 bits before to_words narrows them"""
+    np = model._numpy()
+    if np is not None:
+        # Checked as int64, like ALU.execute_batch: uint64 would wrap -1 and 256 would slice to ADD
+        try:
+            values = _as_word_array(opcodes, np.int64)
+        except OverflowError:
+            raise ValueError("Unknown opcode in batch") from None
+        if values.size and (int(values.min()) < 0 or int(values.max()) >= 32):
+            raise ValueError("Unknown opcode in batch")
+        return values
+    values = _as_ints(opcodes)
+    if any(not 0 <= value < 32 for value in values):
+        raise ValueError("Unknown opcode in batch")
+    return values
+
+
+def to_words(values, width: int) -> List[int]:
+    """Bitslice a sequence of bus values: word `bit` holds that bit of every value"""
+    np = model._numpy()
+    if np is not None:
+        values = _as_word_array(values, np.uint64)
+        return [int.from_bytes(np.packbits(((values >> np.uint64(bit)) & np.uint64(1)).astype(np.uint8),
+                                           bitorder='little').tobytes(), 'little')
+                for bit in range(width)]
+    values = _as_ints(values)
+    return [int(''.join('1' if (value >> bit) & 1 else '0' for value in reversed(values)) or '0', 2)
+            for bit in range(width)]
+
+
+def from_words(words: List[int], count: int):
+    """Bus values of `count` vectors from bitsliced words (the inverse of to_words)"""
+    width = len(words)
+    np = model._numpy()
+    if np is not None:
+        dtype = np.dtype(f'uint{8 * _storage_bytes(width)}').type
+        values = np.zeros(count, dtype=dtype)
+        size = (count + 7) // 8
+        for bit, word in enumerate(words):
+            if word:
+                plane = np.unpackbits(np.frombuffer(word.to_bytes(size, 'little'), dtype=np.uint8),
+                                      count=count, bitorder='little')
+                values |= plane.astype(dtype) << dtype(bit)
+        return values
+    values = [0] * count
+    for bit, word in enumerate(words):
+        for index, digit in enumerate(reversed(format(word, f'0{count}b'))):
+            if digit == '1':
+                values[index] |= 1 << bit
+    return array(_ARRAY_TYPECODES[_storage_bytes(width)], values)
+
+
+def build_netlist(circuit: Circuit) -> Netlist:
+    """Flatten a circuit into a levelized single-bit netlist"""
+    ignore_undefined = circuit.options.get('gateUndefined', 'ignore') == 'ignore'
+
+    # Nets: wire endpoints and component ports that touch, plus tunnels by label
+    net_of = CircuitIndex(circuit).net
+    ports = [(comp, {port.role: port for port in component_ports(comp)}) for comp in circuit.components]
+
+    net_widths = {}
+    net_labels = {}
+    for comp, comp_ports in ports:
+        for port in comp_ports.values():
+            if port.width == 0:
+                continue
+            net = net_of(port.loc)
+            known = net_widths.setdefault(net, port.width)
+            if known != port.width:
+                raise NetlistError(f"Width mismatch at {port.loc}: {comp.describe()} port {port.role} "
+                                   f"is {port.width} bits, the net is {known}")
+        if comp.name in ('Tunnel', 'Pin') and comp.attr('label'):
+            net_labels.setdefault(net_of(comp.loc), comp.attr('label'))
+
+    def net_bits(loc, width):
+        net = net_of(loc)
+        return [(net, bit) for bit in range(width)]
+
+    # Signals: net bits joined through splitters and bit extenders
+    bits = _UnionFind()
+    internal = itertools.count()
+    extend_zero = []
+    for comp, comp_ports in ports:
+        if comp.name == 'Splitter':
+            combined = net_bits(comp.loc, comp_ports['combined'].width)
+            taken = defaultdict(int)
+            for bit, end in enumerate(_splitter_ends(comp)):
+                if end is not None:
+                    port = comp_ports[f'end{end}']
+                    bits.union(combined[bit], (net_of(port.loc), taken[end]))
+                    taken[end] += 1
+        elif comp.name == 'Bit Extender':
+            source = net_bits(comp_ports['in'].loc, comp_ports['in'].width)
+            target = net_bits(comp.loc, comp_ports['out'].width)
+            kind = comp.attr('type', 'sign')
+            for index, bit in enumerate(target):
+                if index < len(source):
+                    bits.union(bit, source[index])
+                elif kind == 'sign':
+                    bits.union(bit, source[-1])
+                elif kind == 'input':
+                    bits.union(bit, net_bits(comp_ports['extend'].loc, 1)[0])
+                else:
+                    extend_zero.append((bit, 1 if kind == 'one' else 0))
+
+    ids = {}
+
+    def signal(bit) -> int:
+        root = bits.find(bit)
+        if root not in ids:
+            ids[root] = len(ids)
+        return ids[root]
+
+    drivers = {}
+    constants = {}
+    cells = []            # (kind, output, inputs, select, source) before levelizing
+    inputs = {}
+    outputs = {}
+
+    def drive(output: int, source: str) -> None:
+        if output in drivers:
+            raise NetlistError(f"Signal {names.get(output, output)} is driven by both "
+                               f"{drivers[output]} and {source}")
+        drivers[output] = source
+
+    names = {}
+    for net, label in net_labels.items():
+        for bit in range(net_widths.get(net, 1)):
+            names.setdefault(signal((net, bit)), f"{label}[{bit}]" if net_widths.get(net, 1) > 1 else label)
+
+    for bit, value in extend_zero:
+        out = signal(bit)
+        drive(out, 'Bit Extender')
+        constants[out] = value
+
+    for comp, comp_ports in ports:
+        source = comp.describe()
+        if comp.name in GATES or comp.name == 'NOT Gate':
+            kind = 'NOT' if comp.name == 'NOT Gate' else GATES[comp.name][0]
+            width = comp_ports['out'].width
+            in_ports = [port for role, port in comp_ports.items() if role.startswith('in')]
+            for bit in range(width):
+                out = signal((net_of(comp.loc), bit))
+                drive(out, source)
+                cells.append([kind, out, [signal((net_of(p.loc), bit)) for p in in_ports], [], source])
+        elif comp.name == 'Multiplexer':
+            width = comp_ports['out'].width
+            select = [signal(bit) for bit in net_bits(comp_ports['sel'].loc, comp_ports['sel'].width)]
+            data = [port for role, port in comp_ports.items() if role.startswith('in')]
+            for bit in range(width):
+                out = signal((net_of(comp.loc), bit))
+                drive(out, source)
+                cells.append(['MUX', out, [signal((net_of(p.loc), bit)) for p in data], select, source])
+        elif comp.name == 'Adder':
+            width = comp_ports['out'].width
+            a = [signal(bit) for bit in net_bits(comp_ports['a'].loc, width)]
+            b = [signal(bit) for bit in net_bits(comp_ports['b'].loc, width)]
+            total = [signal(bit) for bit in net_bits(comp.loc, width)]
+            carry = signal(net_bits(comp_ports['carry_in'].loc, 1)[0])
+            for index in range(width):
+                half = signal(('adder', next(internal)))
+                generate = signal(('adder', next(internal)))
+                propagate = signal(('adder', next(internal)))
+                if index == width - 1:
+                    carry_out = signal(net_bits(comp_ports['carry_out'].loc, 1)[0])
+                else:
+                    carry_out = signal(('adder', next(internal)))
+                for out, kind, ins in ((half, 'XOR', [a[index], b[index]]),
+                                       (total[index], 'XOR', [half, carry]),
+                                       (generate, 'AND', [a[index], b[index]]),
+                                       (propagate, 'AND', [half, carry]),
+                                       (carry_out, 'OR', [generate, propagate])):
+                    drive(out, source)
+                    cells.append([kind, out, ins, [], f"{source} bit {index}"])
+                carry = carry_out
+        elif comp.name == 'Constant':
+            value = int(comp.attr('value', '0x1'), 0)
+            for index, bit in enumerate(net_bits(comp.loc, comp.width())):
+                out = signal(bit)
+                drive(out, source)
+                constants[out] = (value >> index) & 1
+        elif comp.name == 'Pin':
+            label = comp.attr('label') or f"Pin{comp.loc}"
+            pin_bits = [signal(bit) for bit in net_bits(comp.loc, comp.width())]
+            if comp.attr('type') == 'output':
+                outputs[label] = pin_bits
+            else:
+                for out in pin_bits:
+                    drive(out, source)
+                inputs[label] = pin_bits
+
+    # Undriven tunnel-labelled nets become inputs; other undriven signals float
+    for net, label in sorted(net_labels.items(), key=lambda item: item[1]):
+        net_signals = [signal((net, bit)) for bit in range(net_widths.get(net, 1))]
+        if label not in inputs and label not in outputs and not any(s in drivers for s in net_signals):
+            inputs[label] = net_signals
+            for out in net_signals:
+                drivers[out] = f"input {label}"
+
+    floating = set()
+    for cell in cells:
+        kind, _, ins, select, _ = cell
+        undriven = [s for s in ins + select if s not in drivers]
+        if not undriven:
+            continue
+        floating.update(undriven)
+        if kind not in ('MUX', 'NOT') and ignore_undefined:
+            cell[2] = [s for s in ins if s in drivers]
+    floating_names = sorted(names.get(s, f"signal {s}") for s in floating)
+    for s in floating:
+        constants.setdefault(s, 0)
+
+    return Netlist(len(ids), _levelize(cells, drivers), inputs, outputs, constants, names, floating_names)
+
+
+def _levelize(cells, drivers) -> List[Cell]:
+    """Order cells so every cell follows the cells driving it (Kahn's algorithm)"""
+    driving = {cell[1]: cell for cell in cells}
+    readers = defaultdict(list)
+    pending = {}
+    for index, (_, _, ins, select, _) in enumerate(cells):
+        sources = {s for s in ins + select if s in driving}
+        pending[index] = len(sources)
+        for s in sources:
+            readers[s].append(index)
+
+    levels = {}
+    ready = [index for index, count in pending.items() if count == 0]
+    order = []
+    while ready:
+        index = ready.pop()
+        kind, output, ins, select, source = cells[index]
+        level = 1 + max((levels.get(s, 0) for s in ins + select), default=0)
+        levels[output] = level
+        order.append(Cell(kind, output, tuple(ins), tuple(select), level, source))
+        for reader in readers[output]:
+            pending[reader] -= 1
+            if pending[reader] == 0:
+                ready.append(reader)
+
+    if len(order) != len(cells):
+        stuck = sorted({cells[index][4] for index, count in pending.items() if count})
+        raise NetlistError(f"Combinational loop through {', '.join(stuck[:5])}")
+    order.sort(key=lambda cell: cell.level)
+    return order
+
+
+def load_netlist(path=DEFAULT_CIRCUIT, circuit: str = 'main') -> Netlist:
+    """Parse (through the circuit cache) and levelize a Logisim-evolution circuit"""
+    return build_netlist(load_circuit(path, circuit))
+
+
+class NetlistALU8Bit:
+    """alu_top.circ with the ALU8Bit calling conventions (8-bit, numeric opcodes 0-31)
+
+    The opcode drives CTRL and the operands A_IN and B_IN. Result is OVERALL;
+    N and Z follow it and C is C_OUT. The circuit has no overflow output.
+    """
+
+    width = 8
+
+    def __init__(self, netlist: Optional[Netlist] = None):
+        self.netlist = netlist if netlist is not None else load_netlist()
+
+    def execute_packed(self, opcode: int, a: int, b: int) -> int:
+        """Execute by numeric opcode and return result | (NZCV << 8)"""
+        if not 0 <= opcode < 32:
+            raise ValueError(f"Unknown opcode: {opcode}")
+        out = self.netlist.evaluate({'CTRL': opcode, 'A_IN': a & 0xFF, 'B_IN': b & 0xFF})
+        result = out['OVERALL']
+        nzcv = (FLAG_N if result & 0x80 else 0) | (0 if result else FLAG_Z) | (FLAG_C if out['C_OUT'] else 0)
+        return result | (nzcv << 8)
+
+    def execute(self, opcode: str, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """Execute by 5-bit opcode string; returns (result, flags) like ALU8Bit"""
+        entry = self.execute_packed(int(opcode, 2), a, b)
+        return entry & 0xFF, unpack_flags(entry >> 8)
+
+    def execute_batch(self, opcodes, a, b):
+        """Execute many operations at once; same conventions as ALU.execute_batch
+
+        The whole batch is one bitsliced pass through the netlist, and the
+        flags are formed from the output words before unslicing.
+        """
+        if isinstance(opcodes, int):
+            if not 0 <= opcodes < 32:
+                raise ValueError(f"Unknown opcode: {opcodes}")
+        elif len(opcodes) != len(a):
+            raise ValueError("opcodes, a and b must have the same length")
+        if len(a) != len(b):
+            raise ValueError("a and b must have the same length")
+        count = len(a)
+        mask = (1 << count) - 1
+        if isinstance(opcodes, int):
+            ctrl = [mask if (opcodes >> bit) & 1 else 0 for bit in range(5)]
+        else:
+            ctrl = to_words(_checked_opcodes(opcodes), 5)
+        out = self.netlist.evaluate_words({'CTRL': ctrl, 'A_IN': to_words(a, 8), 'B_IN': to_words(b, 8)}, count)
+
+        result = out['OVERALL']
+        nonzero = 0
+        for word in result:
+            nonzero |= word
+        # NZCV words, V first: V is never set, C is C_OUT, Z is no result bit set, N is bit 7
+        nzcv = [0, out['C_OUT'][0], nonzero ^ mask, result[7]]
+        return from_words(result, count), from_words(nzcv, count)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Opcode metadata and flag encoding for the 8-bit ALU
+
+Opcode metadata is loaded from spec/opcode/opcode_table.csv, the same table
+the documentation is generated from, so the model, runners and CLI agree
+on numbering and names without keeping their own copies.
+
+The CSV is hand-edited and some free-text cells contain unquoted commas
+(e.g. the CMP implementation note); rows with extra fields are folded back
+into the Implementation column.
+
+Parsing is done ahead of time: alu/_opcode_table.py holds the parsed rows
+together with the CSV text they came from, and is used whenever the CSV is
+unchanged, so importing the package does not need the csv module. After
+editing the CSV, regenerate it with:
+
+    python3 tools/compile_opcode_table.py
+"""
+
+import os
+from typing import Dict, NamedTuple, Tuple
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+OPCODE_TABLE = os.path.join(os.path.dirname(_PACKAGE_DIR), 'spec', 'opcode', 'opcode_table.csv')
+COMPILED_TABLE = os.path.join(_PACKAGE_DIR, '_opcode_table.py')
+
+# Columns of opcode_table.csv
+TABLE_FIELDS = 7
+
+# Flag bits of the packed NZCV nibble
+FLAG_N = 0x8
+FLAG_Z = 0x4
+FLAG_C = 0x2
+FLAG_V = 0x1
+
+
+class OpcodeInfo(NamedTuple):
+    """One row of the opcode table"""
+    code: int              # numeric opcode (0-18)
+    opcode: str            # 5-bit opcode string, e.g. '00100'
+    func: str              # FUNC[3:0] control bits
+    mnemonic: str          # primary name, e.g. 'LSL'
+    aliases: Tuple[str, ...]   # all names from the Operation column, e.g. ('LSL', 'SLL')
+    description: str
+    implementation: str
+    category: str          # 'Arithmetic' or 'Logic'
+    implemented: bool      # Circuit Progress column
+
+    @property
+    def test_prefix(self) -> str:
+        """Test-name prefix used by the vector generators, e.g. 'INC_A'"""
+        return self.mnemonic.replace(' ', '_')
+
+
+def _parse_row(row) -> OpcodeInfo:
+    if len(row) > TABLE_FIELDS:
+        # Unquoted commas in the free-text Implementation cell
+        row = row[:5] + [','.join(row[5:-1])] + row[-1:]
+    if len(row) != TABLE_FIELDS:
+        raise ValueError(f"Malformed opcode table row: {row}")
+
+    decimal, binary, func, operation, description, implementation, progress = (
+        cell.strip() for cell in row)
+    aliases = tuple(name.strip() for name in operation.split('/'))
+    category = implementation.split(':', 1)[0] if ':' in implementation else ''
+    if int(binary, 2) != int(decimal):
+        raise ValueError(f"Opcode {binary} does not match decimal value {decimal}")
+    return OpcodeInfo(
+        code=int(decimal),
+        opcode=binary,
+        func=func,
+        mnemonic=aliases[0],
+        aliases=aliases,
+        description=description,
+        implementation=implementation,
+        category=category,
+        implemented=progress.upper() in ('TRUE', 'COMPLETE', 'YES'),
+    )
+
+
+def parse_opcode_table(text: str) -> Tuple[OpcodeInfo, ...]:
+    """Parse opcode table CSV text; rows are returned in numeric opcode order"""
+    import csv
+
+    reader = csv.reader(text.splitlines())
+    next(reader, None)  # Header
+    infos = sorted((_parse_row(row) for row in reader if any(cell.strip() for cell in row)),
+                   key=lambda info: info.code)
+    if [info.code for info in infos] != list(range(len(infos))):
+        raise ValueError("Opcode table is not numbered contiguously from 0")
+    return tuple(infos)
+
+
+def load_opcode_table(path: str = OPCODE_TABLE) -> Tuple[OpcodeInfo, ...]:
+    """Parse the opcode table CSV at path"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return parse_opcode_table(f.read())
+
+
+def compile_opcode_table(path: str = OPCODE_TABLE, output: str = COMPILED_TABLE) -> int:
+    """Write the precompiled opcode table module; returns the number of rows"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        source = f.read()
+    infos = parse_opcode_table(source)
+    lines = [
+        '"""Generated from spec/opcode/opcode_table.csv by tools/compile_opcode_table.py; do not edit"""',
+        '',
+        f'SOURCE = {source!r}',
+        '',
+        'ROWS = (',
+    ]
+    lines.extend(f'    {tuple(info)!r},' for info in infos)
+    lines.append(')')
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return len(infos)
+
+
+def _load_opcode_info() -> Tuple[OpcodeInfo, ...]:
+    """Precompiled opcode table, or a fresh parse if the CSV has changed since"""
+    try:
+        from . import _opcode_table as compiled
+    except ImportError:
+        compiled = None
+    try:
+        with open(OPCODE_TABLE, 'r', encoding='utf-8', newline='') as f:
+            source = f.read()
+    except OSError:
+        source = None  # Spec not checked out next to the package
+    if compiled is not None and source in (None, compiled.SOURCE):
+        return tuple(OpcodeInfo(*row) for row in compiled.ROWS)
+    if source is None:
+        raise FileNotFoundError(f"Opcode table not found: {OPCODE_TABLE}")
+    return parse_opcode_table(source)
+
+
+OPCODE_INFO = _load_opcode_info()
+
+# Opcode strings in numeric order; the tuple index is the opcode value
+OPCODES = tuple(info.opcode for info in OPCODE_INFO)
+OPCODE_INDEX = {opcode: index for index, opcode in enumerate(OPCODES)}
+
+# Test-name prefixes (e.g. 'INC_A') and display names (e.g. 'INC A'), by numeric opcode
+OPCODE_NAMES = tuple(info.test_prefix for info in OPCODE_INFO)
+DISPLAY_NAMES = {info.opcode: info.mnemonic for info in OPCODE_INFO}
+
+# Every name and alias, normalised to upper case without spaces or underscores
+MNEMONIC_INDEX: Dict[str, int] = {
+    alias.upper().replace(' ', '').replace('_', ''): info.code
+    for info in OPCODE_INFO for alias in info.aliases
+}
+
+
+def lookup_opcode(name: str) -> OpcodeInfo:
+    """Resolve a mnemonic ('NOT A', 'NOT_A', 'nota', 'SLL') or opcode string"""
+    key = name.strip()
+    if key in OPCODE_INDEX:
+        return OPCODE_INFO[OPCODE_INDEX[key]]
+    code = MNEMONIC_INDEX.get(key.upper().replace(' ', '').replace('_', ''))
+    if code is None:
+        raise ValueError(f"Unknown operation: {name}")
+    return OPCODE_INFO[code]
+
+
+def opcode_number(name: str) -> int:
+    """Numeric opcode of an operation as scripts and traces name it
+
+    Accepts what lookup_opcode does (5-bit opcode strings and mnemonics),
+    the CLI's one-operand names (INC, DEC, REV) and decimal opcode numbers
+    below len(OPCODES). '00010' is INC A, never opcode 10.
+    """
+    key = name.strip()
+    try:
+        return lookup_opcode(key).code
+    except ValueError:
+        pass
+    if key.isdigit() and int(key) < len(OPCODES):
+        return int(key)
+    try:
+        return lookup_opcode(key + ' A').code
+    except ValueError:
+        raise ValueError(f"Unknown operation: {name}") from None
+
+
+def pack_flags(flags: Dict[str, bool]) -> int:
+    """Pack a flags dict into an NZCV nibble"""
+    return ((FLAG_N if flags.get('negative') else 0) |
+            (FLAG_Z if flags.get('zero') else 0) |
+            (FLAG_C if flags.get('carry') else 0) |
+            (FLAG_V if flags.get('overflow') else 0))
+
+
+def unpack_flags(nzcv: int) -> Dict[str, bool]:
+    """Unpack an NZCV nibble into a flags dict"""
+    return {
+        'carry': bool(nzcv & FLAG_C),
+        'zero': bool(nzcv & FLAG_Z),
+        'overflow': bool(nzcv & FLAG_V),
+        'negative': bool(nzcv & FLAG_N),
+    }
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Switching activity and dynamic power estimation on the gate-level netlist
+
+PowerEstimator replays a stream of input vectors through a Netlist and
+counts the transitions of every node between consecutive vectors. Settled
+values are compared (zero delay), so glitches within an operation are not
+counted and the activity is a lower bound; alu/timing.py shows where they
+occur.
+
+A node of capacitance C draws C·V²/2 from the supply per transition. Its
+capacitance is its element's figure plus a load per input it drives, both
+from spec/power/gate_capacitance.csv. spec/power/board_map.csv assigns
+nodes to boards by the nearest labelled net downstream of them.
+
+As in Netlist.evaluate_batch, vectors are bitsliced: a node's word holds its
+value in every vector of a chunk, so its transitions within the chunk are
+the popcount of word ^ (word >> 1).
+"""
+
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from . import model
+from .netlist import Netlist, batch_size, to_words
+from .timing import delay_element
+
+SPEC_DIR = Path(__file__).resolve().parent.parent / 'spec' / 'power'
+CAPACITANCE_TABLE = SPEC_DIR / 'gate_capacitance.csv'
+BOARD_MAP = SPEC_DIR / 'board_map.csv'
+
+# Nodes that reach no labelled net
+UNASSIGNED = 'unassigned'
+
+
+def _read_csv(path, key: str, value: str) -> Dict[str, str]:
+    import csv
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return {row[key].strip(): row[value].strip() for row in csv.DictReader(f)
+                if row.get(key, '').strip()}
+
+
+def load_capacitance(path=CAPACITANCE_TABLE) -> Dict[str, float]:
+    """Element -> capacitance in pF from a CSV with element and capacitance_pf columns"""
+    return {element: float(value) for element, value in _read_csv(path, 'element', 'capacitance_pf').items()}
+
+
+def load_board_map(path=BOARD_MAP) -> Dict[str, str]:
+    """Net label -> board from a CSV with net and board columns"""
+    return _read_csv(path, 'net', 'board')
+
+
+_popcount = getattr(int, 'bit_count', None) or (lambda word: bin(word).count('1'))
+
+
+class Activity(NamedTuple):
+    """Transition counts of a replayed vector stream, split by class (e.g. opcode)"""
+    vectors: int                       # Vectors replayed
+    operations: Dict[object, int]      # class -> vectors of that class
+    toggles: Dict[object, List[int]]   # class -> transitions per signal into vectors of that class
+
+
+class PowerEstimator:
+    """Toggle counting and switching energy of a netlist"""
+
+    def __init__(self, netlist: Netlist, capacitance: Optional[Dict[str, float]] = None,
+                 boards: Optional[Dict[str, str]] = None):
+        self.netlist = netlist
+        capacitance = load_capacitance() if capacitance is None else capacitance
+        boards = load_board_map() if boards is None else boards
+        missing = sorted(({delay_element(cell) for cell in netlist.cells} | {'INPUT', 'FANOUT'}) - set(capacitance))
+        if missing:
+            raise ValueError(f"No capacitance for {', '.join(missing)}")
+
+        drivers = {cell.output: cell for cell in netlist.cells}
+        fanout = [[] for _ in range(netlist.signal_count)]
+        for cell in netlist.cells:
+            for signal in cell.inputs + cell.select:
+                fanout[signal].append(cell.output)
+
+        # Nodes that can switch: inputs and cell outputs
+        self.nodes = sorted(set(drivers).union(*netlist.inputs.values()) - set(netlist.constants))
+        self.element = {signal: delay_element(drivers[signal]) if signal in drivers else 'INPUT'
+                        for signal in self.nodes}
+        self.capacitance = {signal: capacitance[self.element[signal]] + capacitance['FANOUT'] * len(fanout[signal])
+                            for signal in self.nodes}
+        self.board = {signal: self._nearest_board(signal, fanout, boards) for signal in self.nodes}
+
+    def _nearest_board(self, signal: int, fanout: List[List[int]], boards: Dict[str, str]) -> str:
+        """Board of the closest labelled net at or downstream of signal"""
+        seen = {signal}
+        queue = deque([signal])
+        while queue:
+            current = queue.popleft()
+            name = self.netlist.names.get(current)
+            if name is not None:
+                return boards.get(name.split('[')[0], UNASSIGNED)
+            for output in fanout[current]:
+                if output not in seen:
+                    seen.add(output)
+                    queue.append(output)
+        return UNASSIGNED
+
+    def count(self, batches: Iterable[Dict[str, object]], key: Optional[str] = None) -> Activity:
+        """Count node transitions over a stream of batches of input values.
+
+        Each batch maps input names to sequences of bus values (or an int for
+        every vector), as in Netlist.evaluate_batch; batches continue one
+        another, so the transition into a batch's first vector is counted.
+        With key, transitions are classed by the value of that input in the
+        vector they lead into, e.g. key='CTRL' for per-opcode figures.
+        """
+        signal_count = self.netlist.signal_count
+        operations = {}
+        toggles = {}
+        previous = None
+        vectors = 0
+        for batch in batches:
+            count = batch_size(batch)
+            state = self.netlist.evaluate_signals(self.netlist.input_words(batch, count), count)
+            mask = (1 << count) - 1
+            within = mask >> 1   # Bit k: the transition from vector k to k + 1
+            changes = {signal: state[signal] ^ (state[signal] >> 1) for signal in self.nodes}
+            if previous is not None:
+                entry = {signal: previous[signal] ^ (state[signal] & 1) for signal in self.nodes}
+            classes = _class_words(batch[key], count) if key is not None else {None: mask}
+            for value, members in classes.items():
+                operations[value] = operations.get(value, 0) + _popcount(members)
+                counts = toggles.setdefault(value, [0] * signal_count)
+                into = (members >> 1) & within
+                for signal in self.nodes:
+                    counts[signal] += _popcount(changes[signal] & into)
+                if previous is not None and members & 1:
+                    for signal in self.nodes:
+                        counts[signal] += entry[signal]
+            previous = {signal: (state[signal] >> (count - 1)) & 1 for signal in self.nodes}
+            vectors += count
+        return Activity(vectors, operations, toggles)
+
+    def energy(self, activity: Activity, vdd: float = 5.0) -> Dict[object, Dict[str, float]]:
+        """class -> board -> switching energy in nJ (C·V²/2 per transition)"""
+        result = {}
+        for value, counts in activity.toggles.items():
+            boards = result.setdefault(value, {})
+            for signal in self.nodes:
+                if counts[signal]:
+                    board = self.board[signal]
+                    joules = 0.5 * self.capacitance[signal] * 1e-12 * vdd * vdd * counts[signal]
+                    boards[board] = boards.get(board, 0.0) + joules * 1e9
+        return result
+
+
+def _class_words(values, count: int) -> Dict[int, int]:
+    """value -> word with bit k set where vector k has that value"""
+    if isinstance(values, int):
+        return {values: (1 << count) - 1}
+    np = model._numpy()
+    if np is not None:
+        values = np.asarray(values)
+        return {int(value): to_words(values == value, 1)[0] for value in np.unique(values)}
+    words = {}
+    for index, value in enumerate(values):
+        words[int(value)] = words.get(int(value), 0) | 1 << index
+    return words
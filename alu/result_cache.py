@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Content-hash cache of ALU verification results
+
+Verification results are keyed by a SHA-256 of the vector file and a
+SHA-256 of each opcode's implementation in the golden model: the opcode's
+method plus everything it may depend on, which is the rest of the source of
+the model's modules (execute, flag helpers, tables such as REV_TABLE),
+alu/opcodes.py and spec/opcode/opcode_table.csv. When neither has
+changed, the stored per-opcode pass counts are replayed instead of
+re-running the vectors; when only some opcode implementations changed,
+only those opcodes need to be re-verified.
+
+Only fully passing opcodes are cached, so failures are always re-run and
+reported fresh.
+
+FileCache is the file-keyed JSON store behind the .circ and KiCad readers'
+caches (alu/circ.py, alu/kicad.py).
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from . import opcodes
+
+DEFAULT_CACHE_FILE = Path(__file__).resolve().parent.parent / 'results' / 'verification_cache.json'
+CACHE_VERSION = 2
+
+
+def file_digest(path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source(obj) -> str:
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        # No source available (e.g. interactive definitions): never match
+        return repr(obj) + str(id(obj))
+
+
+def implementation_digests(alu) -> Dict[str, str]:
+    """Per-opcode SHA-256 of the code that implements it in an ALU8Bit instance"""
+    methods = {opcode: _source(getattr(method, '__func__', method)) for opcode, method in alu.operations.items()}
+
+    # Shared by every opcode: the modules defining the model's classes with the
+    # per-opcode methods cut out, the opcode metadata module and its table
+    modules = {sys.modules[cls.__module__] for cls in type(alu).__mro__ if cls.__module__ != 'builtins'}
+    modules.add(opcodes)
+    shared = hashlib.sha256(str(alu.width).encode('ascii'))
+    for module in sorted(modules, key=lambda module: module.__name__):
+        source = _source(module)
+        if module is not opcodes:
+            for method_source in set(methods.values()):
+                source = source.replace(method_source, '')
+        shared.update(source.encode('utf-8'))
+    if os.path.exists(opcodes.OPCODE_TABLE):
+        shared.update(file_digest(Path(opcodes.OPCODE_TABLE)).encode('ascii'))
+    shared_hex = shared.hexdigest()
+
+    digests = {}
+    for opcode, source in methods.items():
+        digest = hashlib.sha256(shared_hex.encode('ascii'))
+        digest.update(source.encode('utf-8'))
+        digests[opcode] = digest.hexdigest()
+    return digests
+
+
+class ResultCache:
+    """JSON-backed store of per-opcode verification results"""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_FILE):
+        self.path = Path(path)
+        self.data = {'version': CACHE_VERSION, 'files': {}, 'results': {}}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_VERSION:
+                    self.data = data
+            except (OSError, ValueError):
+                pass  # Corrupt or unreadable cache: start over
+
+    def vector_digest(self, vector_file: Path) -> str:
+        """Content digest of a vector file, reusing the stored one if size and mtime match"""
+        stat = vector_file.stat()
+        key = str(vector_file.resolve())
+        entry = self.data['files'].get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+        digest = file_digest(vector_file)
+        self.data['files'][key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+        return digest
+
+    def lookup(self, vector_digest: str, impl_digests: Dict[str, str]) -> Dict[str, Dict[str, int]]:
+        """Cached op_stats for opcodes whose implementation is unchanged"""
+        entry = self.data['results'].get(vector_digest, {})
+        return {
+            opcode: {'passed': stats['passed'], 'failed': 0}
+            for opcode, stats in entry.get('opcodes', {}).items()
+            if impl_digests.get(opcode) == stats['impl']
+        }
+
+    def is_complete(self, vector_digest: str, cached: Dict[str, Dict[str, int]]) -> bool:
+        """True if every opcode in the vector file is covered by cached results"""
+        entry = self.data['results'].get(vector_digest)
+        if not entry:
+            return False
+        return set(entry['all_opcodes']) <= set(cached)
+
+    def store(self, vector_digest: str, impl_digests: Dict[str, str],
+              op_stats: Dict[str, Dict[str, int]]) -> None:
+        """Record a run's results; opcodes with failures are not cached"""
+        self.data['results'][vector_digest] = {
+            'all_opcodes': sorted(op_stats),
+            'opcodes': {
+                opcode: {'impl': impl_digests[opcode], 'passed': stats['passed']}
+                for opcode, stats in sorted(op_stats.items())
+                if stats['failed'] == 0 and opcode in impl_digests
+            },
+        }
+
+    def save(self) -> None:
+        """Atomically write the cache file"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def load_cached(vector_file: Path, alu, cache: Optional[ResultCache]):
+    """
+    Look up cached results for a vector file and ALU instance.
+    Returns (vector_digest, impl_digests, cached_op_stats, complete).
+    """
+    if cache is None:
+        return None, None, {}, False
+    vector_digest = cache.vector_digest(vector_file)
+    impl_digests = implementation_digests(alu)
+    cached = cache.lookup(vector_digest, impl_digests)
+    return vector_digest, impl_digests, cached, cache.is_complete(vector_digest, cached)
+
+
+class FileCache:
+    """JSON-backed store of models derived from files, keyed by resolved path
+
+    to_json and from_json convert a model to and from its JSON form. An
+    entry is reused while the file's size and mtime match; if they changed,
+    the file's SHA-256 decides, and a match refreshes the stored size and
+    mtime. save() writes only when an entry changed.
+    """
+
+    def __init__(self, path: Path, version: int,
+                 to_json: Callable[[Any], Any], from_json: Callable[[Any], Any]):
+        self.path = Path(path)
+        self.version = version
+        self.to_json = to_json
+        self.from_json = from_json
+        self.data = {'version': version, 'files': {}}
+        self.dirty = False
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == version:
+                    self.data = data
+            except (OSError, ValueError):
+                pass  # Corrupt or unreadable cache: start over
+
+    def load(self, path: Path) -> Optional[Any]:
+        """The cached model of path if the file is unchanged, else None"""
+        entry = self.data['files'].get(str(Path(path).resolve()))
+        if entry is None:
+            return None
+        stat = os.stat(path)
+        if entry['size'] != stat.st_size or entry['mtime_ns'] != stat.st_mtime_ns:
+            if entry['sha256'] != file_digest(path):
+                return None
+            entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            self.dirty = True
+        return self.from_json(entry['model'])
+
+    def store(self, path: Path, model: Any) -> None:
+        stat = os.stat(path)
+        self.data['files'][str(Path(path).resolve())] = {
+            'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_digest(path),
+            'model': self.to_json(model),
+        }
+        self.dirty = True
+
+    def save(self) -> None:
+        """Atomically write the cache file if it changed; a read-only location just disables caching"""
+        if not self.dirty:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError:
+            pass
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Behavioural model of the FPGA RTL (sim/FPGA/src/ALU.sv)
+
+RTLALU8Bit evaluates what ALU.sv computes, not what the opcode table
+specifies, so it can be run against the golden model to find where the
+two disagree. Known differences from ALU8Bit as written in the RTL:
+
+    opcode 11   XNOR    (table: PASS A)
+    opcode 12   PASS A  (table: PASS B)
+    opcode 15   PASS B  (table: XNOR)
+    CMP         Result is A - B; the table drives 0
+    INC/DEC     CarryOut is the adder carry (DEC: A != 0)
+    Overflow    never set (a placeholder in the RTL)
+    19-31       Result 0 (the case default)
+
+Only Result, CarryOut, Zero and Negative are modelled as NZCV; the
+Equal/Less/Great comparison outputs have no counterpart in the table.
+"""
+
+from array import array
+from typing import Dict, Tuple
+
+from . import model
+from .model import REV_TABLE, _as_ints, _as_word_array
+from .opcodes import FLAG_C, FLAG_N, FLAG_Z, unpack_flags
+
+# Operation names by numeric opcode, from the ALU.sv header
+RTL_OPCODE_NAMES = (
+    'ADD', 'SUB', 'INC', 'DEC', 'LSL', 'LSR', 'ASR', 'REV',
+    'NAND', 'NOR', 'XOR', 'XNOR', 'PASS_A', 'AND', 'OR', 'PASS_B',
+    'CMP', 'NOT_A', 'NOT_B',
+)
+
+# The Opcode input is 5 bits; codes past NOT_B fall to the case default
+RTL_OPCODE_COUNT = 32
+
+
+def _rev(a):
+    """REV over an int or a NumPy array"""
+    if isinstance(a, int):
+        return REV_TABLE[a]
+    np = model._numpy()
+    return np.frombuffer(REV_TABLE, dtype=np.uint8)[a].astype(a.dtype)
+
+
+# Opcode -> function of (A, B) giving (temp_result, CarryOut) as in the
+# always @* block. A and B are 8-bit ints or uint16 arrays; temp_result may
+# carry a 9th bit, which Result drops.
+_RTL_OPERATIONS = {
+    0:  lambda a, b: (a + b, (a + b) >> 8),                            # ADD
+    1:  lambda a, b: (a + (~b & 0xFF) + 1, (a + (~b & 0xFF) + 1) >> 8),  # SUB
+    2:  lambda a, b: (a + 1, (a + 1) >> 8),                            # INC
+    3:  lambda a, b: (a + 0xFF, (a + 0xFF) >> 8),                      # DEC
+    4:  lambda a, b: ((a << 1) & 0xFF, a >> 7),                        # LSL
+    5:  lambda a, b: (a >> 1, a & 1),                                  # LSR
+    6:  lambda a, b: ((a >> 1) | (a & 0x80), a & 1),                   # ASR
+    7:  lambda a, b: (_rev(a), 0),                                     # REV
+    8:  lambda a, b: (~(a & b) & 0xFF, 0),                             # NAND
+    9:  lambda a, b: (~(a | b) & 0xFF, 0),                             # NOR
+    10: lambda a, b: (a ^ b, 0),                                       # XOR
+    11: lambda a, b: (~(a ^ b) & 0xFF, 0),                             # XNOR
+    12: lambda a, b: (a, 0),                                           # PASS A
+    13: lambda a, b: (a & b, 0),                                       # AND
+    14: lambda a, b: (a | b, 0),                                       # OR
+    15: lambda a, b: (b, 0),                                           # PASS B
+    16: lambda a, b: (a + (~b & 0xFF) + 1, (a + (~b & 0xFF) + 1) >> 8),  # CMP
+    17: lambda a, b: (~a & 0xFF, 0),                                   # NOT A
+    18: lambda a, b: (~b & 0xFF, 0),                                   # NOT B
+}
+
+
+class RTLALU8Bit:
+    """ALU.sv semantics with the ALU8Bit calling conventions (8-bit, numeric opcodes 0-31)"""
+
+    width = 8
+
+    def execute_packed(self, opcode: int, a: int, b: int) -> int:
+        """Execute by numeric opcode and return result | (NZCV << 8)"""
+        if not 0 <= opcode < RTL_OPCODE_COUNT:
+            raise ValueError(f"Unknown opcode: {opcode}")
+        operation = _RTL_OPERATIONS.get(opcode)
+        if operation is None:
+            return FLAG_Z << 8
+        temp, carry = operation(a & 0xFF, b & 0xFF)
+        result = temp & 0xFF
+        nzcv = (FLAG_N if result & 0x80 else 0) | (0 if result else FLAG_Z) | (FLAG_C if carry & 1 else 0)
+        return result | (nzcv << 8)
+
+    def execute(self, opcode: str, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """Execute by 5-bit opcode string; returns (result, flags) like ALU8Bit"""
+        entry = self.execute_packed(int(opcode, 2), a, b)
+        return entry & 0xFF, unpack_flags(entry >> 8)
+
+    def execute_batch(self, opcodes, a, b):
+        """Execute many operations at once; same conventions as ALU.execute_batch"""
+        np = model._numpy()
+        if np is None:
+            a = _as_ints(a)
+            b = _as_ints(b)
+            opcodes = [opcodes] * len(a) if isinstance(opcodes, int) else _as_ints(opcodes)
+            if not len(opcodes) == len(a) == len(b):
+                raise ValueError("opcodes, a and b must have the same length")
+            entries = [self.execute_packed(op, x, y) for op, x, y in zip(opcodes, a, b)]
+            return array('B', [e & 0xFF for e in entries]), array('B', [e >> 8 for e in entries])
+
+        a = _as_word_array(a, np.uint8).astype(np.uint16)
+        b = _as_word_array(b, np.uint8).astype(np.uint16)
+        if a.shape != b.shape:
+            raise ValueError("a and b must have the same length")
+        if isinstance(opcodes, int):
+            opcodes = np.full(a.shape, opcodes, dtype=np.uint8)
+        else:
+            opcodes = _as_word_array(opcodes, np.uint8)
+            if opcodes.shape != a.shape:
+                raise ValueError("opcodes, a and b must have the same length")
+        if opcodes.size and int(opcodes.max()) >= RTL_OPCODE_COUNT:
+            raise ValueError("Unknown opcode in batch")
+
+        results = np.zeros(a.shape, dtype=np.uint8)
+        nzcv = np.full(a.shape, FLAG_Z, dtype=np.uint8)
+        for opcode in np.unique(opcodes).tolist():
+            operation = _RTL_OPERATIONS.get(opcode)
+            if operation is None:
+                continue  # Case default: Result 0, Zero set
+            sel = opcodes == opcode
+            temp, carry = operation(a[sel], b[sel])
+            res = (np.asarray(temp) & 0xFF).astype(np.uint8)
+            flags = np.where(res == 0, FLAG_Z, 0) | np.where(res & 0x80, FLAG_N, 0)
+            flags |= np.where(np.asarray(carry) & 1, FLAG_C, 0)
+            results[sel] = res
+            nzcv[sel] = flags
+        return results, nzcv
@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""
+ALU golden model as a local socket service
+
+ALUServer serves an 8-bit engine (ALU8Bit or TableALU8Bit) over a Unix or
+TCP socket with asyncio. Each connection speaks one of two framings,
+chosen by its first byte: '{' selects JSON Lines, anything else the
+binary framing. Requests on a connection are pipelined: every complete
+request already received is answered in one write, in request order, so
+clients may keep many requests in flight.
+
+Binary framing (little-endian), an 8-byte header and a payload:
+
+    Header:
+        kind    u8   KIND_EXECUTE, KIND_STATS (requests) or
+                     KIND_RESULT, KIND_STATS_REPLY, KIND_ERROR (responses)
+        status  u8   reserved, 0
+        count   u16  records (execute/result) or payload bytes (stats/error)
+        tag     u32  chosen by the client and echoed in the response
+
+    KIND_EXECUTE payload: count x (opcode u8, A u8, B u8)
+    KIND_RESULT payload:  count x (result u8, NZCV u8)
+    KIND_STATS:           no payload; the reply payload is a JSON object
+    KIND_ERROR payload:   UTF-8 message; sent instead of a result, e.g. for
+                          an unknown opcode anywhere in a batch
+
+JSON Lines framing, one object per line:
+
+    {"op": "ADD", "A": 42, "B": 23, "id": 1}
+        -> the request echoed with "result" and "flags" added, as --batch does
+    {"batch": [["ADD", 42, 23], ["XOR", 170, 85]], "id": 2}
+        -> {"id": 2, "results": [{"result": 65, "flags": {...}}, ...]}
+    {"cmd": "stats"}
+        -> server counters and latency histogram
+    Bad requests get {"id": ..., "error": "..."} and the connection stays open.
+
+ServerStats counts connections, requests, operations, errors and bytes
+per framing, and keeps a LatencyHistogram of request service times.
+ALUClient is the matching asyncio client and is used by
+tools/alu_loadgen.py to benchmark the server.
+"""
+
+import asyncio
+import json
+import struct
+import sys
+import time
+from array import array
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .model import TableALU8Bit
+from .opcodes import OPCODES, lookup_opcode, pack_flags, unpack_flags
+
+FRAME = struct.Struct('<BBHI')
+FRAME_SIZE = FRAME.size
+OP_RECORD_SIZE = 3
+RESULT_RECORD_SIZE = 2
+
+KIND_EXECUTE = 0x01
+KIND_STATS = 0x02
+KIND_RESULT = 0x81
+KIND_STATS_REPLY = 0x82
+KIND_ERROR = 0xFF
+
+# Largest batch in one binary frame (count is a u16)
+MAX_BATCH = 0xFFFF
+
+# Bytes requested from the socket per read
+READ_SIZE = 256 * 1024
+
+# Longest accepted JSON line
+MAX_LINE = 1024 * 1024
+
+DEFAULT_ADDRESS = '127.0.0.1:8580'
+
+# Key spellings accepted in JSON requests (the same as --batch)
+JSON_OPERATION_KEYS = ('op', 'operation', 'opcode')
+JSON_A_KEYS = ('A', 'a')
+JSON_B_KEYS = ('B', 'b')
+
+
+def parse_address(address: str) -> Tuple[str, object]:
+    """
+    Parse a listen/connect address.
+    'unix:PATH' or anything containing '/' is a Unix socket path;
+    'HOST:PORT' or ':PORT' is TCP (host defaults to 127.0.0.1).
+    Returns ('unix', path) or ('tcp', (host, port)).
+    """
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    if '/' in address:
+        return 'unix', address
+    host, sep, port = address.rpartition(':')
+    if not sep or not port.isdigit():
+        raise ValueError(f"Invalid address: {address} (expected HOST:PORT or unix:PATH)")
+    return 'tcp', (host.strip('[]') or '127.0.0.1', int(port))
+
+
+def resolve_opcode(name) -> int:
+    """Numeric opcode from an int, a 5-bit opcode string or any table mnemonic"""
+    if isinstance(name, int) and not isinstance(name, bool):
+        if not 0 <= name < len(OPCODES):
+            raise ValueError(f"Unknown opcode: {name}")
+        return name
+    return lookup_opcode(str(name)).code
+
+
+class LatencyHistogram:
+    """
+    Latency histogram with power-of-two microsecond buckets.
+    Bucket i counts samples in [2**(i-1), 2**i) us (bucket 0 is < 1 us);
+    percentiles are reported as the upper bound of their bucket.
+    """
+
+    BUCKETS = 32
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.total = 0
+        self.sum_us = 0.0
+        self.max_us = 0.0
+
+    def record(self, seconds: float) -> None:
+        micros = seconds * 1e6
+        self.counts[min(int(micros).bit_length(), self.BUCKETS - 1)] += 1
+        self.total += 1
+        self.sum_us += micros
+        if micros > self.max_us:
+            self.max_us = micros
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        self.counts = [x + y for x, y in zip(self.counts, other.counts)]
+        self.total += other.total
+        self.sum_us += other.sum_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound in microseconds of the bucket holding the given quantile"""
+        if not self.total:
+            return 0.0
+        rank = fraction * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return float(1 << index)
+        return float(1 << (self.BUCKETS - 1))
+
+    def to_dict(self) -> Dict:
+        return {
+            'count': self.total,
+            'mean_us': round(self.sum_us / self.total, 3) if self.total else 0.0,
+            'max_us': round(self.max_us, 3),
+            'p50_us': self.percentile(0.50),
+            'p90_us': self.percentile(0.90),
+            'p99_us': self.percentile(0.99),
+            'buckets': {f'<{1 << index}us': count
+                        for index, count in enumerate(self.counts) if count},
+        }
+
+
+class ServerStats:
+    """Request counters and service-time histogram of an ALUServer"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.connections = 0
+        self.active_connections = 0
+        self.requests = {'binary': 0, 'jsonl': 0}
+        self.operations = 0
+        self.errors = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latency = LatencyHistogram()
+
+    def to_dict(self) -> Dict:
+        return {
+            'uptime_s': round(time.time() - self.started, 3),
+            'connections': self.connections,
+            'active_connections': self.active_connections,
+            'requests': dict(self.requests),
+            'operations': self.operations,
+            'errors': self.errors,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'latency': self.latency.to_dict(),
+        }
+
+
+class ALUServer:
+    """
+    asyncio server for an 8-bit ALU engine.
+    resolve maps the operation name of a JSON request to a numeric opcode;
+    alu_cli.py passes one that also knows the CLI spellings (INC, PASSA).
+    """
+
+    def __init__(self, alu=None, resolve: Callable[[object], int] = resolve_opcode):
+        self.alu = alu if alu is not None else TableALU8Bit()
+        if self.alu.width != 8:
+            raise ValueError("ALUServer serves 8-bit engines only")
+        self.resolve = resolve
+        self.stats = ServerStats()
+        self._packed = self.alu.execute_packed
+
+    async def start(self, address: str = DEFAULT_ADDRESS) -> asyncio.AbstractServer:
+        """Start listening; returns the asyncio server (see .sockets for the bound address)"""
+        family, target = parse_address(address)
+        if family == 'unix':
+            return await asyncio.start_unix_server(self.handle_connection, path=target,
+                                                   limit=MAX_LINE)
+        host, port = target
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE)
+
+    async def serve_forever(self, address: str = DEFAULT_ADDRESS,
+                            ready: Optional[Callable[[str], None]] = None) -> None:
+        """Serve until SIGINT or SIGTERM; ready is called with the bound address"""
+        import signal
+
+        loop = asyncio.get_running_loop()
+        stop = loop.create_future()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, lambda: stop.done() or stop.set_result(None))
+            except (NotImplementedError, RuntimeError):
+                pass  # No loop signal handlers (Windows); Ctrl-C still interrupts
+        server = await self.start(address)
+        if ready is not None:
+            ready(format_address(server))
+        async with server:
+            await stop
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        stats = self.stats
+        stats.connections += 1
+        stats.active_connections += 1
+        try:
+            first = await reader.read(READ_SIZE)
+            if first:
+                if first[:1] == b'{':
+                    await self._serve_jsonl(first, reader, writer)
+                else:
+                    await self._serve_binary(first, reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            stats.active_connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    # Binary framing
+
+    async def _serve_binary(self, data: bytes, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        stats = self.stats
+        buffer = bytearray(data)
+        while True:
+            stats.bytes_in += len(data)
+            out = bytearray()
+            offset = 0
+            while len(buffer) - offset >= FRAME_SIZE:
+                kind, _, count, tag = FRAME.unpack_from(buffer, offset)
+                if kind == KIND_EXECUTE:
+                    end = offset + FRAME_SIZE + count * OP_RECORD_SIZE
+                elif kind == KIND_STATS:
+                    end = offset + FRAME_SIZE
+                else:
+                    # Framing is lost; report and drop the connection
+                    stats.errors += 1
+                    out += _error_frame(tag, f"unknown frame kind 0x{kind:02X}")
+                    writer.write(out)
+                    stats.bytes_out += len(out)
+                    await writer.drain()
+                    return
+                if len(buffer) < end:
+                    break
+                start = time.perf_counter()
+                if kind == KIND_EXECUTE:
+                    out += self._execute_frame(tag, count, buffer[offset + FRAME_SIZE:end])
+                else:
+                    payload = json.dumps(stats.to_dict()).encode('utf-8')
+                    out += FRAME.pack(KIND_STATS_REPLY, 0, len(payload), tag) + payload
+                stats.requests['binary'] += 1
+                stats.latency.record(time.perf_counter() - start)
+                offset = end
+            del buffer[:offset]
+            if out:
+                writer.write(out)
+                stats.bytes_out += len(out)
+                await writer.drain()
+            data = await reader.read(READ_SIZE)
+            if not data:
+                return
+            buffer += data
+
+    def _execute_frame(self, tag: int, count: int, payload: bytearray) -> bytes:
+        """Result (or error) frame for one KIND_EXECUTE payload"""
+        try:
+            packed = array('H', map(self._packed, payload[0::3], payload[1::3], payload[2::3]))
+        except ValueError as e:
+            self.stats.errors += 1
+            return _error_frame(tag, str(e))
+        if sys.byteorder != 'little':
+            packed.byteswap()
+        self.stats.operations += count
+        return FRAME.pack(KIND_RESULT, 0, count, tag) + packed.tobytes()
+
+    # JSON Lines framing
+
+    async def _serve_jsonl(self, data: bytes, reader: asyncio.StreamReader,
+                           writer: asyncio.StreamWriter) -> None:
+        stats = self.stats
+        buffer = bytearray(data)
+        while True:
+            stats.bytes_in += len(data)
+            lines = buffer.split(b'\n')
+            buffer = bytearray(lines.pop())
+            if len(buffer) > MAX_LINE:
+                stats.errors += 1
+                writer.write(b'{"error": "line too long"}\n')
+                await writer.drain()
+                return
+            responses = []
+            for line in lines:
+                if not line.strip():
+                    continue
+                start = time.perf_counter()
+                responses.append(self._execute_json(line))
+                stats.requests['jsonl'] += 1
+                stats.latency.record(time.perf_counter() - start)
+            if responses:
+                out = ('\n'.join(responses) + '\n').encode('utf-8')
+                writer.write(out)
+                stats.bytes_out += len(out)
+                await writer.drain()
+            data = await reader.read(READ_SIZE)
+            if not data:
+                return
+            buffer += data
+
+    def _execute_json(self, line: bytes) -> str:
+        """Response line for one JSON request line"""
+        record = None
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("request must be a JSON object")
+            if 'cmd' in record:
+                if record['cmd'] != 'stats':
+                    raise ValueError(f"unknown command: {record['cmd']}")
+                return json.dumps(self.stats.to_dict())
+            if 'batch' in record:
+                results = [self._json_operation(item) for item in record['batch']]
+                self.stats.operations += len(results)
+                reply = {'results': [{'result': result, 'flags': flags}
+                                     for result, flags in results]}
+                if 'id' in record:
+                    reply = {'id': record['id'], **reply}
+                return json.dumps(reply)
+            result, flags = self._json_operation(record)
+            self.stats.operations += 1
+            record['result'] = result
+            record['flags'] = flags
+            return json.dumps(record)
+        except (ValueError, TypeError, KeyError) as e:
+            self.stats.errors += 1
+            reply = {'error': str(e)}
+            if isinstance(record, dict) and 'id' in record:
+                reply = {'id': record['id'], **reply}
+            return json.dumps(reply)
+
+    def _json_operation(self, item) -> Tuple[int, Dict[str, bool]]:
+        if isinstance(item, dict):
+            operation = _json_field(item, JSON_OPERATION_KEYS, 'op')
+            a = _json_field(item, JSON_A_KEYS, 'A')
+            b = _json_field(item, JSON_B_KEYS, 'B')
+        else:
+            operation, a, b = item
+        if not (isinstance(a, int) and isinstance(b, int) and 0 <= a <= 255 and 0 <= b <= 255):
+            raise ValueError("operand out of 8-bit range (0-255)")
+        entry = self._packed(self.resolve(operation), a, b)
+        return entry & 0xFF, unpack_flags(entry >> 8)
+
+
+def _json_field(record: Dict, keys: Tuple[str, ...], name: str):
+    for key in keys:
+        if key in record:
+            return record[key]
+    raise ValueError(f"missing '{name}'")
+
+
+def _error_frame(tag: int, message: str) -> bytes:
+    payload = message.encode('utf-8')[:MAX_BATCH]
+    return FRAME.pack(KIND_ERROR, 0, len(payload), tag) + payload
+
+
+def format_address(server: asyncio.AbstractServer) -> str:
+    """Printable address of the first listening socket"""
+    name = server.sockets[0].getsockname()
+    if isinstance(name, str):
+        return f"unix:{name}"
+    return f"{name[0]}:{name[1]}"
+
+
+def _resolve(future: asyncio.Future, outcome) -> None:
+    """Complete a request's future unless its caller gave up on it"""
+    if future.done():
+        return
+    if isinstance(outcome, Exception):
+        future.set_exception(outcome)
+    else:
+        future.set_result(outcome)
+
+
+class ALUClient:
+    """
+    asyncio client for ALUServer.
+    Any number of coroutines may call request() concurrently on one client;
+    requests are pipelined on the connection and matched to responses in
+    order (binary tags are checked as well).
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 protocol: str = 'binary'):
+        if protocol not in ('binary', 'jsonl'):
+            raise ValueError(f"Unknown protocol: {protocol}")
+        self.reader = reader
+        self.writer = writer
+        self.protocol = protocol
+        self._pending: Deque[Tuple[int, asyncio.Future]] = deque()
+        self._next_tag = 0
+        # Why the reader stopped; requests made afterwards fail with it
+        self._error: Optional[Exception] = None
+        self._reader_task = asyncio.ensure_future(
+            self._read_binary() if protocol == 'binary' else self._read_jsonl())
+
+    @classmethod
+    async def connect(cls, address: str = DEFAULT_ADDRESS, protocol: str = 'binary') -> 'ALUClient':
+        family, target = parse_address(address)
+        if family == 'unix':
+            reader, writer = await asyncio.open_unix_connection(target, limit=MAX_LINE)
+        else:
+            reader, writer = await asyncio.open_connection(*target, limit=MAX_LINE)
+        return cls(reader, writer, protocol)
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+
+    async def __aenter__(self) -> 'ALUClient':
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _send(self, data: bytes) -> asyncio.Future:
+        if self._error is not None:
+            raise ConnectionError(str(self._error))
+        future = asyncio.get_running_loop().create_future()
+        tag = self._next_tag
+        self._next_tag = (tag + 1) & 0xFFFFFFFF
+        self._pending.append((tag, future))
+        self.writer.write(data(tag) if callable(data) else data)
+        return future
+
+    async def request(self, records: Sequence[Tuple[int, int, int]]) -> List[int]:
+        """
+        Execute (opcode, A, B) records with numeric opcodes in one request.
+        Returns result | (NZCV << 8) per record, like execute_packed.
+        """
+        if self.protocol == 'binary':
+            if len(records) > MAX_BATCH:
+                raise ValueError(f"At most {MAX_BATCH} records per request")
+            payload = bytes(value for record in records for value in record)
+            count = len(records)
+            future = self._send(lambda tag: FRAME.pack(KIND_EXECUTE, 0, count, tag) + payload)
+        else:
+            batch = [[OPCODES[op], a, b] for op, a, b in records]
+            future = self._send((json.dumps({'batch': batch}) + '\n').encode('utf-8'))
+        await self.writer.drain()
+        return await future
+
+    async def execute(self, opcode: int, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
+        """Execute one operation; returns (result, flags) like ALU8Bit.execute"""
+        entry = (await self.request([(opcode, a, b)]))[0]
+        return entry & 0xFF, unpack_flags(entry >> 8)
+
+    async def stats(self) -> Dict:
+        if self.protocol == 'binary':
+            future = self._send(lambda tag: FRAME.pack(KIND_STATS, 0, 0, tag))
+        else:
+            future = self._send(b'{"cmd": "stats"}\n')
+        await self.writer.drain()
+        return await future
+
+    def _fail_pending(self, error: Exception) -> None:
+        self._error = error
+        while self._pending:
+            _, future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+
+    async def _read_binary(self) -> None:
+        reader = self.reader
+        try:
+            while True:
+                kind, _, count, tag = FRAME.unpack(await reader.readexactly(FRAME_SIZE))
+                size = count * RESULT_RECORD_SIZE if kind == KIND_RESULT else count
+                payload = await reader.readexactly(size)
+                if not self._pending:
+                    raise ConnectionError(f"unsolicited response with tag {tag}")
+                # The request stays pending until its response decodes, so a bad one fails it too
+                expected, future = self._pending[0]
+                if tag != expected:
+                    raise ConnectionError(f"response tag {tag} does not match request {expected}")
+                if kind == KIND_RESULT:
+                    packed = array('H', payload)
+                    if sys.byteorder != 'little':
+                        packed.byteswap()
+                    outcome = packed.tolist()
+                elif kind == KIND_STATS_REPLY:
+                    outcome = json.loads(payload)
+                else:
+                    outcome = ValueError(payload.decode('utf-8', 'replace'))
+                self._pending.popleft()
+                _resolve(future, outcome)
+        except asyncio.IncompleteReadError as e:
+            self._fail_pending(ConnectionError(f"connection closed: {e}"))
+        except ConnectionError as e:
+            self._fail_pending(e)
+        except ValueError as e:
+            self._fail_pending(ConnectionError(f"bad response: {e}"))
+        self.writer.close()
+
+    async def _read_jsonl(self) -> None:
+        reader = self.reader
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    raise ConnectionError("server closed the connection")
+                if not self._pending:
+                    raise ConnectionError("unsolicited response")
+                reply = json.loads(line)
+                if 'error' in reply:
+                    outcome = ValueError(reply['error'])
+                elif 'results' in reply:
+                    outcome = [entry['result'] | (pack_flags(entry['flags']) << 8) for entry in reply['results']]
+                else:
+                    outcome = reply
+                _resolve(self._pending.popleft()[1], outcome)
+        except ConnectionError as e:
+            self._fail_pending(e)
+        except (ValueError, TypeError, KeyError) as e:
+            self._fail_pending(ConnectionError(f"bad response: {e}"))
+        self.writer.close()
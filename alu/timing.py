@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Event-driven timing simulation of the gate-level netlist
+
+TimingSimulator gives every cell of a Netlist a propagation delay and
+measures when the outputs settle after new inputs are applied. Delays are
+transport delays: a cell's output follows its inputs after its delay,
+glitches included. Pending output changes wait in a priority queue ordered
+by time; when one lands, only the cells reading that signal are
+re-evaluated.
+
+As in Netlist.evaluate_batch, every signal holds a bitsliced word, so one
+event covers a whole batch of vectors applied from the same starting
+state, and settle times are read back per vector.
+
+The delays of each element type come from spec/timing/gate_delays.csv,
+the worst-case figures of docs/verification/timing.md.
+"""
+
+import heapq
+import itertools
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from . import model
+from .netlist import Netlist, batch_size, cell_expression
+
+DELAY_TABLE = Path(__file__).resolve().parent.parent / 'spec' / 'timing' / 'gate_delays.csv'
+
+# Outputs whose settling ends an operation: the result bus and the carry flag
+ALU_OUTPUTS = ('OVERALL', 'C_OUT')
+
+
+def load_delays(path=DELAY_TABLE) -> Dict[str, float]:
+    """Element -> delay in ns from a CSV with element and delay_ns columns"""
+    import csv
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return {row['element'].strip(): float(row['delay_ns']) for row in csv.DictReader(f)
+                if row.get('element', '').strip()}
+
+
+def delay_element(cell) -> str:
+    """Delay-table element for a cell: its gate kind, or MUX2/MUX4/MUX8 by inputs"""
+    return f'MUX{len(cell.inputs)}' if cell.kind == 'MUX' else cell.kind
+
+
+class BatchTiming(NamedTuple):
+    """Settle times of one batch, in ns after the inputs change"""
+    settle: object             # Per-vector settle times (NumPy array or list)
+    events: int                # Signal changes processed
+    history: Optional[Dict[int, List[Tuple[float, int]]]]  # signal -> [(time, changed vectors)]
+
+
+class TimingSimulator:
+    """Transport-delay simulation of a netlist over bitsliced vector batches"""
+
+    def __init__(self, netlist: Netlist, delays: Optional[Dict[str, float]] = None,
+                 outputs: Sequence[str] = ALU_OUTPUTS):
+        self.netlist = netlist
+        delays = load_delays() if delays is None else delays
+        missing = sorted({delay_element(cell) for cell in netlist.cells} - set(delays))
+        if missing:
+            raise ValueError(f"No delay for {', '.join(missing)}")
+        unknown = [name for name in outputs if name not in netlist.outputs]
+        if unknown:
+            raise ValueError(f"Unknown output: {', '.join(unknown)}")
+
+        self.cells = netlist.cells
+        self.delays = [delays[delay_element(cell)] for cell in self.cells]
+        self.functions = [eval(f'lambda v, mask: {cell_expression(cell, "v[{}]")}') for cell in self.cells]
+        self.driver = {cell.output: index for index, cell in enumerate(self.cells)}
+        self.fanout = [[] for _ in range(netlist.signal_count)]
+        for index, cell in enumerate(self.cells):
+            for signal in set(cell.inputs + cell.select):
+                self.fanout[signal].append(index)
+        self.outputs = {signal for name in outputs for signal in netlist.outputs[name]}
+        self._initial = {}
+
+    def settle(self, values: Dict[str, object], initial: Optional[Dict[str, int]] = None,
+               count: Optional[int] = None, trace: bool = False) -> BatchTiming:
+        """Apply input vectors to the circuit settled at `initial` and time the outputs.
+
+        values maps input names to a sequence of bus values (one per vector)
+        or a plain int for every vector; unspecified inputs keep their initial
+        value. initial defaults to every input at 0. With trace, the change
+        history of every signal is kept for critical_path().
+        """
+        if count is None:
+            count = batch_size(values)
+        mask = (1 << count) - 1
+        state = [mask if bit else 0 for bit in self._settled(tuple(sorted((initial or {}).items())))]
+
+        heap = []
+        sequence = itertools.count()
+        for name, words in self.netlist.input_words(values, count).items():
+            for signal, word in zip(self.netlist.inputs[name], words):
+                heap.append((0, next(sequence), signal, word))
+        heapq.heapify(heap)
+
+        output_changes, events, history = self._run(state, heap, sequence, mask, trace)
+        return BatchTiming(_settle_times(output_changes, count), events, history)
+
+    def critical_path(self, timing: BatchTiming, index: int) -> List[Tuple[float, str]]:
+        """Chain of (time, event) that last changed an output of vector `index`.
+
+        Walks back from the final output change through each cell to the
+        input change that caused it. Needs a timing from settle(trace=True).
+        """
+        if timing.history is None:
+            raise ValueError("critical_path needs a timing from settle(trace=True)")
+        bit = 1 << index
+
+        def changed(signal, time=None):
+            """Latest change of signal in vector index (at exactly time, if given)"""
+            for when, vectors in reversed(timing.history.get(signal, ())):
+                if vectors & bit and (time is None or when == time):
+                    return when
+            return None
+
+        last = max(((changed(s), s) for s in self.outputs if changed(s) is not None), default=None)
+        if last is None:
+            return []
+        time, signal = last
+        path = []
+        while True:
+            cell_index = self.driver.get(signal)
+            name = self.netlist.names.get(signal)
+            if cell_index is None:
+                path.append((time, f"input {name or signal}"))
+                break
+            cell = self.cells[cell_index]
+            path.append((time, f"{cell.kind} {cell.source}" + (f" -> {name}" if name else "")))
+            start = time - self.delays[cell_index]
+            cause = next((s for s in cell.inputs + cell.select if changed(s, start) is not None), None)
+            if cause is None:
+                break
+            time, signal = start, cause
+        path.reverse()
+        return path
+
+    def _settled(self, initial: Tuple[Tuple[str, int], ...]) -> List[int]:
+        """One-bit state of every signal with the inputs held at `initial` (cached)"""
+        state = self._initial.get(initial)
+        if state is None:
+            state = [0] * self.netlist.signal_count
+            for signal, value in self.netlist.constants.items():
+                state[signal] = value
+            for name, value in initial:
+                for bit, signal in enumerate(self.netlist.inputs[name]):
+                    state[signal] = (value >> bit) & 1
+            sequence = itertools.count()
+            heap = [(0, next(sequence), cell.output, self.functions[index](state, 1))
+                    for index, cell in enumerate(self.cells)]
+            heapq.heapify(heap)
+            self._run(state, heap, sequence, 1, False)
+            self._initial[initial] = state
+        return state
+
+    def _run(self, state, heap, sequence, mask, trace):
+        """Process events until the circuit is quiet; returns (output changes, events, history)"""
+        functions = self.functions
+        delays = self.delays
+        fanout = self.fanout
+        outputs = self.outputs
+        projected = list(state)  # Value each signal ends at once its pending events land
+        for _, _, signal, word in heap:
+            projected[signal] = word
+        history = {} if trace else None
+        output_changes = []
+        events = 0
+
+        while heap:
+            time = heap[0][0]
+            dirty = set()
+            while heap and heap[0][0] == time:
+                _, _, signal, word = heapq.heappop(heap)
+                changed = state[signal] ^ word
+                if not changed:
+                    continue
+                state[signal] = word
+                events += 1
+                dirty.update(fanout[signal])
+                if signal in outputs:
+                    output_changes.append((time, changed))
+                if trace:
+                    history.setdefault(signal, []).append((time, changed))
+            for index in dirty:
+                word = functions[index](state, mask)
+                output = self.cells[index].output
+                if word != projected[output]:
+                    projected[output] = word
+                    heapq.heappush(heap, (time + delays[index], next(sequence), output, word))
+        return output_changes, events, history
+
+
+def _settle_times(output_changes, count: int):
+    """Per-vector time of the last output change (0 where no output changed)"""
+    np = model._numpy()
+    if np is not None:
+        settle = np.zeros(count, dtype=np.float64)
+        size = (count + 7) // 8
+        for time, changed in output_changes:
+            hit = np.unpackbits(np.frombuffer(changed.to_bytes(size, 'little'), dtype=np.uint8),
+                                count=count, bitorder='little')
+            settle[hit.astype(bool)] = time
+        return settle
+    settle = [0.0] * count
+    for time, changed in output_changes:
+        while changed:
+            low = changed & -changed
+            settle[low.bit_length() - 1] = time
+            changed ^= low
+    return settle
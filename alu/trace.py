@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Instruction traces: chained ALU operations with register and flag state
+
+A trace is a sequence of instructions for a small machine around the ALU:
+eight 8-bit registers (R0 is the accumulator, ACC) and the NZCV flag
+register. Each instruction applies an opcode to two operands, each an
+immediate or a register, and writes the result to a register (ACC unless
+given). CMP only sets the flags. An instruction may carry a condition on
+the current flags and is skipped, leaving registers and flags unchanged,
+when it does not hold.
+
+Text format, one instruction per line; blank lines and comments are skipped.
+A comment runs from a '#' that starts the line or is not directly followed
+by a number:
+
+    OP[.COND] A B [-> Rd]
+
+    ADD 42 23             # ACC = 42 + 23  ('OP A B' --batch lines are traces too)
+    SUB ACC 1 -> R1       # R1 = ACC - 1
+    CMP R1 0x40
+    XOR.NE ACC R1         # only if Z is clear
+
+OP is a mnemonic or opcode (lookup_opcode, or the CLI's INC, DEC and REV);
+COND is EQ/NE (Z), CS/CC (C), MI/PL (N) or VS/VC (V). Commas may separate
+operands, and immediates may be written with a '#' (ADD #5 #3).
+
+Binary format: a 16-byte header laid out like vector_format's (magic
+b'ALUT') followed by 5-byte records:
+
+    opcode   u8  numeric opcode (0-18)
+    a        u8  immediate, or register number if modes bit 0 is set
+    b        u8  immediate, or register number if modes bit 1 is set
+    modes    u8
+    control  u8  destination register (bits 0-2) | condition (bits 4-7, 0 = always)
+
+TraceFile rejects files with a field out of range (opcode, register number,
+operand mode, condition) when it opens them.
+
+TraceMachine.run() replays records through the precomputed TableALU8Bit
+table and counts executed instructions per (opcode, NZCV), from which the
+opcode mix and flag statistics are derived.
+"""
+
+import mmap
+import re
+import struct
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .model import TableALU8Bit
+from .opcodes import FLAG_C, FLAG_N, FLAG_V, FLAG_Z, OPCODE_INDEX, OPCODES, lookup_opcode
+
+MAGIC = b'ALUT'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sBBBxI4x')
+RECORD = struct.Struct('<BBBBB')
+HEADER_SIZE = HEADER.size
+RECORD_SIZE = RECORD.size
+
+REGISTERS = 8
+ACC = 0
+CMP_OPCODE = OPCODE_INDEX['10000']
+
+MODE_A_REGISTER = 0x1
+MODE_B_REGISTER = 0x2
+
+# Start of a comment: a '#' opening the line, or any other that is not an immediate's prefix (#5, #0x1F)
+_COMMENT = re.compile(r'^\s*#|#(?![+-]?\d)')
+
+# Condition codes: (name, flag, required state); index 0 always executes
+CONDITIONS = (
+    ('AL', 0, True),
+    ('EQ', FLAG_Z, True), ('NE', FLAG_Z, False),
+    ('CS', FLAG_C, True), ('CC', FLAG_C, False),
+    ('MI', FLAG_N, True), ('PL', FLAG_N, False),
+    ('VS', FLAG_V, True), ('VC', FLAG_V, False),
+)
+CONDITION_INDEX = {name: index for index, (name, _, _) in enumerate(CONDITIONS)}
+# (condition << 4) | NZCV -> whether the instruction executes
+_CONDITION_PASSES = bytes(
+    1 if index == 0 or bool(nzcv & flag) == state else 0
+    for index, (_, flag, state) in enumerate(CONDITIONS) for nzcv in range(16)
+) + bytes(16 * (16 - len(CONDITIONS)))
+
+# Byte translations flagging (0xFF) register numbers past R7, register-mode
+# bits of the modes byte, and control bytes with bit 3 set or no such condition
+_BAD_REGISTER = bytes(0xFF if value >= REGISTERS else 0 for value in range(256))
+_MODE_A = bytes(0xFF if value & MODE_A_REGISTER else 0 for value in range(256))
+_MODE_B = bytes(0xFF if value & MODE_B_REGISTER else 0 for value in range(256))
+_BAD_CONTROL = bytes(0xFF if value & 0x8 or value >> 4 >= len(CONDITIONS) else 0 for value in range(256))
+
+FLAG_NAMES = (('negative', FLAG_N), ('zero', FLAG_Z), ('carry', FLAG_C), ('overflow', FLAG_V))
+
+Record = Tuple[int, int, int, int, int]
+
+
+class TraceStats(NamedTuple):
+    """Outcome of a replay"""
+    instructions: int
+    executed: int
+    skipped: int                          # Condition did not hold
+    opcode_flags: List[int]               # Executed count per (opcode << 4) | NZCV after it
+    registers: List[int]
+    nzcv: int
+    seconds: float
+
+    def opcode_counts(self) -> Dict[int, int]:
+        """Executed instructions per numeric opcode (opcodes that occurred)"""
+        counts = {}
+        for opcode in range(len(OPCODES)):
+            count = sum(self.opcode_flags[opcode << 4:(opcode + 1) << 4])
+            if count:
+                counts[opcode] = count
+        return counts
+
+    def flag_counts(self, opcode: Optional[int] = None) -> Dict[str, int]:
+        """Executed instructions leaving each flag set (of one opcode, or all)"""
+        opcodes = range(len(OPCODES)) if opcode is None else (opcode,)
+        return {
+            name: sum(self.opcode_flags[(op << 4) | nzcv] for op in opcodes for nzcv in range(16) if nzcv & flag)
+            for name, flag in FLAG_NAMES
+        }
+
+
+def _operand(token: str) -> Tuple[int, bool]:
+    """(value, is_register) of an operand token"""
+    upper = token.upper()
+    if upper == 'ACC':
+        return ACC, True
+    if upper[0] == 'R' and upper[1:].isdigit():
+        register = int(upper[1:])
+        if register >= REGISTERS:
+            raise ValueError(f"no register {token} (R0-R{REGISTERS - 1})")
+        return register, True
+    value = int(token.lstrip('#'), 0)
+    if not 0 <= value <= 0xFF:
+        raise ValueError(f"immediate {token} out of 8-bit range (0-255)")
+    return value, False
+
+
+def _opcode(name: str) -> int:
+    """Numeric opcode of a mnemonic, accepting the CLI's one-operand names (INC, REV)"""
+    try:
+        return lookup_opcode(name).code
+    except ValueError:
+        try:
+            return lookup_opcode(name + ' A').code
+        except ValueError:
+            raise ValueError(f"Unknown operation: {name}") from None
+
+
+def parse_instruction(line: str) -> Record:
+    """Encode one text instruction as a binary record"""
+    fields = line.replace(',', ' ').split()
+    destination = ACC
+    if '->' in fields:
+        arrow = fields.index('->')
+        if arrow != len(fields) - 2:
+            raise ValueError("expected '-> Rd' at the end")
+        destination, is_register = _operand(fields[-1])
+        if not is_register:
+            raise ValueError(f"destination {fields[-1]} is not a register")
+        fields = fields[:arrow]
+    if len(fields) != 3:
+        raise ValueError(f"expected 'OP A B', got {len(fields)} field(s)")
+
+    operation, _, condition = fields[0].partition('.')
+    opcode = _opcode(operation)
+    condition_index = CONDITION_INDEX.get(condition.upper() or 'AL')
+    if condition_index is None:
+        raise ValueError(f"unknown condition .{condition} (one of {', '.join(CONDITION_INDEX)})")
+    a, a_register = _operand(fields[1])
+    b, b_register = _operand(fields[2])
+    modes = (MODE_A_REGISTER if a_register else 0) | (MODE_B_REGISTER if b_register else 0)
+    return opcode, a, b, modes, destination | (condition_index << 4)
+
+
+def parse_trace(lines: Iterable[str]) -> Iterator[Record]:
+    """Records of a text trace; errors name the line"""
+    for number, line in enumerate(lines, 1):
+        line = _COMMENT.split(line, 1)[0].strip()
+        if not line:
+            continue
+        try:
+            yield parse_instruction(line)
+        except ValueError as exc:
+            raise ValueError(f"line {number}: {exc}") from None
+
+
+def format_instruction(record: Record) -> str:
+    """Text form of a record (parse_instruction's inverse)"""
+    opcode, a, b, modes, control = record
+    condition = control >> 4
+
+    def operand(value: int, register: bool) -> str:
+        return ('ACC' if value == ACC else f'R{value}') if register else str(value)
+
+    text = lookup_opcode(OPCODES[opcode]).mnemonic.replace(' ', '_')
+    if condition:
+        text += '.' + CONDITIONS[condition][0]
+    text += f" {operand(a, modes & MODE_A_REGISTER)} {operand(b, modes & MODE_B_REGISTER)}"
+    if control & 0x7:
+        text += f" -> R{control & 0x7}"
+    return text
+
+
+def is_binary_trace(path: Union[str, Path]) -> bool:
+    """Check whether a file starts with the binary trace magic"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_trace(path: Union[str, Path], records: Iterable[Record]) -> int:
+    """Write records to a binary trace file; returns the record count"""
+    count = 0
+    buffer = bytearray()
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 8, RECORD_SIZE, 0))
+        for record in records:
+            buffer += RECORD.pack(*record)
+            count += 1
+            if len(buffer) >= 1 << 20:
+                f.write(buffer)
+                buffer.clear()
+        f.write(buffer)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 8, RECORD_SIZE, count))
+    return count
+
+
+class TraceFile:
+    """Memory-mapped binary trace; iterating yields records without copying the file"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file: BinaryIO = open(self.path, 'rb')
+        self._mmap = None
+        size = self.path.stat().st_size
+        if size < HEADER_SIZE:
+            self.close()
+            raise ValueError(f"{self.path} is too small to be a trace file")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, record_size, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a binary trace file")
+        if version != FORMAT_VERSION or record_size != RECORD_SIZE:
+            self.close()
+            raise ValueError(f"Unsupported trace version {version} (record size {record_size}) in {self.path}")
+        if HEADER_SIZE + count * RECORD_SIZE > size:
+            self.close()
+            raise ValueError(f"{self.path} is truncated: header declares {count} records")
+        self.count = count
+        self.records = memoryview(self._mmap)[HEADER_SIZE:HEADER_SIZE + count * RECORD_SIZE]
+        problem = self._check_fields() if count else None
+        if problem:
+            self.close()
+            raise ValueError(f"{self.path} holds {problem}")
+
+    def _check_fields(self) -> Optional[str]:
+        """Why the records cannot be replayed, or None; every column is checked in bulk"""
+        opcodes, a, b, modes, control = (self.records[field::RECORD_SIZE].tobytes() for field in range(RECORD_SIZE))
+        if max(opcodes) >= len(OPCODES):
+            return f"an opcode above {len(OPCODES) - 1}"
+        if max(modes) > MODE_A_REGISTER | MODE_B_REGISTER:
+            return "an unknown operand mode"
+        for operand, mode in ((a, _MODE_A), (b, _MODE_B)):
+            if int.from_bytes(operand.translate(_BAD_REGISTER), 'little') & int.from_bytes(modes.translate(mode), 'little'):
+                return f"a register operand above R{REGISTERS - 1}"
+        if max(control.translate(_BAD_CONTROL)):
+            return "a bad destination register or condition"
+        return None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Record]:
+        return RECORD.iter_unpack(self.records)
+
+    def close(self) -> None:
+        if getattr(self, 'records', None) is not None:
+            self.records.release()
+            self.records = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> 'TraceFile':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class TraceMachine:
+    """Registers R0 (ACC)..R7 and the NZCV flags, advanced by the table-driven ALU"""
+
+    def __init__(self, alu: Optional[TableALU8Bit] = None):
+        self.alu = alu or TableALU8Bit()
+        self.registers = [0] * REGISTERS
+        self.nzcv = 0
+
+    def run(self, records: Iterable[Record]) -> TraceStats:
+        """Replay records from the current state; the state is kept for further runs"""
+        table = self.alu.table
+        passes = _CONDITION_PASSES
+        cmp_opcode = CMP_OPCODE
+        registers = self.registers
+        nzcv = self.nzcv
+        opcode_flags = [0] * (len(OPCODES) << 4)
+        skipped = 0
+        started = time.perf_counter()
+        for opcode, a, b, modes, control in records:
+            if control > 0xF and not passes[(control & 0xF0) | nzcv]:
+                skipped += 1
+                continue
+            if modes:
+                if modes & MODE_A_REGISTER:
+                    a = registers[a]
+                if modes & MODE_B_REGISTER:
+                    b = registers[b]
+            entry = table[(opcode << 16) | (a << 8) | b]
+            nzcv = entry >> 8
+            opcode_flags[(opcode << 4) | nzcv] += 1
+            if opcode != cmp_opcode:
+                registers[control & 0x7] = entry & 0xFF
+        self.nzcv = nzcv
+        executed = sum(opcode_flags)
+        return TraceStats(executed + skipped, executed, skipped, opcode_flags, list(registers), nzcv,
+                          time.perf_counter() - started)
+
+
+def replay_file(path: Union[str, Path], machine: Optional[TraceMachine] = None) -> TraceStats:
+    """Replay a binary or text trace file"""
+    machine = machine or TraceMachine()
+    if is_binary_trace(path):
+        with TraceFile(path) as trace:
+            return machine.run(trace)
+    with open(path, 'r', encoding='utf-8') as f:
+        return machine.run(parse_trace(f))
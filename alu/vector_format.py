@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Compact binary test-vector format for the 8-bit ALU
+
+A vector file is a 16-byte header followed by fixed-width 5-byte records:
+
+    Header (little-endian):
+        magic        4s   b'ALUV'
+        version      u8   FORMAT_VERSION
+        width        u8   datapath width in bits (8)
+        record_size  u8   bytes per record (5)
+        reserved     u8
+        count        u32  number of records
+        reserved     u32
+
+    Record:
+        opcode  u8  numeric opcode (0-18)
+        A       u8
+        B       u8
+        result  u8  expected result
+        flags   u8  expected NZCV nibble (N=8, Z=4, C=2, V=1)
+
+Test names are not stored; they are derived on demand from the record.
+The full exhaustive suite (19 x 65,536 records) is about 6 MB.
+"""
+
+import mmap
+import struct
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, Tuple, Union
+
+from .opcodes import OPCODE_NAMES, OPCODES, unpack_flags
+
+MAGIC = b'ALUV'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sBBBxI4x')
+RECORD = struct.Struct('<BBBBB')
+HEADER_SIZE = HEADER.size
+RECORD_SIZE = RECORD.size
+
+Record = Tuple[int, int, int, int, int]
+
+
+def test_name(opcode: int, a: int, b: int) -> str:
+    """Derive the test name used by the JSON generator, e.g. ADD_2A_17"""
+    return f"{OPCODE_NAMES[opcode]}_{a:02X}_{b:02X}"
+
+
+def is_binary_vector_file(path: Path) -> bool:
+    """Check whether a file starts with the binary vector magic"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class VectorWriter:
+    """
+    Streaming writer for binary vector files.
+    Records are buffered and appended as they arrive; the record count in
+    the header is filled in when the writer is closed.
+    """
+
+    def __init__(self, path: Union[str, Path], width: int = 8, buffer_records: int = 65536):
+        self.path = Path(path)
+        self.width = width
+        self.count = 0
+        self._buffer = bytearray()
+        self._flush_bytes = buffer_records * RECORD_SIZE
+        self._file: BinaryIO = open(self.path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, width, RECORD_SIZE, 0))
+
+    def write(self, opcode: int, a: int, b: int, result: int, flags: int) -> None:
+        """Append one record"""
+        self._buffer += RECORD.pack(opcode, a, b, result, flags)
+        self.count += 1
+        if len(self._buffer) >= self._flush_bytes:
+            self._flush()
+
+    def write_records(self, records: Iterable[Record]) -> None:
+        """Append many (opcode, A, B, result, flags) records"""
+        for record in records:
+            self.write(*record)
+
+    def write_raw(self, data: bytes) -> None:
+        """Append already-packed records"""
+        if len(data) % RECORD_SIZE:
+            raise ValueError(f"Raw record data must be a multiple of {RECORD_SIZE} bytes")
+        self._buffer += data
+        self.count += len(data) // RECORD_SIZE
+        if len(self._buffer) >= self._flush_bytes:
+            self._flush()
+
+    def _flush(self) -> None:
+        self._file.write(self._buffer)
+        self._buffer.clear()
+
+    def close(self) -> None:
+        """Flush pending records and patch the header record count"""
+        if self._file.closed:
+            return
+        self._flush()
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.width, RECORD_SIZE, self.count))
+        self._file.close()
+
+    def __enter__(self) -> 'VectorWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def write_vectors(path: Union[str, Path], records: Iterable[Record], width: int = 8) -> int:
+    """Write (opcode, A, B, result, flags) records to a binary vector file"""
+    with VectorWriter(path, width) as writer:
+        writer.write_records(records)
+        return writer.count
+
+
+class VectorFile:
+    """
+    Memory-mapped, zero-copy reader for binary vector files.
+    Records are decoded lazily from the mapping; nothing is copied into
+    Python objects until a record is accessed.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        size = self.path.stat().st_size
+        if size < HEADER_SIZE:
+            self._file.close()
+            raise ValueError(f"{self.path} is too small to be a vector file")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, width, record_size, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a binary vector file")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported vector format version {version} in {self.path}")
+        if record_size != RECORD_SIZE:
+            self.close()
+            raise ValueError(f"Unsupported record size {record_size} in {self.path}")
+        if HEADER_SIZE + count * RECORD_SIZE > size:
+            self.close()
+            raise ValueError(f"{self.path} is truncated: header declares {count} records")
+
+        self.version = version
+        self.width = width
+        self.count = count
+        self.records = memoryview(self._mmap)[HEADER_SIZE:HEADER_SIZE + count * RECORD_SIZE]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> Record:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return RECORD.unpack_from(self.records, index * RECORD_SIZE)
+
+    def __iter__(self) -> Iterator[Record]:
+        return RECORD.iter_unpack(self.records)
+
+    def column(self, field: int) -> memoryview:
+        """Zero-copy strided view of one record field (0=opcode ... 4=flags)"""
+        return self.records[field::RECORD_SIZE]
+
+    def slice(self, start: int, stop: int) -> memoryview:
+        """Zero-copy view of the raw bytes of records [start, stop)"""
+        return self.records[start * RECORD_SIZE:stop * RECORD_SIZE]
+
+    def test_name(self, index: int) -> str:
+        opcode, a, b, _, _ = self[index]
+        return test_name(opcode, a, b)
+
+    def as_dict(self, index: int) -> Dict:
+        """Record in the JSON vector layout used by the existing runners"""
+        opcode, a, b, result, flags = self[index]
+        return {
+            'test_name': test_name(opcode, a, b),
+            'opcode': OPCODES[opcode],
+            'A': a,
+            'B': b,
+            'expected_result': result,
+            'expected_flags': unpack_flags(flags),
+        }
+
+    def iter_dicts(self) -> Iterator[Dict]:
+        """Iterate records in the JSON vector layout"""
+        for index in range(self.count):
+            yield self.as_dict(index)
+
+    def close(self) -> None:
+        if getattr(self, 'records', None) is not None:
+            self.records.release()
+            self.records = None
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> 'VectorFile':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
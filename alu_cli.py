@@ -10,53 +10,61 @@ Usage:
     ./alu_cli.py --hex XOR 0xAA 0x55
     ./alu_cli.py --binary AND 11110000 00001111
     ./alu_cli.py --list
+    ./alu_cli.py --batch ops.txt
+    ./alu_cli.py --trace program.trace
+    ./alu_cli.py --interactive
+    ./alu_cli.py --serve unix:/tmp/alu.sock
     ./alu_cli.py --help
 
 Author: Tyrone Marhguy
 Project: 8-Bit Discrete Transistor ALU
 """
 
+# Start-up time matters here: scripts run this once per operation. Only
+# cheap modules are imported up front; json (batch mode) is imported where it
+# is used, NumPy is never needed, and opcode metadata comes precompiled from
+# alu/_opcode_table.py. tools/bench_startup.py measures and guards this.
+import os
 import sys
+import time
 import argparse
-from pathlib import Path
-from typing import Dict, Tuple, Optional
+from typing import Dict, Iterable, List, TextIO, Tuple, Optional
 
-# Add test directory to path
-sys.path.insert(0, str(Path(__file__).parent / 'test'))
+# The golden model lives in the alu package next to this script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 try:
-    from test_alu import ALU8Bit
+    from alu import OPCODE_INFO, ALU8Bit, TableALU8Bit, lookup_opcode, unpack_flags
 except ImportError:
-    print("Error: Could not import ALU8Bit from test_alu.py", file=sys.stderr)
-    print("Please ensure test/test_alu.py exists and is accessible.", file=sys.stderr)
+    print("Error: Could not import the ALU golden model (alu package)", file=sys.stderr)
+    print("Please run alu_cli.py from the repository checkout.", file=sys.stderr)
     sys.exit(1)
 
 
+# CLI names that differ from the opcode table mnemonic with spaces removed
+CLI_NAMES = {
+    'INC A': 'INC',
+    'DEC A': 'DEC',
+    'REV A': 'REV',
+}
+
+
+def cli_opcode_map() -> Dict[str, str]:
+    """CLI operation name (ADD, INC, PASSA, NOTA, ...) to opcode string"""
+    return {
+        CLI_NAMES.get(info.mnemonic, info.mnemonic.replace(' ', '')): info.opcode
+        for info in OPCODE_INFO
+    }
+
+
 class ALUInterface:
     """Professional interface for ALU operations"""
     
-    # Operation name to opcode mapping
-    OPCODE_MAP = {
-        'ADD':    '00000',
-        'SUB':    '00001',
-        'INC':    '00010',
-        'DEC':    '00011',
-        'LSL':    '00100',
-        'LSR':    '00101',
-        'ASR':    '00110',
-        'REV':    '00111',
-        'NAND':   '01000',
-        'NOR':    '01001',
-        'XOR':    '01010',
-        'PASSA':  '01011',
-        'PASSB':  '01100',
-        'AND':    '01101',
-        'OR':     '01110',
-        'XNOR':   '01111',
-        'CMP':    '10000',
-        'NOTA':   '10001',
-        'NOTB':   '10010',
-    }
+    # Operation name to opcode mapping, from the opcode table
+    OPCODE_MAP = cli_opcode_map()
+    
+    # Opcode to operation name, for inputs given as 5-bit opcodes
+    OPCODE_NAMES = dict(zip(OPCODE_MAP.values(), OPCODE_MAP.keys()))
     
     # Operation descriptions
     OPERATION_INFO = {
@@ -81,18 +89,33 @@ class ALUInterface:
         'NOTB':   ('Logic', '~B', 'Invert B'),
     }
     
-    def __init__(self):
-        self.alu = ALU8Bit()
+    # Golden model engines: 'scalar' evaluates each operation directly,
+    # 'table' precomputes every (opcode, A, B) once and then only looks up
+    ENGINES = {
+        'scalar': ALU8Bit,
+        'table':  TableALU8Bit,
+    }
+    
+    def __init__(self, engine: str = 'scalar', port: Optional[str] = None,
+                 baudrate: Optional[int] = None):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        self.alu = self.ENGINES[engine]()
         self.mode = 'simulation'  # 'simulation' or 'fpga'
+        self.port = port          # FPGA serial port
+        self.baudrate = baudrate
+    
+    def resolve(self, operation: str) -> str:
+        """Opcode string for a CLI operation name or any opcode table spelling"""
+        opcode = self.OPCODE_MAP.get(operation.upper())
+        if opcode is None:
+            # Other spellings from the opcode table: SLL, NOT_A, 'PASS A', ...
+            opcode = lookup_opcode(operation).opcode
+        return opcode
     
     def execute(self, operation: str, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
         """Execute ALU operation"""
-        operation = operation.upper()
-        
-        if operation not in self.OPCODE_MAP:
-            raise ValueError(f"Unknown operation: {operation}")
-        
-        opcode = self.OPCODE_MAP[operation]
+        opcode = self.resolve(operation)
         
         if self.mode == 'simulation':
             return self._execute_simulation(opcode, a, b)
@@ -106,8 +129,31 @@ class ALUInterface:
         return self.alu.execute(opcode, a, b)
     
     def _execute_fpga(self, opcode: str, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """Execute on FPGA hardware (placeholder for future implementation)"""
-        raise NotImplementedError("FPGA mode not yet implemented")
+        """Execute on FPGA hardware over the serial link"""
+        entry = self._transport().execute_packed(int(opcode, 2), a, b)
+        return entry & 0xFF, unpack_flags(entry >> 8)
+    
+    def _transport(self):
+        """Pooled serial transport to the FPGA board (opened on first use)"""
+        from alu.fpga_link import DEFAULT_BAUDRATE, get_transport
+        if not self.port:
+            raise ValueError("FPGA mode needs a serial port (--port)")
+        return get_transport(self.port, self.baudrate or DEFAULT_BAUDRATE)
+    
+    def execute_many(self, requests: List[Tuple[str, int, int]]) -> List[Tuple[int, Dict[str, bool]]]:
+        """
+        Execute (opcode, a, b) requests with opcode strings.
+        In FPGA mode they are sent as batched, pipelined serial frames
+        instead of one round trip each.
+        """
+        if self.mode == 'fpga':
+            entries = self._transport().execute_batch(
+                [(int(opcode, 2), a, b) for opcode, a, b in requests])
+            return [(entry & 0xFF, unpack_flags(entry >> 8)) for entry in entries]
+        if self.mode != 'simulation':
+            raise ValueError(f"Unknown mode: {self.mode}")
+        execute = self.alu.execute
+        return [execute(opcode, a, b) for opcode, a, b in requests]
     
     def format_result(self, operation: str, a: int, b: int, result: int, 
                      flags: Dict[str, bool], format_type: str = 'decimal') -> str:
@@ -165,7 +211,8 @@ class ALUInterface:
         """Format a flag value"""
         return "1 (SET)" if flag else "0 (CLEAR)"
     
-    def list_operations(self) -> str:
+    @classmethod
+    def list_operations(cls) -> str:
         """List all available operations"""
         lines = []
         lines.append("=" * 70)
@@ -175,7 +222,7 @@ class ALUInterface:
         
         # Group by category
         categories = {}
-        for op, info in self.OPERATION_INFO.items():
+        for op, info in cls.OPERATION_INFO.items():
             category = info[0]
             if category not in categories:
                 categories[category] = []
@@ -186,7 +233,7 @@ class ALUInterface:
                 lines.append(f"{category} Operations:")
                 lines.append("-" * 70)
                 for op, expr, desc in categories[category]:
-                    opcode = self.OPCODE_MAP[op]
+                    opcode = cls.OPCODE_MAP[op]
                     lines.append(f"  {op:8s} [{opcode}]  {expr:20s}  {desc}")
                 lines.append("")
         
@@ -223,6 +270,390 @@ def parse_value(value_str: str, input_format: Optional[str] = None) -> int:
         return int(value_str, 10)
 
 
+# Output lines buffered by --batch before each write
+BATCH_FLUSH_LINES = 4096
+
+# Key spellings accepted in JSON Lines batch input
+JSON_OPERATION_KEYS = ('op', 'operation', 'opcode')
+JSON_A_KEYS = ('A', 'a')
+JSON_B_KEYS = ('B', 'b')
+
+
+def _json_field(record: Dict, keys: Tuple[str, ...], name: str):
+    for key in keys:
+        if key in record:
+            return record[key]
+    raise ValueError(f"missing '{name}'")
+
+
+def _json_operand(value, input_format: Optional[str]) -> int:
+    return value if isinstance(value, int) else parse_value(str(value), input_format)
+
+
+def parse_batch_line(line: str, input_format: Optional[str] = None) -> Tuple[str, int, int, Optional[Dict]]:
+    """
+    Parse one --batch input line.
+    Lines are either 'OP A B' (whitespace or comma separated) or a JSON
+    object with op/operation/opcode, A and B keys. Returns
+    (operation, a, b, record) where record is the JSON object, or None for
+    text lines.
+    """
+    if line.startswith('{'):
+        import json
+        record = json.loads(line)
+        operation = str(_json_field(record, JSON_OPERATION_KEYS, 'op'))
+        a = _json_operand(_json_field(record, JSON_A_KEYS, 'A'), input_format)
+        b = _json_operand(_json_field(record, JSON_B_KEYS, 'B'), input_format)
+        return operation, a, b, record
+    
+    fields = line.replace(',', ' ').split()
+    if len(fields) != 3:
+        raise ValueError(f"expected 'OP A B', got {len(fields)} field(s)")
+    return fields[0], parse_value(fields[1], input_format), parse_value(fields[2], input_format), None
+
+
+def format_batch_value(value: int, format_type: str) -> str:
+    """Compact single-token value formatting for batch output"""
+    if format_type == 'hex':
+        return f"0x{value:02X}"
+    elif format_type == 'binary':
+        return f"0b{value:08b}"
+    elif format_type == 'all':
+        return f"{value} 0x{value:02X} 0b{value:08b}"
+    return str(value)
+
+
+def run_batch(interface: ALUInterface, lines: Iterable[str], out: TextIO,
+              input_format: Optional[str] = None, format_type: str = 'decimal',
+              quiet: bool = False) -> int:
+    """
+    Execute one operation per input line and write one result per line.
+    Text lines produce '<result> C=c Z=z N=n V=v' (just the result with
+    quiet); JSON lines produce a JSON object echoing the input with
+    result and flags added. Lines are executed and written in chunks of
+    BATCH_FLUSH_LINES, so in FPGA mode a chunk shares serial frames. Bad
+    lines produce an error line instead of a result and processing
+    continues. Returns the number of bad lines.
+    """
+    import json
+    
+    opcode_names = interface.OPCODE_NAMES
+    # Per line: (error line, None) or (record, (opcode, a, b))
+    pending: List[Tuple[object, Optional[Tuple[str, int, int]]]] = []
+    errors = 0
+    
+    def flush() -> None:
+        results = iter(interface.execute_many([request for _, request in pending if request]))
+        output = []
+        for record, request in pending:
+            if request is None:
+                output.append(record)
+                continue
+            result, flags = next(results)
+            if record is not None:
+                record['result'] = result
+                record['flags'] = flags
+                output.append(json.dumps(record))
+            elif quiet:
+                output.append(format_batch_value(result, format_type))
+            else:
+                output.append(
+                    f"{format_batch_value(result, format_type)} "
+                    f"C={flags['carry']:d} Z={flags['zero']:d} "
+                    f"N={flags['negative']:d} V={flags['overflow']:d}"
+                )
+        out.write('\n'.join(output) + '\n')
+        pending.clear()
+    
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        
+        try:
+            operation, a, b, record = parse_batch_line(line, input_format)
+            if not (0 <= a <= 255 and 0 <= b <= 255):
+                raise ValueError("operand out of 8-bit range (0-255)")
+            opcode = interface.resolve(opcode_names.get(operation, operation))
+        except (ValueError, TypeError) as e:
+            errors += 1
+            if line.startswith('{'):
+                pending.append((json.dumps({'line': line_number, 'error': str(e)}), None))
+            else:
+                pending.append((f"ERROR line {line_number}: {e}", None))
+        else:
+            pending.append((record, (opcode, a, b)))
+        
+        if len(pending) >= BATCH_FLUSH_LINES:
+            flush()
+    
+    if pending:
+        flush()
+    out.flush()
+    return errors
+
+
+def run_trace(path: str, out: TextIO, format_type: str = 'decimal',
+              quiet: bool = False, save: Optional[str] = None) -> int:
+    """
+    Replay an instruction trace (text or binary, see alu/trace.py) on the
+    table-driven model and report the final registers and flags, the
+    throughput and the opcode mix with per-opcode flag counts. With quiet
+    only the final ACC is written. With save the trace is also written in
+    the binary format. Raises ValueError for malformed traces.
+    """
+    from alu.trace import (FLAG_NAMES, TraceFile, TraceMachine, is_binary_trace,
+                           parse_trace, replay_file, write_trace)
+    
+    if save:
+        if is_binary_trace(path):
+            with TraceFile(path) as trace:
+                count = write_trace(save, trace)
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                count = write_trace(save, parse_trace(f))
+        if not quiet:
+            out.write(f"Wrote {count:,} instructions to {save}\n")
+    stats = replay_file(save or path, TraceMachine())
+    if quiet:
+        out.write(format_batch_value(stats.registers[0], format_type) + '\n')
+        return 0
+    
+    rate = stats.instructions / stats.seconds / 1e6 if stats.seconds else 0.0
+    registers = '  '.join(
+        f"{'ACC' if number == 0 else f'R{number}'}={format_batch_value(value, format_type)}"
+        for number, value in enumerate(stats.registers)
+    )
+    flags = ' '.join(f"{letter}={int(bool(stats.nzcv & flag))}" for letter, (_, flag) in zip('NZCV', FLAG_NAMES))
+    lines = [
+        f"Trace: {path}",
+        f"Instructions: {stats.instructions:,} in {stats.seconds:.3f} s ({rate:.2f} M instr/s)",
+        f"Executed: {stats.executed:,}  Skipped (condition false): {stats.skipped:,}",
+        f"Registers: {registers}",
+        f"Flags: {flags}",
+        "",
+        f"{'Opcode':<7} {'Operation':<10} {'Count':>12} {'Mix':>7} "
+        + ' '.join(f"{letter:>10}" for letter in 'NZCV'),
+    ]
+    for opcode, count in stats.opcode_counts().items():
+        info = OPCODE_INFO[opcode]
+        flag_counts = stats.flag_counts(opcode)
+        lines.append(
+            f"{info.opcode:<7} {info.mnemonic:<10} {count:>12,} {count / stats.executed:>7.1%} "
+            + ' '.join(f"{flag_counts[name]:>10,}" for name, _ in FLAG_NAMES)
+        )
+    out.write('\n'.join(lines) + '\n')
+    return 0
+
+
+def run_server(interface: ALUInterface, address: str) -> int:
+    """
+    Serve the golden model on a Unix or TCP socket until interrupted
+    (see alu/service.py for the framing). Operation names in JSON requests
+    accept the same spellings as the command line. Server counters are
+    printed to stderr on exit.
+    """
+    import asyncio
+    import json
+    from alu.service import ALUServer, parse_address, resolve_opcode
+    
+    if interface.mode != 'simulation':
+        print("Error: --serve supports simulation mode only", file=sys.stderr)
+        return 1
+    
+    def resolve(operation) -> int:
+        if isinstance(operation, str):
+            return int(interface.resolve(operation), 2)
+        return resolve_opcode(operation)
+    
+    try:
+        family, target = parse_address(address)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    
+    def ready(bound: str) -> None:
+        print(f"Serving ALU on {bound} (binary and JSON Lines); Ctrl-C to stop",
+              file=sys.stderr, flush=True)
+    
+    server = ALUServer(interface.alu, resolve)
+    try:
+        asyncio.run(server.serve_forever(address, ready))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if family == 'unix' and os.path.exists(target):
+            os.unlink(target)
+    print(json.dumps(server.stats.to_dict(), indent=2), file=sys.stderr)
+    return 0
+
+
+# Interactive history file and length
+HISTORY_FILE = os.path.expanduser('~/.alu_cli_history')
+HISTORY_LENGTH = 1000
+
+# Operand names that refer to the previous result in the REPL
+PREVIOUS_RESULT = ('_', 'ans')
+
+REPL_HELP = """Enter operations as 'OP A B', e.g.  ADD 42 23
+  _ or ans        previous result, e.g.  ADD 1 2; LSL _ 0; XOR _ 0xFF
+  OP A            B may be omitted for operations that only use A (INC, LSL, NOTA, ...)
+  ;               separates several operations on one line
+Commands:
+  list            list operations
+  format TYPE     output format: decimal, hex, binary, all
+  engine NAME     switch golden model engine: scalar, table
+  history         show previous inputs
+  help            show this help
+  quit / exit     leave (or Ctrl-D)"""
+
+
+class ALURepl:
+    """
+    Interactive read-eval-print loop over one resident ALUInterface.
+    The engine (and TableALU8Bit's precomputed table) is built once, so
+    each command only pays for parsing and the operation itself.
+    """
+    
+    # Operations whose B operand is ignored and may be omitted
+    A_ONLY = frozenset(['INC', 'DEC', 'LSL', 'LSR', 'ASR', 'REV', 'PASSA', 'NOTA'])
+    
+    def __init__(self, interface: ALUInterface, out: TextIO = sys.stdout,
+                 input_format: Optional[str] = None, format_type: str = 'decimal'):
+        self.interface = interface
+        self.out = out
+        self.input_format = input_format
+        self.format_type = format_type
+        self.last_result: Optional[int] = None
+        self.history: List[str] = []
+    
+    def _operand(self, token: str) -> int:
+        if token.lower() in PREVIOUS_RESULT:
+            if self.last_result is None:
+                raise ValueError("no previous result yet")
+            return self.last_result
+        value = parse_value(token, self.input_format)
+        if not 0 <= value <= 255:
+            raise ValueError(f"operand {value} out of 8-bit range (0-255)")
+        return value
+    
+    def execute_line(self, line: str) -> bool:
+        """Run one input line; returns False when the user asked to quit"""
+        line = line.strip()
+        if not line or line.startswith('#'):
+            return True
+        self.history.append(line)
+        
+        for command in line.split(';'):
+            fields = command.replace(',', ' ').split()
+            if not fields:
+                continue
+            keyword = fields[0].lower()
+            if keyword in ('quit', 'exit'):
+                return False
+            try:
+                if keyword == 'help':
+                    self._print(REPL_HELP)
+                elif keyword == 'list':
+                    self._print(self.interface.list_operations())
+                elif keyword == 'history':
+                    for number, entry in enumerate(self.history[:-1], 1):
+                        self._print(f"{number:4d}  {entry}")
+                elif keyword == 'format':
+                    self._set_format(fields[1:])
+                elif keyword == 'engine':
+                    self._set_engine(fields[1:])
+                else:
+                    self._run_operation(fields)
+            except (ValueError, TypeError, OSError) as e:
+                self._print(f"Error: {e}")
+        return True
+    
+    def _run_operation(self, fields: List[str]) -> None:
+        operation = fields[0].upper()
+        if len(fields) == 2 and operation in self.A_ONLY:
+            fields = fields + ['0']
+        if len(fields) != 3:
+            raise ValueError(f"expected 'OP A B', got '{' '.join(fields)}'")
+        a = self._operand(fields[1])
+        b = self._operand(fields[2])
+        
+        start = time.perf_counter_ns()
+        result, flags = self.interface.execute(operation, a, b)
+        elapsed_us = (time.perf_counter_ns() - start) / 1000
+        
+        self.last_result = result
+        self._print(
+            f"{operation} {format_batch_value(a, self.format_type)} "
+            f"{format_batch_value(b, self.format_type)} = "
+            f"{format_batch_value(result, self.format_type)}  "
+            f"C={flags['carry']:d} Z={flags['zero']:d} "
+            f"N={flags['negative']:d} V={flags['overflow']:d}  "
+            f"({elapsed_us:.1f} µs)"
+        )
+    
+    def _set_format(self, args: List[str]) -> None:
+        if len(args) != 1 or args[0] not in ('decimal', 'hex', 'binary', 'all'):
+            raise ValueError("usage: format decimal|hex|binary|all")
+        self.format_type = args[0]
+        self._print(f"Output format: {self.format_type}")
+    
+    def _set_engine(self, args: List[str]) -> None:
+        if len(args) != 1 or args[0] not in ALUInterface.ENGINES:
+            raise ValueError(f"usage: engine {'|'.join(ALUInterface.ENGINES)}")
+        start = time.perf_counter()
+        previous = self.interface
+        self.interface = ALUInterface(engine=args[0], port=previous.port, baudrate=previous.baudrate)
+        self.interface.mode = previous.mode
+        self._print(f"Engine: {args[0]} (ready in {(time.perf_counter() - start) * 1000:.1f} ms)")
+    
+    def _print(self, text: str) -> None:
+        self.out.write(text + '\n')
+    
+    def run(self, lines: Optional[Iterable[str]] = None) -> int:
+        """Process lines (default: prompt on the terminal) until EOF or quit"""
+        if lines is None:
+            self._print("ALU interactive mode - type 'help' for commands, 'quit' to exit")
+            lines = self._prompt_lines()
+        for line in lines:
+            if not self.execute_line(line):
+                break
+        self.out.flush()
+        return 0
+    
+    def _prompt_lines(self) -> Iterable[str]:
+        """Read lines from the terminal with readline editing and history"""
+        try:
+            import readline
+        except ImportError:
+            readline = None
+        if readline is not None:
+            try:
+                readline.read_history_file(HISTORY_FILE)
+            except OSError:
+                pass
+            readline.set_history_length(HISTORY_LENGTH)
+        
+        try:
+            while True:
+                try:
+                    yield input("alu> ")
+                except KeyboardInterrupt:
+                    self._print("")
+                except EOFError:
+                    self._print("")
+                    return
+        finally:
+            if readline is not None:
+                try:
+                    readline.write_history_file(HISTORY_FILE)
+                except OSError:
+                    pass
+
+
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(
@@ -235,7 +666,14 @@ Examples:
   %(prog)s --binary AND 11110000 00001111  # Binary input
   %(prog)s --format all SUB 100 35      # Show all formats
   %(prog)s --list                       # List all operations
+  %(prog)s --batch ops.txt              # One 'OP A B' or JSON line per operation
+  cat ops.jsonl | %(prog)s --batch      # Batch from stdin
+  %(prog)s --trace program.trace        # Replay a register/flag instruction trace
+  %(prog)s --trace prog.txt --save-trace prog.trace  # ... and save it as binary
   %(prog)s --interactive                # Interactive mode
+  %(prog)s --mode fpga --port /dev/ttyUSB0 --batch ops.txt  # Run on the FPGA board
+  %(prog)s --engine table --serve :8580 # Serve the model on a TCP port
+  %(prog)s --serve unix:/tmp/alu.sock   # ... or on a Unix socket
 
 For more information, see: docs/OPCODE_TABLE.md
         """
@@ -265,6 +703,13 @@ For more information, see: docs/OPCODE_TABLE.md
     parser.add_argument('--mode', choices=['simulation', 'fpga'],
                        default='simulation',
                        help='Execution mode (default: simulation)')
+    parser.add_argument('--port', metavar='DEVICE',
+                       help='FPGA serial port for --mode fpga, e.g. /dev/ttyUSB0')
+    parser.add_argument('--baud', type=int, default=115200,
+                       help='FPGA serial baud rate (default: 115200)')
+    parser.add_argument('--engine', choices=['scalar', 'table'],
+                       default='scalar',
+                       help='Golden model engine (default: scalar)')
     
     # Information options
     parser.add_argument('--list', action='store_true',
@@ -273,23 +718,73 @@ For more information, see: docs/OPCODE_TABLE.md
                        help='Start interactive mode')
     parser.add_argument('--quiet', action='store_true',
                        help='Minimal output (result only)')
+    parser.add_argument('--batch', nargs='?', const='-', metavar='FILE',
+                       help="Execute 'OP A B' or JSON Lines operations from FILE "
+                            "(default: stdin), one result per line")
+    parser.add_argument('--trace', metavar='FILE',
+                       help="Replay a text or binary instruction trace with registers "
+                            "and flags (see alu/trace.py) and report the opcode mix")
+    parser.add_argument('--save-trace', metavar='OUT',
+                       help="With --trace, also write the trace to OUT in the binary format")
+    # Same as alu.service.DEFAULT_ADDRESS, which is not imported unless serving
+    parser.add_argument('--serve', nargs='?', const='127.0.0.1:8580', metavar='ADDRESS',
+                       help="Serve the model on HOST:PORT or unix:PATH "
+                            "(default: 127.0.0.1:8580) with binary and JSON Lines framing")
     
     args = parser.parse_args()
     
+    # Handle list operations (needs no engine)
+    if args.list:
+        print(ALUInterface.list_operations())
+        return 0
+    
     # Create ALU interface
-    interface = ALUInterface()
+    if args.mode == 'fpga' and not args.port:
+        print("Error: --mode fpga needs a serial port (--port)", file=sys.stderr)
+        return 1
+    interface = ALUInterface(engine=args.engine, port=args.port, baudrate=args.baud)
     interface.mode = args.mode
     
-    # Handle list operations
-    if args.list:
-        print(interface.list_operations())
-        return 0
+    # Determine input format
+    input_format = None
+    if args.hex:
+        input_format = 'hex'
+    elif args.binary:
+        input_format = 'binary'
+    
+    # Handle batch mode
+    if args.batch is not None:
+        try:
+            if args.batch == '-':
+                errors = run_batch(interface, sys.stdin, sys.stdout,
+                                   input_format, args.format, args.quiet)
+            else:
+                with open(args.batch, 'r', encoding='utf-8') as f:
+                    errors = run_batch(interface, f, sys.stdout,
+                                       input_format, args.format, args.quiet)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        return 0 if errors == 0 else 1
+    
+    # Handle trace replay (simulation only)
+    if args.trace is not None:
+        if args.mode != 'simulation':
+            print("Error: --trace supports simulation mode only", file=sys.stderr)
+            return 1
+        try:
+            return run_trace(args.trace, sys.stdout, args.format, args.quiet, args.save_trace)
+        except (ValueError, OSError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    
+    # Handle server mode
+    if args.serve is not None:
+        return run_server(interface, args.serve)
     
     # Handle interactive mode
     if args.interactive:
-        print("Interactive mode not yet implemented.")
-        print("Use: ./alu_cli.py <operation> <a> <b>")
-        return 1
+        return ALURepl(interface, sys.stdout, input_format, args.format).run()
     
     # Validate required arguments
     if not args.operation or not args.operand_a or not args.operand_b:
@@ -297,13 +792,6 @@ For more information, see: docs/OPCODE_TABLE.md
         return 1
     
     try:
-        # Determine input format
-        input_format = None
-        if args.hex:
-            input_format = 'hex'
-        elif args.binary:
-            input_format = 'binary'
-        
         # Parse operands
         a = parse_value(args.operand_a, input_format)
         b = parse_value(args.operand_b, input_format)
@@ -330,7 +818,7 @@ For more information, see: docs/OPCODE_TABLE.md
         
         return 0
         
-    except ValueError as e:
+    except (ValueError, OSError) as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
     except Exception as e:
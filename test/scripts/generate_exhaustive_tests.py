@@ -2,147 +2,176 @@
 """
 Generate exhaustive test vectors for 8-bit ALU
 Creates 256×256 test combinations for each operation (19 operations × 65,536 tests = 1,245,184 tests)
+
+Records are streamed straight to disk in JSON, JSON Lines or binary format.
+Opcode shards can be generated in parallel worker processes:
+
+    python3 generate_exhaustive_tests.py                          # vectors/exhaustive.json
+    python3 generate_exhaustive_tests.py out.jsonl --jobs 8
+    python3 generate_exhaustive_tests.py out.bin --ops ADD,SUB --range 0:128
 """
 
-import json
+import argparse
+import math
+import os
+import shutil
 import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
+# Golden model and vector formats live in the alu package at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from alu import OPCODE_INDEX, OPCODE_INFO, ALU8Bit
+from alu.model import A_ONLY_OPCODES
+from alu.vector_format import RECORD_SIZE, VectorWriter
 
-class ALU8Bit:
-    """Software simulation of 8-bit ALU"""
-    
-    def __init__(self):
-        self.width = 8
-        self.mask = (1 << self.width) - 1
-        
-    def _flags(self, result: int, carry: bool = False, overflow: bool = False) -> Dict[str, bool]:
-        """Calculate standard flags"""
-        result_8bit = result & self.mask
-        return {
-            'carry': carry,
-            'zero': result_8bit == 0,
-            'overflow': overflow,
-            'negative': bool(result_8bit & 0x80)
-        }
-    
-    def add(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """ADD: A + B"""
-        result = a + b
-        carry = result > self.mask
-        overflow = ((a & 0x80) == (b & 0x80)) and ((a & 0x80) != (result & 0x80))
-        return result & self.mask, self._flags(result, carry, overflow)
-    
-    def sub(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """SUB: A - B"""
-        result = a - b
-        carry = result >= 0
-        overflow = ((a & 0x80) != (b & 0x80)) and ((a & 0x80) != (result & 0x80))
-        return result & self.mask, self._flags(result, carry, overflow)
-    
-    def inc_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """INC A: A + 1"""
-        result = a + 1
-        carry = result > self.mask
-        overflow = (a == 0x7F)
-        return result & self.mask, self._flags(result, carry, overflow)
-    
-    def dec_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """DEC A: A - 1"""
-        result = a - 1
-        carry = result >= 0
-        overflow = (a == 0x80)
-        return result & self.mask, self._flags(result, carry, overflow)
-    
-    def lsl(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """LSL: Logical shift left"""
-        carry = bool(a & 0x80)
-        result = (a << 1) & self.mask
-        return result, self._flags(result, carry, False)
-    
-    def lsr(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """LSR: Logical shift right"""
-        carry = bool(a & 0x01)
-        result = (a >> 1) & self.mask
-        return result, self._flags(result, carry, False)
-    
-    def asr(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """ASR: Arithmetic shift right"""
-        carry = bool(a & 0x01)
-        sign_bit = a & 0x80
-        result = ((a >> 1) | sign_bit) & self.mask
-        return result, self._flags(result, carry, False)
-    
-    def rev_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """REV A: Reverse bits"""
-        result = 0
-        for i in range(8):
-            if a & (1 << i):
-                result |= (1 << (7 - i))
-        return result, self._flags(result, False, False)
-    
-    def nand(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """NAND"""
-        result = (~(a & b)) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def nor(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """NOR"""
-        result = (~(a | b)) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def xor(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """XOR"""
-        result = (a ^ b) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def pass_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """PASS A"""
-        return a, self._flags(a, False, False)
-    
-    def pass_b(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """PASS B"""
-        return b, self._flags(b, False, False)
-    
-    def and_op(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """AND"""
-        result = (a & b) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def or_op(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """OR"""
-        result = (a | b) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def xnor(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """XNOR"""
-        result = (~(a ^ b)) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def cmp(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """CMP: Compare (flags only)"""
-        result = a - b
-        carry = result >= 0
-        overflow = ((a & 0x80) != (b & 0x80)) and ((a & 0x80) != (result & 0x80))
-        return 0, self._flags(result, carry, overflow)
-    
-    def not_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """NOT A"""
-        result = (~a) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def not_b(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """NOT B"""
-        result = (~b) & self.mask
-        return result, self._flags(result, False, False)
+FORMATS = ('json', 'jsonl', 'binary')
+FORMAT_SUFFIXES = {'.bin': 'binary', '.jsonl': 'jsonl'}
+
+# Approximate bytes per record, for the size estimate
+RECORD_BYTES = {'json': 150, 'jsonl': 150, 'binary': RECORD_SIZE}
+
+# Bytes buffered by a worker before each write
+WRITE_BUFFER = 1 << 20
+
+
+def build_operations(alu: ALU8Bit) -> List[Tuple]:
+    """Return (opcode, name, function, uses_b) for all 19 operations"""
+    return [(info.opcode, info.test_prefix, alu.operations[info.opcode], info.opcode not in A_ONLY_OPCODES)
+            for info in OPCODE_INFO]
+
+
+def format_json_record(op_name: str, opcode: str, a: int, b: int, result: int,
+                       flags: Dict[str, bool]) -> str:
+    """Compact single-line JSON for one vector, keys in the historical order"""
+    return (
+        f'{{"test_name":"{op_name}_{a:02X}_{b:02X}","opcode":"{opcode}",'
+        f'"A":{a},"B":{b},"expected_result":{result},'
+        f'"expected_flags":{{"carry":{_JSON_BOOL[flags["carry"]]},'
+        f'"zero":{_JSON_BOOL[flags["zero"]]},'
+        f'"overflow":{_JSON_BOOL[flags["overflow"]]},'
+        f'"negative":{_JSON_BOOL[flags["negative"]]}}}}}'
+    )
+
+
+_JSON_BOOL = {False: 'false', True: 'true'}
+
+
+def generate_shard(part_file: Path, fmt: str, opcode: str, a_start: int, a_end: int) -> int:
+    """
+    Worker: write all vectors for one opcode and A in [a_start, a_end) to part_file.
+    JSON parts hold records separated by ',\n' with no surrounding array,
+    so parts can be concatenated in order. Returns the number of records.
+    """
+    alu = ALU8Bit()
+    operations = {op: (name, func) for op, name, func, _ in build_operations(alu)}
+    op_name, op_func = operations[opcode]
+    index = OPCODE_INDEX[opcode]
+    count = 0
+    
+    with open(part_file, 'wb') as f:
+        if fmt == 'binary':
+            # One batch call per block of A values, interleaved into records
+            rows = max(1, WRITE_BUFFER // (256 * RECORD_SIZE))
+            for block_start in range(a_start, a_end, rows):
+                block_end = min(block_start + rows, a_end)
+                n = (block_end - block_start) * 256
+                a_col = bytes(a for a in range(block_start, block_end) for _ in range(256))
+                b_col = bytes(range(256)) * (block_end - block_start)
+                results, nzcv = alu.execute_batch(index, a_col, b_col)
+                records = bytearray(n * RECORD_SIZE)
+                records[0::RECORD_SIZE] = bytes([index]) * n
+                records[1::RECORD_SIZE] = a_col
+                records[2::RECORD_SIZE] = b_col
+                records[3::RECORD_SIZE] = bytes(results)
+                records[4::RECORD_SIZE] = bytes(nzcv)
+                f.write(records)
+            count = (a_end - a_start) * 256
+        else:
+            # JSON parts separate records with ',\n' and have no trailing
+            # separator; JSON Lines parts end every record with '\n'
+            separator = ',\n' if fmt == 'json' else '\n'
+            lines = []
+            size = 0
+            for a in range(a_start, a_end):
+                for b in range(256):
+                    result, flags = op_func(a, b)
+                    line = format_json_record(op_name, opcode, a, b, result, flags)
+                    lines.append(line)
+                    size += len(line)
+                if size >= WRITE_BUFFER or a == a_end - 1:
+                    text = separator.join(lines)
+                    if fmt == 'jsonl':
+                        text += separator
+                    elif count:
+                        text = separator + text
+                    f.write(text.encode('ascii'))
+                    count += len(lines)
+                    lines.clear()
+                    size = 0
+    
+    return count
+
+
+def plan_shards(opcodes: List[str], a_start: int, a_end: int, jobs: int) -> List[Tuple[str, int, int]]:
+    """Split each opcode's A range so there are roughly two shards per job"""
+    span = a_end - a_start
+    pieces = max(1, min(span, math.ceil(2 * jobs / len(opcodes)))) if jobs > 1 else 1
+    bounds = [a_start + span * piece // pieces for piece in range(pieces + 1)]
+    return [(opcode, bounds[piece], bounds[piece + 1])
+            for opcode in opcodes for piece in range(pieces)
+            if bounds[piece] < bounds[piece + 1]]
+
+
+class OutputAssembler:
+    """Appends shard part files to the final output in order"""
+    
+    def __init__(self, output_file: Path, fmt: str):
+        self.fmt = fmt
+        self.count = 0
+        if fmt == 'binary':
+            self.writer = VectorWriter(output_file)
+            self.handle = None
+        else:
+            self.writer = None
+            self.handle = open(output_file, 'wb')
+            if fmt == 'json':
+                self.handle.write(b'{"tests": [\n')
+    
+    def append(self, part_file: Path, count: int) -> None:
+        with open(part_file, 'rb') as part:
+            if self.writer is not None:
+                while True:
+                    chunk = part.read(RECORD_SIZE * (WRITE_BUFFER // RECORD_SIZE))
+                    if not chunk:
+                        break
+                    self.writer.write_raw(chunk)
+            else:
+                if self.fmt == 'json' and self.count and count:
+                    self.handle.write(b',\n')
+                shutil.copyfileobj(part, self.handle, WRITE_BUFFER)
+        self.count += count
+    
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        else:
+            if self.fmt == 'json':
+                self.handle.write(b'\n]}\n')
+            self.handle.close()
 
 
-def generate_exhaustive_tests(output_file: Path, chunk_size: int = 10000):
+def generate_exhaustive_tests(output_file: Path, fmt: str = 'json', opcodes: List[str] = None,
+                              a_range: Tuple[int, int] = (0, 256), jobs: int = 1) -> Dict[str, int]:
     """
     Generate exhaustive test vectors
-    For operations that use B: 256×256 = 65,536 tests per operation
-    For operations that don't use B: 256 tests per operation (B=0)
+    Every selected operation gets all A in a_range × all 256 B values. Shards
+    are written to temporary part files (in parallel when jobs > 1) and
+    appended to output_file in order as they complete, so memory stays
+    bounded. Returns the number of vectors per opcode.
     """
     
     print("=" * 80)
@@ -150,124 +179,149 @@ def generate_exhaustive_tests(output_file: Path, chunk_size: int = 10000):
     print("=" * 80)
     print()
     
-    alu = ALU8Bit()
-    
-    operations = [
-        ("00000", "ADD", alu.add, True),
-        ("00001", "SUB", alu.sub, True),
-        ("00010", "INC_A", alu.inc_a, False),
-        ("00011", "DEC_A", alu.dec_a, False),
-        ("00100", "LSL", alu.lsl, False),
-        ("00101", "LSR", alu.lsr, False),
-        ("00110", "ASR", alu.asr, False),
-        ("00111", "REV_A", alu.rev_a, False),
-        ("01000", "NAND", alu.nand, True),
-        ("01001", "NOR", alu.nor, True),
-        ("01010", "XOR", alu.xor, True),
-        ("01011", "PASS_A", alu.pass_a, False),
-        ("01100", "PASS_B", alu.pass_b, True),
-        ("01101", "AND", alu.and_op, True),
-        ("01110", "OR", alu.or_op, True),
-        ("01111", "XNOR", alu.xnor, True),
-        ("10000", "CMP", alu.cmp, True),
-        ("10001", "NOT_A", alu.not_a, False),
-        ("10010", "NOT_B", alu.not_b, True),
-    ]
-    
-    # Calculate total tests: 256×256 for ALL 19 operations
-    total_operations = len(operations)
-    total_tests = total_operations * 256 * 256
-    
-    print(f"Total operations:                {total_operations}")
-    print(f"Tests per operation:             256×256 = 65,536")
-    print(f"Total test vectors to generate:  {total_tests:,} ({total_operations} × 65,536)")
-    print(f"Estimated JSON file size:        ~{total_tests * 200 / (1024*1024):.1f} MB")
+    operations = build_operations(ALU8Bit())
+    names = {opcode: name for opcode, name, _, _ in operations}
+    if opcodes is None:
+        opcodes = [opcode for opcode, _, _, _ in operations]
+    a_start, a_end = a_range
+    shards = plan_shards(opcodes, a_start, a_end, jobs)
+    total_tests = len(opcodes) * (a_end - a_start) * 256
+    
+    print(f"Operations:                      {len(opcodes)}")
+    print(f"A range:                         0x{a_start:02X}-0x{a_end - 1:02X} (B: 0x00-0xFF)")
+    print(f"Total test vectors to generate:  {total_tests:,}")
+    print(f"Format:                          {fmt}")
+    print(f"Estimated file size:             ~{total_tests * RECORD_BYTES[fmt] / (1024*1024):.1f} MB")
+    print(f"Workers:                         {jobs} ({len(shards)} shards)")
     print()
     
-    response = input("This will generate a LARGE file. Continue? (yes/no): ")
-    if response.lower() not in ['yes', 'y']:
-        print("Cancelled.")
-        return
+    start = time.time()
+    per_opcode = {opcode: 0 for opcode in opcodes}
+    assembler = OutputAssembler(output_file, fmt)
     
-    print()
-    print("Generating test vectors...")
-    print()
-    
-    all_tests = []
-    test_count = 0
-    
-    for opcode, op_name, op_func, uses_b in operations:
-        print(f"Generating: {opcode} {op_name:10s}", end=" ", flush=True)
-        op_tests = 0
-        
-        for a in range(256):
-            # Generate all 256×256 combinations for EVERY operation
-            # Even if the operation doesn't use B, we test all B values
-            for b in range(256):
-                result, flags = op_func(a, b)
-                
-                test = {
-                    "test_name": f"{op_name}_{a:02X}_{b:02X}",
-                    "opcode": opcode,
-                    "A": a,
-                    "B": b,
-                    "expected_result": result,
-                    "expected_flags": flags
-                }
-                all_tests.append(test)
-                op_tests += 1
-                test_count += 1
+    try:
+        with tempfile.TemporaryDirectory(dir=output_file.parent, prefix='.vectors-') as tmp_dir:
+            parts = [Path(tmp_dir) / f"part{index:05d}" for index in range(len(shards))]
             
-            # Progress indicator
-            if (a + 1) % 64 == 0:
-                print(".", end="", flush=True)
-        
-        print(f" {op_tests:,} tests")
-    
-    print()
-    print(f"Total tests generated: {test_count:,}")
-    print()
-    print(f"Writing to {output_file}...")
-    
-    # Write to file
-    with open(output_file, 'w') as f:
-        json.dump({"tests": all_tests}, f, indent=2)
-    
-    # Get file size
+            if jobs > 1:
+                pool = ProcessPoolExecutor(max_workers=jobs)
+                futures = [pool.submit(generate_shard, part, fmt, *shard)
+                           for part, shard in zip(parts, shards)]
+                results = (future.result() for future in futures)
+            else:
+                pool = None
+                results = (generate_shard(part, fmt, *shard) for part, shard in zip(parts, shards))
+            
+            try:
+                for part, (opcode, _, _), count in zip(parts, shards, results):
+                    assembler.append(part, count)
+                    part.unlink()
+                    per_opcode[opcode] += count
+                    print(f"  {opcode} {names[opcode]:10s} {count:8,} tests", flush=True)
+            finally:
+                if pool is not None:
+                    pool.shutdown(cancel_futures=True)
+    finally:
+        assembler.close()
+    
+    elapsed = time.time() - start
     file_size = output_file.stat().st_size
-    print(f"✅ Complete! File size: {file_size / (1024*1024):.2f} MB")
-    print()
     
-    # Print summary
+    print()
     print("=" * 80)
     print("SUMMARY")
     print("=" * 80)
     print(f"Output file:     {output_file}")
-    print(f"Total tests:     {test_count:,}")
+    print(f"Total tests:     {assembler.count:,}")
     print(f"File size:       {file_size / (1024*1024):.2f} MB")
-    print(f"Lines:           {sum(1 for _ in open(output_file)):,}")
+    print(f"Time:            {elapsed:.2f}s ({int(assembler.count / elapsed) if elapsed else 0:,} tests/sec)")
     print()
     print("Test distribution:")
-    
-    for opcode, op_name, _, uses_b in operations:
-        print(f"  {opcode} {op_name:10s}: 65,536 tests (256×256)")
-    
+    for opcode, count in per_opcode.items():
+        print(f"  {opcode} {names[opcode]:10s}: {count:,} tests")
     print()
     print("=" * 80)
     print()
+    
+    return per_opcode
+
 
+def parse_ops(value: str) -> List[str]:
+    """Parse --ops: comma-separated names (ADD, INC_A) or opcodes (00000)"""
+    by_name = {name: opcode for opcode, name, _, _ in build_operations(ALU8Bit())}
+    opcodes = []
+    for item in value.split(','):
+        item = item.strip().upper().replace(' ', '_')
+        if not item:
+            continue
+        if item in OPCODE_INDEX:
+            opcodes.append(item)
+        elif item in by_name:
+            opcodes.append(by_name[item])
+        else:
+            raise argparse.ArgumentTypeError(f"Unknown operation: {item}")
+    if not opcodes:
+        raise argparse.ArgumentTypeError("No operations given")
+    return sorted(set(opcodes), key=OPCODE_INDEX.get)
 
-def main():
+
+def parse_range(value: str) -> Tuple[int, int]:
+    """Parse --range START:END (END exclusive; decimal or 0x hex)"""
+    try:
+        start_str, end_str = value.split(':')
+        start = int(start_str, 0) if start_str else 0
+        end = int(end_str, 0) if end_str else 256
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid range '{value}', expected START:END")
+    if not 0 <= start < end <= 256:
+        raise argparse.ArgumentTypeError(f"Range must satisfy 0 <= START < END <= 256")
+    return start, end
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate exhaustive ALU test vectors.")
+    parser.add_argument(
+        "output",
+        nargs="?",
+        type=Path,
+        default=Path(__file__).parent.parent / 'vectors' / 'exhaustive.json',
+        help="Output file (default: test/vectors/exhaustive.json)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="Output format (default: from suffix: .bin binary, .jsonl JSON Lines, else JSON)",
+    )
+    parser.add_argument(
+        "--ops",
+        type=parse_ops,
+        help="Comma-separated operations to generate, by name or opcode (default: all 19)",
+    )
+    parser.add_argument(
+        "--range",
+        type=parse_range,
+        default=(0, 256),
+        dest="a_range",
+        help="Range of A values as START:END, END exclusive (default: 0:256)",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Worker processes generating shards in parallel (0 = one per CPU)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main entry point"""
-    
-    # Output file path
-    output_file = Path(__file__).parent.parent / 'vectors' / 'exhaustive.json'
-    
-    if len(sys.argv) > 1:
-        output_file = Path(sys.argv[1])
+    args = parse_args(argv)
+    output_file = args.output
+    fmt = args.format or FORMAT_SUFFIXES.get(output_file.suffix, 'json')
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
     
     try:
-        generate_exhaustive_tests(output_file)
+        generate_exhaustive_tests(output_file, fmt, args.ops, args.a_range, jobs)
     except KeyboardInterrupt:
         print("\n\n❌ Interrupted by user")
         return 1
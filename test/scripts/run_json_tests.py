@@ -1,214 +1,220 @@
 #!/usr/bin/env python3
 """
 ALU Test Runner - Runs tests from JSON test vectors
-Simulates the 8-bit ALU with all 19 operations
+Checks them against the shared ALU8Bit golden model (alu package)
 """
 
+import argparse
 import json
+import os
+import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Container, Dict, Iterable, Iterator, List, Optional, Tuple
 
-class ALU8Bit:
-    """Software simulation of 8-bit ALU with all 19 operations"""
-    
-    def __init__(self):
-        self.width = 8
-        self.mask = (1 << self.width) - 1
+# Golden model and vector formats live in the alu package at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+from alu import ALU8Bit, OPCODES, TableALU8Bit, unpack_flags
+from alu.opcodes import DISPLAY_NAMES as OPCODE_NAMES
+from alu.result_cache import DEFAULT_CACHE_FILE, ResultCache, load_cached
+from alu.vector_format import RECORD, VectorFile, is_binary_vector_file
+from alu.vector_format import test_name as derive_test_name
+
+# Vectors checked per chunk in streaming mode
+DEFAULT_CHUNK_SIZE = 10000
+
+# Failures reported by --jobs runs
+DEFAULT_MAX_FAILURES = 10
+
+# Runs of at least this many vectors use the table engine: building the table
+# takes about 0.9 s and each lookup saves about 0.9 us over the scalar model
+TABLE_ENGINE_MIN_VECTORS = 1_000_000
+
+# Size of a compact JSON Lines vector, for estimating vector counts from bytes
+JSON_VECTOR_BYTES = 200
+
+# Matches the opening of the "tests" array in {"tests": [...]} documents
+TESTS_ARRAY_START = re.compile(r'"tests"\s*:\s*\[')
+
+# Matches the delimiter and opening brace of a vector inside the array. Vectors
+# are flat objects whose only nested value is expected_flags (preceded by ':')
+VECTOR_START = re.compile(r'[\[,]\s*\{')
+
+
+def iter_test_vectors(json_file: Path, read_size: int = 1 << 20,
+                      start: int = 0, end: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Stream test vectors from a JSON file one at a time.
+    Accepts {"tests": [...]} documents or a bare top-level array. Only one
+    read_size block plus the vector being decoded is held in memory.
+    
+    start/end restrict the stream to a byte range: a vector belongs to the
+    range holding its leading '[' or ',' delimiter, so adjacent ranges
+    partition the array exactly. The file is decoded as latin-1 so buffer
+    positions are byte offsets; vectors with non-ASCII text are re-decoded
+    as UTF-8.
+    """
+    decoder = json.JSONDecoder()
+    
+    with open(json_file, 'rb') as f:
+        f.seek(start)
+        buffer = ''
+        base = start  # byte offset of buffer[0]
+        eof = False
         
-    def execute(self, opcode: str, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """Execute ALU operation and return result with flags"""
-        a = a & self.mask
-        b = b & self.mask
+        def fill() -> bool:
+            nonlocal buffer, eof
+            chunk = f.read(read_size)
+            if not chunk:
+                eof = True
+                return False
+            buffer += chunk.decode('latin-1')
+            return True
         
-        # Map opcode to operation
-        operations = {
-            '00000': self.add,
-            '00001': self.sub,
-            '00010': self.inc_a,
-            '00011': self.dec_a,
-            '00100': self.lsl,
-            '00101': self.lsr,
-            '00110': self.asr,
-            '00111': self.rev_a,
-            '01000': self.nand,
-            '01001': self.nor,
-            '01010': self.xor,
-            '01011': self.pass_a,
-            '01100': self.pass_b,
-            '01101': self.and_op,
-            '01110': self.or_op,
-            '01111': self.xnor,
-            '10000': self.cmp,
-            '10001': self.not_a,
-            '10010': self.not_b,
-        }
+        # Locate the first vector in range
+        pos = None
+        while pos is None:
+            if start == 0:
+                stripped = buffer.lstrip()
+                if stripped.startswith('['):
+                    delimiter = len(buffer) - len(stripped)
+                    pos = delimiter + 1
+                    break
+                match = TESTS_ARRAY_START.search(buffer)
+                if match:
+                    delimiter = match.end() - 1
+                    pos = match.end()
+                    break
+            else:
+                match = VECTOR_START.search(buffer)
+                if match:
+                    delimiter = match.start()
+                    pos = match.end() - 1
+                    break
+            if not fill():
+                return
+        if end is not None and start + delimiter >= end:
+            return
         
-        if opcode not in operations:
-            raise ValueError(f"Unknown opcode: {opcode}")
+        while True:
+            # Skip separators between elements, stopping at the range end
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                    pos += 1
+                if pos < len(buffer) and buffer[pos] == ',':
+                    if end is not None and base + pos >= end:
+                        return
+                    pos += 1
+                    continue
+                if pos < len(buffer) or not fill():
+                    break
+            if pos >= len(buffer):
+                raise ValueError(f"Unterminated tests array in {json_file}")
+            if buffer[pos] == ']':
+                return
             
-        return operations[opcode](a, b)
-    
-    def _flags(self, result: int, carry: bool = False, overflow: bool = False) -> Dict[str, bool]:
-        """Calculate standard flags"""
-        result_8bit = result & self.mask
-        return {
-            'carry': carry,
-            'zero': result_8bit == 0,
-            'overflow': overflow,
-            'negative': bool(result_8bit & 0x80)
-        }
-    
-    def add(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """ADD: A + B"""
-        result = a + b
-        carry = result > self.mask
-        # Overflow: same sign inputs, different sign output
-        overflow = ((a & 0x80) == (b & 0x80)) and ((a & 0x80) != (result & 0x80))
-        return result & self.mask, self._flags(result, carry, overflow)
-    
-    def sub(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """SUB: A - B"""
-        result = a - b
-        carry = result >= 0  # In subtraction, carry=1 means no borrow
-        # Overflow: different sign inputs, result different from A
-        overflow = ((a & 0x80) != (b & 0x80)) and ((a & 0x80) != (result & 0x80))
-        return result & self.mask, self._flags(result, carry, overflow)
-    
-    def inc_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """INC A: A + 1"""
-        result = a + 1
-        carry = result > self.mask
-        overflow = (a == 0x7F)  # Overflow when incrementing max positive signed
-        return result & self.mask, self._flags(result, carry, overflow)
-    
-    def dec_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """DEC A: A - 1"""
-        result = a - 1
-        carry = result >= 0
-        overflow = (a == 0x80)  # Overflow when decrementing min negative signed
-        return result & self.mask, self._flags(result, carry, overflow)
-    
-    def lsl(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """LSL: Logical shift left"""
-        carry = bool(a & 0x80)
-        result = (a << 1) & self.mask
-        return result, self._flags(result, carry, False)
-    
-    def lsr(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """LSR: Logical shift right"""
-        carry = bool(a & 0x01)
-        result = (a >> 1) & self.mask
-        return result, self._flags(result, carry, False)
-    
-    def asr(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """ASR: Arithmetic shift right (preserves sign)"""
-        carry = bool(a & 0x01)
-        sign_bit = a & 0x80
-        result = ((a >> 1) | sign_bit) & self.mask
-        return result, self._flags(result, carry, False)
-    
-    def rev_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """REV A: Reverse bits"""
-        result = 0
-        for i in range(8):
-            if a & (1 << i):
-                result |= (1 << (7 - i))
-        return result, self._flags(result, False, False)
-    
-    def nand(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """NAND: ~(A & B)"""
-        result = (~(a & b)) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def nor(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """NOR: ~(A | B)"""
-        result = (~(a | b)) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def xor(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """XOR: A ^ B"""
-        result = (a ^ b) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def pass_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """PASS A: Output A"""
-        return a, self._flags(a, False, False)
-    
-    def pass_b(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """PASS B: Output B"""
-        return b, self._flags(b, False, False)
-    
-    def and_op(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """AND: A & B"""
-        result = (a & b) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def or_op(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """OR: A | B"""
-        result = (a | b) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def xnor(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """XNOR: ~(A ^ B)"""
-        result = (~(a ^ b)) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def cmp(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """CMP: Compare A and B (flags only, result is 0)"""
-        result = a - b
-        carry = result >= 0
-        overflow = ((a & 0x80) != (b & 0x80)) and ((a & 0x80) != (result & 0x80))
-        # CMP returns 0 as result, only flags matter
-        return 0, self._flags(result, carry, overflow)
-    
-    def not_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """NOT A: ~A"""
-        result = (~a) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def not_b(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """NOT B: ~B"""
-        result = (~b) & self.mask
-        return result, self._flags(result, False, False)
-
-
-def run_tests(json_file: Path) -> Tuple[int, int, int]:
-    """Run tests from JSON file and return (passed, failed, total)"""
-    
-    import time
-    
-    # Load test vectors
-    print(f"\nLoading test vectors from: {json_file.name}...")
-    load_start = time.time()
-    with open(json_file, 'r') as f:
-        data = json.load(f)
-    load_time = time.time() - load_start
-    
-    tests = data.get('tests', [])
-    if not tests:
-        print(f"❌ No tests found in {json_file}")
-        return 0, 0, 0
-    
-    print(f"✅ Loaded {len(tests):,} tests in {load_time:.2f}s")
-    
-    alu = ALU8Bit()
-    passed = 0
-    failed = 0
-    
-    print(f"\n{'='*80}")
-    print(f"Running tests from: {json_file.name}")
-    print(f"{'='*80}\n")
-    
-    # Start timing test execution
-    test_start = time.time()
-    
-    # Track tests per operation
-    op_stats = {}
-    
-    for i, test in enumerate(tests):
+            try:
+                test, stop = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element straddles the end of the buffer: read more and retry
+                if eof or not fill():
+                    raise
+                continue
+            
+            text = buffer[pos:stop]
+            if not text.isascii():
+                test = json.loads(text.encode('latin-1'))
+            yield test
+            pos = stop
+            
+            # Drop consumed text so the buffer stays bounded
+            if pos > read_size:
+                buffer = buffer[pos:]
+                base += pos
+                pos = 0
+
+
+def iter_jsonl_vectors(jsonl_file: Path, start: int = 0, end: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Stream test vectors from a JSON Lines file, one vector per line.
+    start/end restrict the stream to lines that begin inside the byte range.
+    """
+    with open(jsonl_file, 'rb') as f:
+        if start > 0:
+            # Skip the line straddling start; it belongs to the previous range
+            f.seek(start - 1)
+            f.readline()
+        while end is None or f.tell() < end:
+            line = f.readline()
+            if not line:
+                return
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_vectors(vector_file: Path, start: int = 0, end: Optional[int] = None) -> Iterator[Dict]:
+    """Stream vectors from a JSON or JSON Lines (.jsonl) file"""
+    if vector_file.suffix == '.jsonl':
+        return iter_jsonl_vectors(vector_file, start, end)
+    return iter_test_vectors(vector_file, start=start, end=end)
+
+
+def iter_chunks(tests: Iterable[Dict], chunk_size: int) -> Iterator[List[Dict]]:
+    """Group an iterable of test vectors into lists of at most chunk_size"""
+    iterator = iter(tests)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def print_failure(failure: Dict) -> None:
+    """Print one failing vector"""
+    if failure['error'] is not None:
+        print(f"❌ [ERROR] {failure['test_name']}: {failure['error']}\n")
+        return
+    print(f"❌ [FAIL] {failure['test_name']}")
+    print(f"   Opcode: {failure['opcode']}, A: 0x{failure['A']:02X}, B: 0x{failure['B']:02X}")
+    if failure['expected_result'] != failure['actual_result']:
+        print(f"   Result: Expected 0x{failure['expected_result']:02X}, Got 0x{failure['actual_result']:02X}")
+    if failure['expected_flags'] != failure['actual_flags']:
+        print(f"   Expected Flags: {failure['expected_flags']}")
+        print(f"   Actual Flags:   {failure['actual_flags']}")
+    print()
+
+
+def golden_model(vectors: int) -> ALU8Bit:
+    """The golden model for a run of about this many vectors"""
+    return TableALU8Bit() if vectors >= TABLE_ENGINE_MIN_VECTORS else ALU8Bit()
+
+
+def record_failure(failure: Dict, failures: Optional[List[Dict]], max_failures: Optional[int]) -> None:
+    """Print a failure, or collect it when running inside a worker"""
+    if failures is None:
+        print_failure(failure)
+    elif max_failures is None or len(failures) < max_failures:
+        failures.append(failure)
+
+
+def check_vectors(alu: ALU8Bit, tests: Iterable[Dict], op_stats: Dict[str, Dict[str, int]],
+                  counts: Dict[str, int], start_index: int = 0,
+                  failures: Optional[List[Dict]] = None, max_failures: Optional[int] = None,
+                  skip: Container[str] = ()) -> None:
+    """
+    Check a batch of test vectors, updating op_stats and pass/fail counts in place.
+    Failures are printed as they occur, or appended to failures (up to
+    max_failures) when a list is given. Vectors for opcodes in skip are
+    ignored (their results come from the cache).
+    """
+    for i, test in enumerate(tests, start_index):
         test_name = test.get('test_name', f'Test_{i}')
         opcode = test.get('opcode', '')
+        if opcode in skip:
+            continue
         a = int(test.get('A', 0))
         b = int(test.get('B', 0))
         expected_result = int(test.get('expected_result', 0))
@@ -218,6 +224,12 @@ def run_tests(json_file: Path) -> Tuple[int, int, int]:
         if opcode not in op_stats:
             op_stats[opcode] = {'passed': 0, 'failed': 0}
         
+        failure = {
+            'test_name': test_name, 'opcode': opcode, 'A': a, 'B': b,
+            'expected_result': expected_result, 'expected_flags': expected_flags,
+            'actual_result': None, 'actual_flags': None, 'error': None,
+        }
+        
         try:
             # Execute ALU operation
             actual_result, actual_flags = alu.execute(opcode, a, b)
@@ -232,44 +244,81 @@ def run_tests(json_file: Path) -> Tuple[int, int, int]:
             )
             
             if result_match and flags_match:
-                passed += 1
+                counts['passed'] += 1
                 op_stats[opcode]['passed'] += 1
                 # Only print first few passes to avoid clutter
-                if passed <= 10 or not result_match or not flags_match:
+                if failures is None and counts['passed'] <= 10:
                     print(f"✅ [PASS] {test_name}")
             else:
-                failed += 1
+                counts['failed'] += 1
                 op_stats[opcode]['failed'] += 1
-                print(f"❌ [FAIL] {test_name}")
-                print(f"   Opcode: {opcode}, A: 0x{a:02X}, B: 0x{b:02X}")
-                if not result_match:
-                    print(f"   Result: Expected 0x{expected_result:02X}, Got 0x{actual_result:02X}")
-                if not flags_match:
-                    print(f"   Expected Flags: {expected_flags}")
-                    print(f"   Actual Flags:   {actual_flags}")
-                print()
+                failure['actual_result'] = actual_result
+                failure['actual_flags'] = actual_flags
+                record_failure(failure, failures, max_failures)
         
         except Exception as e:
-            failed += 1
+            counts['failed'] += 1
             op_stats[opcode]['failed'] += 1
-            print(f"❌ [ERROR] {test_name}: {e}\n")
-    
-    # Calculate elapsed time
-    test_end = time.time()
-    test_time = test_end - test_start
-    total_time = test_end - load_start
+            failure['error'] = str(e)
+            record_failure(failure, failures, max_failures)
+
+
+def check_records(alu: ALU8Bit, records: Iterable[Tuple[int, int, int, int, int]],
+                  op_stats: Dict[str, Dict[str, int]], counts: Dict[str, int],
+                  failures: Optional[List[Dict]] = None, max_failures: Optional[int] = None,
+                  skip: Container[str] = ()) -> None:
+    """Check binary (opcode, A, B, result, flags) records; same reporting as check_vectors"""
+    execute_packed = alu.execute_packed
+    for op, a, b, expected_result, expected_nzcv in records:
+        opcode = OPCODES[op]
+        if opcode in skip:
+            continue
+        actual = execute_packed(op, a, b)
+        
+        if actual == expected_result | (expected_nzcv << 8):
+            counts['passed'] += 1
+            op_stats[opcode]['passed'] += 1
+            if failures is None and counts['passed'] <= 10:
+                print(f"✅ [PASS] {derive_test_name(op, a, b)}")
+        else:
+            counts['failed'] += 1
+            op_stats[opcode]['failed'] += 1
+            record_failure({
+                'test_name': derive_test_name(op, a, b), 'opcode': opcode, 'A': a, 'B': b,
+                'expected_result': expected_result, 'expected_flags': unpack_flags(expected_nzcv),
+                'actual_result': actual & 0xFF, 'actual_flags': unpack_flags(actual >> 8), 'error': None,
+            }, failures, max_failures)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, if available"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def print_summary(passed: int, failed: int, test_time: float, total_time: float,
+                  op_stats: Dict[str, Dict[str, int]]) -> None:
+    """Print the overall and per-operation results"""
+    total = passed + failed
     
-    # Print summary
     print(f"\n{'='*80}")
     print(f"TEST SUMMARY")
     print(f"{'='*80}")
-    print(f"Total Tests:  {passed + failed:,}")
-    print(f"✅ Passed:    {passed:,} ({100*passed/(passed+failed):.1f}%)")
-    print(f"❌ Failed:    {failed:,} ({100*failed/(passed+failed) if failed else 0:.1f}%)")
+    print(f"Total Tests:  {total:,}")
+    print(f"✅ Passed:    {passed:,} ({100*passed/total if total else 0:.1f}%)")
+    print(f"❌ Failed:    {failed:,} ({100*failed/total if failed else 0:.1f}%)")
     print(f"{'='*80}")
     print(f"⏱️  Test Execution Time:  {test_time:.3f}s")
     print(f"📊 Load + Test Time:      {total_time:.3f}s")
-    print(f"⚡ Test Speed:            {int((passed+failed)/test_time):,} tests/sec")
+    print(f"⚡ Test Speed:            {int(total/test_time) if test_time else 0:,} tests/sec")
+    rss = peak_rss_mb()
+    if rss is not None:
+        print(f"💾 Peak RSS:              {rss:.1f} MB")
     print(f"{'='*80}\n")
     
     # Print per-operation statistics
@@ -277,54 +326,316 @@ def run_tests(json_file: Path) -> Tuple[int, int, int]:
     print(f"PER-OPERATION RESULTS")
     print(f"{'='*80}")
     
-    opcode_names = {
-        '00000': 'ADD',
-        '00001': 'SUB',
-        '00010': 'INC A',
-        '00011': 'DEC A',
-        '00100': 'LSL',
-        '00101': 'LSR',
-        '00110': 'ASR',
-        '00111': 'REV A',
-        '01000': 'NAND',
-        '01001': 'NOR',
-        '01010': 'XOR',
-        '01011': 'PASS A',
-        '01100': 'PASS B',
-        '01101': 'AND',
-        '01110': 'OR',
-        '01111': 'XNOR',
-        '10000': 'CMP',
-        '10001': 'NOT A',
-        '10010': 'NOT B',
-    }
-    
     for opcode in sorted(op_stats.keys()):
         stats = op_stats[opcode]
         total_op = stats['passed'] + stats['failed']
         pass_rate = 100 * stats['passed'] / total_op if total_op > 0 else 0
-        op_name = opcode_names.get(opcode, 'Unknown')
+        op_name = OPCODE_NAMES.get(opcode, 'Unknown')
         status = "✅" if stats['failed'] == 0 else "❌"
         print(f"{status} {opcode} | {op_name:10s} | {stats['passed']:3d}/{total_op:3d} passed ({pass_rate:5.1f}%)")
     
     print(f"{'='*80}\n")
+
+
+def seed_stats(cached: Optional[Dict[str, Dict[str, int]]]) -> Tuple[Dict, Dict[str, int]]:
+    """Initial op_stats and counts from cached per-opcode results"""
+    op_stats = {opcode: dict(stats) for opcode, stats in (cached or {}).items()}
+    counts = {
+        'passed': sum(stats['passed'] for stats in op_stats.values()),
+        'failed': sum(stats['failed'] for stats in op_stats.values()),
+    }
+    return op_stats, counts
+
+
+def run_tests(json_file: Path, cached: Optional[Dict[str, Dict[str, int]]] = None) -> Tuple[int, int, int, Dict]:
+    """
+    Run tests from JSON file and return (passed, failed, total, op_stats).
+    Opcodes in cached are not re-run; their stored results are reported.
+    """
+    
+    # Load test vectors
+    print(f"\nLoading test vectors from: {json_file.name}...")
+    load_start = time.time()
+    with open(json_file, 'r') as f:
+        data = json.load(f)
+    load_time = time.time() - load_start
+    
+    tests = data.get('tests', [])
+    if not tests:
+        print(f"❌ No tests found in {json_file}")
+        return 0, 0, 0, {}
+    
+    print(f"✅ Loaded {len(tests):,} tests in {load_time:.2f}s")
+    
+    alu = golden_model(len(tests))
+    op_stats, counts = seed_stats(cached)
+    
+    print(f"\n{'='*80}")
+    print(f"Running tests from: {json_file.name}")
+    print(f"{'='*80}\n")
+    
+    # Start timing test execution
+    test_start = time.time()
+    
+    check_vectors(alu, tests, op_stats, counts, skip=frozenset(op_stats))
+    
+    # Calculate elapsed time
+    test_end = time.time()
+    passed, failed = counts['passed'], counts['failed']
+    print_summary(passed, failed, test_end - test_start, test_end - load_start, op_stats)
+    
+    return passed, failed, passed + failed, op_stats
+
+
+def run_tests_streaming(json_file: Path, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        cached: Optional[Dict[str, Dict[str, int]]] = None) -> Tuple[int, int, int, Dict]:
+    """
+    Run tests from JSON file without loading it whole.
+    Vectors are parsed incrementally and checked chunk_size at a time, so
+    memory stays flat regardless of file size. Returns (passed, failed, total, op_stats).
+    """
+    print(f"\nStreaming test vectors from: {json_file.name} (chunks of {chunk_size:,})...")
+    
+    alu = golden_model(json_file.stat().st_size // JSON_VECTOR_BYTES)
+    op_stats, counts = seed_stats(cached)
+    skip = frozenset(op_stats)
+    
+    print(f"\n{'='*80}")
+    print(f"Running tests from: {json_file.name}")
+    print(f"{'='*80}\n")
+    
+    test_start = time.time()
+    index = 0
+    for chunk in iter_chunks(iter_vectors(json_file), chunk_size):
+        check_vectors(alu, chunk, op_stats, counts, index, skip=skip)
+        index += len(chunk)
+    test_end = time.time()
+    
+    passed, failed = counts['passed'], counts['failed']
+    if passed + failed == 0:
+        print(f"❌ No tests found in {json_file}")
+        return 0, 0, 0, {}
+    
+    # Parsing is interleaved with checking, so both times cover the whole run
+    print_summary(passed, failed, test_end - test_start, test_end - test_start, op_stats)
+    
+    return passed, failed, passed + failed, op_stats
+
+
+def run_tests_binary(vector_file: Path,
+                     cached: Optional[Dict[str, Dict[str, int]]] = None) -> Tuple[int, int, int, Dict]:
+    """
+    Run tests from a binary vector file and return (passed, failed, total, op_stats).
+    The file is memory-mapped and decoded record by record; test names are
+    derived only for reported vectors.
+    """
+    print(f"\nMapping binary test vectors from: {vector_file.name}...")
+    load_start = time.time()
+    vectors = VectorFile(vector_file)
+    print(f"✅ Mapped {len(vectors):,} tests in {time.time() - load_start:.2f}s")
+    
+    alu = golden_model(len(vectors))
+    op_stats, counts = seed_stats(cached)
+    skip = frozenset(op_stats)
+    for opcode in OPCODES:
+        op_stats.setdefault(opcode, {'passed': 0, 'failed': 0})
+    
+    print(f"\n{'='*80}")
+    print(f"Running tests from: {vector_file.name}")
+    print(f"{'='*80}\n")
+    
+    test_start = time.time()
+    with vectors:
+        check_records(alu, vectors, op_stats, counts, skip=skip)
+    test_end = time.time()
+    
+    passed, failed = counts['passed'], counts['failed']
+    op_stats = prune_stats(op_stats)
+    print_summary(passed, failed, test_end - test_start, test_end - load_start, op_stats)
+    
+    return passed, failed, passed + failed, op_stats
+
+
+def prune_stats(op_stats: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    """Drop opcodes that had no vectors"""
+    return {opcode: stats for opcode, stats in op_stats.items()
+            if stats['passed'] or stats['failed']}
+
+
+def plan_shards(vector_file: Path, jobs: int) -> List[Tuple[str, int, int]]:
+    """
+    Split a vector file into contiguous shards, one per job.
+    Binary files are split by record index, JSON files by byte offset; each
+    worker re-opens the file itself, so no vectors are pickled.
+    """
+    if is_binary_vector_file(vector_file):
+        with VectorFile(vector_file) as vectors:
+            total = len(vectors)
+        kind = 'binary'
+    else:
+        total = vector_file.stat().st_size
+        kind = 'json'
+    bounds = [total * shard // jobs for shard in range(jobs + 1)]
+    return [(kind, bounds[shard], bounds[shard + 1])
+            for shard in range(jobs) if bounds[shard] < bounds[shard + 1]]
+
+
+def run_shard(vector_file: Path, kind: str, start: int, end: int, max_failures: int,
+              skip: Container[str] = ()) -> Dict:
+    """Worker: check one shard and return its counts, op_stats and first failures"""
+    alu = golden_model(end - start if kind == 'binary' else (end - start) // JSON_VECTOR_BYTES)
+    counts = {'passed': 0, 'failed': 0}
+    op_stats = {}
+    failures = []
+    
+    if kind == 'binary':
+        op_stats = {opcode: {'passed': 0, 'failed': 0} for opcode in OPCODES}
+        with VectorFile(vector_file) as vectors:
+            check_records(alu, RECORD.iter_unpack(vectors.slice(start, end)),
+                          op_stats, counts, failures, max_failures, skip)
+        op_stats = prune_stats(op_stats)
+    else:
+        check_vectors(alu, iter_vectors(vector_file, start, end),
+                      op_stats, counts, failures=failures, max_failures=max_failures, skip=skip)
+    
+    return {'passed': counts['passed'], 'failed': counts['failed'],
+            'op_stats': op_stats, 'failures': failures}
+
+
+def run_tests_parallel(vector_file: Path, jobs: int, max_failures: int = DEFAULT_MAX_FAILURES,
+                       cached: Optional[Dict[str, Dict[str, int]]] = None) -> Tuple[int, int, int, Dict]:
+    """
+    Run tests from a JSON or binary vector file across a process pool.
+    Shard results are merged in input order, so totals, op_stats and the
+    first max_failures failures match a sequential run.
+    """
+    shards = plan_shards(vector_file, jobs)
+    print(f"\nRunning {vector_file.name} across {len(shards)} worker process(es)...")
+    
+    print(f"\n{'='*80}")
+    print(f"Running tests from: {vector_file.name}")
+    print(f"{'='*80}\n")
+    
+    op_stats, counts = seed_stats(cached)
+    skip = frozenset(op_stats)
+    
+    test_start = time.time()
+    with ProcessPoolExecutor(max_workers=len(shards) or 1) as pool:
+        futures = [pool.submit(run_shard, vector_file, kind, start, end, max_failures, skip)
+                   for kind, start, end in shards]
+        shard_results = [future.result() for future in futures]
+    test_end = time.time()
     
-    return passed, failed, passed + failed
+    passed, failed = counts['passed'], counts['failed']
+    failures = []
+    for shard in shard_results:
+        passed += shard['passed']
+        failed += shard['failed']
+        failures.extend(shard['failures'])
+        for opcode, stats in shard['op_stats'].items():
+            merged = op_stats.setdefault(opcode, {'passed': 0, 'failed': 0})
+            merged['passed'] += stats['passed']
+            merged['failed'] += stats['failed']
+    
+    if passed + failed == 0:
+        print(f"❌ No tests found in {vector_file}")
+        return 0, 0, 0, {}
+    
+    for failure in failures[:max_failures]:
+        print_failure(failure)
+    if failed > max_failures:
+        print(f"... {failed - max_failures:,} more failure(s) not shown\n")
+    
+    print_summary(passed, failed, test_end - test_start, test_end - test_start, op_stats)
+    
+    return passed, failed, passed + failed, op_stats
+
+
+def replay_cached(vector_file: Path, cached: Dict[str, Dict[str, int]]) -> Tuple[int, int, int, Dict]:
+    """Report stored results for an unchanged vector file and model"""
+    print(f"\n♻️  Replaying cached results for {vector_file.name} (vectors and ALU8Bit unchanged)")
+    op_stats, counts = seed_stats(cached)
+    passed, failed = counts['passed'], counts['failed']
+    print_summary(passed, failed, 0.0, 0.0, op_stats)
+    return passed, failed, passed + failed, op_stats
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run ALU tests from a JSON vector file.")
+    parser.add_argument(
+        "json_file",
+        nargs="?",
+        type=Path,
+        default=Path(__file__).parent.parent / 'vectors' / 'demo.json',
+        help="JSON, JSON Lines (.jsonl) or binary vector file (default: test/vectors/demo.json)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse vectors incrementally with constant memory (for exhaustive.json)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Vectors checked per chunk in --stream mode (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Shard vectors across N worker processes (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--max-failures",
+        type=int,
+        default=DEFAULT_MAX_FAILURES,
+        help=f"Failures reported in --jobs mode, in input order (default: {DEFAULT_MAX_FAILURES})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-verify every vector instead of reusing cached results",
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=Path,
+        default=DEFAULT_CACHE_FILE,
+        help=f"Verification result cache (default: {DEFAULT_CACHE_FILE.relative_to(DEFAULT_CACHE_FILE.parent.parent)})",
+    )
+    return parser.parse_args()
 
 
 def main():
     """Main entry point"""
-    if len(sys.argv) > 1:
-        json_file = Path(sys.argv[1])
-    else:
-        # Default to demo.json in test/vectors
-        json_file = Path(__file__).parent.parent / 'vectors' / 'demo.json'
+    args = parse_args()
+    json_file = args.json_file
     
     if not json_file.exists():
         print(f"❌ Error: File not found: {json_file}")
         return 1
     
-    passed, failed, total = run_tests(json_file)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    
+    cache = None if args.no_cache else ResultCache(args.cache_file)
+    vector_digest, impl_digests, cached, complete = load_cached(json_file, ALU8Bit(), cache)
+    
+    if complete:
+        passed, failed, total, op_stats = replay_cached(json_file, cached)
+    elif jobs > 1:
+        passed, failed, total, op_stats = run_tests_parallel(json_file, jobs, args.max_failures, cached)
+    elif is_binary_vector_file(json_file):
+        passed, failed, total, op_stats = run_tests_binary(json_file, cached)
+    elif args.stream or json_file.suffix == '.jsonl':
+        passed, failed, total, op_stats = run_tests_streaming(json_file, args.chunk_size, cached)
+    else:
+        passed, failed, total, op_stats = run_tests(json_file, cached)
+    
+    if cache is not None and total > 0:
+        if cached and not complete:
+            print(f"♻️  Reused cached results for {len(cached)} unchanged opcode(s)")
+        cache.store(vector_digest, impl_digests, op_stats)
+        cache.save()
     
     # Return 0 if all tests passed, 1 otherwise
     return 0 if failed == 0 else 1
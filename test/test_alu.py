@@ -5,9 +5,18 @@ Run with: pytest test_alu.py -v
 Or: python3 test_alu.py
 """
 
+import importlib
 import json
+import os
+import sys
+from array import array
 from pathlib import Path
-from typing import Dict, Tuple
+
+# The golden model lives in the alu package at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from alu import (ALU, ALU8Bit, FLAG_C, FLAG_Z, OPCODE_INDEX, OPCODE_INFO, OPCODES, TableALU8Bit,
+                 lookup_opcode, opcode_number, pack_flags, result_cache, unpack_flags, vector_format)
+from alu import model as alu_model
 
 # pytest is optional - only needed for advanced testing
 try:
@@ -30,179 +39,50 @@ except ImportError:
                     return func
                 return decorator
 
-
-class ALU8Bit:
-    """Software simulation of 8-bit ALU"""
-    
-    def __init__(self):
-        self.width = 8
-        self.mask = (1 << self.width) - 1
-        
-    def execute(self, opcode: str, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """Execute ALU operation and return result with flags"""
-        a = a & self.mask
-        b = b & self.mask
-        
-        operations = {
-            '00000': self.add,
-            '00001': self.sub,
-            '00010': self.inc_a,
-            '00011': self.dec_a,
-            '00100': self.lsl,
-            '00101': self.lsr,
-            '00110': self.asr,
-            '00111': self.rev_a,
-            '01000': self.nand,
-            '01001': self.nor,
-            '01010': self.xor,
-            '01011': self.pass_a,
-            '01100': self.pass_b,
-            '01101': self.and_op,
-            '01110': self.or_op,
-            '01111': self.xnor,
-            '10000': self.cmp,
-            '10001': self.not_a,
-            '10010': self.not_b,
-        }
-        
-        if opcode not in operations:
-            raise ValueError(f"Unknown opcode: {opcode}")
-            
-        return operations[opcode](a, b)
-    
-    def _flags(self, result: int, carry: bool = False, overflow: bool = False) -> Dict[str, bool]:
-        """Calculate standard flags"""
-        result_8bit = result & self.mask
-        return {
-            'carry': carry,
-            'zero': result_8bit == 0,
-            'overflow': overflow,
-            'negative': bool(result_8bit & 0x80)
-        }
-    
-    def add(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """ADD: A + B"""
-        result = a + b
-        carry = result > self.mask
-        overflow = ((a & 0x80) == (b & 0x80)) and ((a & 0x80) != (result & 0x80))
-        return result & self.mask, self._flags(result, carry, overflow)
-    
-    def sub(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """SUB: A - B"""
-        result = a - b
-        carry = result >= 0
-        overflow = ((a & 0x80) != (b & 0x80)) and ((a & 0x80) != (result & 0x80))
-        return result & self.mask, self._flags(result, carry, overflow)
-    
-    def inc_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """INC A: A + 1"""
-        result = a + 1
-        carry = result > self.mask
-        overflow = (a == 0x7F)
-        return result & self.mask, self._flags(result, carry, overflow)
-    
-    def dec_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """DEC A: A - 1"""
-        result = a - 1
-        carry = result >= 0
-        overflow = (a == 0x80)
-        return result & self.mask, self._flags(result, carry, overflow)
-    
-    def lsl(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """LSL: Logical shift left"""
-        carry = bool(a & 0x80)
-        result = (a << 1) & self.mask
-        return result, self._flags(result, carry, False)
-    
-    def lsr(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """LSR: Logical shift right"""
-        carry = bool(a & 0x01)
-        result = (a >> 1) & self.mask
-        return result, self._flags(result, carry, False)
-    
-    def asr(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """ASR: Arithmetic shift right"""
-        carry = bool(a & 0x01)
-        sign_bit = a & 0x80
-        result = ((a >> 1) | sign_bit) & self.mask
-        return result, self._flags(result, carry, False)
-    
-    def rev_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """REV A: Reverse bits"""
-        result = 0
-        for i in range(8):
-            if a & (1 << i):
-                result |= (1 << (7 - i))
-        return result, self._flags(result, False, False)
-    
-    def nand(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """NAND"""
-        result = (~(a & b)) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def nor(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """NOR"""
-        result = (~(a | b)) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def xor(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """XOR"""
-        result = (a ^ b) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def pass_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """PASS A"""
-        return a, self._flags(a, False, False)
-    
-    def pass_b(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """PASS B"""
-        return b, self._flags(b, False, False)
-    
-    def and_op(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """AND"""
-        result = (a & b) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def or_op(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """OR"""
-        result = (a | b) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def xnor(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """XNOR"""
-        result = (~(a ^ b)) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def cmp(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """CMP: Compare (flags only)"""
-        result = a - b
-        carry = result >= 0
-        overflow = ((a & 0x80) != (b & 0x80)) and ((a & 0x80) != (result & 0x80))
-        return 0, self._flags(result, carry, overflow)
-    
-    def not_a(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """NOT A"""
-        result = (~a) & self.mask
-        return result, self._flags(result, False, False)
-    
-    def not_b(self, a: int, b: int) -> Tuple[int, Dict[str, bool]]:
-        """NOT B"""
-        result = (~b) & self.mask
-        return result, self._flags(result, False, False)
+# NumPy is optional - only needed for the exhaustive batch test
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 # Global ALU instance for tests
 alu = ALU8Bit()
 
 
-def load_test_vectors():
-    """Load test vectors from JSON file"""
-    test_file = Path(__file__).parent / 'vectors' / 'demo.json'
+def import_script(name, directory='tools'):
+    """Import a script from a repository directory, adding the directory to sys.path once"""
+    path = str(Path(__file__).resolve().parent.parent / directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    return importlib.import_module(name)
+
+
+def load_test_vectors(test_file=None):
+    """Load test vectors from a JSON or binary vector file (default: demo.json)"""
+    if test_file is None:
+        test_file = Path(__file__).parent / 'vectors' / 'demo.json'
+    if vector_format.is_binary_vector_file(test_file):
+        with vector_format.VectorFile(test_file) as vectors:
+            return list(vectors.iter_dicts())
     with open(test_file, 'r') as f:
         data = json.load(f)
     return data.get('tests', [])
 
 
+def check_binary_vectors(test_file, skip=()):
+    """Check every record of a binary vector file; return list of failing indices"""
+    table_alu = TableALU8Bit()
+    failures = []
+    with vector_format.VectorFile(test_file) as vectors:
+        for index, (op, a, b, result, flags) in enumerate(vectors):
+            if OPCODES[op] in skip:
+                continue
+            if table_alu.execute_packed(op, a, b) != result | (flags << 8):
+                failures.append(index)
+    return failures
+
+
 # Parametrize tests with all test vectors
 @pytest.fixture(scope="module")
 def test_vectors():
@@ -409,34 +289,1227 @@ class TestFlags:
         assert flags['overflow'] == True
 
 
-def main():
-    """Run tests without pytest"""
+class TestWidths:
+    """Test the width-generic model at widened datapath widths"""
+    
+    @staticmethod
+    def _rev_reference(value, width):
+        return int(format(value, f'0{width}b')[::-1], 2)
+    
+    @pytest.mark.parametrize("width", [8, 12, 16, 32, 64])
+    def test_rev_a(self, width):
+        """REV A matches a per-bit reference without looping per bit"""
+        wide = ALU(width)
+        for value in (0, 1, wide.sign, wide.mask, 0x1234 & wide.mask, (wide.mask // 3)):
+            assert wide.execute('00111', value, 0)[0] == self._rev_reference(value, width)
+    
+    def test_width_8_matches_alu8bit(self):
+        """ALU(8) is the 8-bit golden model"""
+        wide = ALU(8)
+        operands = (0x00, 0x01, 0x7F, 0x80, 0xFF, 0x5A)
+        for opcode in OPCODES:
+            for a in operands:
+                for b in operands:
+                    assert wide.execute(opcode, a, b) == alu.execute(opcode, a, b)
+    
+    @pytest.mark.parametrize("width", [16, 32, 64])
+    def test_wide_flags(self, width):
+        """Sign, carry and overflow use the width's own sign bit"""
+        wide = ALU(width)
+        result, flags = wide.execute('00000', wide.max_signed, 1)
+        assert result == wide.sign and flags['overflow'] and flags['negative'] and not flags['carry']
+        result, flags = wide.execute('00000', wide.mask, 1)
+        assert result == 0 and flags['carry'] and flags['zero']
+        result, flags = wide.execute('00110', wide.sign, 0)
+        assert result == wide.sign | (wide.sign >> 1)
+        result, flags = wide.execute('00011', wide.sign, 0)
+        assert result == wide.max_signed and flags['overflow']
+        assert wide.execute('00000', 0x80, 0x80)[1]['overflow'] is False
+    
+    @pytest.mark.parametrize("width", [16, 32, 64])
+    def test_wide_batch(self, width):
+        """Batch execution at wide widths matches the scalar model"""
+        wide = ALU(width)
+        values = [0, 1, 2, wide.max_signed, wide.sign, wide.mask, wide.mask - 1,
+                  0x0123456789ABCDEF & wide.mask, 0xFEDCBA9876543210 & wide.mask]
+        a = [x for x in values for _ in values]
+        b = [y for _ in values for y in values]
+        for index in range(len(OPCODES)):
+            results, nzcv = wide.execute_batch(index, a, b)
+            entries = [wide.execute_packed(index, x, y) for x, y in zip(a, b)]
+            assert [int(r) for r in results] == [e & wide.mask for e in entries]
+            assert [int(n) for n in nzcv] == [e >> width for e in entries]
+    
+    def test_invalid_width(self):
+        """Widths below 2 bits are rejected"""
+        with pytest.raises(ValueError):
+            ALU(1)
+
+
+class TestOpcodeTable:
+    """Test opcode metadata loaded from spec/opcode/opcode_table.csv"""
+    
+    def test_opcodes_match_model(self):
+        """Every opcode in the table has a model operation and vice versa"""
+        assert list(OPCODES) == list(ALU8Bit().operations)
+        assert len(OPCODES) == 19
+    
+    def test_unquoted_commas(self):
+        """Extra fields from unquoted commas fold into the implementation text"""
+        info = OPCODE_INFO[OPCODE_INDEX['10000']]
+        assert info.mnemonic == 'CMP'
+        assert info.implementation == 'Arithmetic: A - B for flags, no output'
+        assert info.implemented
+    
+    def test_names_and_aliases(self):
+        """Mnemonics, aliases and test-name prefixes resolve to the same row"""
+        assert lookup_opcode('SLL') == lookup_opcode('lsl') == OPCODE_INFO[4]
+        assert lookup_opcode('NOT_A').opcode == '10001'
+        assert lookup_opcode('01100').test_prefix == 'PASS_B'
+        with pytest.raises(ValueError):
+            lookup_opcode('FOO')
+    
+    def test_opcode_number(self):
+        """Opcode strings win over decimal numbers, which must name a real opcode"""
+        assert opcode_number('00010') == opcode_number('INC A') == opcode_number('inc') == 2
+        assert opcode_number('00111') == opcode_number('REV') == 7
+        assert opcode_number(' 10 ') == 10
+        for name in ('19', '-1', '11111', 'FOO'):
+            with pytest.raises(ValueError):
+                opcode_number(name)
+    
+    def test_precompiled_table_current(self):
+        """alu/_opcode_table.py was generated from the current CSV"""
+        from alu import opcodes
+        from alu import _opcode_table
+        with open(opcodes.OPCODE_TABLE, 'r', encoding='utf-8', newline='') as f:
+            source = f.read()
+        assert _opcode_table.SOURCE == source
+        assert OPCODE_INFO == opcodes.parse_opcode_table(source)
+    
+    def test_cli_opcode_map(self):
+        """The CLI's operation names come from the table and cover OPERATION_INFO"""
+        import alu_cli
+        assert set(alu_cli.ALUInterface.OPCODE_MAP) == set(alu_cli.ALUInterface.OPERATION_INFO)
+        assert sorted(alu_cli.ALUInterface.OPCODE_MAP.values()) == list(OPCODES)
+
+
+class TestTableEngine:
+    """Test the precomputed table engine against the golden model"""
+    
+    def test_table_size(self):
+        """Table covers every (opcode, A, B) combination"""
+        assert len(TableALU8Bit().table) == len(OPCODES) * 256 * 256
+    
+    def test_table_matches_golden_model(self):
+        """Table lookups agree with the scalar model"""
+        table_alu = TableALU8Bit()
+        operands = list(range(0, 256, 7)) + [0x7F, 0x80, 0xFF]
+        for index, opcode in enumerate(OPCODES):
+            for a in operands:
+                for b in operands:
+                    assert table_alu.execute(opcode, a, b) == alu.execute(opcode, a, b)
+                    assert table_alu.execute_packed(index, a, b) == alu.execute_packed(index, a, b)
+    
+    def test_packed_flags(self):
+        """Packed entries carry the NZCV nibble above the result byte"""
+        entry = TableALU8Bit().execute_packed(OPCODE_INDEX['00000'], 255, 1)
+        assert entry & 0xFF == 0
+        assert entry >> 8 == FLAG_Z | FLAG_C
+        assert unpack_flags(entry >> 8) == alu.execute('00000', 255, 1)[1]
+    
+    def test_unknown_opcode(self):
+        """Unknown opcodes are rejected by both entry points"""
+        table_alu = TableALU8Bit()
+        with pytest.raises(ValueError):
+            table_alu.execute('11111', 0, 0)
+        with pytest.raises(ValueError):
+            table_alu.execute_packed(len(OPCODES), 0, 0)
+
+
+class TestBatch:
+    """Differential tests: execute_batch against the scalar golden model"""
+    
+    @staticmethod
+    def _scalar_reference(opcodes, a, b):
+        entries = [alu.execute_packed(op, x, y) for op, x, y in zip(opcodes, a, b)]
+        return [entry & 0xFF for entry in entries], [entry >> 8 for entry in entries]
+    
+    def test_batch_exhaustive(self):
+        """Vectorized batch matches the scalar model over the full input space"""
+        if np is None:
+            pytest.skip("NumPy not installed")
+        a = np.repeat(np.arange(256, dtype=np.uint8), 256)
+        b = np.tile(np.arange(256, dtype=np.uint8), 256)
+        for index in range(len(OPCODES)):
+            results, nzcv = alu.execute_batch(index, a, b)
+            expected_results, expected_nzcv = self._scalar_reference([index] * len(a), a.tolist(), b.tolist())
+            assert results.tolist() == expected_results, f"result mismatch for {OPCODES[index]}"
+            assert nzcv.tolist() == expected_nzcv, f"flag mismatch for {OPCODES[index]}"
+    
+    def test_batch_mixed_opcodes(self):
+        """Interleaved opcodes in one batch are routed to the right group"""
+        opcodes = bytes(i % len(OPCODES) for i in range(4096))
+        a = bytes((i * 37) & 0xFF for i in range(4096))
+        b = bytes((i * 101 + 7) & 0xFF for i in range(4096))
+        results, nzcv = alu.execute_batch(opcodes, a, b)
+        expected_results, expected_nzcv = self._scalar_reference(opcodes, a, b)
+        assert list(results) == expected_results
+        assert list(nzcv) == expected_nzcv
+    
+    def test_batch_python_fallback(self, monkeypatch):
+        """Without NumPy the batch path still matches the scalar model"""
+        monkeypatch.setattr(alu_model, '_numpy', lambda: None)
+        opcodes = array('B', [0, 1, 7, 16, 18])
+        a = array('B', [0xFF, 0x03, 0x80, 0x0A, 0x00])
+        b = array('B', [0x01, 0x0A, 0x00, 0x05, 0xF0])
+        results, nzcv = alu.execute_batch(opcodes, a, b)
+        assert isinstance(results, array)
+        assert (list(results), list(nzcv)) == self._scalar_reference(opcodes, a, b)
+    
+    def test_batch_unknown_opcode(self, monkeypatch):
+        """Out-of-range opcodes are rejected by both paths, including ones that wrap to valid bytes"""
+        cases = [bytes([19]), [256, 1], [-1, 0], [2 ** 64, 0]]
+        if np is not None:
+            cases += [np.array([256, 1]), np.array([2 ** 63, 0], dtype=np.uint64)]
+        for fallback in (False, True):
+            if fallback:
+                monkeypatch.setattr(alu_model, '_numpy', lambda: None)
+            for opcodes in cases:
+                with pytest.raises(ValueError):
+                    alu.execute_batch(opcodes, [0] * len(opcodes), [0] * len(opcodes))
+
+
+class TestBinaryVectors:
+    """Test the compact binary vector format"""
+    
+    def _write_demo(self, path):
+        with vector_format.VectorWriter(path) as writer:
+            for test in load_test_vectors():
+                writer.write(OPCODE_INDEX[test['opcode']], test['A'], test['B'],
+                             test['expected_result'], pack_flags(test['expected_flags']))
+        return path
+    
+    def test_round_trip(self, tmp_path):
+        """Binary records read back as the same vectors"""
+        path = self._write_demo(tmp_path / 'demo.bin')
+        demo = load_test_vectors()
+        assert path.stat().st_size == vector_format.HEADER_SIZE + len(demo) * vector_format.RECORD_SIZE
+        
+        loaded = load_test_vectors(path)
+        assert len(loaded) == len(demo)
+        for original, record in zip(demo, loaded):
+            for key in ('opcode', 'A', 'B', 'expected_result', 'expected_flags'):
+                assert original[key] == record[key]
+    
+    def test_records_match_model(self, tmp_path):
+        """Every demo record passes against the table engine"""
+        path = self._write_demo(tmp_path / 'demo.bin')
+        assert check_binary_vectors(path) == []
+    
+    def test_derived_names_and_columns(self, tmp_path):
+        """Names are derived on demand and columns are zero-copy views"""
+        path = tmp_path / 'small.bin'
+        vector_format.write_vectors(path, [(0, 0x2A, 0x17, 0x41, 0), (7, 0x80, 0, 0x01, 0)])
+        with vector_format.VectorFile(path) as vectors:
+            assert vectors.test_name(0) == 'ADD_2A_17'
+            assert vectors.test_name(1) == 'REV_A_80_00'
+            assert list(vectors.column(1)) == [0x2A, 0x80]
+            assert vectors[-1] == (7, 0x80, 0, 0x01, 0)
+    
+    def test_runner_checks_records_in_batches(self, tmp_path, monkeypatch):
+        """tools/run_tests.py checks binary records without building dicts and reports a bad record"""
+        run_tests = import_script('run_tests')
+        path = tmp_path / 'demo.bin'
+        records = [(OPCODE_INDEX[t['opcode']], t['A'], t['B'], t['expected_result'], pack_flags(t['expected_flags']))
+                   for t in load_test_vectors()]
+        records[1000] = records[1000][:3] + (records[1000][3] ^ 1, records[1000][4])
+        vector_format.write_vectors(path, records)
+        monkeypatch.setattr(run_tests, 'BATCH_RECORDS', 256)
+        monkeypatch.setattr(vector_format.VectorFile, 'iter_dicts', None)
+        results = run_tests.evaluate_vectors(path, run_tests.make_backend('golden'))
+        assert run_tests.summarize(results) == (1899, 1)
+        assert [r.test_name for r in results if not r.passed] == [vector_format.test_name(*records[1000][:3])]
+        with vector_format.VectorFile(path) as vectors:
+            expected = run_tests.evaluate_test(path, vectors.as_dict(1000), run_tests.make_backend('golden'))
+        assert results[1000] == expected
+    
+    def test_rejects_bad_header(self, tmp_path):
+        """Files without the magic are rejected"""
+        path = tmp_path / 'bad.bin'
+        path.write_bytes(b'NOPE' + bytes(32))
+        with pytest.raises(ValueError):
+            vector_format.VectorFile(path)
+
+
+class TestResultCache:
+    """Verification results keyed by vector and implementation hashes"""
+    
+    def _store_all(self, cache, path):
+        alu = ALU8Bit()
+        digest = cache.vector_digest(path)
+        impl = result_cache.implementation_digests(alu)
+        cache.store(digest, impl, {opcode: {'passed': 3, 'failed': 0} for opcode in impl})
+        return digest, impl
+    
+    def test_unchanged_inputs_replay(self, tmp_path):
+        """A saved run is fully replayable for the same vectors and model"""
+        vectors = tmp_path / 'v.bin'
+        vector_format.write_vectors(vectors, [(0, 1, 2, 3, 0)])
+        cache = result_cache.ResultCache(tmp_path / 'cache.json')
+        self._store_all(cache, vectors)
+        cache.save()
+        
+        reloaded = result_cache.ResultCache(tmp_path / 'cache.json')
+        _, _, cached, complete = result_cache.load_cached(vectors, ALU8Bit(), reloaded)
+        assert complete
+        assert cached['00000'] == {'passed': 3, 'failed': 0}
+    
+    def test_changed_opcode_is_rerun(self, tmp_path):
+        """Only opcodes whose implementation changed drop out of the cache"""
+        vectors = tmp_path / 'v.bin'
+        vector_format.write_vectors(vectors, [(0, 1, 2, 3, 0)])
+        cache = result_cache.ResultCache(tmp_path / 'cache.json')
+        digest, impl = self._store_all(cache, vectors)
+        
+        changed = dict(impl, **{'00001': 'changed'})
+        cached = cache.lookup(digest, changed)
+        assert '00001' not in cached and '00000' in cached
+        assert not cache.is_complete(digest, cached)
+    
+    def test_whole_file_run_checks_every_vector(self, tmp_path):
+        """run_json_tests.run_tests checks all 1900 demo vectors and skips only cached opcodes"""
+        runner = import_script('run_json_tests', 'test/scripts')
+        tests = load_test_vectors()
+        tests[150]['expected_result'] ^= 1  # Middle of the SUB vectors
+        path = tmp_path / 'demo.json'
+        path.write_text(json.dumps({'tests': tests}))
+        passed, failed, total, op_stats = runner.run_tests(path)
+        assert (passed, failed, total) == (1899, 1, 1900)
+        assert op_stats['00001'] == {'passed': 99, 'failed': 1}
+        
+        passed, failed, total, op_stats = runner.run_tests(path, {'00001': {'passed': 100, 'failed': 0}})
+        assert (passed, failed, total) == (1900, 0, 1900)
+    
+    def test_shared_code_and_data_change_every_digest(self, tmp_path, monkeypatch):
+        """Module-level tables and the opcode CSV are hashed; the opcode methods are hashed per opcode"""
+        from alu import model, opcodes
+        before = result_cache.implementation_digests(ALU8Bit())
+        source = result_cache._source
+        monkeypatch.setattr(result_cache, '_source',
+                            lambda obj: source(obj).replace("[::-1]", "[::1]") if obj is model else source(obj))
+        assert all(digest not in before.values() for digest in result_cache.implementation_digests(ALU8Bit()).values())
+        
+        monkeypatch.setattr(result_cache, '_source', source)
+        table = tmp_path / 'opcode_table.csv'
+        table.write_text(Path(opcodes.OPCODE_TABLE).read_text(encoding='utf-8') + '\n', encoding='utf-8')
+        monkeypatch.setattr(opcodes, 'OPCODE_TABLE', str(table))
+        assert all(digest not in before.values() for digest in result_cache.implementation_digests(ALU8Bit()).values())
+    
+    def test_file_cache_rewrites_only_on_change(self, tmp_path):
+        """FileCache saves after a store or an mtime-only hit, not after a plain hit"""
+        source = tmp_path / 'model.txt'
+        source.write_text('x')
+        cache_file = tmp_path / 'cache.json'
+        
+        def open_cache():
+            return result_cache.FileCache(cache_file, 1, lambda model: [model], lambda data: data[0])
+        
+        cache = open_cache()
+        cache.store(source, 'parsed')
+        cache.save()
+        cache = open_cache()
+        assert cache.load(source) == 'parsed' and not cache.dirty
+        
+        os.utime(source, ns=(1, 1))
+        cache = open_cache()
+        assert cache.load(source) == 'parsed' and cache.dirty
+        cache.save()
+        assert json.loads(cache_file.read_text())['files'][str(source.resolve())]['mtime_ns'] == 1
+        cache = open_cache()
+        assert cache.load(source) == 'parsed' and not cache.dirty
+    
+    def test_failures_not_cached(self, tmp_path):
+        """Opcodes with failures are always re-verified"""
+        cache = result_cache.ResultCache(tmp_path / 'cache.json')
+        impl = result_cache.implementation_digests(ALU8Bit())
+        cache.store('d', impl, {'00000': {'passed': 1, 'failed': 1}, '00001': {'passed': 2, 'failed': 0}})
+        assert set(cache.lookup('d', impl)) == {'00001'}
+    
+    def test_vector_change_invalidates(self, tmp_path):
+        """Editing the vector file changes its digest"""
+        vectors = tmp_path / 'v.bin'
+        vector_format.write_vectors(vectors, [(0, 1, 2, 3, 0)])
+        cache = result_cache.ResultCache(tmp_path / 'cache.json')
+        before = cache.vector_digest(vectors)
+        vector_format.write_vectors(vectors, [(0, 1, 2, 3, 0), (1, 2, 1, 1, 0)])
+        assert cache.vector_digest(vectors) != before
+
+
+
+class TestCLIBatch:
+    """Test alu_cli.py --batch line processing"""
+    
+    def _run(self, text, **kwargs):
+        import io
+        import alu_cli
+        out = io.StringIO()
+        errors = alu_cli.run_batch(alu_cli.ALUInterface(), io.StringIO(text), out, **kwargs)
+        return errors, out.getvalue().splitlines()
+    
+    def test_text_lines(self):
+        """'OP A B' lines give one result line each; comments are skipped"""
+        errors, lines = self._run("ADD 42 23\n# comment\n\nSUB,3,10\n")
+        assert errors == 0
+        assert lines == ["65 C=0 Z=0 N=0 V=0", "249 C=0 Z=0 N=1 V=0"]
+    
+    def test_json_lines(self):
+        """JSON input echoes the record with result and flags added"""
+        import json
+        errors, lines = self._run('{"opcode": "10001", "A": 240, "B": 0, "id": 3}\n')
+        record = json.loads(lines[0])
+        assert errors == 0
+        assert (record['id'], record['result'], record['flags']['zero']) == (3, 15, False)
+    
+    def test_bad_lines_continue(self):
+        """Bad lines report an error and do not stop the batch"""
+        errors, lines = self._run("FOO 1 2\nADD 300 1\nADD 1 1\n", quiet=True)
+        assert errors == 2
+        assert lines[0].startswith("ERROR line 1") and lines[-1] == "2"
+
+
+class TestCLIInteractive:
+    """Test the alu_cli.py interactive REPL"""
+    
+    def _run(self, *lines):
+        import io
+        import alu_cli
+        out = io.StringIO()
+        alu_cli.ALURepl(alu_cli.ALUInterface(), out).run(lines)
+        return out.getvalue().splitlines()
+    
+    def test_chaining_previous_result(self):
+        """'_' and 'ans' refer to the previous result across ';'-separated ops"""
+        lines = self._run("ADD 42 23; LSL _; XOR ans 0xFF")
+        assert [line.split('=')[1].split()[0] for line in lines] == ['65', '130', '125']
+        assert all(line.endswith('µs)') for line in lines)
+    
+    def test_errors_and_quit(self):
+        """Errors are reported without leaving; quit stops reading"""
+        lines = self._run("ADD _ 1", "FOO 1 2", "quit", "ADD 1 1")
+        assert lines == ["Error: no previous result yet", "Error: Unknown operation: FOO"]
+    
+    def test_engine_switch_keeps_fpga_link(self):
+        """Switching engines keeps the mode, serial port and baud rate"""
+        import io
+        import alu_cli
+        interface = alu_cli.ALUInterface(port='/dev/ttyUSB0', baudrate=9600)
+        interface.mode = 'fpga'
+        repl = alu_cli.ALURepl(interface, io.StringIO())
+        repl.run(["engine table"])
+        assert isinstance(repl.interface.alu, TableALU8Bit)
+        assert (repl.interface.mode, repl.interface.port, repl.interface.baudrate) == ('fpga', '/dev/ttyUSB0', 9600)
+
+
+class TestService:
+    """Test the asyncio socket service and client (alu/service.py)"""
+    
+    def _with_server(self, session, protocol='binary'):
+        import asyncio
+        from alu.service import ALUClient, ALUServer, format_address
+        
+        async def run():
+            server = ALUServer(ALU8Bit())
+            listener = await server.start('127.0.0.1:0')
+            async with listener:
+                client = await ALUClient.connect(format_address(listener), protocol)
+                async with client:
+                    return await session(client, server, listener)
+        return asyncio.run(run())
+    
+    def test_binary_single_and_batch(self):
+        """Single operations and batch frames match the golden model"""
+        async def session(client, server, listener):
+            single = await client.execute(0, 42, 23)
+            batch = await client.request([(1, 3, 10), (7, 0x01, 0), (16, 5, 5)])
+            return single, batch
+        single, batch = self._with_server(session)
+        assert single == alu.execute('00000', 42, 23)
+        assert batch == [alu.execute_packed(1, 3, 10), alu.execute_packed(7, 1, 0),
+                         alu.execute_packed(16, 5, 5)]
+    
+    def test_pipelined_requests(self):
+        """Many concurrent requests on one connection come back in order"""
+        import asyncio
+        
+        async def session(client, server, listener):
+            return await asyncio.gather(*(client.request([(i % 19, i, 255 - i)]) for i in range(256)))
+        results = self._with_server(session)
+        assert [entry for (entry,) in results] == [
+            alu.execute_packed(i % 19, i, 255 - i) for i in range(256)]
+    
+    def test_errors_and_stats(self):
+        """Bad opcodes get an error response; counters track the traffic"""
+        async def session(client, server, listener):
+            with pytest.raises(ValueError, match="Unknown opcode"):
+                await client.request([(0, 1, 1), (30, 1, 1)])
+            await client.request([(0, 1, 1)] * 10)
+            return await client.stats()
+        stats = self._with_server(session)
+        assert stats['errors'] == 1
+        assert stats['operations'] == 10
+        # The stats request itself is counted after its reply is built
+        assert stats['requests']['binary'] == 2
+        assert stats['latency']['count'] == 2
+    
+    def test_jsonl_framing(self):
+        """JSON Lines requests: single, batch and per-line errors"""
+        import asyncio
+        
+        async def session(client, server, listener):
+            host, port = listener.sockets[0].getsockname()[:2]
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(b'{"op": "INC A", "A": 41, "B": 0, "id": 1}\n'
+                         b'{"batch": [["ADD", 1, 2], ["00001", 3, 10]], "id": 2}\n'
+                         b'{"op": "FOO", "A": 1, "B": 2, "id": 3}\n')
+            await writer.drain()
+            replies = [json.loads(await reader.readline()) for _ in range(3)]
+            writer.close()
+            return replies, await client.request([(0, 200, 100)])
+        replies, (entry,) = self._with_server(session, protocol='jsonl')
+        assert replies[0]['result'] == 42 and replies[0]['id'] == 1
+        assert [r['result'] for r in replies[1]['results']] == [3, 249]
+        assert replies[1]['results'][1]['flags']['negative']
+        assert replies[2] == {'id': 3, 'error': 'Unknown operation: FOO'}
+        assert entry == alu.execute_packed(0, 200, 100)
+
+    def test_bad_responses_fail_pending_requests(self):
+        """Mismatched tags, unsolicited frames and malformed replies fail every request on the connection"""
+        import asyncio
+        from alu.service import FRAME, FRAME_SIZE, KIND_RESULT, KIND_STATS_REPLY, ALUClient
+
+        async def exchange(protocol, respond):
+            async def handle(reader, writer):
+                if protocol == 'binary':
+                    await reader.readexactly(FRAME_SIZE + 3)
+                else:
+                    await reader.readline()
+                writer.write(respond)
+                await writer.drain()
+                await reader.read()
+
+            server = await asyncio.start_server(handle, '127.0.0.1', 0)
+            async with server:
+                host, port = server.sockets[0].getsockname()[:2]
+                client = await ALUClient.connect(f"{host}:{port}", protocol)
+                async with client:
+                    requests = [asyncio.ensure_future(client.request([(0, 1, 2)])) for _ in range(2)]
+                    done = await asyncio.wait_for(asyncio.gather(*requests, return_exceptions=True), 5)
+                    with pytest.raises(ConnectionError):
+                        await client.request([(0, 1, 2)])
+                    return done
+
+        for protocol, respond in [('binary', FRAME.pack(KIND_RESULT, 0, 1, 7) + b'\x00\x00'),
+                                  ('binary', FRAME.pack(KIND_STATS_REPLY, 0, 3, 0) + b'{x}'),
+                                  ('jsonl', b'{"result": \n'),
+                                  ('jsonl', b'{"results": [{}]}\n')]:
+            results = asyncio.run(exchange(protocol, respond))
+            assert all(isinstance(result, ConnectionError) for result in results), (protocol, respond, results)
+
+    def test_latency_histogram(self):
+        """Percentiles report the upper bound of their power-of-two bucket"""
+        from alu.service import LatencyHistogram
+        histogram = LatencyHistogram()
+        for micros in [0.5, 3, 3, 3, 100]:
+            histogram.record(micros / 1e6)
+        assert histogram.percentile(0.5) == 4
+        assert histogram.percentile(1.0) == 128
+        assert histogram.to_dict()['buckets'] == {'<1us': 1, '<4us': 3, '<128us': 1}
+
+
+@pytest.mark.skipif(not hasattr(os, 'openpty'), reason="needs a pseudo-terminal")
+class TestFPGALink:
+    """Test the batched serial transport against the pty loopback emulator"""
+    
+    def test_batched_pipelined_round_trip(self):
+        """Batches spanning several frames and windows match the golden model"""
+        from alu.fpga_link import LoopbackEmulator, SerialTransport, open_port
+        records = [(i % 19, (i * 7) & 0xFF, (i * 13) & 0xFF) for i in range(1000)]
+        with LoopbackEmulator() as emulator:
+            transport = SerialTransport(open_port(emulator.port), frame_records=64, window=3)
+            try:
+                assert transport.execute_batch(records) == [alu.execute_packed(*r) for r in records]
+                assert transport.execute_packed(0, 42, 23) == alu.execute_packed(0, 42, 23)
+            finally:
+                transport.close()
+            assert emulator.frames == 17
+            assert emulator.operations == 1001
+    
+    def test_errors_and_resync(self):
+        """Board errors raise OSError; line noise and responses to abandoned frames are skipped"""
+        from alu.fpga_link import LoopbackEmulator, SerialTransport, open_port
+        records = [(i % 19, i, 255 - i) for i in range(12)]
+        with LoopbackEmulator(turnaround=0.01) as emulator:
+            transport = SerialTransport(open_port(emulator.port, timeout=1.0), frame_records=2, window=4)
+            try:
+                with pytest.raises(OSError, match="Unknown opcode"):
+                    transport.execute_batch([(0, 1, 1), (25, 1, 1)])
+                # Fail on the first frame of a window; the next batch must not see the other three
+                with pytest.raises(OSError, match="Unknown opcode"):
+                    transport.execute_batch([(0, 1, 1), (25, 1, 1)] + records)
+                assert transport.execute_batch(records) == [alu.execute_packed(*r) for r in records]
+                # Noise in both directions, including a bogus sync byte and header
+                os.write(emulator._master, b'\x00\x5a\x81junk')
+                transport.port.write(b'\xa5\x01zz')
+                assert transport.execute_packed(1, 3, 10) == alu.execute_packed(1, 3, 10)
+            finally:
+                transport.close()
+    
+    def test_frame_crc(self):
+        """Corrupted frames are reported rather than decoded"""
+        from alu import fpga_link
+        frame = bytearray(fpga_link.encode_frame(fpga_link.REQUEST_SYNC, fpga_link.KIND_EXECUTE,
+                                                 7, 1, bytes([0, 1, 2])))
+        assert fpga_link.decode_frames(frame, fpga_link.REQUEST_SYNC)[0] == [
+            (fpga_link.KIND_EXECUTE, 7, 1, bytes([0, 1, 2]))]
+        frame[-3] ^= 0xFF
+        frames, _ = fpga_link.decode_frames(frame, fpga_link.REQUEST_SYNC)
+        assert frames == [(fpga_link.KIND_ERROR, 7, 0, b'CRC mismatch')]
+    
+    def test_cli_fpga_mode(self):
+        """ALUInterface in FPGA mode uses one pooled port for single and batch calls"""
+        import io
+        import alu_cli
+        from alu import fpga_link
+        with fpga_link.LoopbackEmulator() as emulator:
+            interface = alu_cli.ALUInterface(port=emulator.port)
+            interface.mode = 'fpga'
+            try:
+                assert interface.execute('ADD', 42, 23) == alu.execute('00000', 42, 23)
+                out = io.StringIO()
+                errors = alu_cli.run_batch(interface, io.StringIO("SUB 3 10\nFOO 1 2\nINC 41 0\n"), out)
+                assert interface._transport() is interface._transport()
+            finally:
+                fpga_link.close_transports()
+        assert errors == 1
+        assert out.getvalue().splitlines() == [
+            "249 C=0 Z=0 N=1 V=0", "ERROR line 2: Unknown operation: FOO", "42 C=0 Z=0 N=0 V=0"]
+        assert emulator.frames == 2
+
+
+class TestNetlist:
+    """Test the gate-level simulator of sim/top/alu_top.circ (alu/netlist.py)"""
+    
+    def test_schedule_is_levelized(self):
+        """The circuit flattens without floating signals, and cells follow their drivers"""
+        from alu.netlist import load_netlist
+        netlist = load_netlist()
+        assert {name: len(bits) for name, bits in netlist.inputs.items()} == {
+            'A_IN': 8, 'B_IN': 8, 'GND': 1, 'CTRL': 5}
+        assert netlist.floating == []
+        levels = {cell.output: cell.level for cell in netlist.cells}
+        for cell in netlist.cells:
+            assert all(levels.get(s, 0) < cell.level for s in cell.inputs + cell.select)
+    
+    def test_results_match_golden_model(self):
+        """Every opcode but CMP produces the golden result (flags differ by design)"""
+        from alu.netlist import NetlistALU8Bit
+        netlist_alu = NetlistALU8Bit()
+        for opcode in range(len(OPCODES)):
+            if OPCODE_INFO[opcode].mnemonic == 'CMP':
+                continue
+            for a, b in [(42, 23), (3, 10), (0xFF, 0x01), (0x81, 0x7F), (0, 0), (0xA5, 0x3C)]:
+                assert netlist_alu.execute_packed(opcode, a, b) & 0xFF == alu.execute_packed(opcode, a, b) & 0xFF
+    
+    def test_bitsliced_batch_matches_scalar(self):
+        """A bitsliced batch gives the same entries as one vector at a time"""
+        from alu.netlist import NetlistALU8Bit
+        netlist_alu = NetlistALU8Bit()
+        ops = array('B', [0, 1, 4, 7, 11, 16, 18, 19, 31, 2])
+        a = array('B', [200, 3, 0x80, 0x01, 0x0F, 5, 0xF0, 9, 9, 0xFF])
+        b = array('B', [100, 10, 0, 0, 0xF0, 5, 0, 9, 9, 0])
+        results, nzcv = netlist_alu.execute_batch(ops, a, b)
+        expected = [netlist_alu.execute_packed(op, x, y) for op, x, y in zip(ops, a, b)]
+        assert [int(r) | int(f) << 8 for r, f in zip(results, nzcv)] == expected
+        with pytest.raises(ValueError):
+            netlist_alu.execute_batch(array('B', [32]), a[:1], b[:1])
+
+    def test_batch_unknown_opcode(self, monkeypatch):
+        """Opcodes outside CTRL's 5 bits are rejected, including ones that wrap to valid bytes"""
+        from alu.netlist import NetlistALU8Bit
+        netlist_alu = NetlistALU8Bit()
+        cases = [bytes([32]), [256, 1], [-1, 0], [2 ** 64, 0]]
+        if np is not None:
+            cases += [np.array([256, 1]), np.array([2 ** 63, 0], dtype=np.uint64)]
+        for fallback in (False, True):
+            if fallback:
+                monkeypatch.setattr(alu_model, '_numpy', lambda: None)
+            for opcodes in cases:
+                with pytest.raises(ValueError):
+                    netlist_alu.execute_batch(opcodes, [0] * len(opcodes), [0] * len(opcodes))
+
+    def test_bitsliced_python_fallback(self, monkeypatch):
+        """Bitslicing without NumPy gives the same entries"""
+        from alu.netlist import NetlistALU8Bit
+        netlist_alu = NetlistALU8Bit()
+        a = array('B', [200, 3, 0x80, 0])
+        b = array('B', [100, 10, 0, 0])
+        with_numpy = netlist_alu.execute_batch(1, a, b)
+        monkeypatch.setattr(alu_model, '_numpy', lambda: None)
+        results, nzcv = netlist_alu.execute_batch(1, a, b)
+        assert isinstance(results, array)
+        assert (list(results), list(nzcv)) == (list(with_numpy[0]), list(with_numpy[1]))
+    
+    def test_exhaustive_results(self):
+        """Over the whole input space only CMP's result differs from the golden model"""
+        from alu.netlist import NetlistALU8Bit
+        netlist_alu = NetlistALU8Bit()
+        a = array('B', bytes(x for x in range(256) for _ in range(256)))
+        b = array('B', bytes(range(256)) * 256)
+        for opcode in range(len(OPCODES)):
+            results, _ = netlist_alu.execute_batch(opcode, a, b)
+            expected, _ = alu.execute_batch(opcode, a, b)
+            same = list(results) == list(expected)
+            assert same == (OPCODE_INFO[opcode].mnemonic != 'CMP'), OPCODE_INFO[opcode].mnemonic
+    
+    def test_structural_errors(self):
+        """Combinational loops and conflicting drivers are rejected"""
+        from alu.netlist import Circuit, Component, NetlistError, build_netlist
+        loop = Circuit([Component('NOT Gate', (100, 100), {})], [((70, 100), (100, 100))], {})
+        with pytest.raises(NetlistError):
+            build_netlist(loop)
+        conflict = Circuit([Component('Constant', (100, 100), {}),
+                            Component('Constant', (100, 120), {'value': '0x0'})],
+                           [((100, 100), (100, 120))], {})
+        with pytest.raises(NetlistError):
+            build_netlist(conflict)
+
+
+class TestCircuitFile:
+    """Test the indexed, cached .circ reader (alu/circ.py)"""
+
+    def test_cache_skips_parse_until_content_changes(self, tmp_path, monkeypatch):
+        """An unchanged file (even with a new mtime) loads from the cache; an edited one is re-parsed"""
+        import shutil
+        from alu import circ
+        from alu.netlist import DEFAULT_CIRCUIT
+        path = tmp_path / 'alu_top.circ'
+        shutil.copy(DEFAULT_CIRCUIT, path)
+        cache_file = tmp_path / 'cache.json'
+        parsed = circ.load_circuit(path, cache_file=cache_file)
+        assert parsed == circ.parse_circuit(path)
+
+        def no_parse(_):
+            raise AssertionError("parsed despite the cache")
+        monkeypatch.setattr(circ, 'parse_file', no_parse)
+        assert circ.load_circuit(path, cache_file=cache_file) == parsed
+        os.utime(path, ns=(0, 0))
+        assert circ.load_circuit(path, cache_file=cache_file) == parsed
+
+        path.write_text(path.read_text().replace('label" val="OVERALL"', 'label" val="RESULT"'))
+        with pytest.raises(AssertionError):
+            circ.load_circuit(path, cache_file=cache_file)
+
+    def test_index_resolves_tunnels_into_nets(self):
+        """Tunnels with the same label share a net; components are indexed by library and name"""
+        from alu.circ import CircuitIndex, load_circuit
+        from alu.netlist import DEFAULT_CIRCUIT
+        index = CircuitIndex(load_circuit(DEFAULT_CIRCUIT))
+        for label, tunnels in index.tunnels.items():
+            assert len({index.net(tunnel.loc) for tunnel in tunnels}) == 1, label
+        assert index.by_name['Multiplexer'] == [c for c in index.by_lib['2'] if c.name == 'Multiplexer']
+        assert all(comp.loc == loc for loc, comps in index.at.items() for comp in comps)
+
+
+class TestComponentInventory:
+    """Test the KiCad reader and the batch component analysis (tools/analyze_components.py)"""
+
+    def _schematic(self, path, symbols=(), sheets=()):
+        body = ''.join(f'(symbol (lib_id "{lib_id}") (unit {unit}) (property "Reference" "{ref}") '
+                       f'(property "Value" "{value}"))\n' for lib_id, ref, value, unit in symbols)
+        body += ''.join(f'(sheet (property "Sheetname" "{name}") (property "Sheetfile" "{file}"))\n'
+                        for name, file in sheets)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f'(kicad_sch (version 20231120)\n(lib_symbols (symbol "Device:R"))\n{body})\n')
+        return path
+
+    def test_hierarchy_is_flattened(self, tmp_path):
+        """Sub-sheets are summed into their parent once per instance; multi-unit parts count once"""
+        tools = import_script('analyze_components')
+        gate = self._schematic(tmp_path / 'gate' / 'gate.kicad_sch', [
+            ('Simulation_SPICE:NMOS', 'Q1', 'NMOS', 1), ('Simulation_SPICE:PMOS', 'Q2', 'PMOS', 1),
+            ('Simulation_SPICE:NMOS', 'Q?', 'NMOS', 1), ('Simulation_SPICE:NMOS', 'Q?', 'NMOS', 1)])
+        board = self._schematic(tmp_path / 'board' / 'board.kicad_sch', [
+            ('74xx:74HC86', 'U1', '74HC86', 1), ('74xx:74HC86', 'U1', '74HC86', 2),
+            ('Device:R', 'R1', '1k', 1), ('power:GND', '#PWR01', 'GND', 1)],
+            [('g0', '../gate/gate.kicad_sch'), ('g1', '../gate/gate.kicad_sch'), ('x', 'missing.kicad_sch')])
+        results = {tools.relative(path): tools.analyze_file(path) for path in (gate, board)}
+        totals, missing = tools.flatten_schematics(results)
+        total = totals[tools.relative(board)]
+        assert total['transistors'] == {'NMOS': 6, 'PMOS': 2}
+        assert total['ics'] == {'74HC86': 1}
+        assert total['passives'] == {'R': 1}
+        assert missing == {tools.relative(board): [tools.relative(tmp_path / 'board' / 'missing.kicad_sch')]}
+
+    def test_cache_reanalyzes_only_changed_files(self, tmp_path):
+        """A second run reuses every result; editing one file re-analyzes just that file"""
+        tools = import_script('analyze_components')
+        files = [self._schematic(tmp_path / f'm{i}.kicad_sch', [('Device:C', 'C1', '100n', 1)]) for i in range(3)]
+        cache = tools.InventoryCache(tmp_path / 'cache.json')
+        first, analyzed = tools.analyze_all(files, jobs=1, cache=cache)
+        assert analyzed == 3
+        cache.save(files)
+
+        self._schematic(files[1], [('Device:C', 'C1', '100n', 1), ('Device:C', 'C2', '100n', 1)])
+        second, analyzed = tools.analyze_all(files, jobs=1, cache=tools.InventoryCache(tmp_path / 'cache.json'))
+        assert analyzed == 1
+        assert second[tools.relative(files[0])] == first[tools.relative(files[0])]
+        assert second[tools.relative(files[1])]['parts']['passives'] == {'C': 2}
+
+        # Files no longer found are dropped when the cache is saved
+        cache = tools.InventoryCache(tmp_path / 'cache.json')
+        cache.save(files[:2])
+        assert len(tools.InventoryCache(tmp_path / 'cache.json').data['files']) == 2
+
+
+class TestKicad:
+    """Test the streaming, indexed KiCad reader (alu/kicad.py)"""
+
+    BOARD = '''(kicad_pcb (version 20241229)
+\t(net 0 "")
+\t(net 1 "VCC")
+\t(net 2 "Net-(Q1-D)")
+\t(footprint "Package_TO_SOT_SMD:TSOT-23"
+\t\t(property "Reference" "Q1" (effects (font (size 1 1))))
+\t\t(property "Value" "NMOS")
+\t\t(fp_line (start 0 0) (end 1 1))
+\t\t(pad "1" smd roundrect (net 2 "Net-(Q1-D)"))
+\t\t(pad "2" smd roundrect (net 1 "VCC"))
+\t\t(pad "3" smd roundrect)
+\t)
+\t(footprint "Package_SO:SOIC-14"
+\t\t(fp_text reference "U1")
+\t\t(fp_text value "74HC86")
+\t\t(pad "14" smd rect (net "VCC"))
+\t)
+\t(segment (start 0 0) (end 1 1) (net 1))
+)
+'''
+
+    def test_streaming_matches_full_parse(self):
+        """Chunk boundaries do not split tokens, and skipped items are never built"""
+        from alu.kicad import _BOARD_ITEMS, parse_sexpr, read_items, tokenize
+        text = self.BOARD
+        chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+        assert list(tokenize(chunks)) == list(tokenize([text]))
+        kind, items = read_items(tokenize(chunks), _BOARD_ITEMS)
+        assert kind == 'kicad_pcb'
+        full = [item for item in parse_sexpr(text)[1:] if isinstance(item, list) and item[0] in _BOARD_ITEMS]
+        assert [item[:2] for item in items] == [item[:2] for item in full]
+        assert not any(isinstance(child, list) and child[0] == 'fp_line' for item in items for child in item)
+
+    def test_index_queries_and_cache(self, tmp_path, monkeypatch):
+        """Nets by part, pads by net and part counts; an unchanged file loads from the cache"""
+        from alu import kicad
+        path = tmp_path / 'board.kicad_pcb'
+        path.write_text(self.BOARD)
+        cache_file = tmp_path / 'cache.json'
+        index = kicad.KicadIndex(kicad.load_file(path, cache_file))
+        assert index.nets_of('Q1') == ['Net-(Q1-D)', 'VCC']
+        assert sorted(index.pads_on['VCC']) == [('Q1', '2'), ('U1', '14')]
+        assert index.count('NMOS', 'PMOS') == 1 and index.count('74HC*') == 1
+
+        def no_parse(_):
+            raise AssertionError("parsed despite the cache")
+        monkeypatch.setattr(kicad, 'parse_file', no_parse)
+        assert kicad.load_file(path, cache_file) == index.file
+
+
+class TestKicadCleanup:
+    """Test the single-scan cleanup planner (tools/cleanup_kicad.py)"""
+
+    def _tree(self, root):
+        for name in ['board/board.kicad_sch', 'board/_autosave-board.kicad_sch', 'board/~board.kicad_pcb.lck',
+                     'board/fp-info-cache', 'board/notes.LOG.txt', 'board/.DS_Store',
+                     'board/project-cache/x.tmp', 'board/backups/old.lck', 'module/m.kicad_pcb-bak']:
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / name).write_text('x')
+
+    def test_plan_matches_patterns_and_skips_backups(self, tmp_path):
+        """The compiled expression agrees with fnmatch; emptied cache directories are planned, backups kept"""
+        import fnmatch
+        cleanup = import_script('cleanup_kicad')
+        for name in ['a.lck', 'A.LCK', 'x~y', 'FP-Info-CACHE', 'foo.log', 'Thumbs.db', 'board.kicad_sch', 'b.wbk~']:
+            expected = any(fnmatch.fnmatch(name, p) for p in cleanup.PATTERNS_TO_DELETE) or 'cache' in name.lower()
+            assert cleanup.should_delete_file(name) == expected, name
+        self._tree(tmp_path)
+        plan = cleanup.plan_cleanup(tmp_path)
+        assert [Path(name).as_posix() for name in plan['files']] == [
+            'board/.DS_Store', 'board/_autosave-board.kicad_sch', 'board/fp-info-cache',
+            'board/project-cache/x.tmp', 'board/~board.kicad_pcb.lck', 'module/m.kicad_pcb-bak']
+        assert [Path(name).as_posix() for name in plan['dirs']] == ['board/project-cache']
+        assert (tmp_path / 'board/backups/old.lck').exists()
+
+    def test_execute_deletes_planned_files_only(self, tmp_path):
+        """Executing a plan removes its files and directories and nothing else"""
+        cleanup = import_script('cleanup_kicad')
+        self._tree(tmp_path)
+        plan = json.loads(json.dumps(cleanup.plan_cleanup(tmp_path)))
+        deleted_files, deleted_dirs, errors = cleanup.execute_plan(plan, jobs=4)
+        assert errors == [] and len(deleted_files) == 6 and len(deleted_dirs) == 1
+        remaining = sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob('*') if p.is_file())
+        assert remaining == ['board/backups/old.lck', 'board/board.kicad_sch', 'board/notes.LOG.txt']
+        assert cleanup.plan_cleanup(tmp_path)['files'] == []
+
+
+class TestKicadRename:
+    """Test the transactional KiCad rename (tools/rename_kicad_files.py)"""
+
+    def _tree(self, root):
+        module = root / 'modules' / 'gate_nor_2in_1bit'
+        board = root / 'boards' / 'flags'
+        module.mkdir(parents=True)
+        board.mkdir(parents=True)
+        (module / 'gate_nor_2in.kicad_sch').write_text('(kicad_sch (instances (project "gate_nor_2in")))\n')
+        (module / 'gate_nor_2in.kicad_pcb').write_text('(kicad_pcb)\n')
+        (module / 'gate_nor_2in.kicad_pro').write_text('{\n  "meta": {\n    "filename": "gate_nor_2in.kicad_pro"\n  }\n}\n')
+        (board / 'flags.kicad_pro').write_text('{}\n')
+        (board / 'flags.kicad_sch').write_text(
+            '(kicad_sch (sheet (property "Sheetfile" "../../modules/gate_nor_2in_1bit/gate_nor_2in.kicad_sch")))\n')
+        (board / 'flags.kicad_pcb').write_text('(kicad_pcb (footprint (sheetfile "../gate_nor_2in_1bit/gate_nor_2in.kicad_sch")))\n')
+        return module, board
+
+    def test_renames_and_updates_references_across_tree(self, tmp_path):
+        """Files take the directory name; references in other projects, boards and the .kicad_pro follow"""
+        rename = import_script('rename_kicad_files')
+        module, board = self._tree(tmp_path)
+        renames, edits, warnings = rename.process_directory(tmp_path)
+        assert warnings == [] and len(renames) == 3 and len(edits) == 4
+        rename.apply_plan(tmp_path, renames, edits)
+        assert sorted(p.name for p in module.iterdir()) == [
+            'gate_nor_2in_1bit.kicad_pcb', 'gate_nor_2in_1bit.kicad_pro', 'gate_nor_2in_1bit.kicad_sch']
+        assert json.loads((module / 'gate_nor_2in_1bit.kicad_pro').read_text())['meta']['filename'] == \
+            'gate_nor_2in_1bit.kicad_pro'
+        assert '(project "gate_nor_2in_1bit")' in (module / 'gate_nor_2in_1bit.kicad_sch').read_text()
+        assert 'gate_nor_2in_1bit/gate_nor_2in_1bit.kicad_sch' in (board / 'flags.kicad_sch').read_text()
+        assert 'gate_nor_2in_1bit/gate_nor_2in_1bit.kicad_sch' in (board / 'flags.kicad_pcb').read_text()
+        assert rename.process_directory(tmp_path)[0] == []
+
+    def test_failed_verification_undoes_everything(self, tmp_path, monkeypatch):
+        """A failure after the files were moved restores every name and byte"""
+        rename = import_script('rename_kicad_files')
+        self._tree(tmp_path)
+        before = {p: p.read_bytes() for p in tmp_path.rglob('*') if p.is_file()}
+        renames, edits, _ = rename.process_directory(tmp_path)
+        monkeypatch.setattr(rename, 'verify', lambda *args: ['injected failure'])
+        with pytest.raises(rename.RenameError, match='undone'):
+            rename.apply_plan(tmp_path, renames, edits)
+        assert {p: p.read_bytes() for p in tmp_path.rglob('*') if p.is_file()} == before
+
+    def test_dangling_reference_in_renamed_schematic(self, tmp_path):
+        """A sheet reference that was already broken does not fail verification after its file moves"""
+        rename = import_script('rename_kicad_files')
+        project = tmp_path / 'proj'
+        project.mkdir()
+        (project / 'old.kicad_sch').write_text('(kicad_sch (sheet (property "Sheetfile" "missing.kicad_sch")))\n')
+        (project / 'old.kicad_pro').write_text('{}\n')
+        renames, edits, _ = rename.process_directory(tmp_path)
+        rename.apply_plan(tmp_path, renames, edits)
+        assert sorted(p.name for p in project.iterdir()) == ['proj.kicad_pro', 'proj.kicad_sch']
+
+    def test_undo_runs_every_step(self, tmp_path, monkeypatch):
+        """An undo step that fails is reported without stopping the ones after it"""
+        rename = import_script('rename_kicad_files')
+        module, board = self._tree(tmp_path)
+        board_sheet = (board / 'flags.kicad_sch').read_bytes()
+        renames, edits, _ = rename.process_directory(tmp_path)
+
+        def verify(*args):
+            (module / 'gate_nor_2in_1bit.kicad_pcb').unlink()
+            return ['injected failure']
+        monkeypatch.setattr(rename, 'verify', verify)
+        with pytest.raises(rename.RenameError, match='could not undo 1 steps'):
+            rename.apply_plan(tmp_path, renames, edits)
+        assert sorted(p.name for p in module.iterdir()) == ['gate_nor_2in.kicad_pro', 'gate_nor_2in.kicad_sch']
+        assert (board / 'flags.kicad_sch').read_bytes() == board_sheet
+
+
+class TestTiming:
+    """Test the event-driven timing simulation (alu/timing.py)"""
+    
+    def _inverter_chain(self):
+        from alu.netlist import Circuit, Component, build_netlist
+        return build_netlist(Circuit(
+            [Component('Pin', (40, 100), {'label': 'X'}),
+             Component('NOT Gate', (100, 100), {}),
+             Component('NOT Gate', (160, 100), {}),
+             Component('Pin', (160, 100), {'label': 'Y', 'type': 'output'})],
+            [((40, 100), (70, 100)), ((100, 100), (130, 100))], {}))
+    
+    def test_inverter_chain(self):
+        """Two 15 ns inverters settle 30 ns after their input changes"""
+        from alu.timing import TimingSimulator
+        simulator = TimingSimulator(self._inverter_chain(), {'NOT': 15}, outputs=['Y'])
+        timing = simulator.settle({'X': [0, 1, 1]}, trace=True)
+        assert list(timing.settle) == [0, 30, 30]
+        assert [event.split()[0] for _, event in simulator.critical_path(timing, 2)] == ['input', 'NOT', 'NOT']
+        assert list(simulator.settle({'X': [0, 1]}, initial={'X': 1}).settle) == [30, 0]
+        with pytest.raises(ValueError):
+            TimingSimulator(self._inverter_chain(), {'AND': 15})
+    
+    def test_batch_matches_single_vectors(self):
+        """Bitsliced settle times equal those of each vector simulated alone"""
+        from alu.netlist import load_netlist
+        from alu.timing import TimingSimulator
+        simulator = TimingSimulator(load_netlist())
+        a = [0xFF, 0x01, 0x00, 0x7F, 0x55]
+        b = [0x01, 0x7F, 0x00, 0x01, 0xAA]
+        batch = simulator.settle({'CTRL': 0, 'A_IN': a, 'B_IN': b})
+        single = [simulator.settle({'CTRL': 0, 'A_IN': x, 'B_IN': y}).settle[0] for x, y in zip(a, b)]
+        assert list(batch.settle) == single
+        # 0xFF + 0x01 ripples a carry through all eight adder bits (AND + OR per bit)
+        assert batch.settle[0] >= 8 * 30
+
+    def test_sweep_opcode_strings(self, monkeypatch, tmp_path, capsys):
+        """--opcodes and --from resolve opcode strings; unknown decimal opcodes are reported"""
+        timing_sim = import_script('timing_sim')
+        report = tmp_path / 'timing.json'
+        monkeypatch.setattr(sys, 'argv', ['timing_sim.py', '--opcodes', '00111', '--from', '00010,0,0',
+                                          '--json', str(report)])
+        assert timing_sim.main() == 0
+        opcodes = json.loads(report.read_text(encoding='utf-8'))['opcodes']
+        assert [(row['opcode'], row['operation']) for row in opcodes] == [('00111', 'REV A')]
+        monkeypatch.setattr(sys, 'argv', ['timing_sim.py', '--opcodes', '19'])
+        assert timing_sim.main() == 1
+        assert 'Unknown operation: 19' in capsys.readouterr().out
+
+
+class TestPower:
+    """Test switching-activity counting and energy estimation (alu/power.py)"""
+
+    def test_inverter_chain_energy(self):
+        """Each transition of a node costs C*V^2/2, C including one input load per fanout"""
+        from alu.power import PowerEstimator
+        netlist = TestTiming()._inverter_chain()
+        estimator = PowerEstimator(netlist, {'NOT': 20, 'INPUT': 0, 'FANOUT': 5}, {'X': 'in', 'Y': 'out'})
+        activity = estimator.count([{'X': [0, 1, 1]}, {'X': [0]}])
+        # X and both inverter outputs switch twice: 0 -> 1 -> 1 | -> 0
+        assert activity.vectors == 4
+        assert sorted(activity.toggles[None][signal] for signal in estimator.nodes) == [2, 2, 2]
+        energy = estimator.energy(activity, vdd=2.0)[None]
+        assert energy['in'] == pytest.approx(2 * 0.5 * 5e-12 * 4 * 1e9)
+        assert energy['out'] == pytest.approx(2 * 0.5 * (25e-12 + 20e-12) * 4 * 1e9)
+
+    def test_chunked_stream_matches_vector_by_vector(self):
+        """Bitsliced per-opcode toggle counts equal a one-vector-at-a-time replay"""
+        from alu.netlist import load_netlist
+        from alu.power import PowerEstimator
+        estimator = PowerEstimator(load_netlist())
+        ops = [0, 0, 1, 16, 8, 8, 3, 16, 18, 0]
+        a = [0xFF, 0x01, 0x00, 0x7F, 0x55, 0xAA, 0x80, 0x01, 0x0F, 0x00]
+        b = [0x01, 0x7F, 0x00, 0x01, 0xAA, 0xAA, 0x01, 0x02, 0xF0, 0x00]
+        stream = [{'CTRL': ops[i:i + 3], 'A_IN': a[i:i + 3], 'B_IN': b[i:i + 3]} for i in range(0, len(ops), 3)]
+        activity = estimator.count(stream, key='CTRL')
+
+        netlist = estimator.netlist
+        states = [netlist.evaluate_signals(netlist.input_words({'CTRL': op, 'A_IN': x, 'B_IN': y}, 1), 1)
+                  for op, x, y in zip(ops, a, b)]
+        for opcode in set(ops):
+            expected = [sum(states[k][s] ^ states[k - 1][s] for k in range(1, len(ops)) if ops[k] == opcode)
+                        for s in estimator.nodes]
+            assert [activity.toggles[opcode][s] for s in estimator.nodes] == expected
+        assert activity.operations == {op: ops.count(op) for op in set(ops)}
+        assert 'unassigned' not in estimator.board.values()
+
+    def test_trace_stream_opcode_strings(self, tmp_path):
+        """Trace operations resolve like the CLI's: '00010' is INC A, not opcode 10"""
+        power_sim = import_script('power_sim')
+        trace = tmp_path / 'ops.txt'
+        trace.write_text('# op a b\n00010 1 0\nINC_A 5 0\n{"opcode": 7, "A": 3, "B": 4}\n', encoding='utf-8')
+        assert list(power_sim.trace_stream(trace, 2)) == [
+            {'CTRL': [2, 2], 'A_IN': [1, 5], 'B_IN': [0, 0]}, {'CTRL': [7], 'A_IN': [3], 'B_IN': [4]}]
+        trace.write_text('00010 1 0\n19 1 0\n', encoding='utf-8')
+        with pytest.raises(ValueError, match='ops.txt:2'):
+            list(power_sim.trace_stream(trace, 2))
+
+
+class TestCosim:
+    """Test the RTL semantics model and the co-simulation runner (tools/cosim.py)"""
+    
+    def test_rtl_batch_matches_scalar(self):
+        """RTLALU8Bit batch results agree with execute_packed, including undefined opcodes"""
+        from alu.rtl import RTLALU8Bit
+        rtl = RTLALU8Bit()
+        ops = array('B', [0, 1, 3, 6, 11, 16, 18, 19, 31])
+        a = array('B', [200, 3, 0, 0x81, 0x0F, 5, 0xF0, 9, 9])
+        b = array('B', [100, 10, 0, 0, 0xF0, 5, 0, 9, 9])
+        results, nzcv = rtl.execute_batch(ops, a, b)
+        expected = [rtl.execute_packed(op, x, y) for op, x, y in zip(ops, a, b)]
+        assert [int(r) | int(f) << 8 for r, f in zip(results, nzcv)] == expected
+        assert rtl.execute('10011', 1, 2) == (0, unpack_flags(FLAG_Z))
+    
+    def test_golden_agrees_with_itself(self):
+        """Two golden backends over every opcode give no divergence classes"""
+        cosim = import_script('cosim')
+        backends = {'golden': cosim.make_backend('golden'), 'copy': cosim.make_backend('golden')}
+        report = cosim.cosimulate(backends, 'golden', cosim.resolve_opcodes(None))
+        assert report['vectors'] == len(OPCODES) * 65536
+        assert report['backends']['copy'] == {'differing_vectors': 0, 'classes': [], 'result_aliases': {}}
+    
+    def test_rtl_divergence_classes(self):
+        """RTL opcode renumbering and the missing overflow flag are classified"""
+        cosim = import_script('cosim')
+        backends = {name: cosim.make_backend(name) for name in ('golden', 'rtl')}
+        report = cosim.cosimulate(backends, 'golden', cosim.resolve_opcodes('ADD,PASS A,XOR'))
+        rtl = report['backends']['rtl']
+        assert [(c['operation'], c['divergence']) for c in rtl['classes']] == [
+            ('ADD', '-V'), ('PASS A', 'result')]
+        assert rtl['classes'][0]['count'] == sum(
+            1 for x in range(256) for y in range(256) if (x ^ ~y) & (x ^ (x + y)) & 0x80)
+        assert rtl['result_aliases'] == {'01011': {'matches': '01111', 'operation': 'XNOR'}}
+    
+    def test_resolve_opcode_strings(self):
+        """--opcodes takes opcode strings before decimal numbers, which are range-checked"""
+        cosim = import_script('cosim')
+        assert cosim.resolve_opcodes('00111, INC A,00010,2') == [7, 2, 2, 2]
+        report = cosim.cosimulate({'golden': cosim.make_backend('golden')}, 'golden', cosim.resolve_opcodes('00010'))
+        assert report['vectors'] == 65536
+        with pytest.raises(ValueError):
+            cosim.resolve_opcodes('ADD,19')
+    
+    def test_fpga_backend_needs_port(self):
+        """The fpga backend cannot be built without a serial port"""
+        cosim = import_script('cosim')
+        with pytest.raises(ValueError):
+            cosim.make_backend('fpga')
+
+
+class TestTrace:
+    """Test instruction-trace parsing and replay with registers and flags (alu/trace.py)"""
+    
+    PROGRAM = """
+    ADD 0 5 -> R1        # R1 = 5
+    ADD ACC R1           # ACC = 5
+    CMP R1 5             # Z set
+    SUB.NE ACC 1         # skipped
+    INC.EQ ACC 0         # ACC = 6
+    XOR 0xAA, 0b0101 -> R7
+    """
+    
+    def test_registers_conditions_and_stats(self):
+        """Results feed back through registers, CMP flags select instructions"""
+        from alu.trace import TraceMachine, parse_trace
+        stats = TraceMachine().run(parse_trace(self.PROGRAM.splitlines()))
+        assert stats.registers == [6, 5, 0, 0, 0, 0, 0, 0xAF]
+        assert (stats.instructions, stats.executed, stats.skipped) == (6, 5, 1)
+        assert stats.opcode_counts() == {0: 2, 2: 1, 10: 1, 16: 1}
+        assert stats.flag_counts(16)['zero'] == 1 and stats.flag_counts()['negative'] == 1
+        assert stats.nzcv == pack_flags({'negative': True})
+        with pytest.raises(ValueError, match='line 2'):
+            list(parse_trace(["ADD 1 2", "ADD 1 R8"]))
+    
+    def test_immediates_and_comments(self):
+        """'#' before a number is an immediate; any other '#' starts a comment"""
+        from alu.trace import parse_instruction, parse_trace
+        assert list(parse_trace(["ADD #5 #3", "ADD #0x1F, 3 # note", "#5 is an immediate, not this line",
+                                 "SUB 1 2 #note"])) == [
+            parse_instruction("ADD 5 3"), parse_instruction("ADD 31 3"), parse_instruction("SUB 1 2")]
+        with pytest.raises(ValueError, match="line 1: expected 'OP A B'"):
+            list(parse_trace(["ADD 1 2 #3"]))
+    
+    def test_binary_trace_and_cli(self, tmp_path):
+        """A binary trace replays like its text form and alu_cli.py --trace reports ACC"""
+        import io
+        import alu_cli
+        from alu.trace import format_instruction, parse_trace, replay_file, write_trace
+        text = tmp_path / 'program.txt'
+        text.write_text(self.PROGRAM, encoding='utf-8')
+        records = list(parse_trace(self.PROGRAM.splitlines()))
+        assert list(parse_trace(map(format_instruction, records))) == records
+        assert write_trace(tmp_path / 'program.trace', records) == 6
+        assert replay_file(tmp_path / 'program.trace')[:6] == replay_file(text)[:6]
+        
+        out = io.StringIO()
+        assert alu_cli.run_trace(str(text), out, 'hex', quiet=True, save=str(tmp_path / 'saved.trace')) == 0
+        assert out.getvalue() == "0x06\n"
+        assert (tmp_path / 'saved.trace').read_bytes() == (tmp_path / 'program.trace').read_bytes()
+        
+        from alu.trace import MODE_A_REGISTER, TraceFile
+        write_trace(tmp_path / 'bad.trace', records + [(0, 9, 1, MODE_A_REGISTER, 0)])
+        with pytest.raises(ValueError, match='register operand above R7'):
+            TraceFile(tmp_path / 'bad.trace')
+
+
+def main(argv=None):
+    """Run tests without pytest (optionally against a given vector file)
+
+    Opcodes whose vectors and implementation are unchanged since a fully
+    passing run are replayed from results/verification_cache.json, which
+    test/scripts/run_json_tests.py shares; --no-cache re-checks everything.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    no_cache = '--no-cache' in argv
+    argv = [arg for arg in argv if arg != '--no-cache']
+    test_file = Path(argv[0]) if argv else Path(__file__).parent / 'vectors' / 'demo.json'
+    
     print("\n" + "="*80)
     print("Running ALU Tests (unittest mode)")
     print("="*80 + "\n")
     
-    test_vectors = load_test_vectors()
-    passed = 0
-    failed = 0
+    cache = None if no_cache else result_cache.ResultCache()
+    vector_digest, impl_digests, cached, complete = result_cache.load_cached(test_file, alu, cache)
+    if cached:
+        print(f"♻️  Replaying cached results for {len(cached)} unchanged opcode(s)")
+    op_stats = {opcode: dict(stats) for opcode, stats in cached.items()}
+    
+    if complete:
+        test_vectors = []
+    elif vector_format.is_binary_vector_file(test_file):
+        test_vectors = []
+        failures = check_binary_vectors(test_file, skip=frozenset(cached))
+        with vector_format.VectorFile(test_file) as vectors:
+            column = vectors.column(0).tobytes()
+            for op, opcode in enumerate(OPCODES):
+                if opcode not in cached and column.count(op):
+                    op_stats[opcode] = {'passed': column.count(op), 'failed': 0}
+            for shown, index in enumerate(failures):
+                stats = op_stats[OPCODES[vectors[index][0]]]
+                stats['passed'] -= 1
+                stats['failed'] += 1
+                if shown < 10:
+                    print(f"❌ FAIL: {vectors.test_name(index)}")
+    else:
+        test_vectors = load_test_vectors(test_file)
     
+    failed = 0
     for test_data in test_vectors:
+        opcode = test_data.get('opcode', '')
+        if opcode in cached:
+            continue
+        stats = op_stats.setdefault(opcode, {'passed': 0, 'failed': 0})
         try:
             test_alu_operation(test_data)
-            passed += 1
+            stats['passed'] += 1
         except AssertionError as e:
+            stats['failed'] += 1
             failed += 1
             if failed <= 10:  # Only print first 10 failures
                 print(f"❌ FAIL: {test_data.get('test_name')}")
                 print(f"   {e}\n")
     
+    passed = sum(stats['passed'] for stats in op_stats.values())
+    failed = sum(stats['failed'] for stats in op_stats.values())
+    if cache is not None and op_stats:
+        cache.store(vector_digest, impl_digests, op_stats)
+        cache.save()
+    
     print(f"\n{'='*80}")
     print(f"Results: {passed} passed, {failed} failed out of {passed+failed} total")
-    print(f"Success Rate: {100*passed/(passed+failed):.1f}%")
+    print(f"Success Rate: {100*passed/(passed+failed) if passed + failed else 0:.1f}%")
     print(f"{'='*80}\n")
     
     return 0 if failed == 0 else 1
 
 
 if __name__ == '__main__':
-    import sys
     sys.exit(main())
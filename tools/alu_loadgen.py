@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Load generator for the ALU socket service (alu_cli.py --serve).
+
+Opens several connections, keeps a number of pipelined requests in flight
+on each, and reports throughput, client-side round-trip latency, and the
+server's own counters. Every response is checked against the golden model.
+Without --connect, a server is started on a temporary Unix socket for the
+duration of the run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+from alu import OPCODES, TableALU8Bit  # noqa: E402
+from alu.service import ALUClient, LatencyHistogram  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the ALU socket service.")
+    parser.add_argument("--connect", help="Server address (HOST:PORT or unix:PATH); default: spawn one.")
+    parser.add_argument("--protocol", choices=["binary", "jsonl"], default="binary")
+    parser.add_argument("--connections", type=int, default=4, help="Concurrent connections.")
+    parser.add_argument("--depth", type=int, default=8, help="Pipelined requests in flight per connection.")
+    parser.add_argument("--batch", type=int, default=1, help="Operations per request.")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to run.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for operands.")
+    parser.add_argument("--json", type=Path, help="Write the report to this JSON file.")
+    return parser.parse_args()
+
+
+class LoadStats:
+    def __init__(self):
+        self.requests = 0
+        self.operations = 0
+        self.mismatches = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+
+async def worker(client: ALUClient, args: argparse.Namespace, deadline: float,
+                 stats: LoadStats, rng: random.Random, table) -> None:
+    opcode_count = len(OPCODES)
+    while time.perf_counter() < deadline:
+        records = [(rng.randrange(opcode_count), rng.randrange(256), rng.randrange(256))
+                   for _ in range(args.batch)]
+        start = time.perf_counter()
+        try:
+            results = await client.request(records)
+        except ValueError:
+            stats.errors += 1
+            continue
+        stats.latency.record(time.perf_counter() - start)
+        stats.requests += 1
+        stats.operations += len(records)
+        for (opcode, a, b), entry in zip(records, results):
+            if table[(opcode << 16) | (a << 8) | b] != entry:
+                stats.mismatches += 1
+
+
+async def run_load(address: str, args: argparse.Namespace) -> dict:
+    table = TableALU8Bit().table
+    clients = [await ALUClient.connect(address, args.protocol) for _ in range(args.connections)]
+    stats = LoadStats()
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(
+        worker(client, args, deadline, stats, random.Random(rng.random()), table)
+        for client in clients for _ in range(args.depth)
+    ))
+    elapsed = time.perf_counter() - start
+    server_stats = await clients[0].stats()
+    for client in clients:
+        await client.close()
+    return {
+        "address": address,
+        "protocol": args.protocol,
+        "connections": args.connections,
+        "depth": args.depth,
+        "batch": args.batch,
+        "elapsed_s": round(elapsed, 3),
+        "requests": stats.requests,
+        "operations": stats.operations,
+        "requests_per_s": round(stats.requests / elapsed, 1),
+        "operations_per_s": round(stats.operations / elapsed, 1),
+        "errors": stats.errors,
+        "mismatches": stats.mismatches,
+        "latency": stats.latency.to_dict(),
+        "server": server_stats,
+    }
+
+
+def spawn_server(directory: str) -> tuple:
+    """Start alu_cli.py --serve on a Unix socket in directory; returns (process, address)"""
+    path = os.path.join(directory, "alu.sock")
+    process = subprocess.Popen(
+        [sys.executable, str(REPO_ROOT / "alu_cli.py"), "--engine", "table", "--serve", f"unix:{path}"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    for _ in range(200):
+        if os.path.exists(path):
+            return process, f"unix:{path}"
+        if process.poll() is not None:
+            break
+        time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Server did not start")
+
+
+def print_report(report: dict) -> None:
+    latency = report["latency"]
+    print(f"Address:      {report['address']} ({report['protocol']})")
+    print(f"Load:         {report['connections']} connections x {report['depth']} in flight, "
+          f"{report['batch']} ops/request")
+    print(f"Requests:     {report['requests']} ({report['requests_per_s']:.0f}/s)")
+    print(f"Operations:   {report['operations']} ({report['operations_per_s']:.0f}/s)")
+    print(f"Round trip:   mean {latency['mean_us']:.0f} us, p50 <{latency['p50_us']:.0f} us, "
+          f"p99 <{latency['p99_us']:.0f} us, max {latency['max_us']:.0f} us")
+    server_latency = report["server"]["latency"]
+    print(f"Server time:  mean {server_latency['mean_us']:.1f} us/request, "
+          f"p99 <{server_latency['p99_us']:.0f} us")
+    print(f"Errors:       {report['errors']}, mismatches: {report['mismatches']}")
+
+
+def main() -> int:
+    args = parse_args()
+    if args.connections < 1 or args.depth < 1 or args.batch < 1:
+        raise SystemExit("--connections, --depth and --batch must be at least 1")
+
+    process: Optional[subprocess.Popen] = None
+    with tempfile.TemporaryDirectory() as directory:
+        address = args.connect
+        if address is None:
+            process, address = spawn_server(directory)
+        try:
+            report = asyncio.run(run_load(address, args))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    print_report(report)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with args.json.open("w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+    return 1 if report["errors"] or report["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
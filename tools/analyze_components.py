@@ -1,179 +1,465 @@
 #!/usr/bin/env python3
 """
 Analyze Logisim circuit file and extract all components with their sizes.
+
+    python3 tools/analyze_components.py [circuit.circ]   # text report of the main circuit
+    python3 tools/analyze_components.py --all            # every circuit, board and module
+
+The circuit is read through alu/circ.py, so repeated runs reuse the cached
+parse of an unchanged file.
+
+--all analyzes every .circ file in the repository and every KiCad schematic
+under schematics/kicad/modules and schematics/kicad/boards in worker
+processes. Per-file results are cached on file size, mtime and SHA-256, so
+only changed files are analyzed again. It writes a JSON inventory, with KiCad
+part counts summed over each sheet hierarchy, and regenerates
+results/component_analysis.txt and the component tables of
+results/SIMULATION_METRICS.md.
 """
 
-import xml.etree.ElementTree as ET
-from collections import defaultdict
+import argparse
+import json
+import math
+import os
 import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from alu.circ import CircuitError, CircuitIndex, load_file  # noqa: E402
+from alu.kicad import KicadError, read_schematic  # noqa: E402
+from alu.netlist import DEFAULT_CIRCUIT  # noqa: E402
+from alu.result_cache import FileCache  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+KICAD_ROOTS = (REPO_ROOT / 'schematics' / 'kicad' / 'modules', REPO_ROOT / 'schematics' / 'kicad' / 'boards')
+CACHE_FILE = REPO_ROOT / 'results' / 'component_inventory_cache.json'
+INVENTORY_FILE = REPO_ROOT / 'results' / 'component_inventory.json'
+ANALYSIS_FILE = REPO_ROOT / 'results' / 'component_analysis.txt'
+METRICS_FILE = REPO_ROOT / 'results' / 'SIMULATION_METRICS.md'
+
+# Bump when the per-file analysis or the cache layout changes, so cached results are discarded
+ANALYZER_VERSION = 2
+
+# Generated region of SIMULATION_METRICS.md
+METRICS_BEGIN = '<!-- component-inventory:begin (tools/analyze_components.py --all) -->'
+METRICS_END = '<!-- component-inventory:end -->'
+
+# Discrete transistors per full-adder bit (mirror adder)
+ADDER_TRANSISTORS_PER_BIT = 28
+
+# Gates built from 74HC ICs rather than discrete transistors: (part, gates per package)
+GATE_PARTS = {'XOR Gate': ('74HC86', 4), 'XNOR Gate': ('74HC266', 4)}
 
-def get_attr(comp, name, default=None):
-    """Get attribute value from component."""
-    for attr in comp.findall('a'):
-        if attr.get('name') == name:
-            return attr.get('val')
-    return default
-
-def analyze_logisim_circuit(filename):
-    """Analyze a Logisim circuit file and return component statistics."""
-    
-    tree = ET.parse(filename)
-    root = tree.getroot()
-    
-    # Component categories
+# Multiplexer data inputs -> (part, bits per package)
+MUX_PARTS = {2: ('74HC157', 4), 4: ('74HC153', 2), 8: ('74HC151', 1)}
+
+
+def gate_transistors(name, inputs):
+    """Discrete CMOS transistors per bit of a gate: NAND/NOR 2n, AND/OR 2n + 2 (plus an inverter)."""
+    if name == 'NOT Gate':
+        return 2
+    if name in ('NAND Gate', 'NOR Gate'):
+        return 2 * inputs
+    if name in ('AND Gate', 'OR Gate'):
+        return 2 * inputs + 2
+    return None
+
+
+def circuit_inventory(index, libraries):
+    """Component counts by type, inputs and width, with transistor and IC estimates."""
     gates = defaultdict(lambda: defaultdict(int))
     muxes = defaultdict(lambda: defaultdict(int))
     other = defaultdict(int)
-    
-    # Find all components in the main circuit
-    circuit = root.find(".//circuit[@name='main']")
-    if circuit is None:
-        print("Warning: Could not find main circuit")
-        return
-    
-    for comp in circuit.findall('comp'):
-        lib = comp.get('lib')
-        name = comp.get('name')
-        
-        if lib == '1':  # Gates library
-            # NOT gates don't have inputs attribute
-            if 'NOT' in name or name == 'NOT Gate':
-                width = get_attr(comp, 'width', '1')
-                key = f"{name}"
-                gates[key][f"width={width}"] += 1
-            else:
-                inputs = get_attr(comp, 'inputs', '2')  # Default is 2 for gates
-                width = get_attr(comp, 'width', '1')  # Default is 1 bit
-                
-                # Create key: "GateType (inputs=X, width=Y)"
-                key = f"{name}"
-                if inputs != '2' or width != '1':
-                    if width != '1':
-                        gates[key][f"width={width}"] += 1
-                    if inputs != '2':
-                        gates[key][f"inputs={inputs}"] += 1
-                else:
-                    gates[key]["inputs=2, width=1"] += 1
-                
-        elif lib == '2':  # Multiplexers library
-            select = get_attr(comp, 'select', '1')  # Default select bits
-            width = get_attr(comp, 'width', '1')
-            num_inputs = 2 ** int(select) if select else 2
-            
-            key = f"{name}"
-            muxes[key][f"{num_inputs}:1 MUX, select={select}, width={width}"] += 1
-            
-        elif lib == '3':  # Arithmetic library
-            width = get_attr(comp, 'width', '1')
-            key = f"{name} (width={width})"
-            other[key] += 1
-            
+    transistors = defaultdict(int)
+    ics = defaultdict(int)
+
+    for comp in index.circuit.components:
+        library = libraries.get(comp.lib, '')
+        width = comp.width('width', 8 if library == '#Arithmetic' else 1)
+
+        if library == '#Gates':
+            inputs = comp.width('inputs', 2)
+            # NOT gates are unary - no inputs attribute
+            variant = f"{width}-bit" if 'NOT' in comp.name else f"{inputs}-input, {width}-bit"
+            gates[comp.name][variant] += 1
+            per_bit = gate_transistors(comp.name, inputs)
+            if per_bit is not None:
+                transistors[comp.name] += per_bit * width
+            elif comp.name in GATE_PARTS:
+                part, per_package = GATE_PARTS[comp.name]
+                ics[part] += math.ceil(width / per_package)
+
+        elif library == '#Plexers':
+            select = comp.width('select', 1)
+            num_inputs = 2 ** select
+            muxes[comp.name][f"{num_inputs}:1 MUX, select={select}, width={width}"] += 1
+            if comp.name == 'Multiplexer' and num_inputs in MUX_PARTS:
+                part, per_package = MUX_PARTS[num_inputs]
+                ics[part] += math.ceil(width / per_package)
+
+        elif library == '#Arithmetic':
+            other[f"{comp.name} (width={width})"] += 1
+            if comp.name == 'Adder':
+                transistors[comp.name] += ADDER_TRANSISTORS_PER_BIT * width
+
         else:
-            # Other components
-            width = get_attr(comp, 'width', None)
-            fanout = get_attr(comp, 'fanout', None)
-            incoming = get_attr(comp, 'incoming', None)
-            
-            key = name
-            if width:
-                key += f" (width={width})"
-            if fanout:
-                key += f" (fanout={fanout})"
-            if incoming:
-                key += f" (incoming={incoming})"
-                
+            key = comp.name
+            for attr in ('width', 'fanout', 'incoming'):
+                value = comp.attr(attr)
+                if value:
+                    key += f" ({attr}={value})"
             other[key] += 1
-    
-    return gates, muxes, other
 
-def print_results(gates, muxes, other):
+    return {
+        'gates': {name: dict(variants) for name, variants in sorted(gates.items())},
+        'multiplexers': {name: dict(variants) for name, variants in sorted(muxes.items())},
+        'other': dict(sorted(other.items())),
+        'transistors': dict(sorted(transistors.items())),
+        'ics': dict(sorted(ics.items())),
+    }
+
+
+def analyze_logisim_circuit(filename, circuit='main'):
+    """Analyze one circuit of a Logisim file and return its inventory (None if it is missing)."""
+    parsed = load_file(filename)
+    if circuit not in parsed.circuits:
+        print(f"Warning: Could not find {circuit} circuit")
+        return None
+    return circuit_inventory(CircuitIndex(parsed.circuits[circuit]), parsed.libraries)
+
+
+def schematic_inventory(schematic):
+    """Part counts of one KiCad schematic sheet (without its sub-sheets)."""
+    parts = {category: defaultdict(int) for category in ('transistors', 'ics', 'passives', 'connectors', 'other')}
+    seen = set()
+    for symbol in schematic.symbols:
+        library, _, name = symbol.lib_id.partition(':')
+        if library == 'power' or symbol.reference.startswith('#'):
+            continue
+        # Units of one multi-unit part share a reference; unannotated ('Q?') symbols count singly
+        if not symbol.reference.endswith('?'):
+            if symbol.reference in seen:
+                continue
+            seen.add(symbol.reference)
+
+        if name in ('NMOS', 'PMOS', 'NPN', 'PNP') or library.startswith('Transistor_') or symbol.reference.startswith('Q'):
+            parts['transistors'][symbol.value or name] += 1
+        elif symbol.reference.startswith('U'):
+            parts['ics'][symbol.value or name] += 1
+        elif library == 'Device' and name.split('_')[0] in ('R', 'C', 'LED', 'L', 'D'):
+            parts['passives'][name.split('_')[0]] += 1
+        elif library == 'Connector':
+            parts['connectors'][name] += 1
+        else:
+            parts['other'][symbol.lib_id] += 1
+    return {category: dict(sorted(counts.items())) for category, counts in parts.items()}
+
+
+def relative(path):
+    """Repository-relative POSIX path where possible."""
+    path = Path(os.path.normpath(path))
+    try:
+        return path.relative_to(REPO_ROOT).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def analyze_file(path):
+    """Inventory of one .circ or .kicad_sch file (run in worker processes)."""
+    path = Path(path)
+    try:
+        if path.suffix == '.circ':
+            parsed = load_file(path)
+            return {
+                'type': 'logisim',
+                'circuits': {name: circuit_inventory(CircuitIndex(circuit), parsed.libraries)
+                             for name, circuit in parsed.circuits.items()},
+            }
+        schematic = read_schematic(path)
+        return {
+            'type': 'kicad',
+            'parts': schematic_inventory(schematic),
+            'sheets': [[sheet.name, relative(path.parent / sheet.file)] for sheet in schematic.sheets],
+        }
+    except (CircuitError, KicadError, OSError) as exc:
+        return {'type': 'error', 'error': str(exc)}
+
+
+def discover_files():
+    """Every .circ file in the repository and every KiCad schematic under modules and boards."""
+    circuits = [path for path in REPO_ROOT.rglob('*.circ')
+                if not any(part.startswith('.') for part in path.relative_to(REPO_ROOT).parts)]
+    schematics = [path for root in KICAD_ROOTS for path in root.rglob('*.kicad_sch')
+                  if not path.name.startswith('_autosave-')]
+    return sorted(circuits) + sorted(schematics)
+
+
+def _same(analysis):
+    return analysis
+
+
+class InventoryCache(FileCache):
+    """Per-file analysis results, reused while the file is unchanged (size and mtime, then SHA-256)."""
+
+    def __init__(self, path=CACHE_FILE):
+        super().__init__(path, ANALYZER_VERSION, _same, _same)
+
+    def save(self, keep=None):
+        """Write the cache if it changed, first dropping files not in keep (those no longer found)."""
+        if keep is not None:
+            keep = {str(Path(path).resolve()) for path in keep}
+            files = self.data['files']
+            for name in [name for name in files if name not in keep]:
+                del files[name]
+                self.dirty = True
+        super().save()
+
+
+def analyze_all(files, jobs=None, cache=None):
+    """{path: analysis} for every file, analyzing only those not in the cache; also returns the analyzed count."""
+    results = {}
+    stale = []
+    for path in files:
+        cached = cache.load(path) if cache is not None else None
+        if cached is None:
+            stale.append(path)
+        else:
+            results[relative(path)] = cached
+
+    if jobs == 1 or len(stale) < 2:
+        analyses = [analyze_file(str(path)) for path in stale]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            analyses = list(pool.map(analyze_file, [str(path) for path in stale]))
+    for path, analysis in zip(stale, analyses):
+        results[relative(path)] = analysis
+        if cache is not None and analysis['type'] != 'error':
+            cache.store(path, analysis)
+    return results, len(stale)
+
+
+def _add_parts(total, parts):
+    for category, counts in parts.items():
+        for name, count in counts.items():
+            total[category][name] = total[category].get(name, 0) + count
+
+
+def flatten_schematics(results):
+    """Part counts of each schematic including its sub-sheets, and sheet files that are missing."""
+    totals = {}
+    missing = defaultdict(list)
+
+    def total(name, active):
+        if name in totals:
+            return totals[name]
+        parts = {category: {} for category in ('transistors', 'ics', 'passives', 'connectors', 'other')}
+        _add_parts(parts, results[name]['parts'])
+        for _, child in results[name]['sheets']:
+            if results.get(child, {}).get('type') != 'kicad':
+                if not (REPO_ROOT / child).exists():
+                    missing[name].append(child)
+                    continue
+                results[child] = analyze_file(str(REPO_ROOT / child))
+                if results[child]['type'] != 'kicad':
+                    missing[name].append(child)
+                    continue
+            if child in active:
+                continue  # Recursive sheet reference
+            _add_parts(parts, total(child, active | {name}))
+        totals[name] = {category: dict(sorted(counts.items())) for category, counts in parts.items()}
+        return totals[name]
+
+    for name in [name for name, result in results.items() if result['type'] == 'kicad']:
+        total(name, frozenset())
+    return totals, dict(missing)
+
+
+def build_inventory(results):
+    """The JSON inventory: Logisim circuits, KiCad schematics (own and flattened) and errors."""
+    flattened, missing = flatten_schematics(results)
+    return {
+        'logisim': {name: result['circuits'] for name, result in sorted(results.items())
+                    if result['type'] == 'logisim'},
+        'kicad': {
+            name: {
+                'parts': result['parts'],
+                'sheets': [{'name': sheet, 'file': child} for sheet, child in result['sheets']],
+                'total': flattened[name],
+                **({'missing_sheets': missing[name]} if name in missing else {}),
+            }
+            for name, result in sorted(results.items()) if result['type'] == 'kicad'
+        },
+        'errors': {name: result['error'] for name, result in sorted(results.items()) if result['type'] == 'error'},
+    }
+
+
+def print_results(inventory, out=sys.stdout):
     """Print analysis results in a formatted way."""
-    
-    print("=" * 80)
-    print("COMPONENT ANALYSIS - ALU TOP CIRCUIT")
-    print("=" * 80)
-    print()
-    
+
+    def emit(line=''):
+        print(line, file=out)
+
+    emit("=" * 80)
+    emit("COMPONENT ANALYSIS - ALU TOP CIRCUIT")
+    emit("=" * 80)
+    emit()
+
     # Print Gates
-    print("GATES:")
-    print("-" * 80)
-    
-    # Detailed breakdown by input size and width
-    gate_details = defaultdict(lambda: defaultdict(int))
-    
-    for gate_name, variations in sorted(gates.items()):
-        for variant, count in sorted(variations.items()):
-            # Parse inputs and width
-            if 'NOT' in gate_name:
-                # NOT gates are unary - no inputs attribute
-                width = '1'  # default
-                if 'width=' in variant:
-                    width = variant.split('width=')[1].split(',')[0].split(')')[0]
-                key = f"{gate_name} ({width}-bit)"
-            else:
-                inputs = '2'  # default
-                width = '1'   # default
-                
-                if 'inputs=' in variant:
-                    inputs = variant.split('inputs=')[1].split(',')[0].split(')')[0]
-                if 'width=' in variant:
-                    width = variant.split('width=')[1].split(',')[0].split(')')[0]
-                
-                key = f"{gate_name} ({inputs}-input, {width}-bit)"
-            gate_details[gate_name][key] += count
-    
-    for gate_name in sorted(gate_details.keys()):
-        print(f"  {gate_name}:")
-        for variant, count in sorted(gate_details[gate_name].items()):
-            print(f"    {variant}: {count}")
-        print(f"    Subtotal: {sum(gate_details[gate_name].values())}")
-        print()
-    
-    print()
-    print("MULTIPLEXERS:")
-    print("-" * 80)
-    
-    mux_types = defaultdict(lambda: defaultdict(int))
-    for mux_name, variations in sorted(muxes.items()):
-        for variant, count in sorted(variations.items()):
-            mux_types[mux_name][variant] += count
-    
-    for mux_name in sorted(mux_types.keys()):
-        print(f"  {mux_name}")
-        for variant, count in sorted(mux_types[mux_name].items()):
-            print(f"    {variant}: {count}")
-        print()
-    
-    print()
-    print("OTHER COMPONENTS:")
-    print("-" * 80)
-    
-    for comp_name, count in sorted(other.items()):
-        print(f"  {comp_name}: {count}")
-    
-    print()
-    print("=" * 80)
-    
+    emit("GATES:")
+    emit("-" * 80)
+
+    for gate_name, variants in sorted(inventory['gates'].items()):
+        emit(f"  {gate_name}:")
+        for variant, count in sorted(variants.items()):
+            emit(f"    {gate_name} ({variant}): {count}")
+        emit(f"    Subtotal: {sum(variants.values())}")
+        emit()
+
+    emit()
+    emit("MULTIPLEXERS:")
+    emit("-" * 80)
+
+    for mux_name, variants in sorted(inventory['multiplexers'].items()):
+        emit(f"  {mux_name}")
+        for variant, count in sorted(variants.items()):
+            emit(f"    {variant}: {count}")
+        emit()
+
+    emit()
+    emit("OTHER COMPONENTS:")
+    emit("-" * 80)
+
+    for comp_name, count in sorted(inventory['other'].items()):
+        emit(f"  {comp_name}: {count}")
+
+    emit()
+    emit("=" * 80)
+
     # Summary statistics
-    print()
-    print("SUMMARY:")
-    print("-" * 80)
-    
-    total_gates = sum(sum(v.values()) for v in gates.values())
-    total_muxes = sum(sum(v.values()) for v in muxes.values())
-    total_other = sum(other.values())
-    
-    print(f"Total Gates: {total_gates}")
-    print(f"Total Multiplexers: {total_muxes}")
-    print(f"Total Other Components: {total_other}")
-    print(f"Grand Total: {total_gates + total_muxes + total_other}")
+    emit()
+    emit("SUMMARY:")
+    emit("-" * 80)
 
-if __name__ == '__main__':
-    if len(sys.argv) > 1:
-        filename = sys.argv[1]
-    else:
-        filename = '/Users/tmarhguy/Documents/cpu/logisim/top/alu_top.circ'
-    
-    gates, muxes, other = analyze_logisim_circuit(filename)
-    print_results(gates, muxes, other)
+    total_gates = sum(sum(v.values()) for v in inventory['gates'].values())
+    total_muxes = sum(sum(v.values()) for v in inventory['multiplexers'].values())
+    total_other = sum(inventory['other'].values())
+
+    emit(f"Total Gates: {total_gates}")
+    emit(f"Total Multiplexers: {total_muxes}")
+    emit(f"Total Other Components: {total_other}")
+    emit(f"Grand Total: {total_gates + total_muxes + total_other}")
+
+
+def metrics_tables(inventory, circuit_file):
+    """Markdown tables of the analyzer's counts for SIMULATION_METRICS.md."""
+    main = inventory['logisim'][circuit_file]['main']
+    lines = [METRICS_BEGIN, '',
+             '#### Analyzer Counts', '',
+             f'Generated from `{circuit_file}` (main circuit) and the KiCad schematics by '
+             '`tools/analyze_components.py --all`.', '',
+             '| Component | Count | Variants | Discrete Transistors | ICs |',
+             '|-----------|-------|----------|----------------------|-----|']
+    for group in ('gates', 'multiplexers'):
+        for name, variants in main[group].items():
+            listed = ', '.join(f"{variant} ({count})" for variant, count in sorted(variants.items()))
+            transistors = main['transistors'].get(name)
+            if group == 'gates':
+                ics = GATE_PARTS.get(name, ('-',))[0]
+            else:
+                ics = ', '.join(part for part, _ in MUX_PARTS.values() if part in main['ics']) or '-'
+            lines.append(f"| {name} | {sum(variants.values())} | {listed} | "
+                         f"{f'{transistors:,}' if transistors else '-'} | {ics} |")
+    for name, count in main['other'].items():
+        if name.startswith('Adder'):
+            lines.append(f"| {name} | {count} | - | {main['transistors'].get('Adder', 0):,} | - |")
+
+    lines += ['', f"**Estimate:** {sum(main['transistors'].values()):,} discrete transistors in gates and "
+              f"the adder, plus {', '.join(f'{count}× {part}' for part, count in main['ics'].items())}.", '',
+              '#### Boards and Modules (KiCad)', '',
+              'Part counts include every sub-sheet of the hierarchy.', '',
+              '| Schematic | Transistors | ICs | Passives | Connectors |',
+              '|-----------|-------------|-----|----------|------------|']
+    for name, entry in inventory['kicad'].items():
+        total = entry['total']
+        ics = ', '.join(f"{count}× {part}" for part, count in total['ics'].items()) or '-'
+        passives = ', '.join(f"{count}× {part}" for part, count in total['passives'].items()) or '-'
+        lines.append(f"| `{name.replace('schematics/kicad/', '')}` | {sum(total['transistors'].values()):,} | "
+                     f"{ics} | {passives} | {sum(total['connectors'].values())} |")
+    lines += ['', METRICS_END]
+    return '\n'.join(lines)
+
+
+def update_metrics(path, tables):
+    """Replace the generated region of SIMULATION_METRICS.md; False if its markers are missing."""
+    text = path.read_text(encoding='utf-8')
+    start = text.find(METRICS_BEGIN)
+    end = text.find(METRICS_END)
+    if start < 0 or end < start:
+        return False
+    updated = text[:start] + tables + text[end + len(METRICS_END):]
+    if updated != text:
+        path.write_text(updated, encoding='utf-8')
+    return True
 
+
+def run_all(args):
+    started = time.perf_counter()
+    files = discover_files()
+    cache = None if args.no_cache else InventoryCache()
+    results, analyzed = analyze_all(files, args.jobs, cache)
+    if cache is not None:
+        cache.save(files)
+    inventory = build_inventory(results)
+
+    args.json.parent.mkdir(parents=True, exist_ok=True)
+    with args.json.open('w', encoding='utf-8') as handle:
+        json.dump(inventory, handle, indent=2)
+        handle.write('\n')
+
+    circuit_file = relative(DEFAULT_CIRCUIT)
+    if 'main' in inventory['logisim'].get(circuit_file, {}):
+        with ANALYSIS_FILE.open('w', encoding='utf-8') as handle:
+            print_results(inventory['logisim'][circuit_file]['main'], handle)
+        if not update_metrics(METRICS_FILE, metrics_tables(inventory, circuit_file)):
+            print(f"Warning: no generated-table markers in {relative(METRICS_FILE)}")
+
+    print(f"Analyzed {analyzed} of {len(files)} files ({len(files) - analyzed} cached) "
+          f"in {time.perf_counter() - started:.2f} s")
+    for name, entry in inventory['kicad'].items():
+        if name.startswith('schematics/kicad/boards/'):
+            total = entry['total']
+            print(f"  {name.replace('schematics/kicad/', ''):<52} {sum(total['transistors'].values()):>5} transistors, "
+                  f"{sum(total['ics'].values()):>3} ICs")
+    for name, missing in ((n, e.get('missing_sheets')) for n, e in inventory['kicad'].items()):
+        if missing:
+            print(f"Warning: {name} references missing sheets: {', '.join(missing)}")
+    for name, error in inventory['errors'].items():
+        print(f"Error: {name}: {error}")
+    print(f"Wrote {relative(args.json)}, {relative(ANALYSIS_FILE)} and {relative(METRICS_FILE)}")
+    return 1 if inventory['errors'] else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Component analysis of the Logisim circuit and KiCad schematics.")
+    parser.add_argument('filename', nargs='?', type=Path, default=DEFAULT_CIRCUIT,
+                        help="Logisim circuit for the text report (default: sim/top/alu_top.circ).")
+    parser.add_argument('--all', action='store_true', help="Analyze every circuit and KiCad board and module.")
+    parser.add_argument('--jobs', type=int, help="Worker processes for --all (default: one per CPU).")
+    parser.add_argument('--json', type=Path, default=INVENTORY_FILE, help="Inventory JSON written by --all.")
+    parser.add_argument('--no-cache', action='store_true', help="Re-analyze every file.")
+    args = parser.parse_args()
+
+    if args.all:
+        return run_all(args)
+    inventory = analyze_logisim_circuit(args.filename)
+    if inventory is None:
+        return 1
+    print_results(inventory)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Measure alu_cli.py cold start with `python -X importtime`.
+
+Each scenario runs the CLI in a fresh interpreter several times and reports
+the median wall time and the median cumulative import time of the modules
+imported at top level. Scenarios that should stay lightweight fail the run
+if they import a module from FORBIDDEN_MODULES or exceed their time budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CLI = REPO_ROOT / "alu_cli.py"
+
+# Let the warm-up run write bytecode so timed runs measure imports, not compilation
+BENCH_ENV = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+
+# Modules that the --help, --list and single-operation paths must not pull in
+FORBIDDEN_MODULES = ("numpy", "json", "csv", "pathlib", "pytest", "readline")
+
+
+class Scenario(NamedTuple):
+    name: str
+    args: Sequence[str]
+    stdin: Optional[str] = None
+    lightweight: bool = True
+
+
+SCENARIOS = (
+    Scenario("help", ["--help"]),
+    Scenario("list", ["--list"]),
+    Scenario("single-op", ["--quiet", "ADD", "42", "23"]),
+    Scenario("batch", ["--batch"], stdin="ADD 1 2\nSUB 5 3\n", lightweight=False),
+)
+
+
+def parse_importtime(stderr: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Cumulative microseconds per module: (every module, top-level imports only)"""
+    modules: Dict[str, int] = {}
+    top: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # Header line
+        modules[name.strip()] = int(cumulative)
+        if not name[1:].startswith(" "):
+            top[name.strip()] = int(cumulative)
+    return modules, top
+
+
+def run_once(scenario: Scenario) -> dict:
+    command = [sys.executable, "-X", "importtime", str(CLI), *scenario.args]
+    start = time.perf_counter()
+    proc = subprocess.run(
+        command,
+        input=scenario.stdin or "",
+        capture_output=True,
+        text=True,
+        cwd=REPO_ROOT,
+        env=BENCH_ENV,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f"{scenario.name}: alu_cli.py exited with {proc.returncode}\n{proc.stderr[-2000:]}"
+        )
+    modules, top = parse_importtime(proc.stderr)
+    return {"wall_ms": wall * 1000.0, "modules": modules, "top_level": top}
+
+
+def measure(scenario: Scenario, runs: int) -> dict:
+    run_once(scenario)  # Warm-up so .pyc compilation is not counted
+    samples = [run_once(scenario) for _ in range(runs)]
+    modules = samples[-1]["modules"]
+    top = {
+        name: statistics.median(sample["top_level"].get(name, 0) for sample in samples)
+        for name in samples[-1]["top_level"]
+    }
+    return {
+        "scenario": scenario.name,
+        "args": list(scenario.args),
+        "runs": runs,
+        "wall_ms": statistics.median(sample["wall_ms"] for sample in samples),
+        "import_ms": sum(top.values()) / 1000.0,
+        "module_count": len(modules),
+        "forbidden": sorted(
+            name for name in modules if name.split(".", 1)[0] in FORBIDDEN_MODULES
+        ) if scenario.lightweight else [],
+        "slowest": sorted(top.items(), key=lambda item: item[1], reverse=True)[:8],
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark alu_cli.py start-up time.")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per scenario.")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=250.0,
+        help="Fail if a lightweight scenario's median wall time exceeds this.",
+    )
+    parser.add_argument("--json", type=Path, help="Write the results to this JSON file.")
+    parser.add_argument("--verbose", action="store_true", help="Show the slowest top-level imports.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    results = [measure(scenario, args.runs) for scenario in SCENARIOS]
+
+    failures: List[str] = []
+    print(f"{'Scenario':<12} {'Wall (ms)':>10} {'Imports (ms)':>13} {'Modules':>8}")
+    for scenario, result in zip(SCENARIOS, results):
+        print(
+            f"{result['scenario']:<12} {result['wall_ms']:>10.1f} "
+            f"{result['import_ms']:>13.1f} {result['module_count']:>8}"
+        )
+        if args.verbose:
+            for name, micros in result["slowest"]:
+                print(f"    {name:<30} {micros / 1000.0:>8.2f} ms")
+        if result["forbidden"]:
+            failures.append(f"{result['scenario']}: imports {', '.join(result['forbidden'])}")
+        if scenario.lightweight and result["wall_ms"] > args.budget_ms:
+            failures.append(
+                f"{result['scenario']}: {result['wall_ms']:.1f} ms exceeds {args.budget_ms:.0f} ms budget"
+            )
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with args.json.open("w", encoding="utf-8") as handle:
+            json.dump({"python": sys.version, "results": results}, handle, indent=2)
+            handle.write("\n")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,49 +2,68 @@
 """
 Clean up non-essential files from KiCad directories.
 Removes cache files, lock files, autosaves, and other temporary files.
+
+    python3 tools/cleanup_kicad.py --dry-run            # print what would be deleted
+    python3 tools/cleanup_kicad.py --dry-run --plan plan.json
+    python3 tools/cleanup_kicad.py --from-plan plan.json   # delete exactly what was reviewed
+    python3 tools/cleanup_kicad.py schematics/kicad     # clean another tree
+
+The tree (schematics/ by default) is scanned once with os.scandir; every
+file name is tested against one regular expression compiled from
+PATTERNS_TO_DELETE. The resulting plan lists the files to delete and the
+cache directories that will then be empty. Files are deleted in a thread
+pool, then the directories, deepest first.
 """
 
+import argparse
+import fnmatch
+import json
 import os
+import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
 # File patterns to delete
 PATTERNS_TO_DELETE = [
     # Lock files
     '*.lck',
     '*~*.lck',
     '*_autosave-*.lck',
-    
+
     # Cache files
     '*cache*',
     'fp-info-cache',
-    
+
     # Backup files (workbook backups)
     '*.wbk',
-    
+
     # System files
     '.DS_Store',
     'Thumbs.db',
     'desktop.ini',
-    
+
     # Temporary files
     '*.tmp',
     '*.temp',
     '*~',
     '*~*',
-    
+
     # Autosave files
     '*autosave*',
     '*~_autosave*',
-    
+
     # KiCad backup files
     '*.kicad_sch-bak',
     '*.kicad_pcb-bak',
-    
+
     # Log files
     '*.log',
     'replicate_layout.log',
-    
+
     # Other
     '*.orig',
     '*.swp',
@@ -63,111 +82,150 @@ SKIP_DIRS = {
     '.git',
 }
 
-def matches_pattern(filename, pattern):
-    """Check if filename matches a pattern (simple wildcard matching)."""
-    import fnmatch
-    return fnmatch.fnmatch(filename, pattern)
+# One expression per rule set; any file name containing 'cache' (in any case) is a cache file
+DELETE_FILE = re.compile('|'.join([*(fnmatch.translate(p) for p in PATTERNS_TO_DELETE), r'(?i:.*cache)']))
+REMOVE_DIR = re.compile('|'.join(fnmatch.translate(p) for p in DIRS_TO_REMOVE_IF_EMPTY))
+# Directories whose name contains a SKIP_DIRS entry (in any case)
+SKIP_DIR = re.compile('|'.join(re.escape(skip) for skip in sorted(SKIP_DIRS)), re.IGNORECASE)
+
 
 def should_delete_file(filepath):
     """Determine if a file should be deleted."""
-    filename = filepath.name
-    
-    # Check against deletion patterns
-    for pattern in PATTERNS_TO_DELETE:
-        if matches_pattern(filename, pattern):
-            return True
-    
-    # Check if it's a lock file by extension
-    if filename.endswith('.lck'):
-        return True
-    
-    # Check if it's a cache file
-    if 'cache' in filename.lower():
-        return True
-    
-    return False
+    return DELETE_FILE.match(Path(filepath).name) is not None
+
 
 def should_skip_directory(dirpath):
     """Check if we should skip this directory."""
-    dirname = dirpath.name.lower()
-    for skip in SKIP_DIRS:
-        if skip.lower() in dirname:
-            return True
-    return False
+    return SKIP_DIR.search(Path(dirpath).name) is not None
 
-def cleanup_directory(root_dir):
-    """Clean up non-essential files from a directory tree."""
+
+def plan_cleanup(root_dir):
+    """Scan the tree once and return the plan: files to delete, then directories to remove.
+
+    A directory is removed when its name matches DIRS_TO_REMOVE_IF_EMPTY
+    and it holds nothing but files and directories that are removed too.
+    """
     root_path = Path(root_dir)
-    
-    deleted_files = []
-    deleted_dirs = []
+    files = []
+    dirs = []
+    total_bytes = 0
+    scanned = 0
+
+    def scan(path):
+        """Walk path; True if nothing in it is kept"""
+        nonlocal total_bytes, scanned
+        empty = True
+        with os.scandir(path) as entries:
+            for entry in entries:
+                scanned += 1
+                if entry.is_dir(follow_symlinks=False):
+                    if should_skip_directory(entry.name):
+                        empty = False
+                    elif scan(entry.path) and REMOVE_DIR.match(entry.name.lower()):
+                        dirs.append(entry.path)
+                    else:
+                        empty = False
+                elif DELETE_FILE.match(entry.name) and not entry.is_dir():
+                    files.append(entry.path)
+                    total_bytes += entry.stat(follow_symlinks=False).st_size
+                else:
+                    empty = False
+        return empty
+
+    scan(root_path)
+    relative = [os.path.relpath(path, root_path) for path in files]
+    return {
+        'root': str(root_path.resolve()),
+        'scanned': scanned,
+        'bytes': total_bytes,
+        'files': sorted(relative),
+        # Children come before their parents
+        'dirs': [os.path.relpath(path, root_path) for path in dirs],
+    }
+
+
+def execute_plan(plan, jobs=None):
+    """Delete the planned files in a thread pool, then remove the planned directories.
+
+    Returns the deleted files, the removed directories and (path, error) pairs.
+    """
+    root_path = Path(plan['root'])
     errors = []
-    
-    print(f"Scanning {root_dir} for non-essential files...\n")
-    
-    # Walk through directory tree
-    for dirpath, dirnames, filenames in os.walk(root_path):
-        dir_path = Path(dirpath)
-        
-        # Skip certain directories
-        dirnames[:] = [d for d in dirnames if not should_skip_directory(dir_path / d)]
-        
-        # Check files in this directory
-        for filename in filenames:
-            filepath = dir_path / filename
-            
-            if should_delete_file(filepath):
-                try:
-                    filepath.unlink()
-                    deleted_files.append(filepath)
-                    print(f"  ✓ Deleted: {filepath.relative_to(root_path)}")
-                except Exception as e:
-                    errors.append((filepath, str(e)))
-                    print(f"  ✗ Error deleting {filepath.relative_to(root_path)}: {e}")
-    
-    # Remove empty directories (cache directories, etc.)
-    print("\nRemoving empty directories...")
-    for dirpath, dirnames, filenames in os.walk(root_path, topdown=False):
-        dir_path = Path(dirpath)
-        
-        # Skip root and backup directories
-        if dir_path == root_path or should_skip_directory(dir_path):
-            continue
-        
-        # Check if directory name matches removal patterns
-        dirname = dir_path.name.lower()
-        should_remove = False
-        for pattern in DIRS_TO_REMOVE_IF_EMPTY:
-            if matches_pattern(dirname, pattern):
-                should_remove = True
-                break
-        
-        # Remove if empty and matches pattern
-        if should_remove:
-            try:
-                if dir_path.exists() and not any(dir_path.iterdir()):
-                    dir_path.rmdir()
-                    deleted_dirs.append(dir_path)
-                    print(f"  ✓ Removed empty directory: {dir_path.relative_to(root_path)}")
-            except Exception as e:
-                errors.append((dir_path, str(e)))
-                print(f"  ✗ Error removing {dir_path.relative_to(root_path)}: {e}")
-    
+
+    def unlink(name):
+        try:
+            (root_path / name).unlink()
+            return None
+        except OSError as e:
+            return name, str(e)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        failures = [failure for failure in pool.map(unlink, plan['files']) if failure]
+    errors.extend(failures)
+    failed = {name for name, _ in failures}
+    deleted_files = [name for name in plan['files'] if name not in failed]
+
+    deleted_dirs = []
+    for name in plan['dirs']:
+        try:
+            (root_path / name).rmdir()
+            deleted_dirs.append(name)
+        except OSError as e:
+            errors.append((name, str(e)))
     return deleted_files, deleted_dirs, errors
 
+
+def cleanup_directory(root_dir, jobs=None):
+    """Clean up non-essential files from a directory tree."""
+    return execute_plan(plan_cleanup(root_dir), jobs)
+
+
 def main():
-    if len(sys.argv) > 1:
-        root_dir = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Remove cache, lock, autosave and temporary files from KiCad trees.")
+    parser.add_argument('root_dir', nargs='?', type=Path, default=REPO_ROOT / 'schematics',
+                        help="Tree to clean (default: schematics/).")
+    parser.add_argument('--dry-run', action='store_true', help="Only report what would be deleted.")
+    parser.add_argument('--plan', type=Path, help="Write the plan to this JSON file ('-' prints it and deletes nothing).")
+    parser.add_argument('--from-plan', type=Path, help="Delete what a saved plan lists instead of scanning.")
+    parser.add_argument('--jobs', type=int, help="Threads deleting files (default: Python's choice).")
+    args = parser.parse_args()
+
+    if not args.root_dir.is_dir():
+        print(f"Error: {args.root_dir} is not a directory")
+        return 1
+
+    started = time.perf_counter()
+    if args.from_plan:
+        try:
+            plan = json.loads(args.from_plan.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"Error: cannot read plan {args.from_plan}: {e}")
+            return 1
     else:
-        root_dir = '/Users/tmarhguy/Documents/cpu/kicad'
-    
+        plan = plan_cleanup(args.root_dir)
+    if args.plan:
+        text = json.dumps(plan, indent=2) + '\n'
+        if str(args.plan) == '-':
+            sys.stdout.write(text)
+            return 0
+        args.plan.write_text(text, encoding='utf-8')
+
     print("=" * 80)
-    print("KiCad Directory Cleanup")
+    print("KiCad Directory Cleanup" + (" (dry run)" if args.dry_run else ""))
     print("=" * 80)
     print()
-    
-    deleted_files, deleted_dirs, errors = cleanup_directory(root_dir)
-    
+    print(f"Scanned {plan['scanned']} entries under {plan['root']}")
+    for name in plan['files']:
+        print(f"  {'Would delete' if args.dry_run else 'Delete'}: {name}")
+    for name in plan['dirs']:
+        print(f"  {'Would remove' if args.dry_run else 'Remove'} empty directory: {name}")
+    if args.dry_run:
+        print(f"\n{len(plan['files'])} files ({plan['bytes']:,} bytes) and {len(plan['dirs'])} directories "
+              f"would be removed ({time.perf_counter() - started:.3f} s)")
+        return 0
+
+    deleted_files, deleted_dirs, errors = execute_plan(plan, args.jobs)
+
     print()
     print("=" * 80)
     print("Summary")
@@ -175,13 +233,17 @@ def main():
     print(f"Files deleted: {len(deleted_files)}")
     print(f"Directories removed: {len(deleted_dirs)}")
     print(f"Errors: {len(errors)}")
-    
+    print(f"Time: {time.perf_counter() - started:.3f} s")
+
     if errors:
         print("\nErrors encountered:")
         for item, error in errors:
             print(f"  {item}: {error}")
-    
+        return 1
+
     print("\nDone!")
+    return 0
+
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Regenerate alu/_opcode_table.py from spec/opcode/opcode_table.csv."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from alu.opcodes import COMPILED_TABLE, OPCODE_TABLE, compile_opcode_table  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Precompile the opcode table for fast imports.")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only check that the precompiled table matches the CSV (exit 1 if stale).",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.check:
+        import alu._opcode_table as compiled
+
+        with open(OPCODE_TABLE, "r", encoding="utf-8", newline="") as handle:
+            source = handle.read()
+        if source != compiled.SOURCE:
+            print(f"{COMPILED_TABLE} is out of date; run tools/compile_opcode_table.py")
+            return 1
+        print(f"{COMPILED_TABLE} is up to date")
+        return 0
+
+    count = compile_opcode_table()
+    print(f"Wrote {count} opcodes to {COMPILED_TABLE}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Differential co-simulation of ALU implementations over the exhaustive input space.
+
+Every backend evaluates all (opcode, A, B) combinations in lockstep, one
+opcode (65,536 operand pairs) at a time through its evaluate_batch path,
+and is compared with the reference backend. Mismatching vectors are grouped
+into divergence classes by opcode, by whether the result differs, and by
+which flags the backend sets (+) or clears (-) relative to the reference
+(only C and V when the result differs, since N and Z follow it). Each
+class is reported once, with its size and a few example inputs.
+
+When a backend's results for an opcode equal the reference's results for a
+different opcode on every input, that is reported as well: it points at an
+opcode numbering difference rather than a datapath bug.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from run_tests import HARDWARE_BACKENDS, HardwareInterface, make_backend  # noqa: E402
+
+from alu import OPCODE_INFO, OPCODES, opcode_number  # noqa: E402
+from alu import model as alu_model  # noqa: E402
+
+FLAG_NAMES = (("N", 0x8), ("Z", 0x4), ("C", 0x2), ("V", 0x1))
+
+# Bit of a divergence signature marking a result mismatch; the low byte
+# holds flags set by the backend only (high nibble) and cleared (low nibble)
+RESULT_DIFFERS = 0x100
+
+# N and Z follow the result, so result mismatches are classified by C and V only
+CV_ONLY = 0x3
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Differential co-simulation of ALU backends.")
+    parser.add_argument(
+        "--backends",
+        default="golden,rtl",
+        help=f"Comma-separated backends to compare ({', '.join(HARDWARE_BACKENDS)}).",
+    )
+    parser.add_argument("--reference", help="Backend the others are compared with (default: the first).")
+    parser.add_argument("--opcodes", help="Comma-separated opcodes or mnemonics to check (default: all).")
+    parser.add_argument("--examples", type=int, default=3, help="Example inputs shown per class.")
+    parser.add_argument("--port", help="Serial port for the fpga backend.")
+    parser.add_argument("--baud", type=int, default=115200, help="Baud rate for the fpga backend.")
+    parser.add_argument("--circuit", type=Path, help="Logisim circuit for the netlist backend.")
+    parser.add_argument("--json", type=Path, help="Write the divergence report to this JSON file.")
+    return parser.parse_args()
+
+
+def operand_space():
+    """A and B covering every 8-bit pair, A-major (index = A << 8 | B)"""
+    np = alu_model._numpy()
+    if np is not None:
+        values = np.arange(256, dtype=np.uint8)
+        return np.repeat(values, 256), np.tile(values, 256)
+    a = array("B", bytes(value for value in range(256) for _ in range(256)))
+    b = array("B", bytes(range(256)) * 256)
+    return a, b
+
+
+def signature_codes(ref_results, ref_nzcv, results, nzcv):
+    """Per-vector divergence signature (0 where the backend agrees)"""
+    np = alu_model._numpy()
+    if np is not None:
+        ref_results = np.asarray(ref_results, dtype=np.uint16)
+        results = np.asarray(results, dtype=np.uint16)
+        ref_nzcv = np.asarray(ref_nzcv, dtype=np.uint16)
+        nzcv = np.asarray(nzcv, dtype=np.uint16)
+        differs = ref_results != results
+        flags = np.where(differs, CV_ONLY, 0xF)
+        return (np.where(differs, RESULT_DIFFERS, 0)
+                | ((nzcv & ~ref_nzcv & flags) << 4) | (ref_nzcv & ~nzcv & flags))
+    codes = []
+    for rr, rf, r, f in zip(ref_results, ref_nzcv, results, nzcv):
+        flags = CV_ONLY if rr != r else 0xF
+        codes.append((RESULT_DIFFERS if rr != r else 0) | ((f & ~rf & flags) << 4) | (rf & ~f & flags))
+    return codes
+
+
+def group_signatures(codes, limit: int) -> Dict[int, tuple]:
+    """{signature: (count, first `limit` vector indices)} for non-zero signatures"""
+    np = alu_model._numpy()
+    groups = {}
+    if np is not None and not isinstance(codes, list):
+        counts = np.bincount(codes, minlength=RESULT_DIFFERS * 2)
+        for code in np.flatnonzero(counts[1:]) + 1:
+            groups[int(code)] = (int(counts[code]), np.flatnonzero(codes == code)[:limit].tolist())
+        return groups
+    for index, code in enumerate(codes):
+        if code:
+            count, examples = groups.get(code, (0, []))
+            if len(examples) < limit:
+                examples.append(index)
+            groups[code] = (count + 1, examples)
+    return groups
+
+
+def same_values(x, y) -> bool:
+    np = alu_model._numpy()
+    if np is not None:
+        return bool(np.array_equal(np.asarray(x), np.asarray(y)))
+    return list(x) == list(y)
+
+
+def describe_signature(code: int) -> str:
+    parts = ["result"] if code & RESULT_DIFFERS else []
+    parts += [f"+{name}" for name, bit in FLAG_NAMES if code & (bit << 4)]
+    parts += [f"-{name}" for name, bit in FLAG_NAMES if code & bit]
+    return " ".join(parts)
+
+
+def format_nzcv(nzcv: int) -> str:
+    return "".join(name if nzcv & bit else "." for name, bit in FLAG_NAMES)
+
+
+def resolve_opcodes(spec: Optional[str]) -> List[int]:
+    if not spec:
+        return list(range(len(OPCODES)))
+    return [opcode_number(name) for name in spec.split(",")]
+
+
+def cosimulate(backends: Dict[str, HardwareInterface], reference: str,
+               opcodes: Sequence[int], examples: int = 3) -> dict:
+    """Run every backend over the exhaustive space and classify divergences from reference"""
+    a, b = operand_space()
+    ref = backends[reference]
+    others = [name for name in backends if name != reference]
+
+    # Reference outputs for every opcode, also used to spot renumbered opcodes
+    started = time.perf_counter()
+    ref_outputs = [ref.evaluate_batch(opcode, a, b) for opcode in range(len(OPCODES))]
+    timings = {name: 0.0 for name in backends}
+    timings[reference] = time.perf_counter() - started
+
+    summary = {name: {"differing_vectors": 0, "classes": [], "result_aliases": {}} for name in others}
+    for opcode in opcodes:
+        ref_results, ref_nzcv = ref_outputs[opcode]
+        for name in others:
+            started = time.perf_counter()
+            results, nzcv = backends[name].evaluate_batch(opcode, a, b)
+            timings[name] += time.perf_counter() - started
+
+            groups = group_signatures(signature_codes(ref_results, ref_nzcv, results, nzcv), examples)
+            if not groups:
+                continue
+            result = summary[name]
+            if any(code & RESULT_DIFFERS for code in groups):
+                for other, (other_results, _) in enumerate(ref_outputs):
+                    if other != opcode and same_values(results, other_results):
+                        result["result_aliases"][OPCODES[opcode]] = {
+                            "matches": OPCODES[other], "operation": OPCODE_INFO[other].mnemonic}
+                        break
+            for code, (count, indices) in sorted(groups.items(), key=lambda item: -item[1][0]):
+                result["differing_vectors"] += count
+                result["classes"].append({
+                    "opcode": OPCODES[opcode],
+                    "operation": OPCODE_INFO[opcode].mnemonic,
+                    "divergence": describe_signature(code),
+                    "count": count,
+                    "examples": [
+                        {
+                            "A": int(a[index]),
+                            "B": int(b[index]),
+                            "reference": [int(ref_results[index]), format_nzcv(int(ref_nzcv[index]))],
+                            "backend": [int(results[index]), format_nzcv(int(nzcv[index]))],
+                        }
+                        for index in indices
+                    ],
+                })
+
+    return {
+        "reference": reference,
+        "vectors": len(opcodes) * len(a),
+        "backends": summary,
+        "seconds": {name: round(seconds, 3) for name, seconds in timings.items()},
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"Reference: {report['reference']} ({report['vectors']:,} vectors, "
+          f"{report['seconds'][report['reference']]:.2f} s)")
+    for name, result in report["backends"].items():
+        classes = result["classes"]
+        opcodes = {entry["opcode"] for entry in classes}
+        print(f"\n{name}: {len(classes)} divergence classes in {len(opcodes)} opcodes, "
+              f"{result['differing_vectors']:,} vectors differ ({report['seconds'][name]:.2f} s)")
+        last_opcode = None
+        for entry in classes:
+            if entry["opcode"] != last_opcode:
+                last_opcode = entry["opcode"]
+                alias = result["result_aliases"].get(last_opcode)
+                note = (f"  results equal reference {alias['operation']} ({alias['matches']}) on every input"
+                        if alias else "")
+                print(f"  {last_opcode} {entry['operation']}{note}")
+            examples = "; ".join(
+                f"A={ex['A']:02X} B={ex['B']:02X}: {ex['reference'][0]:02X} {ex['reference'][1]}"
+                f" vs {ex['backend'][0]:02X} {ex['backend'][1]}"
+                for ex in entry["examples"]
+            )
+            print(f"    {entry['count']:>7,}  {entry['divergence']:<16} {examples}")
+
+
+def main() -> int:
+    args = parse_args()
+    names = [name.strip() for name in args.backends.split(",") if name.strip()]
+    reference = args.reference or names[0]
+    if reference not in names:
+        names.insert(0, reference)
+    try:
+        backends = {name: make_backend(name, port=args.port, baudrate=args.baud, circuit=args.circuit)
+                    for name in names}
+        opcodes = resolve_opcodes(args.opcodes)
+    except (ValueError, OSError) as exc:
+        print(f"Error: {exc}")
+        return 1
+
+    report = cosimulate(backends, reference, opcodes, args.examples)
+    print_report(report)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with args.json.open("w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+    return 1 if any(result["classes"] for result in report["backends"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
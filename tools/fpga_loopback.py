@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Run the FPGA loopback emulator, or benchmark the serial transport against it.
+
+Without --bench, the emulator runs until Ctrl-C and prints the pty to pass
+to `alu_cli.py --mode fpga --port`. With --bench, the same operations are
+sent one round trip at a time and then in batched frames at several
+pipelining windows, and the throughput of each is reported. Every result
+is checked against the golden model.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from alu import OPCODES, ALU8Bit  # noqa: E402
+from alu.fpga_link import FRAME_RECORDS, LoopbackEmulator, SerialTransport, open_port  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="FPGA loopback emulator for the serial link.")
+    parser.add_argument("--baud", type=int, default=None,
+                        help="Throttle the emulated link to this baud rate (default: unthrottled).")
+    parser.add_argument("--turnaround-us", type=float, default=0.0,
+                        help="Emulated per-frame processing delay on the board, in microseconds.")
+    parser.add_argument("--bench", action="store_true", help="Benchmark the transport and exit.")
+    parser.add_argument("--operations", type=int, default=20000, help="Operations per benchmark run.")
+    parser.add_argument("--single", type=int, default=500,
+                        help="Operations for the one-round-trip-per-operation run.")
+    parser.add_argument("--frame-records", type=int, default=FRAME_RECORDS, help="Records per frame.")
+    parser.add_argument("--windows", default="1,2,4,8", help="Comma-separated pipelining windows.")
+    return parser.parse_args()
+
+
+def random_records(count: int, seed: int = 0) -> List[Tuple[int, int, int]]:
+    rng = random.Random(seed)
+    return [(rng.randrange(len(OPCODES)), rng.randrange(256), rng.randrange(256))
+            for _ in range(count)]
+
+
+def benchmark(emulator: LoopbackEmulator, args: argparse.Namespace) -> int:
+    alu = ALU8Bit()
+    transport = SerialTransport(open_port(emulator.port), frame_records=args.frame_records)
+    failures = 0
+
+    def report(label: str, records, results, elapsed: float) -> None:
+        nonlocal failures
+        expected = [alu.execute_packed(*record) for record in records]
+        bad = sum(1 for got, want in zip(results, expected) if got != want)
+        failures += bad
+        print(f"{label:<28} {len(records):>8} {elapsed * 1000:>10.1f} {len(records) / elapsed:>12.0f}"
+              + (f"  {bad} MISMATCHES" if bad else ""))
+
+    print(f"{'Mode':<28} {'Ops':>8} {'Time (ms)':>10} {'Ops/s':>12}")
+    records = random_records(args.single)
+    start = time.perf_counter()
+    results = [transport.execute_packed(*record) for record in records]
+    report("one round trip per op", records, results, time.perf_counter() - start)
+
+    records = random_records(args.operations, seed=1)
+    for window in (int(value) for value in args.windows.split(",")):
+        transport.window = window
+        start = time.perf_counter()
+        results = transport.execute_batch(records)
+        report(f"batched, window {window}", records, results, time.perf_counter() - start)
+
+    transport.close()
+    return 1 if failures else 0
+
+
+def main() -> int:
+    args = parse_args()
+    emulator = LoopbackEmulator(baudrate=args.baud, turnaround=args.turnaround_us / 1e6)
+    with emulator:
+        link = f"{args.baud} baud" if args.baud else "unthrottled"
+        print(f"Emulated FPGA on {emulator.port} ({link}, turnaround {args.turnaround_us:g} us)")
+        if args.bench:
+            return benchmark(emulator, args)
+        print(f"Try: ./alu_cli.py --mode fpga --port {emulator.port} ADD 42 23")
+        print("Ctrl-C to stop")
+        try:
+            signal.pause()
+        except KeyboardInterrupt:
+            pass
+        print(f"\n{emulator.frames} frames, {emulator.operations} operations, {emulator.errors} errors")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Query the KiCad boards through the cached index of alu/kicad.py.
+
+    python3 tools/kicad_query.py nets U203 --board main_control   # nets on a part's pads
+    python3 tools/kicad_query.py pads VCC --board flags           # pads on a net
+    python3 tools/kicad_query.py count NMOS PMOS                  # parts per board (glob patterns)
+    python3 tools/kicad_query.py parts --board led_panel_3        # every part of a board
+
+Boards are the .kicad_pcb files under schematics/kicad/boards (--schematics
+queries the top-level .kicad_sch files instead; they have no nets and do not
+include their sub-sheets). The first run reads the files; later runs load the
+unchanged ones from results/kicad_cache.json.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from alu.kicad import DEFAULT_CACHE_FILE, KicadError, KicadIndex, load_files  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BOARDS_DIR = REPO_ROOT / "schematics" / "kicad" / "boards"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Query KiCad boards by part, net and value.")
+    parser.add_argument("query", choices=("nets", "pads", "count", "parts"),
+                        help="nets REF, pads NET, count PATTERN..., or parts.")
+    parser.add_argument("args", nargs="*", help="Reference, net name or value/library-id glob patterns.")
+    parser.add_argument("--board", help="Only boards whose path contains this text.")
+    parser.add_argument("--files", type=Path, nargs="+", help="Query these files instead of the boards.")
+    parser.add_argument("--schematics", action="store_true", help="Query the board schematics, not the layouts.")
+    parser.add_argument("--no-cache", action="store_true", help="Read every file instead of using the cache.")
+    parser.add_argument("--json", type=Path, help="Write the answer to this JSON file.")
+    return parser.parse_args()
+
+
+def board_files(schematics: bool, board: str | None) -> List[Path]:
+    suffix = ".kicad_sch" if schematics else ".kicad_pcb"
+    return [path for path in sorted(BOARDS_DIR.rglob(f"*{suffix}"))
+            if not path.name.startswith("_autosave-") and (board is None or board in path.as_posix())]
+
+
+def answer(query: str, args: List[str], index: KicadIndex):
+    if query == "nets":
+        return {reference: index.nets_of(reference) for reference in args}
+    if query == "pads":
+        return {net: [f"{reference}.{pad}" for reference, pad in sorted(index.pads_on.get(net, ()))] for net in args}
+    if query == "count":
+        return index.count(*args)
+    parts: Dict[str, int] = {}
+    for reference, units in sorted(index.by_reference.items()):
+        if not reference.startswith("#"):
+            parts[units[0].value or units[0].lib_id] = parts.get(units[0].value or units[0].lib_id, 0) + 1
+    return dict(sorted(parts.items()))
+
+
+def main() -> int:
+    args = parse_args()
+    if args.query in ("nets", "pads", "count") and not args.args:
+        print(f"Error: '{args.query}' needs at least one argument")
+        return 1
+    files = args.files or board_files(args.schematics, args.board)
+    if not files:
+        print("Error: no KiCad files selected")
+        return 1
+
+    started = time.perf_counter()
+    try:
+        loaded = load_files(files, None if args.no_cache else DEFAULT_CACHE_FILE)
+    except (KicadError, OSError) as exc:
+        print(f"Error: {exc}")
+        return 1
+    results = {}
+    for path, parsed in loaded.items():
+        resolved = Path(path).resolve()
+        name = resolved.relative_to(REPO_ROOT).as_posix() if resolved.is_relative_to(REPO_ROOT) else path
+        results[name] = answer(args.query, args.args, KicadIndex(parsed))
+    elapsed = time.perf_counter() - started
+
+    width = max(len(name) for name in results)
+    for name, result in results.items():
+        if args.query == "count":
+            print(f"{name:<{width}} {result:>5}")
+            continue
+        print(name)
+        for key, values in result.items():
+            print(f"  {key}: {', '.join(values) if isinstance(values, list) else values}")
+    if args.query == "count":
+        print(f"{'Total':<{width}} {sum(results.values()):>5}")
+    print(f"({len(results)} files, {elapsed * 1000:.1f} ms)")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with args.json.open("w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+            handle.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Estimate switching activity and dynamic power of the gate-level netlist.
+
+An instruction trace (alu_cli.py --batch lines: 'OP A B' or JSON objects)
+or a random operand stream is replayed through the netlist of
+sim/top/alu_top.circ. Transitions of every node between consecutive
+operations are counted and weighted with the capacitances of
+spec/power/gate_capacitance.csv, giving the switching energy per operation
+of each board (spec/power/board_map.csv) and of each opcode, and the power
+at a given clock rate.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from alu import OPCODE_INFO, OPCODES, opcode_number  # noqa: E402
+from alu import model as alu_model  # noqa: E402
+from alu.netlist import DEFAULT_CIRCUIT, load_netlist  # noqa: E402
+from alu.power import BOARD_MAP, CAPACITANCE_TABLE, PowerEstimator, load_board_map, load_capacitance  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Switching activity and dynamic power of the Logisim netlist.")
+    parser.add_argument("--circuit", type=Path, default=DEFAULT_CIRCUIT, help="Logisim circuit to simulate.")
+    parser.add_argument("--capacitance", type=Path, default=CAPACITANCE_TABLE,
+                        help="Capacitance table CSV (element,capacitance_pf).")
+    parser.add_argument("--boards", type=Path, default=BOARD_MAP, help="Net-to-board map CSV (net,board).")
+    parser.add_argument("--trace", type=Path, help="Instruction trace to replay ('OP A B' or JSON lines).")
+    parser.add_argument("--random", type=int, default=1_000_000,
+                        help="Random operations to replay when no trace is given.")
+    parser.add_argument("--opcodes", help="Comma-separated opcodes or mnemonics for the random stream (default: all).")
+    parser.add_argument("--seed", type=int, default=1, help="Seed of the random stream.")
+    parser.add_argument("--chunk", type=int, default=65536, help="Operations evaluated per bitsliced batch.")
+    parser.add_argument("--vdd", type=float, default=5.0, help="Supply voltage in V.")
+    parser.add_argument("--clock", type=float, default=1.0, help="Operation rate in MHz for the power figures.")
+    parser.add_argument("--json", type=Path, help="Write the power report to this JSON file.")
+    return parser.parse_args()
+
+
+def random_stream(total: int, opcodes: List[int], seed: int, chunk: int) -> Iterator[dict]:
+    """Batches of uniformly random operations drawn from opcodes"""
+    np = alu_model._numpy()
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        choices = np.array(opcodes, dtype=np.uint8)
+    else:
+        import random
+        rng = random.Random(seed)
+    for start in range(0, total, chunk):
+        size = min(chunk, total - start)
+        if np is not None:
+            yield {"CTRL": rng.choice(choices, size), "A_IN": rng.integers(0, 256, size, dtype=np.uint8),
+                   "B_IN": rng.integers(0, 256, size, dtype=np.uint8)}
+        else:
+            yield {"CTRL": [rng.choice(opcodes) for _ in range(size)],
+                   "A_IN": [rng.randrange(256) for _ in range(size)],
+                   "B_IN": [rng.randrange(256) for _ in range(size)]}
+
+
+def trace_stream(path: Path, chunk: int) -> Iterator[dict]:
+    """Batches of the operations in a trace, in order"""
+    from alu_cli import parse_batch_line
+
+    batch = {"CTRL": [], "A_IN": [], "B_IN": []}
+    with path.open("r", encoding="utf-8") as handle:
+        for number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                operation, a, b, _ = parse_batch_line(line)
+                opcode = opcode_number(operation)
+            except ValueError as exc:
+                raise ValueError(f"{path}:{number}: {exc}") from None
+            batch["CTRL"].append(opcode)
+            batch["A_IN"].append(a & 0xFF)
+            batch["B_IN"].append(b & 0xFF)
+            if len(batch["CTRL"]) == chunk:
+                yield batch
+                batch = {"CTRL": [], "A_IN": [], "B_IN": []}
+    if batch["CTRL"]:
+        yield batch
+
+
+def build_report(estimator: PowerEstimator, activity, vdd: float, clock_mhz: float) -> dict:
+    energy = estimator.energy(activity, vdd)
+    operations = activity.vectors
+    boards = {}
+    for per_board in energy.values():
+        for board, nanojoules in per_board.items():
+            boards[board] = boards.get(board, 0.0) + nanojoules
+    nodes = {}
+    transitions = {}
+    for signal in estimator.nodes:
+        board = estimator.board[signal]
+        nodes[board] = nodes.get(board, 0) + 1
+        count = sum(counts[signal] for counts in activity.toggles.values())
+        transitions[board] = transitions.get(board, 0) + count
+    total = sum(boards.values())
+
+    def power_mw(nanojoules: float) -> float:
+        return nanojoules / operations * clock_mhz     # nJ/op × Mop/s = mW
+
+    return {
+        "operations": operations,
+        "vdd": vdd,
+        "clock_mhz": clock_mhz,
+        "energy_per_op_nj": round(total / operations, 3) if operations else 0.0,
+        "power_mw": round(power_mw(total), 3) if operations else 0.0,
+        "activity_factor": round(sum(transitions.values()) / (len(estimator.nodes) * operations), 4)
+        if operations else 0.0,
+        "boards": [
+            {
+                "board": board,
+                "nodes": nodes[board],
+                "activity_factor": round(transitions[board] / (nodes[board] * operations), 4),
+                "energy_per_op_nj": round(boards.get(board, 0.0) / operations, 3),
+                "power_mw": round(power_mw(boards.get(board, 0.0)), 3),
+            }
+            for board in sorted(nodes, key=lambda name: -boards.get(name, 0.0))
+        ] if operations else [],
+        "opcodes": [
+            {
+                "opcode": OPCODES[opcode],
+                "operation": OPCODE_INFO[opcode].mnemonic,
+                "operations": activity.operations[opcode],
+                "energy_per_op_nj": round(sum(energy[opcode].values()) / activity.operations[opcode], 3),
+            }
+            for opcode in sorted(activity.operations)
+        ],
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"Power: {report['operations']:,} operations from {report['source']} "
+          f"({report['seconds']:.2f} s), VDD {report['vdd']} V, {report['clock_mhz']} MHz\n")
+    print(f"{'Board':<14} {'Nodes':>5} {'Activity':>8} {'nJ/op':>8} {'mW':>9}")
+    for entry in report["boards"]:
+        print(f"{entry['board']:<14} {entry['nodes']:>5} {entry['activity_factor']:>8.3f} "
+              f"{entry['energy_per_op_nj']:>8.2f} {entry['power_mw']:>9.2f}")
+    print(f"{'Total':<14} {sum(e['nodes'] for e in report['boards']):>5} {report['activity_factor']:>8.3f} "
+          f"{report['energy_per_op_nj']:>8.2f} {report['power_mw']:>9.2f}")
+
+    print(f"\n{'Opcode':<7} {'Operation':<9} {'Ops':>9} {'nJ/op':>8}")
+    for entry in report["opcodes"]:
+        print(f"{entry['opcode']:<7} {entry['operation']:<9} {entry['operations']:>9,} {entry['energy_per_op_nj']:>8.2f}")
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        estimator = PowerEstimator(load_netlist(args.circuit), load_capacitance(args.capacitance),
+                                   load_board_map(args.boards))
+        if args.trace:
+            stream = trace_stream(args.trace, args.chunk)
+            source = str(args.trace)
+        else:
+            opcodes = ([opcode_number(name) for name in args.opcodes.split(",")] if args.opcodes
+                       else list(range(len(OPCODES))))
+            stream = random_stream(args.random, opcodes, args.seed, args.chunk)
+            source = f"random stream (seed {args.seed})"
+        started = time.perf_counter()
+        activity = estimator.count(stream, key="CTRL")
+    except (ValueError, KeyError, OSError) as exc:
+        print(f"Error: {exc}")
+        return 1
+
+    report = build_report(estimator, activity, args.vdd, args.clock)
+    report.update({"source": source, "seconds": round(time.perf_counter() - started, 3)})
+    print_report(report)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with args.json.open("w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,236 +1,355 @@
 #!/usr/bin/env python3
 """
 Refactor KiCad file names to match their directory names.
-Ensures consistency and updates all references in .kicad_pro files.
+Ensures consistency and updates all references to the renamed files.
+
+    python3 tools/rename_kicad_files.py --dry-run                 # show the plan
+    python3 tools/rename_kicad_files.py --plan plan.json --yes    # save the plan and apply it
+    python3 tools/rename_kicad_files.py schematics/kicad/modules  # another tree
+
+The tree (schematics/kicad by default) is scanned once. Every project
+directory (one holding a .kicad_pro) whose files are named differently from
+the directory is renamed. The plan also holds every reference to a renamed
+file anywhere in the tree: hierarchical sheet references in schematics
+(resolved against the schematic's directory) and boards (matched by path
+suffix, since they are relative to the instantiating schematic), the file
+names in the project's .kicad_pro, and the symbol-instance project names in
+schematics.
+
+Applying the plan is transactional: rewritten files are first written to
+temporary files next to their targets (in a thread pool), then files are
+moved and temporaries renamed into place. The references are verified
+afterwards, and any failure, during the moves or in the verification, undoes
+every completed step.
 """
 
+import argparse
+import json
 import os
 import re
-import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+KICAD_EXTENSIONS = ['.kicad_sch', '.kicad_pcb', '.kicad_pro', '.kicad_prl']
+# Renamed along with the project files when they share its name
+COMPANION_EXTENSIONS = ['.kicad_dru', '.wbk']
+# Files whose references are rewritten
+TEXT_EXTENSIONS = ('.kicad_sch', '.kicad_pcb', '.kicad_pro')
+
+# Hierarchical sheet references: (property "Sheetfile" "...") in schematics, (sheetfile "...") in boards
+SHEET_REFERENCE = re.compile(r'(\(property "Sheetfile" "|\(sheetfile ")((?:[^"\\]|\\.)*)"')
+PROJECT_REFERENCE = re.compile(r'\(project "((?:[^"\\]|\\.)*)"')
+
+TEMP_SUFFIX = '.rename-tmp'
+
+
+class Rename(NamedTuple):
+    old: Path
+    new: Path
+    old_name: str             # Old base name, e.g. 'gate_nor_2in'
+    new_name: str             # The directory's name
+
+
+class Edit(NamedTuple):
+    path: Path                # The file as it is now (before any rename)
+    original: str
+    text: str
+    changes: int
+
+
+class RenameError(Exception):
+    """The plan cannot be applied or did not verify"""
+
 
 def get_directory_name(path):
     """Extract the directory name from a path."""
     return os.path.basename(os.path.normpath(path))
 
-def find_kicad_files(directory):
-    """Find all KiCad files in a directory."""
-    kicad_extensions = ['.kicad_sch', '.kicad_pcb', '.kicad_pro', '.kicad_prl']
-    files = {}
-    for ext in kicad_extensions:
-        pattern = f"*{ext}"
-        matches = list(Path(directory).glob(pattern))
-        if matches:
-            # Take the first match (should only be one per type)
-            files[ext] = matches[0]
+
+def is_skipped(name):
+    """Backup and hidden directories are left alone."""
+    return 'backup' in name.lower() or name.startswith('.')
+
+
+def scan_tree(root_dir):
+    """One walk of the tree: KiCad files by directory."""
+    files: Dict[Path, List[Path]] = {}
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames[:] = sorted(d for d in dirnames if not is_skipped(d))
+        found = [Path(dirpath) / name for name in sorted(filenames) if not name.startswith('_autosave-')
+                 and os.path.splitext(name)[1] in KICAD_EXTENSIONS + COMPANION_EXTENSIONS]
+        if found:
+            files[Path(dirpath)] = found
     return files
 
-def update_kicad_pro_references(file_path, old_name, new_name):
-    """Update file references in a .kicad_pro file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # .kicad_pro files are JSON
-        # Need to update references to schematic and PCB files
-        data = json.loads(content)
-        
-        modified = False
-        
-        # Update board file reference (can be string or dict)
-        if 'board' in data:
-            if isinstance(data['board'], str) and old_name in data['board']:
-                data['board'] = data['board'].replace(old_name, new_name)
-                modified = True
-            elif isinstance(data['board'], dict):
-                # Recursively update dict values
-                def update_dict(obj, old, new):
-                    if isinstance(obj, dict):
-                        return {k: update_dict(v, old, new) for k, v in obj.items()}
-                    elif isinstance(obj, list):
-                        return [update_dict(item, old, new) for item in obj]
-                    elif isinstance(obj, str) and old in obj:
-                        return obj.replace(old, new)
-                    return obj
-                old_board = str(data['board'])
-                data['board'] = update_dict(data['board'], old_name, new_name)
-                if str(data['board']) != old_board:
-                    modified = True
-        
-        # Update schematic files list
-        if 'schematic' in data:
-            if isinstance(data['schematic'], list):
-                for i, sch in enumerate(data['schematic']):
-                    if isinstance(sch, str) and old_name in sch:
-                        data['schematic'][i] = sch.replace(old_name, new_name)
-                        modified = True
-            elif isinstance(data['schematic'], str):
-                if old_name in data['schematic']:
-                    data['schematic'] = data['schematic'].replace(old_name, new_name)
-                    modified = True
-        
-        if modified:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            return True
-    except (json.JSONDecodeError, UnicodeDecodeError) as e:
-        # Try simple string replacement as fallback
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            if old_name in content:
-                content = content.replace(old_name, new_name)
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                return True
-        except Exception as e2:
-            pass  # Silent fail for reference updates
-    except Exception as e:
-        pass  # Silent fail for reference updates
-    return False
-
-def update_sch_references(file_path, old_name, new_name):
-    """Update file references in .kicad_sch files (s-expressions)."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Update Sheetfile references
-        pattern = rf'\(property "Sheetfile" ".*{re.escape(old_name)}[^"]*"'
-        replacement = lambda m: m.group(0).replace(old_name, new_name)
-        
-        if re.search(pattern, content):
-            content = re.sub(pattern, replacement, content)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True
-    except Exception as e:
-        print(f"  Warning: Could not update {file_path}: {e}")
-    return False
-
-def rename_kicad_files(directory):
-    """Rename KiCad files in a directory to match the directory name."""
+
+def rename_kicad_files(directory, files, warnings):
+    """Renames giving a project directory's KiCad files the directory's name."""
     dir_name = get_directory_name(directory)
-    files = find_kicad_files(directory)
-    
-    if not files:
-        return None
-    
-    # Determine the current base name from existing files
-    current_name = None
-    for ext, file_path in files.items():
-        base = file_path.stem
-        # Skip if already matches directory name
-        if base == dir_name:
-            continue
-        if current_name is None:
-            current_name = base
-        elif current_name != base:
-            print(f"  Warning: Multiple file base names found: {current_name}, {base}")
-    
-    if current_name is None or current_name == dir_name:
-        return None
-    
-    # Rename files
+    if not any(path.suffix == '.kicad_pro' for path in files):
+        return []
+    names = {path.stem for path in files if path.stem != dir_name and path.suffix in KICAD_EXTENSIONS}
+    if not names:
+        return []
+    if len(names) > 1:
+        warnings.append(f"{directory}: multiple file base names found ({', '.join(sorted(names))}), skipped")
+        return []
+    current_name = names.pop()
+    return [Rename(path, path.with_name(dir_name + path.suffix), current_name, dir_name)
+            for path in files if path.stem == current_name]
+
+
+def _replace_sheet_references(text, path, moved):
+    """Rewrite sheet references to moved files; returns the text and the number of changes."""
+    changes = 0
+
+    def replace(match):
+        nonlocal changes
+        reference = match.group(2)
+        if path.suffix == '.kicad_sch':
+            target = Path(os.path.normpath(path.parent / reference))
+            rename = moved.get(target)
+        else:
+            # Board references are relative to the instantiating schematic: match by path suffix
+            suffix = Path(os.path.normpath(reference)).parts
+            suffix = tuple(part for part in suffix if part != '..')
+            rename = next((r for old, r in moved.items() if suffix and old.parts[-len(suffix):] == suffix), None)
+        if rename is None or not reference.endswith(rename.old.name):
+            return match.group(0)
+        changes += 1
+        return f'{match.group(1)}{reference[:-len(rename.old.name)]}{rename.new.name}"'
+
+    return SHEET_REFERENCE.sub(replace, text), changes
+
+
+def plan_edits(files, renames, jobs=None):
+    """The rewritten content of every file that refers to a renamed file."""
+    moved = {rename.old: rename for rename in renames}
+    # Symbol instances name their project; rename it only where the old name is unambiguous
+    projects = {}
+    for directory, paths in files.items():
+        for path in paths:
+            if path.suffix == '.kicad_pro':
+                projects.setdefault(path.stem, []).append(path)
+    project_names = {r.old_name: r.new_name for r in renames
+                     if r.old.suffix == '.kicad_pro' and len(projects.get(r.old_name, ())) == 1}
+    project_files = {r.old: r for r in renames if r.old.suffix == '.kicad_pro'}
+
+    def edit(path):
+        text = path.read_text(encoding='utf-8')
+        new_text, changes = text, 0
+        if path.suffix in ('.kicad_sch', '.kicad_pcb'):
+            new_text, changes = _replace_sheet_references(text, path, moved)
+        if path.suffix == '.kicad_sch' and project_names:
+            def project(match):
+                nonlocal changes
+                if match.group(1) not in project_names:
+                    return match.group(0)
+                changes += 1
+                return f'(project "{project_names[match.group(1)]}"'
+            new_text = PROJECT_REFERENCE.sub(project, new_text)
+        if path in project_files:
+            rename = project_files[path]
+            # File names in the project: "<old>.kicad_pro", "<old>.wbk", ...
+            new_text, count = re.subn(rf'(?<=["/]){re.escape(rename.old_name)}(?=\.[A-Za-z0-9_-]+")',
+                                      rename.new_name, new_text)
+            changes += count
+        return Edit(path, text, new_text, changes) if changes else None
+
+    candidates = [path for paths in files.values() for path in paths if path.suffix in TEXT_EXTENSIONS]
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return [edit_ for edit_ in pool.map(edit, candidates) if edit_ is not None]
+
+
+def process_directory(root_dir, jobs=None):
+    """Scan the tree once and return the plan: renames, reference edits and warnings."""
+    files = scan_tree(root_dir)
+    warnings = []
     renames = []
-    for ext, file_path in files.items():
-        old_path = file_path
-        new_path = file_path.parent / f"{dir_name}{ext}"
-        
-        if old_path != new_path:
-            renames.append((old_path, new_path, current_name, dir_name))
-    
-    return renames if renames else None
-
-def process_directory(root_dir):
-    """Process all directories and rename files."""
-    root_path = Path(root_dir)
-    all_renames = []
-    
-    # Find all directories that might contain KiCad files
-    for dir_path in root_path.rglob('*'):
-        if not dir_path.is_dir():
-            continue
-        
-        # Skip backup directories and hidden directories
-        if 'backup' in dir_path.name.lower() or dir_path.name.startswith('.'):
-            continue
-        
-        # Skip if directory is too shallow (root level modules only)
-        if len(dir_path.relative_to(root_path).parts) < 2:
-            continue
-        
-        renames = rename_kicad_files(str(dir_path))
-        if renames:
-            all_renames.extend(renames)
-    
-    # Sort by depth (deepest first) to avoid path issues
-    all_renames.sort(key=lambda x: len(str(x[0].parent).split(os.sep)), reverse=True)
-    
-    return all_renames
+    for directory, paths in files.items():
+        renames.extend(rename_kicad_files(directory, paths, warnings))
+    for rename in renames:
+        if rename.new.exists():
+            warnings.append(f"{rename.new} already exists, {rename.old.name} cannot be renamed")
+    edits = plan_edits(files, renames, jobs) if renames else []
+    return renames, edits, warnings
+
+
+def _write_temp(path, text):
+    tmp_path = path.with_name(path.name + TEMP_SUFFIX)
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp_path
+
+
+def verify(root_dir, renames, before, jobs=None):
+    """Problems with the renamed tree: files not moved, references that no longer resolve."""
+    problems = [f"{r.new} is missing" for r in renames if not r.new.exists()]
+    problems += [f"{r.old} still exists" for r in renames if r.old.exists()]
+    files = scan_tree(root_dir)
+    olds = {rename.old for rename in renames}
+    # before is keyed by the paths as they were before the renames
+    originals = {rename.new: rename.old for rename in renames}
+
+    def check(path):
+        found = []
+        text = path.read_text(encoding='utf-8')
+        if path.suffix == '.kicad_pro':
+            try:
+                json.loads(text)
+            except ValueError as e:
+                found.append(f"{path}: invalid JSON ({e})")
+        for match in SHEET_REFERENCE.finditer(text):
+            reference = match.group(2)
+            if path.suffix == '.kicad_sch':
+                target = Path(os.path.normpath(path.parent / reference))
+                if not target.exists() and (target in olds or before.get(originals.get(path, path), {}).get(reference, True)):
+                    found.append(f"{path}: sheet {reference} not found")
+            else:
+                suffix = tuple(p for p in Path(os.path.normpath(reference)).parts if p != '..')
+                if any(old.parts[-len(suffix):] == suffix for old in olds):
+                    found.append(f"{path}: sheet {reference} still names a renamed file")
+        return found
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for found in pool.map(check, [p for paths in files.values() for p in paths if p.suffix in TEXT_EXTENSIONS]):
+            problems.extend(found)
+    return problems
+
+
+def resolved_references(files):
+    """For each schematic, whether each of its sheet references resolved before the change."""
+    result = {}
+    for paths in files.values():
+        for path in paths:
+            if path.suffix == '.kicad_sch':
+                text = path.read_text(encoding='utf-8')
+                result[path] = {m.group(2): (path.parent / m.group(2)).exists() for m in SHEET_REFERENCE.finditer(text)}
+    return result
+
+
+def apply_plan(root_dir, renames, edits, jobs=None):
+    """Apply renames and edits as one transaction; raises RenameError after undoing everything."""
+    moved = {rename.old: rename.new for rename in renames}
+    conflicts = [str(r.new) for r in renames if r.new.exists()]
+    if conflicts:
+        raise RenameError(f"Targets already exist: {', '.join(conflicts)}")
+    before = resolved_references(scan_tree(root_dir))
+
+    # Prepare: write every rewritten file next to its final location
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [(edit, pool.submit(_write_temp, moved.get(edit.path, edit.path), edit.text)) for edit in edits]
+    temps = []
+    failures = []
+    for edit, future in futures:
+        try:
+            temps.append((edit, future.result()))
+        except OSError as e:
+            failures.append(f"{edit.path}: {e}")
+    if failures:
+        for _, tmp_path in temps:
+            tmp_path.unlink(missing_ok=True)
+        raise RenameError(f"Could not write {len(failures)} files: {'; '.join(failures)}")
+
+    # Commit: move files, then put the rewritten content in place; record how to undo each step
+    undo = []
+    try:
+        for rename in renames:
+            os.replace(rename.old, rename.new)
+            undo.append(lambda r=rename: os.replace(r.new, r.old))
+        for edit, tmp_path in temps:
+            target = moved.get(edit.path, edit.path)
+            os.replace(tmp_path, target)
+            undo.append(lambda e=edit, t=target: os.replace(_write_temp(t, e.original), t))
+        problems = verify(root_dir, renames, before, jobs)
+        if problems:
+            raise RenameError("Verification failed: " + '; '.join(problems))
+    except (OSError, RenameError) as e:
+        undo_failures = []
+        for step in reversed(undo):
+            try:
+                step()
+            except OSError as undo_error:
+                undo_failures.append(str(undo_error))
+        for _, tmp_path in temps:
+            tmp_path.unlink(missing_ok=True)
+        if undo_failures:
+            raise RenameError(f"{e} (could not undo {len(undo_failures)} steps: "
+                              f"{'; '.join(undo_failures)})") from None
+        raise RenameError(f"{e} (all changes undone)") from None
+
+
+def plan_to_json(root_dir, renames, edits, warnings):
+    root = Path(root_dir)
+    return {
+        'root': str(root.resolve()),
+        'renames': [{'from': os.path.relpath(r.old, root), 'to': os.path.relpath(r.new, root)} for r in renames],
+        'edits': [{'file': os.path.relpath(e.path, root), 'changes': e.changes} for e in edits],
+        'warnings': warnings,
+    }
+
 
 def main():
-    if len(sys.argv) > 1:
-        root_dir = sys.argv[1]
-    else:
-        root_dir = '/Users/tmarhguy/Documents/cpu/kicad/modules'
-    
-    print(f"Scanning {root_dir} for KiCad files...")
-    renames = process_directory(root_dir)
-    
+    parser = argparse.ArgumentParser(description="Rename KiCad project files to match their directories.")
+    parser.add_argument('root_dir', nargs='?', type=Path, default=REPO_ROOT / 'schematics' / 'kicad',
+                        help="Tree to normalize (default: schematics/kicad).")
+    parser.add_argument('-y', '--yes', action='store_true', help="Apply without asking.")
+    parser.add_argument('--dry-run', action='store_true', help="Only show the plan.")
+    parser.add_argument('--plan', type=Path, help="Write the plan to this JSON file.")
+    parser.add_argument('--jobs', type=int, help="Threads reading and writing files.")
+    args = parser.parse_args()
+
+    if not args.root_dir.is_dir():
+        print(f"Error: {args.root_dir} is not a directory")
+        return 1
+
+    print(f"Scanning {args.root_dir} for KiCad files...")
+    renames, edits, warnings = process_directory(args.root_dir, args.jobs)
+    for warning in warnings:
+        print(f"  Warning: {warning}")
+    if args.plan:
+        with args.plan.open('w', encoding='utf-8') as f:
+            json.dump(plan_to_json(args.root_dir, renames, edits, warnings), f, indent=2)
+            f.write('\n')
+
     if not renames:
         print("No files need renaming.")
-        return
-    
+        return 0
+
     print(f"\nFound {len(renames)} files to rename:\n")
-    
-    # Show what will be renamed
-    for old_path, new_path, old_name, new_name in renames:
-        print(f"  {old_path.name} -> {new_path.name}")
-        print(f"    ({old_path.parent} -> {new_path.parent})")
-    
-    print(f"\nTotal: {len(renames)} files")
-    
-    # Auto-confirm if --yes flag is provided, otherwise ask
-    auto_yes = '--yes' in sys.argv or '-y' in sys.argv
-    if not auto_yes:
+    for rename in renames:
+        print(f"  {rename.old.name} -> {rename.new.name}")
+        print(f"    ({rename.old.parent})")
+    print(f"\nReferences to update in {len(edits)} files:\n")
+    for edit in edits:
+        print(f"  {os.path.relpath(edit.path, args.root_dir)}: {edit.changes}")
+
+    if args.dry_run:
+        return 0
+    if not args.yes:
         try:
             confirm = input("\nProceed with renaming? (yes/no): ").strip().lower()
-            if confirm not in ['yes', 'y']:
-                print("Cancelled.")
-                return
         except EOFError:
             print("\nNo input available. Use --yes flag to auto-confirm.")
-            print("Dry-run mode: showing what would be renamed without actually renaming.")
-            auto_yes = False
-            # Don't proceed, just show
-            return
-    
-    # Perform renames
-    print("\nRenaming files...")
-    for old_path, new_path, old_name, new_name in renames:
-        try:
-            # Rename the file
-            old_path.rename(new_path)
-            print(f"  ✓ Renamed: {old_path.name} -> {new_path.name}")
-            
-            # Update references in .kicad_pro files
-            pro_files = list(new_path.parent.glob('*.kicad_pro'))
-            for pro_file in pro_files:
-                if update_kicad_pro_references(pro_file, old_name, new_name):
-                    print(f"    Updated references in {pro_file.name}")
-            
-            # Update references in .kicad_sch files
-            sch_files = list(new_path.parent.glob('*.kicad_sch'))
-            for sch_file in sch_files:
-                if update_sch_references(sch_file, old_name, new_name):
-                    print(f"    Updated references in {sch_file.name}")
-        
-        except Exception as e:
-            print(f"  ✗ Error renaming {old_path.name}: {e}")
-    
-    print("\nDone!")
+            return 0
+        if confirm not in ['yes', 'y']:
+            print("Cancelled.")
+            return 0
+
+    try:
+        apply_plan(args.root_dir, renames, edits, args.jobs)
+    except RenameError as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"\nRenamed {len(renames)} files and updated {len(edits)} files; all references verified.")
+    return 0
+
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
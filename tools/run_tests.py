@@ -7,10 +7,26 @@ import argparse
 import csv
 import json
 import sys
+from array import array
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Tuple
 
+# Golden model and vector formats live in the alu package at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from alu import ALU, OPCODE_INDEX, OPCODE_INFO, OPCODES, lookup_opcode, pack_flags, unpack_flags  # noqa: E402
+from alu.netlist import DEFAULT_CIRCUIT, NetlistALU8Bit, load_netlist  # noqa: E402
+from alu.rtl import RTLALU8Bit  # noqa: E402
+from alu.vector_format import RECORD, RECORD_SIZE, VectorFile, is_binary_vector_file, test_name  # noqa: E402
+
+VECTOR_PATTERNS = ("*.json", "*.bin")
+
+# Binary records checked per evaluate_batch call
+BATCH_RECORDS = 65536
+
+# Flag dicts of binary-record results, shared by NZCV value (asdict copies them)
+FLAG_DICTS = tuple(unpack_flags(nzcv) for nzcv in range(16))
+
 
 @dataclass
 class TestResult:
@@ -28,71 +44,151 @@ class TestResult:
 class HardwareInterface:
     """Abstract interface for hardware/simulation evaluation."""
 
+    name = "hardware"
+
     def evaluate(self, test: Dict[str, Any]) -> Tuple[int, Dict[str, bool]]:
         raise NotImplementedError
 
+    def evaluate_batch(self, opcodes, a, b):
+        """Evaluate 8-bit operations given as numeric opcodes and operand sequences.
+
+        opcodes may be a single numeric opcode for every pair. Returns
+        (results, nzcv) like ALU.execute_batch. The default calls evaluate()
+        per element; backends with a vectorized path override it.
+        """
+        if isinstance(opcodes, int):
+            opcodes = [opcodes] * len(a)
+        results = array("B")
+        nzcv = array("B")
+        for opcode, x, y in zip(opcodes, a, b):
+            result, flags = self.evaluate({"opcode": OPCODES[opcode], "A": int(x), "B": int(y)})
+            results.append(result)
+            nzcv.append(pack_flags(flags))
+        return results, nzcv
+
 
 class SimulatedALUHardware(HardwareInterface):
-    """Simulated ALU evaluator for add/sub operations."""
+    """Simulated ALU evaluator backed by the shared golden model."""
+
+    name = "golden"
+
+    def __init__(self) -> None:
+        self.models: Dict[int, ALU] = {}
+
+    def model(self, width: int = 8) -> ALU:
+        alu = self.models.get(width)
+        if alu is None:
+            alu = self.models[width] = ALU(width)
+        return alu
 
     def evaluate(self, test: Dict[str, Any]) -> Tuple[int, Dict[str, bool]]:
-        width = int(test.get("width", 8))
-        mask = (1 << width) - 1
-        a = int(test["A"]) & mask
-        b = int(test["B"]) & mask
-
-        operation = normalize_operation(test)
-        if operation not in {"ADD", "SUB"}:
-            raise ValueError(f"Unsupported operation '{operation}'")
-
-        if operation == "ADD":
-            raw = a + b
-            result = raw & mask
-            carry = raw > mask
-        else:
-            raw = a - b
-            result = raw & mask
-            carry = raw >= 0
-
-        a_signed = to_signed(a, width)
-        b_signed = to_signed(b, width)
-        result_signed = to_signed(result, width)
-
-        if operation == "ADD":
-            overflow = (
-                (a_signed >= 0 and b_signed >= 0 and result_signed < 0)
-                or (a_signed < 0 and b_signed < 0 and result_signed >= 0)
-            )
-        else:
-            overflow = (
-                (a_signed >= 0 and b_signed < 0 and result_signed < 0)
-                or (a_signed < 0 and b_signed >= 0 and result_signed >= 0)
-            )
-
-        flags = {
-            "carry": carry,
-            "overflow": overflow,
-            "zero": result == 0,
-            "negative": bool(result & (1 << (width - 1))),
-        }
-        return result, flags
-
-
-def to_signed(value: int, width: int) -> int:
-    sign_bit = 1 << (width - 1)
-    if value & sign_bit:
-        return value - (1 << width)
-    return value
+        alu = self.model(int(test.get("width", 8)))
+        return alu.execute(resolve_opcode(test), int(test["A"]), int(test["B"]))
+
+    def evaluate_batch(self, opcodes, a, b):
+        return self.model(8).execute_batch(opcodes, a, b)
+
+
+class RTLSemanticsHardware(HardwareInterface):
+    """What sim/FPGA/src/ALU.sv computes, including its opcode numbering."""
+
+    name = "rtl"
+
+    def __init__(self) -> None:
+        self.alu = RTLALU8Bit()
+
+    def evaluate(self, test: Dict[str, Any]) -> Tuple[int, Dict[str, bool]]:
+        return self.alu.execute(resolve_opcode(test), int(test["A"]), int(test["B"]))
+
+    def evaluate_batch(self, opcodes, a, b):
+        return self.alu.execute_batch(opcodes, a, b)
+
+
+class NetlistHardware(HardwareInterface):
+    """Gate-level simulation of the Logisim circuit (sim/top/alu_top.circ)."""
+
+    name = "netlist"
+
+    def __init__(self, circuit: Path = DEFAULT_CIRCUIT) -> None:
+        self.alu = NetlistALU8Bit(load_netlist(circuit))
+
+    def evaluate(self, test: Dict[str, Any]) -> Tuple[int, Dict[str, bool]]:
+        return self.alu.execute(resolve_opcode(test), int(test["A"]), int(test["B"]))
+
+    def evaluate_batch(self, opcodes, a, b):
+        return self.alu.execute_batch(opcodes, a, b)
+
+
+class FPGAHardware(HardwareInterface):
+    """ALU on an FPGA board over the batched serial link (alu/fpga_link.py)."""
+
+    name = "fpga"
+
+    def __init__(self, port: str, baudrate: int = 115200) -> None:
+        from alu.fpga_link import get_transport
+
+        self.transport = get_transport(port, baudrate)
+
+    def evaluate(self, test: Dict[str, Any]) -> Tuple[int, Dict[str, bool]]:
+        entry = self.transport.execute_packed(
+            OPCODE_INDEX[resolve_opcode(test)], int(test["A"]), int(test["B"])
+        )
+        return entry & 0xFF, unpack_flags(entry >> 8)
+
+    def evaluate_batch(self, opcodes, a, b):
+        if isinstance(opcodes, int):
+            opcodes = [opcodes] * len(a)
+        entries = self.transport.execute_batch(
+            [(int(opcode), int(x), int(y)) for opcode, x, y in zip(opcodes, a, b)]
+        )
+        return array("B", [entry & 0xFF for entry in entries]), array("B", [entry >> 8 for entry in entries])
+
+
+# Backends selectable by name; options not used by a backend are ignored
+HARDWARE_BACKENDS = {
+    "golden": lambda **options: SimulatedALUHardware(),
+    "rtl": lambda **options: RTLSemanticsHardware(),
+    "netlist": lambda circuit=DEFAULT_CIRCUIT, **options: NetlistHardware(circuit or DEFAULT_CIRCUIT),
+    "fpga": lambda port=None, baudrate=115200, **options: FPGAHardware(port, baudrate),
+}
+
+
+def make_backend(name: str, **options: Any) -> HardwareInterface:
+    factory = HARDWARE_BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown backend '{name}' (choose from {', '.join(HARDWARE_BACKENDS)})")
+    if name == "fpga" and not options.get("port"):
+        raise ValueError("The fpga backend needs a serial port (--port)")
+    return factory(**options)
+
+
+# Legacy opcode spellings used by older vector files
+LEGACY_OPCODES = {
+    "0000": "00000",
+    "00000000": "00000",
+    "0001": "00001",
+    "11111111": "00001",
+}
+
+
+def resolve_opcode(test: Dict[str, Any]) -> str:
+    """5-bit opcode for a vector, from its 'operation' name or 'opcode' field."""
+    if "operation" in test:
+        return lookup_opcode(str(test["operation"])).opcode
+    opcode = str(test.get("opcode", "")).strip()
+    opcode = LEGACY_OPCODES.get(opcode, opcode)
+    if opcode not in OPCODE_INDEX:
+        raise ValueError(f"Unknown opcode '{opcode}'")
+    return opcode
 
 
 def normalize_operation(test: Dict[str, Any]) -> str:
     if "operation" in test:
         return str(test["operation"]).strip().upper()
     opcode = str(test.get("opcode", "")).strip()
-    if opcode in {"0000", "00000000"}:
-        return "ADD"
-    if opcode in {"11111111", "0001"}:
-        return "SUB"
+    opcode = LEGACY_OPCODES.get(opcode, opcode)
+    if opcode in OPCODE_INDEX:
+        return OPCODE_INFO[OPCODE_INDEX[opcode]].mnemonic
     return "UNKNOWN"
 
 
@@ -113,48 +209,89 @@ def load_vectors(path: Path) -> List[Dict[str, Any]]:
     return vectors
 
 
-def evaluate_vectors(vector_file: Path, hw: HardwareInterface) -> List[TestResult]:
-    results: List[TestResult] = []
-    vectors = load_vectors(vector_file)
-
-    for test in vectors:
-        test_name = str(test.get("test_name", "unnamed"))
-        operation = normalize_operation(test)
-        expected_result = int(test.get("expected_result", 0))
-        expected_flags = {
-            key: bool(value)
-            for key, value in test.get("expected_flags", {}).items()
-        }
-        try:
-            actual_result, actual_flags = hw.evaluate(test)
-            passed = (expected_result == actual_result) and all(
-                expected_flags.get(flag) == actual_flags.get(flag)
-                for flag in expected_flags
-            )
-            message = "pass" if passed else "mismatch"
-        except Exception as exc:  # pragma: no cover - defensive
-            actual_result = -1
-            actual_flags = {}
-            passed = False
-            message = f"error: {exc}"
-
-        results.append(
-            TestResult(
-                vector_file=vector_file.name,
-                test_name=test_name,
-                operation=operation,
-                passed=passed,
-                expected_result=expected_result,
-                actual_result=actual_result,
-                expected_flags=expected_flags,
-                actual_flags=actual_flags,
-                message=message,
-            )
+def evaluate_test(vector_file: Path, test: Dict[str, Any], hw: HardwareInterface) -> TestResult:
+    test_name = str(test.get("test_name", "unnamed"))
+    operation = normalize_operation(test)
+    expected_result = int(test.get("expected_result", 0))
+    expected_flags = {
+        key: bool(value)
+        for key, value in test.get("expected_flags", {}).items()
+    }
+    try:
+        actual_result, actual_flags = hw.evaluate(test)
+        passed = (expected_result == actual_result) and all(
+            expected_flags.get(flag) == actual_flags.get(flag)
+            for flag in expected_flags
         )
+        message = "pass" if passed else "mismatch"
+    except Exception as exc:  # pragma: no cover - defensive
+        actual_result = -1
+        actual_flags = {}
+        passed = False
+        message = f"error: {exc}"
+
+    return TestResult(
+        vector_file=vector_file.name,
+        test_name=test_name,
+        operation=operation,
+        passed=passed,
+        expected_result=expected_result,
+        actual_result=actual_result,
+        expected_flags=expected_flags,
+        actual_flags=actual_flags,
+        message=message,
+    )
+
+
+def evaluate_records(vector_file: Path, hw: HardwareInterface) -> List[TestResult]:
+    """Check a binary vector file BATCH_RECORDS at a time through hw.evaluate_batch.
 
+    The opcode and operand columns passed to the backend are zero-copy views
+    of the memory-mapped records. A chunk the backend rejects (an unknown
+    opcode, a link error) is re-run record by record so each vector gets its
+    own result.
+    """
+    results: List[TestResult] = []
+    with VectorFile(vector_file) as vectors:
+        for start in range(0, len(vectors), BATCH_RECORDS):
+            stop = min(start + BATCH_RECORDS, len(vectors))
+            with vectors.slice(start, stop) as chunk:
+                try:
+                    actual = hw.evaluate_batch(chunk[0::RECORD_SIZE], chunk[1::RECORD_SIZE], chunk[2::RECORD_SIZE])
+                except Exception:
+                    results.extend(evaluate_test(vector_file, vectors.as_dict(index), hw)
+                                   for index in range(start, stop))
+                    continue
+                results.extend(record_results(vector_file, RECORD.iter_unpack(chunk), *actual))
     return results
 
 
+def record_results(vector_file: Path, records, actual_results, actual_nzcv) -> Iterable[TestResult]:
+    """TestResults for binary records and the backend's (results, nzcv) for them"""
+    for (opcode, a, b, expected_result, expected_nzcv), actual_result, nzcv in zip(
+        records, actual_results, actual_nzcv
+    ):
+        actual_result, nzcv = int(actual_result), int(nzcv)
+        passed = actual_result == expected_result and nzcv == expected_nzcv
+        yield TestResult(
+            vector_file=vector_file.name,
+            test_name=test_name(opcode, a, b),
+            operation=OPCODE_INFO[opcode].mnemonic,
+            passed=passed,
+            expected_result=expected_result,
+            actual_result=actual_result,
+            expected_flags=FLAG_DICTS[expected_nzcv & 0xF],
+            actual_flags=FLAG_DICTS[nzcv & 0xF],
+            message="pass" if passed else "mismatch",
+        )
+
+
+def evaluate_vectors(vector_file: Path, hw: HardwareInterface) -> List[TestResult]:
+    if is_binary_vector_file(vector_file):
+        return evaluate_records(vector_file, hw)
+    return [evaluate_test(vector_file, test, hw) for test in load_vectors(vector_file)]
+
+
 def write_results_json(results: Iterable[TestResult], output_path: Path) -> None:
     payload = [asdict(result) for result in results]
     output_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
@@ -183,13 +320,22 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--vectors-dir",
         default="test",
-        help="Directory containing JSON test vectors.",
+        help="Directory containing JSON or binary (.bin) test vectors.",
     )
     parser.add_argument(
         "--output-dir",
         default="results",
         help="Directory for CSV/JSON output files.",
     )
+    parser.add_argument(
+        "--backend",
+        default="golden",
+        choices=sorted(HARDWARE_BACKENDS),
+        help="Implementation to check the vectors against (default: golden model).",
+    )
+    parser.add_argument("--port", help="Serial port for the fpga backend.")
+    parser.add_argument("--baud", type=int, default=115200, help="Baud rate for the fpga backend.")
+    parser.add_argument("--circuit", type=Path, help="Logisim circuit for the netlist backend.")
     return parser.parse_args()
 
 
@@ -198,12 +344,18 @@ def main() -> int:
     vectors_dir = Path(args.vectors_dir)
     output_dir = Path(args.output_dir)
 
-    vector_files = sorted(vectors_dir.glob("*.json"))
+    vector_files = sorted(
+        path for pattern in VECTOR_PATTERNS for path in vectors_dir.glob(pattern)
+    )
     if not vector_files:
-        print(f"No JSON vector files found in {vectors_dir}")
+        print(f"No vector files found in {vectors_dir}")
         return 1
 
-    hw = SimulatedALUHardware()
+    try:
+        hw = make_backend(args.backend, port=args.port, baudrate=args.baud, circuit=args.circuit)
+    except (ValueError, OSError) as exc:
+        print(f"Error: {exc}")
+        return 1
     all_results: List[TestResult] = []
 
     for vector_file in vector_files:
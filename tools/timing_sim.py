@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Sweep the gate-level netlist with an event-driven timing simulation.
+
+Every (opcode, A, B) is applied to the circuit settled at a starting
+operation (ADD 0 0 by default), and the time until the outputs settle is
+measured with the per-element delays of spec/timing/gate_delays.csv. The
+report gives per-opcode settle times, the distribution across the input
+space, and the critical path of the slowest vector, from which a clock
+rate can be set.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from cosim import operand_space  # noqa: E402
+
+from alu import OPCODE_INFO, OPCODES, opcode_number  # noqa: E402
+from alu.netlist import DEFAULT_CIRCUIT, load_netlist  # noqa: E402
+from alu.timing import ALU_OUTPUTS, DELAY_TABLE, TimingSimulator, load_delays  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Event-driven timing sweep of the Logisim netlist.")
+    parser.add_argument("--circuit", type=Path, default=DEFAULT_CIRCUIT, help="Logisim circuit to simulate.")
+    parser.add_argument("--delays", type=Path, default=DELAY_TABLE, help="Delay table CSV (element,delay_ns).")
+    parser.add_argument("--opcodes", help="Comma-separated opcodes or mnemonics to sweep (default: all).")
+    parser.add_argument("--outputs", default=",".join(ALU_OUTPUTS),
+                        help="Comma-separated output pins whose settling is timed.")
+    parser.add_argument("--from", dest="start", default="ADD,0,0",
+                        help="Operation the circuit is settled at before each vector (OP,A,B).")
+    parser.add_argument("--bucket", type=float, default=25.0, help="Histogram bucket width in ns.")
+    parser.add_argument("--json", type=Path, help="Write the timing report to this JSON file.")
+    return parser.parse_args()
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def sweep(simulator: TimingSimulator, opcodes: List[int], initial: dict, bucket: float) -> dict:
+    a, b = operand_space()
+    histogram = {}
+    per_opcode = []
+    worst = (-1.0, 0, 0, 0)
+    events = 0
+    for opcode in opcodes:
+        timing = simulator.settle({"CTRL": opcode, "A_IN": a, "B_IN": b}, initial)
+        settle = [float(value) for value in timing.settle]
+        events += timing.events
+        index = max(range(len(settle)), key=settle.__getitem__)
+        ordered = sorted(settle)
+        per_opcode.append({
+            "opcode": OPCODES[opcode],
+            "operation": OPCODE_INFO[opcode].mnemonic,
+            "max_ns": ordered[-1],
+            "mean_ns": round(sum(settle) / len(settle), 1),
+            "p99_ns": percentile(ordered, 0.99),
+            "worst": {"A": int(a[index]), "B": int(b[index])},
+        })
+        if ordered[-1] > worst[0]:
+            worst = (ordered[-1], opcode, int(a[index]), int(b[index]))
+        for value in settle:
+            key = int(value // bucket)
+            histogram[key] = histogram.get(key, 0) + 1
+
+    critical, opcode, worst_a, worst_b = worst
+    traced = simulator.settle({"CTRL": opcode, "A_IN": worst_a, "B_IN": worst_b}, initial, trace=True)
+    return {
+        "vectors": len(opcodes) * len(a),
+        "events": events,
+        "opcodes": per_opcode,
+        "histogram": [{"from_ns": key * bucket, "to_ns": (key + 1) * bucket, "vectors": histogram[key]}
+                      for key in sorted(histogram)],
+        "critical": {
+            "opcode": OPCODES[opcode],
+            "operation": OPCODE_INFO[opcode].mnemonic,
+            "A": worst_a,
+            "B": worst_b,
+            "settle_ns": critical,
+            "fmax_mhz": round(1000.0 / critical, 2) if critical else None,
+            "path": [{"time_ns": t, "event": event} for t, event in simulator.critical_path(traced, 0)],
+        },
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"Timing: {report['vectors']:,} vectors from {report['from']}, delays {report['delays']} "
+          f"({report['seconds']:.2f} s, {report['events']:,} events)\n")
+    print(f"{'Opcode':<7} {'Operation':<9} {'Max ns':>7} {'Mean ns':>8} {'P99 ns':>7}  Slowest A,B")
+    for entry in report["opcodes"]:
+        print(f"{entry['opcode']:<7} {entry['operation']:<9} {entry['max_ns']:>7.1f} {entry['mean_ns']:>8.1f} "
+              f"{entry['p99_ns']:>7.1f}  {entry['worst']['A']:02X},{entry['worst']['B']:02X}")
+
+    print("\nSettle time distribution:")
+    largest = max(bucket["vectors"] for bucket in report["histogram"])
+    for bucket in report["histogram"]:
+        bar = "#" * max(1, round(40 * bucket["vectors"] / largest))
+        print(f"  {bucket['from_ns']:>5.0f}-{bucket['to_ns']:<5.0f} {bucket['vectors']:>9,}  {bar}")
+
+    critical = report["critical"]
+    print(f"\nCritical path: {critical['operation']} A={critical['A']:02X} B={critical['B']:02X}, "
+          f"{critical['settle_ns']:.1f} ns (Fmax {critical['fmax_mhz']} MHz)")
+    for step in critical["path"]:
+        print(f"  {step['time_ns']:>7.1f}  {step['event']}")
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        opcode, start_a, start_b = args.start.split(",")
+        initial = {"CTRL": opcode_number(opcode), "A_IN": int(start_a, 0), "B_IN": int(start_b, 0)}
+        opcodes = ([opcode_number(name) for name in args.opcodes.split(",")] if args.opcodes
+                   else list(range(len(OPCODES))))
+        simulator = TimingSimulator(load_netlist(args.circuit), load_delays(args.delays),
+                                    [name.strip() for name in args.outputs.split(",")])
+    except (ValueError, KeyError, OSError) as exc:
+        print(f"Error: {exc}")
+        return 1
+
+    started = time.perf_counter()
+    report = sweep(simulator, opcodes, initial, args.bucket)
+    report.update({"from": args.start, "delays": str(args.delays), "outputs": args.outputs,
+                   "seconds": round(time.perf_counter() - started, 3)})
+    print_report(report)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with args.json.open("w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())